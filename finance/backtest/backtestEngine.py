@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import pickle
 from dataclasses import dataclass
 from typing import List, Optional
 
 from finance.core.coreTypes import DroppedSignalRecord, EquityPoint, RunSummary, TradeRecord
+from finance.data.barArrays import BarArrays
 from finance.data.dataHandler import DataHandler
 from finance.execution.broker import Broker
 from finance.portfolio.portfolio import Portfolio
+from finance.portfolio.runJournal import RecordLog
 from finance.strategy.strategyBase import StrategyBase
 
 
@@ -20,13 +23,20 @@ class ResultBundle:
     metrics: Optional[dict] = None
 
 
+def _snapshot(seq):
+    """结果里的净值/成交：内存列表复制一份；落盘记录只取当前长度的快照，不读入内存。"""
+
+    return seq.snapshot() if isinstance(seq, RecordLog) else list(seq)
+
+
 class BacktestEngine:
     """MVP 回测引擎（单标的）：
 
     顺序（对每个 bar）：
     1) 若存在 pending signal，则在当日 open 撮合成交并更新组合
-    2) 当日 close 盯市，记录 equity
-    3) 基于当日 close 生成 signal，放入 pending（用于下一日 open）
+    2) 用当日 open/high/low 撮合挂单簿中的限价/止损单
+    3) 当日 close 盯市，记录 equity
+    4) 基于当日 close 生成 signal，放入 pending（用于下一日 open）；策略新提交的挂单从下一根 bar 起生效
 
     边界：最后一根 bar 产生的 signal 会被丢弃并记录。
     """
@@ -46,12 +56,32 @@ class BacktestEngine:
         self.broker = broker
         self.portfolio = portfolio
 
+        self._next = 0
+        self._dropped: List[DroppedSignalRecord] = []
+
     def run(self) -> ResultBundle:
+        self.advance()
+        return self.result()
+
+    @property
+    def bars_processed(self) -> int:
+        return self._next
+
+    def advance(self, end: Optional[int] = None) -> int:
+        """从上次停下的位置继续处理到第 end 根 bar（不含），返回已处理的 bar 数。
+
+        只推进前缀时，前缀最后一根 bar 的 signal 仍留在 broker 的 pending 里，
+        后续继续推进的结果与一次性 run 完全一致（可用于逐步加长样本的参数筛选）。
+        """
+
         bars = self.data.get_bars(self.symbol)
-        dropped: List[DroppedSignalRecord] = []
-        dropped_last_bar = 0
+        end = len(bars) if end is None else min(int(end), len(bars))
+        if self.broker.needs_liquidity(self.symbol):
+            # 冲击模型用的 ADV/波动率整段预先算一次
+            self.broker.attach_liquidity(self.symbol, BarArrays.from_bars(bars))
 
-        for i, bar in enumerate(bars):
+        for i in range(self._next, end):
+            bar = bars[i]
             # 1) open 撮合（使用上一交易日生成的 pending signal）
             order, fill = self.broker.execute_open(
                 bar,
@@ -61,17 +91,27 @@ class BacktestEngine:
             if order is not None and fill is not None:
                 self.portfolio.apply_fill(order, fill)
 
-            # 2) close 盯市（无论是否有交易，都记录 equity 点）
+            # 2) 挂单撮合（空挂单簿时跳过）
+            if len(self.broker.order_book):
+                for order, fill in self.broker.execute_resting(bar, cash=self.portfolio.cash, position_qty=self.portfolio.position_qty):
+                    self.portfolio.apply_fill(order, fill)
+                    self.strategy.on_fill(fill)
+
+            # 3) close 盯市（无论是否有交易，都记录 equity 点）
             self.portfolio.mark_to_market(bar)
 
-            # 3) close 后生成 signal
+            # 4) close 后生成 signal / 挂单
             signal = self.strategy.on_bar(bar)
+            orders, cancels = self.strategy.drain_orders()
+            for order_id in cancels:
+                self.broker.cancel_order(order_id)
+            for order in orders:
+                self.broker.submit_order(order)
             if signal is None:
                 continue
 
             if i == len(bars) - 1:
-                dropped_last_bar += 1
-                dropped.append(
+                self._dropped.append(
                     DroppedSignalRecord(
                         dt=signal.dt,
                         symbol=signal.symbol,
@@ -83,21 +123,38 @@ class BacktestEngine:
 
             self.broker.queue_signal(signal)
 
+        self._next = max(self._next, end)
+        return self._next
+
+    def result(self) -> ResultBundle:
         final_equity = self.portfolio.equity_curve[-1].total_equity if self.portfolio.equity_curve else self.portfolio.initial_cash
         summary = RunSummary(
             symbol=self.symbol,
-            bars=len(bars),
+            bars=self._next,
             trades=len(self.portfolio.trades),
-            dropped_signals_last_bar=dropped_last_bar,
+            dropped_signals_last_bar=len(self._dropped),
             initial_cash=self.portfolio.initial_cash,
             final_equity=float(final_equity),
         )
 
         return ResultBundle(
             symbol=self.symbol,
-            equity_curve=list(self.portfolio.equity_curve),
-            trades=list(self.portfolio.trades),
-            dropped_signals=dropped,
+            equity_curve=_snapshot(self.portfolio.equity_curve),
+            trades=_snapshot(self.portfolio.trades),
+            dropped_signals=list(self._dropped),
             run_summary=summary,
             metrics=None,
         )
+
+    def checkpoint(self) -> bytes:
+        """序列化引擎状态（策略/broker/组合/进度），不含行情数据。"""
+
+        state = {k: v for k, v in self.__dict__.items() if k != "data"}
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def restore(cls, blob: bytes, data: DataHandler) -> "BacktestEngine":
+        engine = cls.__new__(cls)
+        engine.__dict__.update(pickle.loads(blob))
+        engine.data = data
+        return engine
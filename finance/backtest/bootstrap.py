@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from finance.backtest.metrics import Metrics, MetricsConfig
+
+BOOTSTRAP_METRICS = ("cumulative_return", "annualized_return", "max_drawdown", "sharpe")
+
+
+def default_block_len(n: int) -> int:
+    """块长经验值 n^(1/3)（至少 1）。"""
+
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def block_bootstrap_indices(n: int, n_paths: int, block_len: int, rng: np.random.Generator) -> np.ndarray:
+    """循环块自助法（circular block bootstrap）的下标矩阵 (n_paths, n)。
+
+    每条路径由随机起点的连续块首尾拼接（越过末尾则回绕），保留块内的自相关与波动聚集。
+    """
+
+    if n <= 0:
+        return np.zeros((n_paths, 0), dtype=np.int64)
+    b = max(1, min(int(block_len), n))
+    n_blocks = -(-n // b)
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(b)) % n
+    return idx.reshape(n_paths, n_blocks * b)[:, :n]
+
+
+def _equity_paths(returns: np.ndarray, start_value: float) -> np.ndarray:
+    """收益率矩阵 (P, n) -> 净值矩阵 (n+1, P)（按时间升序，首行为起始净值）。"""
+
+    paths = np.empty((returns.shape[1] + 1, returns.shape[0]))
+    paths[0] = start_value
+    np.cumprod(1.0 + returns.T, axis=0, out=paths[1:])
+    paths[1:] *= start_value
+    return paths
+
+
+def summarize(samples: Dict[str, np.ndarray], ci: float = 0.95) -> Dict[str, Dict[str, Optional[float]]]:
+    """每个指标的均值/标准差/中位数与置信区间（分位数法）。"""
+
+    if not 0.0 < ci < 1.0:
+        raise ValueError(f"ci must be in (0, 1): {ci}")
+    lo, hi = (1.0 - ci) / 2.0 * 100.0, (1.0 + ci) / 2.0 * 100.0
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for name, values in samples.items():
+        v = values[np.isfinite(values)]
+        if v.shape[0] == 0:
+            out[name] = {"mean": None, "std": None, "median": None, "ci_low": None, "ci_high": None}
+            continue
+        q_lo, q_med, q_hi = np.percentile(v, [lo, 50.0, hi])
+        out[name] = {
+            "mean": float(v.mean()),
+            "std": float(v.std()),
+            "median": float(q_med),
+            "ci_low": float(q_lo),
+            "ci_high": float(q_hi),
+        }
+    return out
+
+
+def bootstrap_equity(
+    equity: Sequence[float],
+    *,
+    n_paths: int = 1000,
+    block_len: Optional[int] = None,
+    seed: Optional[int] = 0,
+    ci: float = 0.95,
+    chunk_size: int = 500,
+    config: Optional[MetricsConfig] = None,
+) -> Dict[str, object]:
+    """对净值曲线的逐 bar 收益做块自助重采样，给出各指标的分布与置信区间。
+
+    - 每个块生成 chunk_size 条路径的 (路径 × bar) 收益矩阵，指标用 Metrics.compute_matrix 一次算完
+    - 同一 seed 下结果可复现，且与 chunk_size 无关（随机数按同一个 Generator 顺序消费）
+    - 内存上限约为 chunk_size × bar 数 × 若干个 float64
+    """
+
+    if n_paths <= 0:
+        raise ValueError("n_paths must be > 0")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+    eq = np.asarray(equity, dtype=np.float64)
+    if eq.shape[0] < 2:
+        raise ValueError("净值曲线至少需要 2 个点")
+
+    rets = eq[1:] / eq[:-1] - 1.0
+    n = rets.shape[0]
+    b = int(block_len) if block_len else default_block_len(n)
+    rng = np.random.default_rng(seed)
+
+    samples = {name: np.empty(n_paths) for name in BOOTSTRAP_METRICS}
+    for start in range(0, n_paths, chunk_size):
+        p = min(chunk_size, n_paths - start)
+        idx = block_bootstrap_indices(n, p, b, rng)
+        stats = Metrics.compute_matrix(_equity_paths(rets[idx], float(eq[0])), config)
+        for name in BOOTSTRAP_METRICS:
+            samples[name][start : start + p] = stats[name]
+
+    return {
+        "method": "circular_block_bootstrap",
+        "paths": int(n_paths),
+        "block_len": b,
+        "seed": seed,
+        "ci": ci,
+        "metrics": summarize(samples, ci),
+    }
+
+
+def _drawdown_rows(equity: np.ndarray) -> np.ndarray:
+    """(P, m) 净值 -> 每行最大回撤。"""
+
+    return (equity / np.maximum.accumulate(equity, axis=1) - 1.0).min(axis=1)
+
+
+def reshuffle_trades(
+    trade_returns: Sequence[float],
+    *,
+    n_paths: int = 1000,
+    replace: bool = False,
+    seed: Optional[int] = 0,
+    ci: float = 0.95,
+    chunk_size: int = 2000,
+) -> Dict[str, object]:
+    """逐笔交易收益的 Monte Carlo：打乱交易顺序（replace=False）或有放回重抽（replace=True）。
+
+    交易按复利首尾相接（全仓口径），输出累计收益与最大回撤的分布；
+    打乱顺序不改变累计收益，主要用于评估回撤对交易顺序的敏感度。
+    """
+
+    if n_paths <= 0:
+        raise ValueError("n_paths must be > 0")
+    r = np.asarray(trade_returns, dtype=np.float64)
+    r = r[np.isfinite(r)]
+    if r.shape[0] == 0:
+        return {"method": "trade_reshuffle", "paths": 0, "trades": 0, "metrics": {}}
+
+    m = r.shape[0]
+    rng = np.random.default_rng(seed)
+    final = np.empty(n_paths)
+    max_dd = np.empty(n_paths)
+    for start in range(0, n_paths, chunk_size):
+        p = min(chunk_size, n_paths - start)
+        if replace:
+            idx = rng.integers(0, m, size=(p, m))
+        else:
+            idx = np.argsort(rng.random((p, m)), axis=1)
+        equity = np.ones((p, m + 1))
+        np.cumprod(1.0 + r[idx], axis=1, out=equity[:, 1:])
+        final[start : start + p] = equity[:, -1] - 1.0
+        max_dd[start : start + p] = _drawdown_rows(equity)
+
+    return {
+        "method": "trade_bootstrap" if replace else "trade_reshuffle",
+        "paths": int(n_paths),
+        "trades": int(m),
+        "seed": seed,
+        "ci": ci,
+        "metrics": summarize({"cumulative_return": final, "max_drawdown": max_dd}, ci),
+    }
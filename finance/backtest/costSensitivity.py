@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from finance.backtest.metrics import Metrics, MetricsConfig
+from finance.data.barArrays import BarArrays
+
+TABLE_COLUMNS = [
+    "fee_rate",
+    "min_fee",
+    "slippage_bps",
+    "trades",
+    "turnover",
+    "total_fees",
+    "total_slippage",
+    "final_equity",
+    "cumulative_return",
+    "annualized_return",
+    "max_drawdown",
+    "sharpe",
+]
+
+
+@dataclass(frozen=True)
+class CostSensitivityResult:
+    """成本敏感性结果：table 每行一个 (fee_rate, min_fee, slippage_bps) 组合。"""
+
+    table: pd.DataFrame
+    break_even: pd.DataFrame
+    gross_break_even_bps: float
+
+
+def cost_grid(fee_rates: Sequence[float], min_fees: Sequence[float], slippage_bps: Sequence[float]) -> np.ndarray:
+    """笛卡尔积网格，返回 (G, 3)：fee_rate, min_fee, slippage_bps。"""
+
+    grid = np.array(list(product(fee_rates, min_fees, slippage_bps)), dtype=np.float64)
+    if grid.size == 0:
+        raise ValueError("成本网格为空")
+    if (grid < 0).any():
+        raise ValueError("成本参数必须 >= 0")
+    return grid.reshape(-1, 3)
+
+
+def _simulate_grid(open_: np.ndarray, targets: np.ndarray, initial_cash: float, grid: np.ndarray):
+    """对整个成本网格同时复刻 Broker.execute_open 的 0/1 目标仓位撮合。
+
+    信号与成本无关，只在有信号的 bar 上推进（向量维度是网格 G），
+    返回各事件后的 (cash, qty) 状态与成交统计。
+    """
+
+    n = open_.shape[0]
+    g = grid.shape[0]
+    rate = grid[:, 0]
+    min_fee = grid[:, 1]
+    slip = grid[:, 2] / 1e4
+
+    sig_idx = np.flatnonzero(~np.isnan(targets[: max(n - 1, 0)]))
+    bad = (targets[sig_idx] > 0.0) & (targets[sig_idx] < 1.0)
+    if bad.any():
+        raise ValueError(f"MVP 仅支持 target_position 为 0 或 1（index={int(sig_idx[bad][0])}）")
+    event_bars = sig_idx + 1
+
+    cash = np.full(g, float(initial_cash))
+    qty = np.zeros(g, dtype=np.int64)
+    cash_states = np.empty((event_bars.shape[0] + 1, g))
+    qty_states = np.empty((event_bars.shape[0] + 1, g), dtype=np.int64)
+    cash_states[0] = cash
+    qty_states[0] = qty
+
+    trades = np.zeros(g, dtype=np.int64)
+    turnover = np.zeros(g)
+    total_fees = np.zeros(g)
+    total_slip = np.zeros(g)
+
+    def fee_of(notional: np.ndarray) -> np.ndarray:
+        return np.maximum(notional * rate, min_fee)
+
+    for k, (bar, target) in enumerate(zip(event_bars.tolist(), targets[sig_idx].tolist())):
+        mp = float(open_[bar])
+        sell_price = mp * (1.0 - slip)
+        buy_price = mp * (1.0 + slip)
+        delta = np.zeros(g, dtype=np.int64)  # >0 买入，<0 卖出
+
+        if target <= 0.0:
+            delta = -qty
+        else:
+            est = np.floor_divide(cash + qty * mp, buy_price).astype(np.int64)
+            delta = np.where(est < qty, est - qty, 0)
+
+            # 全仓买入：与 Broker 相同的迭代逼近（最多 5 次 + 兜底）
+            active = est > qty
+            for _ in range(5):
+                if not active.any():
+                    break
+                buy_qty = est - qty
+                notional = buy_price * buy_qty
+                ok = active & (notional + fee_of(notional) <= cash)
+                delta = np.where(ok, buy_qty, delta)
+                active &= ~ok
+                est = np.where(
+                    rate > 0,
+                    np.floor_divide(cash, buy_price * (1.0 + rate)),
+                    np.floor_divide(cash, buy_price),
+                ).astype(np.int64)
+                est = np.where(min_fee > 0, np.maximum(est - 1, 0), est)
+                active &= est > qty
+            if active.any():
+                buy_qty = np.maximum(np.floor_divide(cash - min_fee, buy_price).astype(np.int64) - 1, 0)
+                notional = buy_price * buy_qty
+                ok = active & (buy_qty > 0) & (notional + fee_of(notional) <= cash)
+                delta = np.where(ok, buy_qty, delta)
+
+        traded = delta != 0
+        price = np.where(delta > 0, buy_price, sell_price)
+        notional = price * np.abs(delta)
+        fee = np.where(traded, fee_of(notional), 0.0)
+        cash = cash - np.sign(delta) * notional - fee
+        qty = qty + delta
+
+        trades += traded
+        turnover += notional
+        total_fees += fee
+        total_slip += np.abs(price - mp) * np.abs(delta)
+        cash_states[k + 1] = cash
+        qty_states[k + 1] = qty
+
+    return event_bars, cash_states, qty_states, trades, turnover, total_fees, total_slip
+
+
+def run_cost_sensitivity(
+    bars: BarArrays,
+    targets: np.ndarray,
+    *,
+    initial_cash: float,
+    fee_rates: Sequence[float],
+    min_fees: Sequence[float] = (0.0,),
+    slippage_bps: Sequence[float] = (0.0,),
+    metrics_config: Optional[MetricsConfig] = None,
+    max_cells: int = 8_000_000,
+) -> CostSensitivityResult:
+    """固定信号下的成本敏感性：目标仓位序列只生成一次，整张成本网格一次推进。
+
+    - targets：与 bars 等长，NaN=无信号（见 sma_cross_targets / fastKernel）
+    - 净值矩阵按网格列分块物化（每块不超过 max_cells 个元素），控制内存
+    """
+
+    targets = np.asarray(targets, dtype=np.float64)
+    if targets.shape[0] != len(bars):
+        raise ValueError("targets 长度与 bars 不一致")
+    grid = cost_grid(fee_rates, min_fees, slippage_bps)
+    n = len(bars)
+
+    event_bars, cash_states, qty_states, trades, turnover, fees, slips = _simulate_grid(bars.open, targets, initial_cash, grid)
+
+    # 每根 bar 所处的状态段：0=首次成交前，k=第 k 次事件之后
+    seg = np.searchsorted(event_bars, np.arange(n), side="right")
+    close = bars.close[:, None]
+
+    metrics: Dict[str, np.ndarray] = {}
+    final_equity = np.empty(grid.shape[0])
+    step = max(1, max_cells // max(n, 1))
+    for start in range(0, grid.shape[0], step):
+        cols = slice(start, start + step)
+        equity = cash_states[seg, cols] + qty_states[seg, cols] * close
+        chunk = Metrics.compute_matrix(equity, metrics_config)
+        for key, values in chunk.items():
+            metrics.setdefault(key, np.empty(grid.shape[0], dtype=values.dtype))[cols] = values
+        final_equity[cols] = equity[-1] if n > 0 else initial_cash
+
+    table = pd.DataFrame(
+        {
+            "fee_rate": grid[:, 0],
+            "min_fee": grid[:, 1],
+            "slippage_bps": grid[:, 2],
+            "trades": trades,
+            "turnover": turnover,
+            "total_fees": fees,
+            "total_slippage": slips,
+            "final_equity": final_equity,
+            "cumulative_return": metrics["cumulative_return"],
+            "annualized_return": metrics["annualized_return"],
+            "max_drawdown": metrics["max_drawdown"],
+            "sharpe": metrics["sharpe"],
+        },
+        columns=TABLE_COLUMNS,
+    )
+
+    return CostSensitivityResult(
+        table=table,
+        break_even=estimate_break_even(table),
+        gross_break_even_bps=_gross_break_even_bps(bars, targets, initial_cash),
+    )
+
+
+def _gross_break_even_bps(bars: BarArrays, targets: np.ndarray, initial_cash: float) -> float:
+    """零成本下的一阶估计：把全部毛利摊到成交额上的单边成本（bps）。"""
+
+    _, cash_states, qty_states, _, turnover, _, _ = _simulate_grid(bars.open, targets, initial_cash, np.zeros((1, 3)))
+    if turnover[0] <= 0 or len(bars) == 0:
+        return float("nan")
+    pnl = cash_states[-1, 0] + qty_states[-1, 0] * float(bars.close[-1]) - initial_cash
+    return float(pnl / turnover[0] * 1e4)
+
+
+def estimate_break_even(table: pd.DataFrame, metric: str = "cumulative_return", threshold: float = 0.0) -> pd.DataFrame:
+    """按 min_fee 分组，沿单边成本（fee_rate×1e4 + slippage_bps）插值出 metric 穿越 threshold 的位置。
+
+    在网格范围内没有穿越时返回 NaN（盈亏平衡点在网格之外）。
+    """
+
+    rows = []
+    for min_fee, grp in table.groupby("min_fee", sort=True):
+        cost = grp["fee_rate"].to_numpy() * 1e4 + grp["slippage_bps"].to_numpy()
+        curve = pd.Series(grp[metric].to_numpy()).groupby(cost).mean()
+        xs = curve.index.to_numpy(dtype=np.float64)
+        ys = curve.to_numpy(dtype=np.float64) - threshold
+
+        be = float("nan")
+        crossing = np.flatnonzero((ys[:-1] > 0) & (ys[1:] <= 0))
+        if crossing.shape[0] > 0:
+            j = int(crossing[0])
+            x0, x1, y0, y1 = xs[j], xs[j + 1], ys[j], ys[j + 1]
+            be = float(x0 + (x1 - x0) * y0 / (y0 - y1))
+        rows.append({"min_fee": float(min_fee), "metric": metric, "break_even_cost_bps": be})
+    return pd.DataFrame(rows, columns=["min_fee", "metric", "break_even_cost_bps"])
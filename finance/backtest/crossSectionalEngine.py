@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from finance.core.coreTypes import BookEquityPoint, TradeRecord
+from finance.data.tradingCalendar import AlignedPanel
+from finance.execution.broker import Broker
+from finance.portfolio.multiAssetPortfolio import MultiAssetPortfolio
+from finance.portfolio.riskManager import LimitFlag
+from finance.strategy.crossSectionalStrategy import CrossSection, CrossSectionalStrategy, RebalanceSchedule
+
+
+@dataclass(frozen=True)
+class CrossSectionalResult:
+    symbols: List[str]
+    equity_curve: List[BookEquityPoint]
+    trades: List[TradeRecord]
+    rebalances: int
+    dropped_last_bar: int
+    risk_flag_counts: dict
+    initial_cash: float
+
+    @property
+    def final_equity(self) -> float:
+        return self.equity_curve[-1].total_equity if self.equity_curve else self.initial_cash
+
+
+class CrossSectionalEngine:
+    """多标的截面回测引擎（与 BacktestEngine 相同的 Next-Open 时序）：
+
+    对主时间轴上的每个时点：
+    1) 若有上一调仓日生成的目标权重：按当日 open 由 Broker 换算为调仓数量，经 RiskManager 批量预检后
+       先卖后买逐笔成交（停牌/无 open 的标的不交易）
+    2) 按 close 盯市（一次点积），并把收盘价交给 strategy.observe（增量状态）
+    3) 仅在调仓日构造截面并调用 strategy.target_weights
+    最后一根 bar 的目标权重被丢弃并计数。
+    """
+
+    def __init__(
+        self,
+        *,
+        panel: AlignedPanel,
+        strategy: CrossSectionalStrategy,
+        broker: Broker,
+        portfolio: MultiAssetPortfolio,
+        schedule: Optional[RebalanceSchedule] = None,
+    ) -> None:
+        if portfolio.symbols != panel.symbols:
+            raise ValueError("portfolio.symbols 与 panel.symbols 不一致")
+        self.panel = panel
+        self.strategy = strategy
+        self.broker = broker
+        self.portfolio = portfolio
+        self.schedule = schedule or RebalanceSchedule()
+
+    def run(self) -> CrossSectionalResult:
+        panel = self.panel
+        pf = self.portfolio
+        cal = panel.calendar
+        dts = cal.datetimes()
+        n = len(cal)
+
+        open_ = panel.panel("open")
+        close = panel.panel("close")
+        present = panel.present
+        features = self.strategy.compute_features(panel)
+        for name, values in features.items():
+            if values.shape != (n, len(panel.symbols)):
+                raise ValueError(f"feature {name} shape {values.shape} != {(n, len(panel.symbols))}")
+        rebalance = self.schedule.mask(cal)
+
+        limits = pf.risk_manager.limits
+        flag_counts = {f.name: 0 for f in LimitFlag if f.name and f != LimitFlag.NONE}
+        pending: Optional[np.ndarray] = None
+        rebalances = 0
+        dropped_last_bar = 0
+
+        for t in range(n):
+            dt = dts[t]
+            if pending is not None:
+                self._rebalance_open(dt, pending, open_[t], flag_counts, limits.lot_size)
+                pending = None
+
+            pf.mark_to_market(dt, close[t])
+            self.strategy.observe(t, close[t])
+
+            if not rebalance[t]:
+                continue
+            snapshot = CrossSection(
+                t=t,
+                dt=dt,
+                symbols=panel.symbols,
+                features={name: values[t] for name, values in features.items()},
+                tradable=present[t],
+                weights=pf.weights(),
+            )
+            weights = np.asarray(self.strategy.target_weights(snapshot), dtype=np.float64)
+            if weights.shape != (len(panel.symbols),):
+                raise ValueError(f"target_weights shape {weights.shape} != ({len(panel.symbols)},)")
+            rebalances += 1
+            if t == n - 1:
+                dropped_last_bar += 1
+                continue
+            pending = weights
+
+        return CrossSectionalResult(
+            symbols=list(panel.symbols),
+            equity_curve=list(pf.equity_curve),
+            trades=list(pf.trades),
+            rebalances=rebalances,
+            dropped_last_bar=dropped_last_bar,
+            risk_flag_counts={k: v for k, v in flag_counts.items() if v},
+            initial_cash=pf.initial_cash,
+        )
+
+    def _rebalance_open(self, dt, weights: np.ndarray, open_row: np.ndarray, flag_counts: dict, lot_size: int) -> None:
+        pf = self.portfolio
+        tradable = open_row > 0
+        # open 价估值（无 open 的标的沿用上次价格）
+        marks = np.where(tradable, open_row, pf.last_prices)
+        equity = float(pf.cash) + float(np.dot(pf.quantities, marks))
+        if equity <= 0:
+            return
+
+        deltas = self.broker.size_target_weights(
+            target_weights=weights,
+            prices=open_row,
+            quantities=pf.quantities,
+            equity=equity,
+            lot_size=lot_size,
+        )
+        if not deltas.any():
+            return
+
+        check = pf.risk_manager.check_orders(
+            quantities=deltas,
+            prices=np.where(tradable, open_row, 0.0),
+            positions=pf.quantities,
+            equity=equity,
+            cash=pf.cash,
+        )
+        for flag in LimitFlag:
+            if flag != LimitFlag.NONE:
+                hit = int(np.count_nonzero(check.flags & int(flag)))
+                if hit:
+                    flag_counts[flag.name] += hit
+        accepted = check.accepted
+
+        # 先卖后买：卖出回款可用于买入
+        sells = np.flatnonzero(accepted < 0)
+        buys = np.flatnonzero(accepted > 0)
+        for i in sells.tolist():
+            order, fill = self.broker.fill_market(dt=dt, symbol=pf.symbols[i], quantity=int(accepted[i]), market_price=float(open_row[i]), reason="rebalance")
+            pf.apply_fill(order, fill)
+        for i in buys.tolist():
+            # 预检按 open 价校验现金，这里再按含滑点/手续费的成本截断
+            qty = min(int(accepted[i]), self.broker.affordable_qty(float(open_row[i]), pf.cash, lot_size))
+            if qty <= 0:
+                continue
+            order, fill = self.broker.fill_market(dt=dt, symbol=pf.symbols[i], quantity=qty, market_price=float(open_row[i]), reason="rebalance")
+            pf.apply_fill(order, fill)
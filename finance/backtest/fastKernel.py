@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from finance.core.compactTypes import CompactEquityPoint, CompactSignal, CompactTradeRecord
+from finance.core.coreTypes import Side
+from finance.data.barArrays import BarArrays
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.portfolio import Portfolio
+
+# numba 为可选依赖：未安装时自动回退到参考 Python 路径；导入较慢，首次编译时才 import
+_HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+BACKENDS = ("auto", "numba", "kernel", "python")
+
+
+def target_position_kernel(open_, close, targets, initial_cash, fee_rate, min_fee, slip_factor):
+    """单标的 Next-Open 撮合核心循环（纯数组/标量，可被 numba 编译）。
+
+    逐 bar 复刻 Broker.execute_open + Portfolio.apply_fill + mark_to_market 的语义
+    （手续费 = max(成交额 × rate, min_fee)，与 FeeModel.calc 一致）：
+    targets[i] 为 bar i 收盘后的目标仓位（NaN=无信号），在 bar i+1 开盘成交；
+    最后一根 bar 的信号被丢弃。
+    返回 (cash, qty, equity, fill_side, fill_qty, fill_price, fill_fee, fill_slippage, bad_index)，
+    bad_index >= 0 表示该位置的 target 不是 0/1。
+    """
+
+    n = open_.shape[0]
+    cash_out = np.empty(n)
+    qty_out = np.zeros(n, dtype=np.int64)
+    equity_out = np.empty(n)
+    fill_side = np.zeros(n, dtype=np.int8)
+    fill_qty = np.zeros(n, dtype=np.int64)
+    fill_price = np.zeros(n)
+    fill_fee = np.zeros(n)
+    fill_slip = np.zeros(n)
+
+    cash = initial_cash
+    qty = 0
+    pending = np.nan
+    for i in range(n):
+        if not math.isnan(pending):
+            target = pending
+            pending = np.nan
+            mp = open_[i]
+            side = 0
+            trade_qty = 0
+            price = 0.0
+            if target <= 0.0:
+                if qty > 0:
+                    side = -1
+                    trade_qty = qty
+                    price = mp * (1.0 - slip_factor)
+            elif target >= 1.0:
+                total_equity_open = cash + qty * mp
+                buy_price = mp * (1.0 + slip_factor)
+                qty_estimate = int(total_equity_open // buy_price)
+                if qty_estimate <= qty:
+                    if qty_estimate < qty:
+                        side = -1
+                        trade_qty = qty - qty_estimate
+                        price = mp * (1.0 - slip_factor)
+                else:
+                    done = False
+                    for _ in range(5):
+                        buy_qty = qty_estimate - qty
+                        if buy_qty <= 0:
+                            done = True
+                            break
+                        notional = buy_price * buy_qty
+                        if notional + max(notional * fee_rate, min_fee) <= cash:
+                            side = 1
+                            trade_qty = buy_qty
+                            price = buy_price
+                            done = True
+                            break
+                        if fee_rate > 0:
+                            qty_estimate = int(cash // (buy_price * (1.0 + fee_rate)))
+                        else:
+                            qty_estimate = int(cash // buy_price)
+                        if min_fee > 0:
+                            qty_estimate = max(0, qty_estimate - 1)
+                        if qty_estimate <= qty:
+                            done = True
+                            break
+                    if not done:
+                        buy_qty = max(0, int((cash - min_fee) // buy_price) - 1)
+                        if buy_qty > 0:
+                            notional = buy_price * buy_qty
+                            if notional + max(notional * fee_rate, min_fee) <= cash:
+                                side = 1
+                                trade_qty = buy_qty
+                                price = buy_price
+            else:
+                return cash_out, qty_out, equity_out, fill_side, fill_qty, fill_price, fill_fee, fill_slip, i - 1
+
+            if side != 0:
+                notional = price * trade_qty
+                fee = max(notional * fee_rate, min_fee)
+                fill_side[i] = side
+                fill_qty[i] = trade_qty
+                fill_price[i] = price
+                fill_fee[i] = fee
+                fill_slip[i] = abs(price - mp) * trade_qty
+                if side > 0:
+                    cash -= notional + fee
+                    qty += trade_qty
+                else:
+                    cash += notional - fee
+                    qty -= trade_qty
+
+        cash_out[i] = cash
+        qty_out[i] = qty
+        equity_out[i] = cash + qty * close[i]
+        if i < n - 1:
+            pending = targets[i]
+
+    return cash_out, qty_out, equity_out, fill_side, fill_qty, fill_price, fill_fee, fill_slip, -1
+
+
+_compiled_kernel = None
+
+
+def _get_compiled_kernel():
+    global _compiled_kernel
+    if _compiled_kernel is None and _HAS_NUMBA:
+        import numba
+
+        _compiled_kernel = numba.njit(cache=True)(target_position_kernel)
+    return _compiled_kernel
+
+
+def jit_available() -> bool:
+    return _HAS_NUMBA
+
+
+@dataclass(frozen=True)
+class KernelResult:
+    """核心循环的列式输出（每根 bar 一行；fill_side：1=BUY，-1=SELL，0=无成交）。"""
+
+    ts: np.ndarray
+    cash: np.ndarray
+    position_qty: np.ndarray
+    close: np.ndarray
+    total_equity: np.ndarray
+    fill_side: np.ndarray
+    fill_qty: np.ndarray
+    fill_price: np.ndarray
+    fill_fee: np.ndarray
+    fill_slippage: np.ndarray
+    backend: str
+
+    @property
+    def position_value(self) -> np.ndarray:
+        return self.position_qty * self.close
+
+    def equity_points(self) -> List[CompactEquityPoint]:
+        return [
+            CompactEquityPoint(ts=ts, cash=c, position_qty=q, close=px, position_value=q * px, total_equity=e)
+            for ts, c, q, px, e in zip(self.ts.tolist(), self.cash.tolist(), self.position_qty.tolist(), self.close.tolist(), self.total_equity.tolist())
+        ]
+
+    def trade_records(self, symbol: str) -> List[CompactTradeRecord]:
+        idx = np.flatnonzero(self.fill_side)
+        return [
+            CompactTradeRecord(
+                ts=ts,
+                symbol=symbol,
+                side=Side.BUY if self.fill_side[i] > 0 else Side.SELL,
+                quantity=int(self.fill_qty[i]),
+                price=float(self.fill_price[i]),
+                fee=float(self.fill_fee[i]),
+                slippage=float(self.fill_slippage[i]),
+                order_id=f"kernel-{i}",
+            )
+            for ts, i in zip(self.ts[idx].tolist(), idx.tolist())
+        ]
+
+
+def run_target_positions(
+    bars: BarArrays,
+    targets: np.ndarray,
+    *,
+    initial_cash: float,
+    fee_model: Optional[FeeModel] = None,
+    slippage_model: Optional[SlippageModel] = None,
+    backend: str = "auto",
+    symbol: str = "",
+) -> KernelResult:
+    """按目标仓位数组跑单标的回测（Next-Open 成交、收盘盯市）。
+
+    backend：
+    - auto：numba 可用时用编译内核，否则回退到参考 Python 路径
+    - numba：强制编译内核（未安装 numba 时报错）
+    - kernel：不编译、直接在解释器里跑内核函数（调试/等价性测试用）
+    - python：参考路径，直接驱动 Broker/Portfolio 对象（与 BacktestEngine 完全一致）
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError(f"backend 仅支持 {BACKENDS}: {backend!r}")
+    targets = np.asarray(targets, dtype=np.float64)
+    if targets.shape[0] != len(bars):
+        raise ValueError("targets 长度与 bars 不一致")
+    fee_model = fee_model or FeeModel()
+    slippage_model = slippage_model or SlippageModel()
+
+    if backend == "numba" and not jit_available():
+        raise RuntimeError("backend='numba' 需要安装 numba")
+    if backend == "python" or (backend == "auto" and not jit_available()):
+        return _run_reference(bars, targets, initial_cash, fee_model, slippage_model, symbol or "_")
+
+    kernel = target_position_kernel if backend == "kernel" else _get_compiled_kernel()
+    out = kernel(
+        np.ascontiguousarray(bars.open, dtype=np.float64),
+        np.ascontiguousarray(bars.close, dtype=np.float64),
+        np.ascontiguousarray(targets),
+        float(initial_cash),
+        float(fee_model.rate),
+        float(fee_model.min_fee),
+        float(slippage_model.bps) / 1e4,
+    )
+    return _kernel_result(bars, out, backend="kernel" if backend == "kernel" else "numba")
+
+
+def _kernel_result(bars: BarArrays, out, *, backend: str) -> KernelResult:
+    cash, qty, equity, side, fqty, fprice, ffee, fslip, bad = out
+    if bad >= 0:
+        raise ValueError(f"MVP 仅支持 target_position 为 0 或 1（index={bad}）")
+    return KernelResult(
+        ts=bars.ts,
+        cash=cash,
+        position_qty=qty,
+        close=bars.close,
+        total_equity=equity,
+        fill_side=side,
+        fill_qty=fqty,
+        fill_price=fprice,
+        fill_fee=ffee,
+        fill_slippage=fslip,
+        backend=backend,
+    )
+
+
+def _run_reference(
+    bars: BarArrays,
+    targets: np.ndarray,
+    initial_cash: float,
+    fee_model: FeeModel,
+    slippage_model: SlippageModel,
+    symbol: str,
+) -> KernelResult:
+    broker = Broker(fee_model=fee_model, slippage_model=slippage_model)
+    portfolio = Portfolio(symbol=symbol, initial_cash=initial_cash)
+
+    n = len(bars)
+    fill_side = np.zeros(n, dtype=np.int8)
+    fill_qty = np.zeros(n, dtype=np.int64)
+    fill_price = np.zeros(n)
+    fill_fee = np.zeros(n)
+    fill_slip = np.zeros(n)
+
+    bar_list = bars.to_bars(symbol)
+    target_list = targets.tolist()
+    for i, bar in enumerate(bar_list):
+        order, fill = broker.execute_open(bar, cash=portfolio.cash, position_qty=portfolio.position_qty)
+        if order is not None and fill is not None:
+            portfolio.apply_fill(order, fill)
+            fill_side[i] = 1 if fill.side == Side.BUY else -1
+            fill_qty[i] = fill.quantity
+            fill_price[i] = fill.price
+            fill_fee[i] = fill.fee
+            fill_slip[i] = fill.slippage
+        portfolio.mark_to_market(bar)
+
+        target = target_list[i]
+        if i < n - 1 and not math.isnan(target):
+            broker.queue_signal(CompactSignal(ts=bar.ts, symbol=symbol, target_position=target))
+
+    curve = portfolio.equity_curve
+    return KernelResult(
+        ts=bars.ts,
+        cash=np.array([p.cash for p in curve]),
+        position_qty=np.array([p.position_qty for p in curve], dtype=np.int64),
+        close=bars.close,
+        total_equity=np.array([p.total_equity for p in curve]),
+        fill_side=fill_side,
+        fill_qty=fill_qty,
+        fill_price=fill_price,
+        fill_fee=fill_fee,
+        fill_slippage=fill_slip,
+        backend="python",
+    )
@@ -4,15 +4,33 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional
 
 import numpy as np
-import pandas as pd
 
 from finance.core.coreTypes import EquityPoint
+from finance.data.resampler import NS_PER_DAY, parse_timeframe
 
 
 @dataclass(frozen=True)
 class MetricsConfig:
+    """年化口径：按 bar 周期折算每年的 bar 数。
+
+    - bar_frequency：1d（默认）/ 1w / 5m / 1h ...
+    - session_minutes：日内周期下每个交易日的交易时长（A 股 240 分钟）
+    """
+
     trading_days_per_year: int = 252
     risk_free_rate: float = 0.0
+    bar_frequency: str = "1d"
+    session_minutes: float = 240.0
+
+    def periods_per_year(self) -> float:
+        tf = parse_timeframe(self.bar_frequency)
+        if tf.is_intraday:
+            bars_per_day = float(self.session_minutes) * 60.0 * 1e9 / float(tf.step_ns)
+            return float(self.trading_days_per_year) * bars_per_day
+        # 多日周期：按交易日折算（1w ≈ 5 个交易日）
+        days = tf.step_ns / NS_PER_DAY
+        trading_days = days * 5.0 / 7.0 if days >= 7 else days
+        return float(self.trading_days_per_year) / trading_days
 
 
 class Metrics:
@@ -28,13 +46,20 @@ class Metrics:
                 "sharpe": 0.0,
             }
 
+        if hasattr(equity_curve, "records"):
+            # 落盘的净值曲线：直接在映射的 total_equity 列上计算，不构造 EquityPoint
+            stats = Metrics.compute_matrix(equity_curve.records()["total_equity"], cfg)
+            return {k: v[0].item() for k, v in stats.items()}
+
+        import pandas as pd  # 按需导入：只用 compute_matrix 的场景（寻优/重采样）不必加载 pandas
+
         df = pd.DataFrame(
             {
-                "dt": [p.dt for p in equity_curve],
+                "ts": [p.ts for p in equity_curve],
                 "equity": [p.total_equity for p in equity_curve],
             }
         )
-        df = df.sort_values("dt").reset_index(drop=True)
+        df = df.sort_values("ts").reset_index(drop=True)
 
         equity = df["equity"].astype(float)
         rets = equity.pct_change().fillna(0.0)
@@ -42,7 +67,8 @@ class Metrics:
         cumulative_return = float(equity.iloc[-1] / equity.iloc[0] - 1.0) if equity.iloc[0] != 0 else 0.0
 
         n = len(equity)
-        years = n / float(cfg.trading_days_per_year)
+        periods_per_year = cfg.periods_per_year()
+        years = n / periods_per_year
         if years <= 0 or equity.iloc[0] <= 0:
             annualized_return = 0.0
         else:
@@ -53,14 +79,14 @@ class Metrics:
         dd = equity / running_max - 1.0
         max_drawdown = float(dd.min())
 
-        # sharpe（MVP：rf=0，按日收益年化）
-        rf_daily = float(cfg.risk_free_rate) / float(cfg.trading_days_per_year)
-        excess = rets - rf_daily
+        # sharpe（按 bar 周期收益年化）
+        rf_per_bar = float(cfg.risk_free_rate) / periods_per_year
+        excess = rets - rf_per_bar
         vol = float(excess.std(ddof=0))
         if vol == 0.0:
             sharpe = 0.0
         else:
-            sharpe = float(np.sqrt(cfg.trading_days_per_year) * (excess.mean() / vol))
+            sharpe = float(np.sqrt(periods_per_year) * (excess.mean() / vol))
 
         return {
             "bars": int(n),
@@ -69,3 +95,47 @@ class Metrics:
             "max_drawdown": max_drawdown,
             "sharpe": sharpe,
         }
+
+    @staticmethod
+    def compute_matrix(equity: np.ndarray, config: Optional[MetricsConfig] = None) -> Dict[str, np.ndarray]:
+        """对多条净值曲线（T × K，按时间升序）一次性计算与 compute 相同口径的指标。
+
+        返回 {指标名: 长度 K 的数组}，用于成本网格/重采样等批量场景。
+        """
+
+        cfg = config or MetricsConfig()
+        eq = np.asarray(equity, dtype=np.float64)
+        if eq.ndim == 1:
+            eq = eq[:, None]
+        n, k = eq.shape
+        if n == 0:
+            zeros = np.zeros(k)
+            return {"bars": np.zeros(k, dtype=np.int64), "cumulative_return": zeros, "annualized_return": zeros, "max_drawdown": zeros, "sharpe": zeros}
+
+        first = eq[0]
+        last = eq[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cumulative_return = np.where(first != 0, last / first - 1.0, 0.0)
+
+            periods_per_year = cfg.periods_per_year()
+            years = n / periods_per_year
+            if years > 0:
+                annualized_return = np.where(first > 0, (last / first) ** (1.0 / years) - 1.0, 0.0)
+            else:
+                annualized_return = np.zeros(k)
+
+            max_drawdown = (eq / np.maximum.accumulate(eq, axis=0) - 1.0).min(axis=0)
+
+            rets = np.zeros_like(eq)
+            rets[1:] = eq[1:] / eq[:-1] - 1.0
+            excess = rets - float(cfg.risk_free_rate) / periods_per_year
+            vol = excess.std(axis=0)
+            sharpe = np.where(vol == 0.0, 0.0, np.sqrt(periods_per_year) * excess.mean(axis=0) / vol)
+
+        return {
+            "bars": np.full(k, n, dtype=np.int64),
+            "cumulative_return": cumulative_return,
+            "annualized_return": annualized_return,
+            "max_drawdown": max_drawdown,
+            "sharpe": sharpe,
+        }
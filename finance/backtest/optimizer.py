@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.backtest.metrics import Metrics, MetricsConfig
+from finance.core.coreTypes import Bar
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+from finance.strategy.strategyBase import StrategyBase
+
+Params = Dict[str, Any]
+StrategyFactory = Callable[[str, Params], StrategyBase]
+
+
+def sma_cross_factory(symbol: str, params: Params) -> StrategyBase:
+    return SmaCrossStrategy(symbol=symbol, fast_window=int(params["fast"]), slow_window=int(params["slow"]))
+
+
+def sma_grid(fast: Sequence[int], slow: Sequence[int]) -> List[Params]:
+    """fast × slow 网格（只保留 fast < slow）。"""
+
+    return [{"fast": int(f), "slow": int(s)} for f, s in product(fast, slow) if f < s]
+
+
+def rung_budgets(n_bars: int, min_bars: int, eta: int) -> List[int]:
+    """各轮的样本长度：min_bars · eta^k，最后一轮为全部 bar。"""
+
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    if min_bars <= 0:
+        raise ValueError("min_bars must be > 0")
+    budgets = []
+    b = min(min_bars, n_bars)
+    while b < n_bars:
+        budgets.append(b)
+        b *= eta
+    budgets.append(n_bars)
+    return budgets
+
+
+@dataclass(frozen=True)
+class EvalSettings:
+    symbol: str
+    initial_cash: float
+    fee_model: FeeModel
+    slippage_model: SlippageModel
+    metrics_config: MetricsConfig
+    metric: str
+    factory: StrategyFactory
+
+
+# ---------- worker 侧：行情在进程初始化时下发一次，任务只携带参数与引擎 checkpoint ----------
+
+_worker_data: Optional[DataHandler] = None
+_worker_settings: Optional[EvalSettings] = None
+
+
+def _init_worker(bars: List[Bar], settings: EvalSettings) -> None:
+    global _worker_data, _worker_settings
+    _worker_data = DataHandler(_bars_by_symbol={settings.symbol: bars})
+    _worker_settings = settings
+
+
+def _advance(task: Tuple[int, Params, Optional[bytes], int]) -> Tuple[int, float, bytes, int]:
+    """把一个候选推进到 end 根 bar，返回 (候选 id, 得分, 新 checkpoint, 本次新增 bar 数)。"""
+
+    cid, params, blob, end = task
+    data, st = _worker_data, _worker_settings
+    assert data is not None and st is not None, "worker 未初始化"
+
+    if blob is None:
+        engine = BacktestEngine(
+            symbol=st.symbol,
+            data=data,
+            strategy=st.factory(st.symbol, params),
+            broker=Broker(fee_model=st.fee_model, slippage_model=st.slippage_model),
+            portfolio=Portfolio(symbol=st.symbol, initial_cash=st.initial_cash),
+        )
+    else:
+        engine = BacktestEngine.restore(blob, data)
+
+    start = engine.bars_processed
+    engine.advance(end)
+    score = float(Metrics.compute(engine.portfolio.equity_curve, st.metrics_config).get(st.metric, math.nan))
+    if math.isnan(score):
+        score = -math.inf
+    return cid, score, engine.checkpoint(), engine.bars_processed - start
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    best_params: Params
+    best_score: float
+    leaderboard: pd.DataFrame
+    budgets: List[int]
+    bars_evaluated: int
+    full_grid_bars: int
+
+    @property
+    def budget_fraction(self) -> float:
+        return self.bars_evaluated / self.full_grid_bars if self.full_grid_bars else 0.0
+
+
+def successive_halving(
+    bars: List[Bar],
+    candidates: Sequence[Params],
+    *,
+    symbol: str,
+    initial_cash: float,
+    fee_model: Optional[FeeModel] = None,
+    slippage_model: Optional[SlippageModel] = None,
+    metrics_config: Optional[MetricsConfig] = None,
+    metric: str = "sharpe",
+    factory: StrategyFactory = sma_cross_factory,
+    min_bars: int = 250,
+    eta: int = 3,
+    max_workers: int = 0,
+) -> OptimizationResult:
+    """Successive halving：在逐步加长的历史前缀上评估候选，每轮只保留得分前 1/eta。
+
+    - 第 k 轮样本为前 min_bars·eta^k 根 bar，最后一轮为全样本；得分为该前缀上的 metric（越大越好）
+    - 晋级的候选从上一轮的引擎 checkpoint 继续推进，不从头重跑；最终结果与完整回测一致
+    - max_workers > 0 时每轮的候选在进程池中并行（行情通过 initializer 每个进程只传一次）；0 为当前进程串行
+    - factory 需可 pickle（模块级函数），用于并行时在子进程中构造策略
+    """
+
+    if not candidates:
+        raise ValueError("candidates 为空")
+    if max_workers < 0:
+        raise ValueError("max_workers must be >= 0")
+
+    n = len(bars)
+    budgets = rung_budgets(n, min_bars, eta)
+    settings = EvalSettings(
+        symbol=symbol,
+        initial_cash=float(initial_cash),
+        fee_model=fee_model or FeeModel(),
+        slippage_model=slippage_model or SlippageModel(),
+        metrics_config=metrics_config or MetricsConfig(),
+        metric=metric,
+        factory=factory,
+    )
+
+    pool: Optional[ProcessPoolExecutor] = None
+    if max_workers > 0:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(bars, settings))
+    else:
+        _init_worker(bars, settings)
+
+    alive = list(range(len(candidates)))
+    checkpoints: Dict[int, Optional[bytes]] = {i: None for i in alive}
+    rows: List[Dict[str, Any]] = []
+    bars_evaluated = 0
+    scores: Dict[int, float] = {}
+    try:
+        for rung, end in enumerate(budgets):
+            tasks = [(i, candidates[i], checkpoints[i], end) for i in alive]
+            outputs = pool.map(_advance, tasks, chunksize=max(1, len(tasks) // (4 * max_workers))) if pool else map(_advance, tasks)
+
+            scores = {}
+            for cid, score, blob, used in outputs:
+                scores[cid] = score
+                checkpoints[cid] = blob
+                bars_evaluated += used
+                rows.append({"candidate": cid, **candidates[cid], "rung": rung, "bars": end, "score": score})
+
+            if rung == len(budgets) - 1:
+                break
+            keep = max(1, len(alive) // eta)
+            alive = sorted(alive, key=lambda i: (-scores[i], i))[:keep]
+            # 淘汰的 checkpoint 不再需要
+            checkpoints = {i: checkpoints[i] for i in alive}
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    best = max(alive, key=lambda i: (scores[i], -i))
+    leaderboard = pd.DataFrame(rows).sort_values(["rung", "score"], ascending=[False, False], kind="mergesort").reset_index(drop=True)
+    return OptimizationResult(
+        best_params=dict(candidates[best]),
+        best_score=scores[best],
+        leaderboard=leaderboard,
+        budgets=budgets,
+        bars_evaluated=bars_evaluated,
+        full_grid_bars=len(candidates) * n,
+    )
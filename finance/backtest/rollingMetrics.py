@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from finance.backtest.metrics import MetricsConfig
+from finance.core.coreTypes import EquityPoint
+from finance.data.barArrays import equity_arrays, ns_to_datetimes
+
+ROLLING_COLUMNS = [
+    "dt",
+    "total_equity",
+    "ret",
+    "rolling_vol",
+    "rolling_sharpe",
+    "rolling_max_drawdown",
+    "rolling_beta",
+    "var",
+    "cvar",
+]
+
+
+def _check_window(x: np.ndarray, window: int) -> None:
+    if window < 1:
+        raise ValueError(f"window must be >= 1: {window}")
+    if x.ndim != 1:
+        raise ValueError("仅支持一维序列")
+
+
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """窗口和（前缀和相减，O(n)）；前 window-1 个位置为 NaN，窗口内有 NaN 则结果为 NaN。
+
+    NaN 按 0 计入前缀和，另用有效个数的窗口和判断：NaN 只影响包含它的窗口。
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    _check_window(x, window)
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    full = (ccount[window:] - ccount[:-window]) == window
+    out[window - 1 :] = np.where(full, csum[window:] - csum[:-window], np.nan)
+    return out
+
+
+def _blocks(x: np.ndarray, window: int, fill: float) -> np.ndarray:
+    """按窗口长度分块（末块用 fill 补齐），返回 (块数, window) 视图。"""
+
+    n = x.shape[0]
+    m = -(-n // window)
+    padded = np.full(m * window, fill)
+    padded[:n] = x
+    return padded.reshape(m, window)
+
+
+def _rolling_extreme(x: np.ndarray, window: int, ufunc: np.ufunc, fill: float) -> np.ndarray:
+    # van Herk / Gil-Werman：块内前缀 + 块内后缀，任意长度为 window 的窗口恰好跨越至多两个块
+    x = np.asarray(x, dtype=np.float64)
+    _check_window(x, window)
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    blocks = _blocks(x, window, fill)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    end = np.arange(window - 1, n)
+    out[window - 1 :] = ufunc(suffix[end - window + 1], prefix[end])
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    """窗口最大值（O(n)，与窗口长度无关）。"""
+
+    return _rolling_extreme(x, window, np.maximum, -np.inf)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    """窗口最小值（O(n)，与窗口长度无关）。"""
+
+    return _rolling_extreme(x, window, np.minimum, np.inf)
+
+
+def rolling_max_drawdown(equity: np.ndarray, window: int) -> np.ndarray:
+    """窗口内最大回撤（窗口内先高后低的最大跌幅，<= 0），O(n) 精确计算。
+
+    与 rolling_max 同样按窗口长度分块：窗口 [s, e] 内的回撤要么完全落在左块的后缀里、
+    要么完全落在右块的前缀里、要么峰在左块谷在右块（= 右块前缀最小 / 左块后缀最大 - 1）。
+    equity 需为正。
+    """
+
+    eq = np.asarray(equity, dtype=np.float64)
+    _check_window(eq, window)
+    n = eq.shape[0]
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    if window == 1:
+        out[:] = 0.0
+        return out
+
+    # 末块补齐的值只会进入起点在末块的后缀，而这些起点不构成完整窗口
+    blocks = _blocks(eq, window, float(eq[-1]))
+
+    pre_max = np.maximum.accumulate(blocks, axis=1)
+    pre_min = np.minimum.accumulate(blocks, axis=1)
+    pre_dd = np.minimum.accumulate(blocks / pre_max - 1.0, axis=1)
+
+    rev = blocks[:, ::-1]
+    suf_max = np.maximum.accumulate(rev, axis=1)[:, ::-1]
+    suf_min = np.minimum.accumulate(rev, axis=1)[:, ::-1]
+    # 后缀 [i, 块尾] 的回撤：min_{k>=i} (min_{j>=k} eq[j]) / eq[k] - 1
+    suf_dd = np.minimum.accumulate((suf_min / blocks - 1.0)[:, ::-1], axis=1)[:, ::-1]
+
+    pre_min, pre_dd, suf_max, suf_dd = (a.ravel() for a in (pre_min, pre_dd, suf_max, suf_dd))
+    end = np.arange(window - 1, n)
+    start = end - window + 1
+    cross = np.minimum(np.minimum(suf_dd[start], pre_dd[end]), pre_min[end] / suf_max[start] - 1.0)
+    # 窗口与块对齐时（start 为块首）整个窗口在同一块内，只看前缀
+    out[window - 1 :] = np.where(start % window == 0, pre_dd[end], cross)
+    return out
+
+
+def rolling_var_cvar(rets: np.ndarray, window: int, level: float = 0.95, chunk_size: int = 4096) -> tuple[np.ndarray, np.ndarray]:
+    """历史模拟法 VaR / CVaR（以正数表示损失）：窗口内最差 k = ceil((1-level)·window) 个收益。
+
+    分位数没有前缀和形式；这里对窗口视图分块做 np.partition（每窗口 O(window)，在 C 内完成），
+    内存占用为 chunk_size × window。
+    """
+
+    r = np.asarray(rets, dtype=np.float64)
+    _check_window(r, window)
+    if not 0.0 < level < 1.0:
+        raise ValueError(f"level must be in (0, 1): {level}")
+    n = r.shape[0]
+    var = np.full(n, np.nan)
+    cvar = np.full(n, np.nan)
+    if n < window:
+        return var, cvar
+
+    k = max(1, int(np.ceil((1.0 - level) * window - 1e-9)))
+    views = np.lib.stride_tricks.sliding_window_view(r, window)
+    for start in range(0, views.shape[0], chunk_size):
+        part = np.partition(views[start : start + chunk_size], k - 1, axis=1)[:, :k]
+        rows = slice(window - 1 + start, window - 1 + start + part.shape[0])
+        var[rows] = -part.max(axis=1)
+        cvar[rows] = -part.mean(axis=1)
+    return var, cvar
+
+
+def _simple_returns(values: np.ndarray) -> np.ndarray:
+    r = np.full(values.shape[0], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r[1:] = values[1:] / values[:-1] - 1.0
+    return r
+
+
+def align_to(ts: np.ndarray, other_ts: np.ndarray, other_values: np.ndarray) -> np.ndarray:
+    """把另一条序列（如基准收盘价）按时间对齐到 ts：取 <= ts 的最近一个值，之前为 NaN。"""
+
+    pos = np.searchsorted(np.asarray(other_ts, dtype=np.int64), np.asarray(ts, dtype=np.int64), side="right") - 1
+    values = np.asarray(other_values, dtype=np.float64)
+    out = np.full(pos.shape[0], np.nan)
+    ok = pos >= 0
+    out[ok] = values[pos[ok]]
+    return out
+
+
+def compute_rolling(
+    ts: np.ndarray,
+    equity: np.ndarray,
+    window: int,
+    *,
+    benchmark: Optional[np.ndarray] = None,
+    var_level: float = 0.95,
+    config: Optional[MetricsConfig] = None,
+) -> pd.DataFrame:
+    """按 bar 计算滚动指标（窗口 = 最近 window 个收益，即 window+1 个净值点）。
+
+    - rolling_vol / rolling_sharpe：年化口径与 Metrics.compute 一致（ddof=0、按 bar 周期折算）
+    - rolling_beta：需要 benchmark（与 ts 对齐的价格序列），否则为 NaN
+    - var / cvar：历史模拟法，以正数表示单 bar 损失
+    除 VaR/CVaR 外全部基于前缀和与分块前缀/后缀扫描，复杂度 O(n)，与窗口长度无关。
+    """
+
+    cfg = config or MetricsConfig()
+    eq = np.asarray(equity, dtype=np.float64)
+    ts = np.asarray(ts, dtype=np.int64)
+    if ts.shape != eq.shape:
+        raise ValueError("ts 与 equity 长度不一致")
+    _check_window(eq, window)
+
+    n = eq.shape[0]
+    periods_per_year = cfg.periods_per_year()
+    rets = _simple_returns(eq)
+    r = rets[1:]
+
+    vol = np.full(n, np.nan)
+    sharpe = np.full(n, np.nan)
+    beta = np.full(n, np.nan)
+    var = np.full(n, np.nan)
+    cvar = np.full(n, np.nan)
+
+    if r.shape[0] >= window:
+        # 先减去全样本均值再做前缀和，减小大样本下 E[x²]-E[x]² 的抵消误差
+        excess = r - float(cfg.risk_free_rate) / periods_per_year
+        center = float(np.nanmean(excess))
+        d = excess - center
+        mean_d = rolling_sum(d, window) / window
+        var_d = np.maximum(rolling_sum(d * d, window) / window - mean_d * mean_d, 0.0)
+        std = np.sqrt(var_d)
+        vol[1:] = std * np.sqrt(periods_per_year)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe[1:] = np.where(std > 1e-15, np.sqrt(periods_per_year) * (mean_d + center) / std, 0.0)
+        sharpe[: window] = np.nan
+
+        if benchmark is not None:
+            b = _simple_returns(np.asarray(benchmark, dtype=np.float64))[1:]
+            if b.shape != r.shape:
+                raise ValueError("benchmark 与 equity 长度不一致")
+            rc = r - float(np.nanmean(r))
+            bc = b - float(np.nanmean(b))
+            mean_r = rolling_sum(rc, window) / window
+            mean_b = rolling_sum(bc, window) / window
+            cov = rolling_sum(rc * bc, window) / window - mean_r * mean_b
+            var_b = rolling_sum(bc * bc, window) / window - mean_b * mean_b
+            with np.errstate(divide="ignore", invalid="ignore"):
+                beta[1:] = np.where(var_b > 1e-18, cov / var_b, np.nan)
+
+        var[1:], cvar[1:] = rolling_var_cvar(r, window, var_level)
+
+    return pd.DataFrame(
+        {
+            "dt": ns_to_datetimes(ts),
+            "total_equity": eq,
+            "ret": rets,
+            "rolling_vol": vol,
+            "rolling_sharpe": sharpe,
+            "rolling_max_drawdown": rolling_max_drawdown(eq, window + 1) if n > window else np.full(n, np.nan),
+            "rolling_beta": beta,
+            "var": var,
+            "cvar": cvar,
+        },
+        columns=ROLLING_COLUMNS,
+    )
+
+
+def compute_rolling_curve(
+    equity_curve: List[EquityPoint],
+    window: int,
+    *,
+    benchmark: Optional[np.ndarray] = None,
+    var_level: float = 0.95,
+    config: Optional[MetricsConfig] = None,
+) -> pd.DataFrame:
+    """compute_rolling 的 EquityPoint 列表入口（回测引擎输出）。"""
+
+    ts, eq = equity_arrays(equity_curve)
+    return compute_rolling(ts, eq, window, benchmark=benchmark, var_level=var_level, config=config)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from finance.core.compactTypes import CompactBar
+from finance.core.coreTypes import BookEquityPoint, Side, TradeRecord
+from finance.data.tradingCalendar import AlignedPanel
+from finance.execution.broker import Broker
+from finance.portfolio.riskManager import RiskManager
+from finance.portfolio.sleevePortfolio import SleevePortfolio
+from finance.strategy.crossSectionalStrategy import RebalanceSchedule
+from finance.strategy.strategyBase import StrategyBase
+
+
+@dataclass(frozen=True)
+class Sleeve:
+    """一个资金分仓：strategy 只接收 symbol 的 bar，weight 为占总资金的比例。"""
+
+    name: str
+    symbol: str
+    strategy: StrategyBase
+    weight: float
+
+
+@dataclass(frozen=True)
+class SleeveResult:
+    symbols: List[str]
+    equity_curve: List[BookEquityPoint]
+    sleeve_curves: Dict[str, List[BookEquityPoint]]
+    trades: List[TradeRecord]
+    reallocations: int
+    crossed_quantity: int
+    costs_saved: float
+    dropped_last_bar: int
+    initial_cash: float
+
+    @property
+    def final_equity(self) -> float:
+        return self.equity_curve[-1].total_equity if self.equity_curve else self.initial_cash
+
+
+class SleeveEngine:
+    """多策略分仓回测（与 BacktestEngine 相同的 Next-Open 时序），所有 sleeve 共用一次数据遍历：
+
+    对主时间轴上的每个时点：
+    1) 有待执行信号的 sleeve 按当日 open 由各自权益换算目标数量（目标仓位 ∈ [0, 1]，按整手、含成本），
+       同一标的各 sleeve 的调仓数量轧差后只下一笔净额市价单（先卖后买），再拆回各 sleeve
+    2) 按 close 盯市，记录组合与各 sleeve 的权益
+    3) 在调仓日程上按 weights 重新划拨 sleeve 资金，并让持仓的 sleeve 下一根 bar 开盘按原目标仓位重新调整
+    4) 依次把当根 bar 交给各 sleeve 的策略（停牌的标的跳过），新信号下一根 bar 开盘执行
+    策略挂单（submit_order）暂不支持；最后一根 bar 的信号被丢弃并计数。
+    """
+
+    def __init__(
+        self,
+        *,
+        panel: AlignedPanel,
+        sleeves: Sequence[Sleeve],
+        broker: Broker,
+        initial_cash: float,
+        reallocate: Optional[RebalanceSchedule] = None,
+        risk_manager: Optional[RiskManager] = None,
+    ) -> None:
+        missing = sorted({s.symbol for s in sleeves} - set(panel.symbols))
+        if missing:
+            raise ValueError(f"panel 中没有这些标的: {missing}")
+        self.panel = panel
+        self.sleeves = list(sleeves)
+        self.broker = broker
+        self.reallocate = reallocate
+        self.portfolio = SleevePortfolio(
+            [s.name for s in self.sleeves],
+            [s.symbol for s in self.sleeves],
+            [s.weight for s in self.sleeves],
+            initial_cash,
+            risk_manager,
+        )
+
+    def run(self) -> SleeveResult:
+        panel = self.panel
+        sp = self.portfolio
+        cal = panel.calendar
+        dts = cal.datetimes()
+        n = len(cal)
+        columns = {s: panel.symbols.index(s) for s in sp.book.symbols}
+        fields = {f: panel.panel(f)[:, [columns[s] for s in sp.book.symbols]] for f in ("open", "high", "low", "close", "volume")}
+        present = panel.present[:, [columns[s] for s in sp.book.symbols]]
+        realloc = self.reallocate.mask(cal) if self.reallocate is not None else np.zeros(n, dtype=bool)
+
+        S = len(self.sleeves)
+        targets = np.full(S, np.nan)
+        pending = np.zeros(S, dtype=bool)
+        self._crossed = 0
+        self._costs_saved = 0.0
+        reallocations = 0
+        dropped_last_bar = 0
+
+        for t in range(n):
+            dt = dts[t]
+            if pending.any():
+                self._rebalance_open(dt, fields["open"][t], targets, pending)
+
+            sp.mark_to_market(dt, fields["close"][t])
+
+            if realloc[t] and t < n - 1:
+                sp.reallocate()
+                reallocations += 1
+                held = ~np.isnan(targets)
+                pending[held] = True
+
+            for s, sleeve in enumerate(self.sleeves):
+                k = sp.symbol_index[s]
+                if not present[t, k]:
+                    continue
+                bar = CompactBar(
+                    int(cal.ts[t]),
+                    sleeve.symbol,
+                    float(fields["open"][t, k]),
+                    float(fields["high"][t, k]),
+                    float(fields["low"][t, k]),
+                    float(fields["close"][t, k]),
+                    float(fields["volume"][t, k]),
+                )
+                signal = sleeve.strategy.on_bar(bar)
+                orders, cancels = sleeve.strategy.drain_orders()
+                if orders or cancels:
+                    raise ValueError(f"sleeve {sleeve.name}: SleeveEngine 不支持挂单")
+                if signal is None:
+                    continue
+                if t == n - 1:
+                    dropped_last_bar += 1
+                    continue
+                targets[s] = min(max(float(signal.target_position), 0.0), 1.0)
+                pending[s] = True
+
+        return SleeveResult(
+            symbols=list(sp.book.symbols),
+            equity_curve=list(sp.book.equity_curve),
+            sleeve_curves={name: list(curve) for name, curve in sp.equity_curves.items()},
+            trades=list(sp.book.trades),
+            reallocations=reallocations,
+            crossed_quantity=self._crossed,
+            costs_saved=self._costs_saved,
+            dropped_last_bar=dropped_last_bar,
+            initial_cash=sp.initial_cash,
+        )
+
+    def _sleeve_deltas(self, open_row: np.ndarray, targets: np.ndarray, pending: np.ndarray) -> np.ndarray:
+        """各 sleeve 按自身权益换算的调仓数量；标的无 open 的 sleeve 保留待执行信号。"""
+
+        sp = self.portfolio
+        lot = sp.book.risk_manager.limits.lot_size
+        prices = open_row[sp.symbol_index]
+        equity = sp.equity(open_row)
+        deltas = np.zeros(len(self.sleeves), dtype=np.int64)
+        for s in np.flatnonzero(pending & (prices > 0)).tolist():
+            pending[s] = False
+            price = float(prices[s])
+            want = self.broker.affordable_qty(price, float(equity[s]) * targets[s], lot) if targets[s] > 0 else 0
+            delta = want - int(sp.quantities[s])
+            if delta > 0:
+                delta = min(delta, self.broker.affordable_qty(price, float(sp.cash[s]), lot))
+            deltas[s] = delta
+        return deltas
+
+    def _rebalance_open(self, dt, open_row: np.ndarray, targets: np.ndarray, pending: np.ndarray) -> None:
+        sp = self.portfolio
+        deltas = self._sleeve_deltas(open_row, targets, pending)
+        if not deltas.any():
+            return
+
+        by_symbol = []
+        for k, symbol in enumerate(sp.book.symbols):
+            d = np.where(sp.symbol_index == k, deltas, 0)
+            if d.any():
+                by_symbol.append((int(d.sum()), k, symbol, d))
+        # 先卖后买：卖出回款可用于买入
+        for net, k, symbol, d in sorted(by_symbol, key=lambda x: x[0] > 0):
+            price = float(open_row[k])
+            order = fill = None
+            qty = net
+            if net > 0:
+                qty = min(net, self.broker.affordable_qty(price, sp.book.cash))
+            if qty:
+                order, fill = self.broker.fill_market(dt=dt, symbol=symbol, quantity=qty, market_price=price, reason="sleeve_net")
+            final = sp.apply_netted_fill(symbol, d, price, order, fill)
+            self._record_netting(final, price, fill)
+
+    def _record_netting(self, final: np.ndarray, price: float, fill) -> None:
+        """统计内部对冲数量，以及相对各 sleeve 单独下单节省的手续费与滑点。"""
+
+        buys = int(final[final > 0].sum())
+        sells = int(-final[final < 0].sum())
+        self._crossed += min(buys, sells)
+        standalone = 0.0
+        for q in final[final != 0].tolist():
+            side = Side.BUY if q > 0 else Side.SELL
+            exec_price, per_share_slip = self.broker.slippage_model.apply(price, side=side)
+            standalone += self.broker.fee_model.calc(exec_price * abs(q)) + per_share_slip * abs(q)
+        actual = 0.0 if fill is None else float(fill.fee + fill.slippage)
+        self._costs_saved += standalone - actual
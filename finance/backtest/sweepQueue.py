@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+# 共享目录任务队列（无需常驻的消息服务）：
+#
+#   {root}/tasks/{task_id}.json    待执行任务（协调端写入）
+#   {root}/leases/{task_id}.lease  租约：worker 以 O_CREAT|O_EXCL 原子创建，内容为 worker id，mtime 为最近一次心跳
+#   {root}/results/{task_id}.json  结果（写临时文件后 os.replace，原子可见）
+#
+# 租约超过 lease_ttl 秒未心跳视为过期，任意进程调用 requeue_expired（claim 时自动调用）删除过期租约，
+# 任务随即可被重新领取。判断过期用的是文件 mtime，各主机时钟偏差须远小于 lease_ttl。
+# 同一任务可能因租约过期被执行两次，结果文件按 task_id 覆盖写，内容相同。
+
+TASKS_DIR = "tasks"
+LEASES_DIR = "leases"
+RESULTS_DIR = "results"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _write_json_atomic(path: str, payload: Dict[str, Any]) -> None:
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _unlink_quiet(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _ids(directory: str, suffix: str) -> List[str]:
+    return sorted(name[: -len(suffix)] for name in os.listdir(directory) if name.endswith(suffix))
+
+
+@dataclass
+class Lease:
+    """一次领取：持有期间需定期 heartbeat，结束时 complete（写结果并删除任务与租约）或 release（放回队列）。"""
+
+    queue: "SweepQueue"
+    task_id: str
+    task: Dict[str, Any]
+    worker_id: str
+
+    @property
+    def path(self) -> str:
+        return self.queue.lease_path(self.task_id)
+
+    def heartbeat(self) -> bool:
+        """刷新租约 mtime；租约已被回收或被他人重新领取时返回 False。"""
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                if f.read() != self.worker_id:
+                    return False
+            os.utime(self.path, None)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, result: Dict[str, Any]) -> None:
+        _write_json_atomic(self.queue.result_path(self.task_id), {**result, "task_id": self.task_id, "worker": self.worker_id})
+        _unlink_quiet(self.queue.task_path(self.task_id))
+        self.release()
+
+    def release(self) -> None:
+        """删除自己持有的租约（已被他人重新领取时不动）。"""
+
+        if self.heartbeat():
+            _unlink_quiet(self.path)
+
+
+class Heartbeat:
+    """后台线程按 interval 秒刷新租约（回测本身在主线程运行）；lost 表示租约已丢失。"""
+
+    def __init__(self, lease: Lease, interval: float) -> None:
+        self.lease = lease
+        self.interval = float(interval)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{lease.task_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self.lease.heartbeat():
+                self.lost = True
+                return
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class SweepQueue:
+    def __init__(self, root: str, lease_ttl: float = 120.0) -> None:
+        if lease_ttl <= 0:
+            raise ValueError("lease_ttl must be > 0")
+        self.root = root
+        self.lease_ttl = float(lease_ttl)
+        for name in (TASKS_DIR, LEASES_DIR, RESULTS_DIR):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def task_path(self, task_id: str) -> str:
+        return os.path.join(self.root, TASKS_DIR, f"{task_id}.json")
+
+    def lease_path(self, task_id: str) -> str:
+        return os.path.join(self.root, LEASES_DIR, f"{task_id}.lease")
+
+    def result_path(self, task_id: str) -> str:
+        return os.path.join(self.root, RESULTS_DIR, f"{task_id}.json")
+
+    # ---- 协调端 ----
+
+    def submit(self, tasks: Sequence[Dict[str, Any]], *, batch_id: str) -> List[str]:
+        """写入任务，task_id 为 {batch_id}_{序号}；已有结果的任务跳过（重复提交同一批次是幂等的）。"""
+
+        ids = []
+        for i, task in enumerate(tasks):
+            task_id = f"{batch_id}_{i:04d}"
+            if not os.path.exists(self.result_path(task_id)):
+                _write_json_atomic(self.task_path(task_id), task)
+            ids.append(task_id)
+        return ids
+
+    def requeue_expired(self, now: Optional[float] = None) -> List[str]:
+        """删除超过 lease_ttl 未心跳的租约，返回被放回队列的 task_id。"""
+
+        now = time.time() if now is None else now
+        out = []
+        for task_id in _ids(os.path.join(self.root, LEASES_DIR), ".lease"):
+            path = self.lease_path(task_id)
+            try:
+                expired = now - os.stat(path).st_mtime > self.lease_ttl
+            except FileNotFoundError:
+                continue
+            if expired:
+                _unlink_quiet(path)
+                out.append(task_id)
+        return out
+
+    def status(self) -> Dict[str, int]:
+        tasks = set(_ids(os.path.join(self.root, TASKS_DIR), ".json"))
+        leased = set(_ids(os.path.join(self.root, LEASES_DIR), ".lease"))
+        counts = {"pending": len(tasks - leased), "leased": len(leased), "ok": 0, "failed": 0}
+        for result in self.results():
+            counts["ok" if result.get("status") == "ok" else "failed"] += 1
+        return counts
+
+    def results(self) -> List[Dict[str, Any]]:
+        out = []
+        for task_id in _ids(os.path.join(self.root, RESULTS_DIR), ".json"):
+            result = _read_json(self.result_path(task_id))
+            if result is not None:
+                out.append(result)
+        return out
+
+    # ---- worker 端 ----
+
+    def claim(self, worker_id: str) -> Optional[Lease]:
+        """原子领取一个待执行任务（O_EXCL 创建租约文件），没有可领取的任务时返回 None。"""
+
+        self.requeue_expired()
+        for task_id in _ids(os.path.join(self.root, TASKS_DIR), ".json"):
+            lease_path = self.lease_path(task_id)
+            if os.path.exists(lease_path):
+                continue
+            try:
+                fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(worker_id)
+
+            task = _read_json(self.task_path(task_id))
+            if task is None or os.path.exists(self.result_path(task_id)):
+                # 领取前已被他人完成（旧租约过期后原 worker 仍写出了结果）
+                _unlink_quiet(self.task_path(task_id))
+                _unlink_quiet(lease_path)
+                continue
+            return Lease(queue=self, task_id=task_id, task=task, worker_id=worker_id)
+        return None
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from finance.core.coreTypes import Side, TradeRecord
+from finance.data.barArrays import BarArrays, ns_to_datetimes
+from finance.data.resampler import NS_PER_DAY
+
+ROUND_TRIP_COLUMNS = [
+    "symbol",
+    "entry_dt",
+    "exit_dt",
+    "quantity",
+    "entry_price",
+    "exit_price",
+    "fees",
+    "pnl",
+    "return",
+    "holding_bars",
+    "holding_days",
+    "mae",
+    "mfe",
+]
+
+
+@dataclass(frozen=True)
+class TradeColumns:
+    """成交的列式表示（按成交先后顺序）：side 为 1=BUY / -1=SELL，symbol_id 索引 symbols。"""
+
+    symbols: List[str]
+    symbol_id: np.ndarray
+    ts: np.ndarray
+    side: np.ndarray
+    quantity: np.ndarray
+    price: np.ndarray
+    fee: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @classmethod
+    def from_records(cls, trades: Sequence[TradeRecord]) -> "TradeColumns":
+        """TradeRecord 列表逐笔取属性；落盘的 TradeLog（有 records()）直接取映射列，不构造成交对象。"""
+
+        if hasattr(trades, "records"):
+            return cls._from_structured(trades.records())
+        codes, symbols = pd.factorize(pd.Series([t.symbol for t in trades], dtype=object), sort=True)
+        return cls(
+            symbols=[str(s) for s in symbols],
+            symbol_id=codes.astype(np.int64),
+            ts=np.array([t.ts for t in trades], dtype=np.int64),
+            side=np.array([1 if t.side == Side.BUY else -1 for t in trades], dtype=np.int8),
+            quantity=np.array([t.quantity for t in trades], dtype=np.int64),
+            price=np.array([t.price for t in trades], dtype=np.float64),
+            fee=np.array([t.fee for t in trades], dtype=np.float64),
+        )
+
+    @classmethod
+    def _from_structured(cls, rec: np.ndarray) -> "TradeColumns":
+        # symbol 为定长 bytes：按字节排序与解码后按 str 排序一致（UTF-8 保序）
+        symbols, codes = np.unique(rec["symbol"], return_inverse=True)
+        return cls(
+            symbols=[s.decode("utf-8") for s in symbols.tolist()],
+            symbol_id=codes.astype(np.int64).reshape(-1),
+            ts=rec["ts"].astype(np.int64),
+            side=np.where(rec["side"] > 0, 1, -1).astype(np.int8),
+            quantity=rec["quantity"].astype(np.int64),
+            price=rec["price"].astype(np.float64),
+            fee=rec["fee"].astype(np.float64),
+        )
+
+
+@dataclass(frozen=True)
+class LotMatches:
+    """FIFO 配对结果：每行是一段 (买入成交, 卖出成交) 的匹配数量。"""
+
+    buy_index: np.ndarray
+    sell_index: np.ndarray
+    quantity: np.ndarray
+
+
+def match_fifo(cols: TradeColumns) -> LotMatches:
+    """按标的做 FIFO 配对（仅多头，与 Portfolio 一致）。
+
+    把每个标的的买入/卖出数量分别累加成区间 [累计起点, 累计终点)，
+    所有标的按 symbol_id 依次平移到同一数轴上；两组区间端点合并后，
+    每个被卖出区间覆盖的小段即为一笔 lot 匹配。全程为排序/累加/二分，无逐笔循环。
+    """
+
+    n = len(cols)
+    empty = np.zeros(0, dtype=np.int64)
+    if n == 0:
+        return LotMatches(buy_index=empty, sell_index=empty, quantity=empty)
+
+    sym = cols.symbol_id
+    qty = cols.quantity
+    nsym = int(sym.max()) + 1
+    idx = np.arange(n, dtype=np.int64)
+
+    buys = idx[cols.side > 0]
+    sells = idx[cols.side < 0]
+    buys = buys[np.argsort(sym[buys], kind="stable")]
+    sells = sells[np.argsort(sym[sells], kind="stable")]
+
+    qb = qty[buys]
+    qs = qty[sells]
+    bought = np.bincount(sym[buys], weights=qb, minlength=nsym).astype(np.int64)
+    sold = np.bincount(sym[sells], weights=qs, minlength=nsym).astype(np.int64)
+    buy_offset = np.cumsum(bought) - bought
+    sell_offset = np.cumsum(sold) - sold
+
+    buy_end = np.cumsum(qb)
+    sell_end = np.cumsum(qs) - sell_offset[sym[sells]] + buy_offset[sym[sells]]
+    sell_start = sell_end - qs
+
+    # 卖出不能超过卖出时点之前该标的的累计买入
+    key_b = sym[buys] * n + buys
+    before = np.searchsorted(key_b, sym[sells] * n + sells)
+    bought_before = np.concatenate(([0], buy_end))[before]
+    short = sell_end > bought_before
+    if short.any():
+        j = int(sells[short][0])
+        raise ValueError(f"卖出数量超过持仓（仅支持多头 FIFO 配对）：trade index={j}, symbol={cols.symbols[int(sym[j])]}")
+
+    points = np.unique(np.concatenate((buy_end - qb, buy_end, sell_start, sell_end)))
+    x0 = points[:-1]
+    seg_qty = np.diff(points)
+    s_pos = np.searchsorted(sell_end, x0, side="right")
+    covered = s_pos < sells.shape[0]
+    covered[covered] &= sell_start[s_pos[covered]] <= x0[covered]
+    x0 = x0[covered]
+    b_pos = np.searchsorted(buy_end, x0, side="right")
+
+    return LotMatches(buy_index=buys[b_pos], sell_index=sells[s_pos[covered]], quantity=seg_qty[covered])
+
+
+def _window_extremes(bars: BarArrays, entry_ts: np.ndarray, exit_ts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """持仓期间（入场 bar 到出场 bar 之前）的最低价/最高价与持仓 bar 数；区间为空时为 NaN。
+
+    各区间的极值用一次 reduceat 求出：下标交错排列 [s0, e0, s1, e1, ...]，取偶数位结果。
+    """
+
+    start = np.searchsorted(bars.ts, entry_ts, side="left")
+    stop = np.searchsorted(bars.ts, exit_ts, side="left")
+    holding = stop - start
+    low = np.full(start.shape[0], np.nan)
+    high = np.full(start.shape[0], np.nan)
+    ok = stop > start
+    if ok.any():
+        # 末尾补一个哨兵，保证 stop 可以等于 len(bars)
+        lows = np.append(bars.low, np.nan)
+        highs = np.append(bars.high, np.nan)
+        pairs = np.column_stack((start[ok], stop[ok])).ravel()
+        low[ok] = np.minimum.reduceat(lows, pairs)[::2]
+        high[ok] = np.maximum.reduceat(highs, pairs)[::2]
+    return low, high, holding
+
+
+@dataclass(frozen=True)
+class TradeAnalytics:
+    round_trips: pd.DataFrame
+    stats: Dict[str, Optional[float]]
+
+
+def round_trip_stats(round_trips: pd.DataFrame) -> Dict[str, Optional[float]]:
+    """胜率、盈亏比（profit factor）、期望收益、平均持仓与 MAE/MFE；无亏损时 profit_factor 为 None。
+
+    没有 round trip 时键集合不变：计数/金额类为 0，均值类为 None（metrics.json 的结构不随运行变化）。
+    """
+
+    count = int(len(round_trips))
+    pnl = round_trips["pnl"].to_numpy(dtype=np.float64)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    gross_profit = float(wins.sum())
+    gross_loss = float(-losses.sum())
+
+    def mean(col: str) -> Optional[float]:
+        values = round_trips[col].to_numpy(dtype=np.float64)
+        return float(np.nanmean(values)) if np.isfinite(values).any() else None
+
+    return {
+        "round_trips": count,
+        "win_rate": float(wins.shape[0] / count) if count else 0.0,
+        "profit_factor": gross_profit / gross_loss if gross_loss > 0 else None,
+        "expectancy": float(pnl.mean()) if count else 0.0,
+        "expectancy_return": mean("return"),
+        "avg_win": float(wins.mean()) if wins.shape[0] else 0.0,
+        "avg_loss": float(losses.mean()) if losses.shape[0] else 0.0,
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "avg_holding_bars": mean("holding_bars"),
+        "avg_holding_days": mean("holding_days"),
+        "avg_mae": mean("mae"),
+        "avg_mfe": mean("mfe"),
+    }
+
+
+def analyze_trades(
+    trades: Sequence[TradeRecord] | TradeColumns,
+    bars: Optional[Mapping[str, BarArrays]] = None,
+) -> TradeAnalytics:
+    """把成交配对成 round trip 并统计。
+
+    - 手续费按数量比例分摊到每段匹配（买入费 + 卖出费）
+    - bars 给出时计算持仓 bar 数与 MAE/MFE：入场后到出场前各 bar 的最低/最高价及出场价，
+      相对入场价的最大不利/有利幅度（MAE <= 0 <= MFE）
+    - 未平仓部分不计入
+    """
+
+    cols = trades if isinstance(trades, TradeColumns) else TradeColumns.from_records(trades)
+    m = match_fifo(cols)
+    b, s, q = m.buy_index, m.sell_index, m.quantity.astype(np.float64)
+
+    entry_price = cols.price[b]
+    exit_price = cols.price[s]
+    fees = cols.fee[b] * q / cols.quantity[b] + cols.fee[s] * q / cols.quantity[s]
+    pnl = (exit_price - entry_price) * q - fees
+    entry_ts = cols.ts[b]
+    exit_ts = cols.ts[s]
+
+    holding_bars = np.full(b.shape[0], np.nan)
+    mae = np.full(b.shape[0], np.nan)
+    mfe = np.full(b.shape[0], np.nan)
+    if bars is not None and b.shape[0] > 0:
+        sym = cols.symbol_id[b]
+        for sid in np.unique(sym).tolist():
+            arrays = bars.get(cols.symbols[sid])
+            if arrays is None:
+                continue
+            rows = np.flatnonzero(sym == sid)
+            low, high, held = _window_extremes(arrays, entry_ts[rows], exit_ts[rows])
+            worst = np.fmin(low, exit_price[rows])
+            best = np.fmax(high, exit_price[rows])
+            mae[rows] = np.minimum(worst / entry_price[rows] - 1.0, 0.0)
+            mfe[rows] = np.maximum(best / entry_price[rows] - 1.0, 0.0)
+            holding_bars[rows] = held
+
+    table = pd.DataFrame(
+        {
+            "symbol": np.asarray(cols.symbols, dtype=object)[cols.symbol_id[b]] if b.shape[0] else np.array([], dtype=object),
+            "entry_dt": ns_to_datetimes(entry_ts),
+            "exit_dt": ns_to_datetimes(exit_ts),
+            "quantity": m.quantity,
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "fees": fees,
+            "pnl": pnl,
+            "return": pnl / (entry_price * q),
+            "holding_bars": holding_bars,
+            "holding_days": (exit_ts - entry_ts) / NS_PER_DAY,
+            "mae": mae,
+            "mfe": mfe,
+        },
+        columns=ROUND_TRIP_COLUMNS,
+    )
+    return TradeAnalytics(round_trips=table, stats=round_trip_stats(table))
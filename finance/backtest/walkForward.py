@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from finance.backtest.fastKernel import run_target_positions
+from finance.backtest.metrics import Metrics, MetricsConfig
+from finance.backtest.optimizer import Params
+from finance.data.barArrays import BarArrays, ns_to_datetimes
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.strategy.smaCrossStrategy import sma_cross_targets
+
+WINDOW_COLUMNS = [
+    "window",
+    "train_start",
+    "train_end",
+    "test_start",
+    "test_end",
+    "fast",
+    "slow",
+    "train_score",
+    "test_bars",
+    "test_trades",
+    "test_return",
+    "test_max_drawdown",
+    "test_sharpe",
+]
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    """一个 walk-forward 窗口（bar 行号，左闭右开）。"""
+
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward_windows(n_bars: int, train_bars: int, test_bars: int, *, anchored: bool = False) -> List[WalkForwardWindow]:
+    """切分训练/测试窗口：测试窗口首尾相接覆盖 [train_bars, n_bars)。
+
+    - rolling：训练窗口为测试窗口之前固定长度的 train_bars 根 bar
+    - anchored：训练窗口总是从第 0 根 bar 开始（逐步加长）
+    """
+
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars/test_bars must be > 0")
+    windows = []
+    start = train_bars
+    while start < n_bars:
+        end = min(start + test_bars, n_bars)
+        windows.append(
+            WalkForwardWindow(
+                index=len(windows),
+                train_start=0 if anchored else start - train_bars,
+                train_end=start,
+                test_start=start,
+                test_end=end,
+            )
+        )
+        start = end
+    return windows
+
+
+@dataclass(frozen=True)
+class _Settings:
+    initial_cash: float
+    fee_model: FeeModel
+    slippage_model: SlippageModel
+    metrics_config: MetricsConfig
+    metric: str
+    backend: str
+
+
+_worker_bars: Optional[BarArrays] = None
+_worker_settings: Optional[_Settings] = None
+
+
+def _init_worker(bars: BarArrays, settings: _Settings) -> None:
+    global _worker_bars, _worker_settings
+    _worker_bars = bars
+    _worker_settings = settings
+
+
+def _simulate(bars: BarArrays, start: int, end: int, params: Params, st: _Settings):
+    """在 [start, end) 上以空仓起步跑 SMA Cross；向前借 slow-1 根 bar 做均线预热（预热期不交易）。"""
+
+    slow = int(params["slow"])
+    lead = min(slow - 1, start)
+    window = bars.slice(start - lead, end)
+    # 均线在窗口内第 slow-1 根 bar 才就绪，最早的信号不早于 start 收盘，预热段不会成交
+    targets = sma_cross_targets(window.close, int(params["fast"]), slow)
+    res = run_target_positions(
+        window,
+        targets,
+        initial_cash=st.initial_cash,
+        fee_model=st.fee_model,
+        slippage_model=st.slippage_model,
+        backend=st.backend,
+    )
+    return res, lead
+
+
+def _run_window(task: Tuple[WalkForwardWindow, Sequence[Params]]) -> Dict[str, Any]:
+    win, candidates = task
+    bars, st = _worker_bars, _worker_settings
+    assert bars is not None and st is not None, "worker 未初始化"
+
+    # 1) 训练窗口：逐个候选打分，取最优
+    best: Optional[Params] = None
+    best_score = -math.inf
+    for params in candidates:
+        res, lead = _simulate(bars, win.train_start, win.train_end, params, st)
+        # 与测试段相同：只对 [train_start, train_end) 打分，不计借来的预热段（预热段恒为空仓，会按 slow 不同程度稀释得分）
+        score = float(Metrics.compute_matrix(res.total_equity[lead:], st.metrics_config)[st.metric][0])
+        if not math.isnan(score) and (best is None or score > best_score):
+            best, best_score = params, score
+    if best is None:
+        best = candidates[0]
+
+    # 2) 测试窗口：用最优参数样本外评估
+    res, lead = _simulate(bars, win.test_start, win.test_end, best, st)
+    equity = res.total_equity[lead:]
+    stats = Metrics.compute_matrix(equity, st.metrics_config)
+    return {
+        "window": win.index,
+        "train_start": win.train_start,
+        "train_end": win.train_end,
+        "test_start": win.test_start,
+        "test_end": win.test_end,
+        "fast": int(best["fast"]),
+        "slow": int(best["slow"]),
+        "train_score": best_score,
+        "test_bars": int(equity.shape[0]),
+        "test_trades": int(np.count_nonzero(res.fill_side[lead:])),
+        "test_return": float(stats["cumulative_return"][0]),
+        "test_max_drawdown": float(stats["max_drawdown"][0]),
+        "test_sharpe": float(stats["sharpe"][0]),
+        "_equity": equity,
+    }
+
+
+@dataclass(frozen=True)
+class WalkForwardResult:
+    windows: pd.DataFrame
+    oos_equity: pd.DataFrame
+    oos_metrics: Dict[str, Any]
+
+
+def run_walk_forward(
+    bars: BarArrays,
+    candidates: Sequence[Params],
+    *,
+    train_bars: int,
+    test_bars: int,
+    anchored: bool = False,
+    initial_cash: float,
+    fee_model: Optional[FeeModel] = None,
+    slippage_model: Optional[SlippageModel] = None,
+    metrics_config: Optional[MetricsConfig] = None,
+    metric: str = "sharpe",
+    backend: str = "auto",
+    max_workers: int = 0,
+) -> WalkForwardResult:
+    """Walk-forward：每个窗口在训练段选出 SMA 参数，在紧随其后的测试段样本外评估。
+
+    - 各窗口相互独立，max_workers > 0 时在进程池中并行；行情通过 initializer 每个进程只传一次
+    - 每个测试段都以 initial_cash 空仓起步；样本外净值按各段收益率首尾相乘拼接
+    """
+
+    if not candidates:
+        raise ValueError("candidates 为空")
+    if max_workers < 0:
+        raise ValueError("max_workers must be >= 0")
+    windows = walk_forward_windows(len(bars), train_bars, test_bars, anchored=anchored)
+    if not windows:
+        raise ValueError(f"数据长度 {len(bars)} 不足以切出训练窗口 train_bars={train_bars}")
+
+    settings = _Settings(
+        initial_cash=float(initial_cash),
+        fee_model=fee_model or FeeModel(),
+        slippage_model=slippage_model or SlippageModel(),
+        metrics_config=metrics_config or MetricsConfig(),
+        metric=metric,
+        backend=backend,
+    )
+    tasks = [(w, list(candidates)) for w in windows]
+    if max_workers > 0:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(bars, settings)) as pool:
+            rows = list(pool.map(_run_window, tasks))
+    else:
+        _init_worker(bars, settings)
+        rows = [_run_window(t) for t in tasks]
+
+    # 拼接：每段净值按上一段期末净值缩放
+    pieces = []
+    level = 1.0
+    for row in rows:
+        eq = row.pop("_equity")
+        growth = eq / settings.initial_cash
+        pieces.append(growth * level)
+        level *= float(growth[-1])
+    stitched = np.concatenate(pieces) * settings.initial_cash
+    test_index = np.arange(windows[0].test_start, windows[-1].test_end)
+    window_id = np.repeat([w.index for w in windows], [w.test_end - w.test_start for w in windows])
+
+    oos_equity = pd.DataFrame(
+        {
+            "dt": ns_to_datetimes(bars.ts[test_index]),
+            "total_equity": stitched,
+            "window": window_id,
+        }
+    )
+    stats = Metrics.compute_matrix(stitched, settings.metrics_config)
+    oos_metrics: Dict[str, Any] = {k: v[0].item() for k, v in stats.items()}
+    oos_metrics["windows"] = len(windows)
+    oos_metrics["trades"] = int(sum(r["test_trades"] for r in rows))
+    return WalkForwardResult(
+        windows=pd.DataFrame(rows, columns=WINDOW_COLUMNS),
+        oos_equity=oos_equity,
+        oos_metrics=oos_metrics,
+    )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+_START_NS = 1_577_836_800_000_000_000  # 2020-01-01
+_STEP_NS = 60_000_000_000
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="coreTypes 与 compactTypes 的单对象内存与构造耗时对比")
+    p.add_argument("--n", type=int, default=200_000, help="每种类型构造的对象数")
+    p.add_argument("--repeat", type=int, default=5, help="计时重复次数（取最快一次）")
+    p.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    return p
+
+
+def _cases(n: int) -> Dict[str, tuple[Callable[[int], Any], Callable[[int], Any]]]:
+    """{类型名: (标准类型构造, 紧凑类型构造)}；参数 i 为行号，时间戳对象在构造时生成（计入内存）。"""
+
+    from finance.core import compactTypes as ct
+    from finance.core import coreTypes as t
+
+    def dt(i: int):
+        return t.ns_to_datetime(_START_NS + i * _STEP_NS)
+
+    def ts(i: int) -> int:
+        return _START_NS + i * _STEP_NS
+
+    return {
+        "Bar": (
+            lambda i: t.Bar(dt(i), "000001", 10.0, 10.5, 9.5, 10.2, 1e6),
+            lambda i: ct.CompactBar(ts(i), "000001", 10.0, 10.5, 9.5, 10.2, 1e6),
+        ),
+        "Signal": (
+            lambda i: t.Signal(dt(i), "000001", 1.0),
+            lambda i: ct.CompactSignal(ts(i), "000001", 1.0),
+        ),
+        "Order": (
+            lambda i: t.Order("oid", dt(i), "000001", t.Side.BUY, 100),
+            lambda i: ct.CompactOrder("oid", ts(i), "000001", t.Side.BUY, 100),
+        ),
+        "Fill": (
+            lambda i: t.Fill("oid", dt(i), "000001", t.Side.BUY, 100, 10.0, 0.5, 0.1),
+            lambda i: ct.CompactFill("oid", ts(i), "000001", t.Side.BUY, 100, 10.0, 0.5, 0.1),
+        ),
+        "EquityPoint": (
+            lambda i: t.EquityPoint(dt(i), 1e6, 0, 10.0, 0.0, 1e6),
+            lambda i: ct.CompactEquityPoint(ts(i), 1e6, 0, 10.0, 0.0, 1e6),
+        ),
+        "TradeRecord": (
+            lambda i: t.TradeRecord(dt(i), "000001", t.Side.BUY, 100, 10.0, 0.5, 0.1, "oid"),
+            lambda i: ct.CompactTradeRecord(ts(i), "000001", t.Side.BUY, 100, 10.0, 0.5, 0.1, "oid"),
+        ),
+    }
+
+
+def _bytes_per_object(make: Callable[[int], Any], n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    objs = [make(i) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    # 扣除列表本身的指针数组
+    used -= 8 * len(objs)
+    del objs
+    return used / n
+
+
+def _ns_per_object(make: Callable[[int], Any], n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.disable()
+        t0 = time.perf_counter_ns()
+        for i in range(n):
+            make(i)
+        best = min(best, time.perf_counter_ns() - t0)
+        gc.enable()
+    return best / n
+
+
+def run_benchmark(n: int, repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for name, (standard, compact) in _cases(n).items():
+        row: Dict[str, Any] = {"type": name}
+        for label, make in (("standard", standard), ("compact", compact)):
+            row[f"{label}_bytes"] = round(_bytes_per_object(make, n), 1)
+            row[f"{label}_ns"] = round(_ns_per_object(make, n, repeat), 1)
+        row["bytes_saved_pct"] = round(100.0 * (1 - row["compact_bytes"] / row["standard_bytes"]), 1)
+        row["time_saved_pct"] = round(100.0 * (1 - row["compact_ns"] / row["standard_ns"]), 1)
+        rows.append(row)
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+    if args.n <= 0 or args.repeat <= 0:
+        raise ValueError("--n/--repeat must be > 0")
+
+    rows = run_benchmark(args.n, args.repeat)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"n={args.n} repeat={args.repeat}（字节数含时间戳对象，浮点字段共享不计；耗时含时间戳生成）")
+    print(f"{'type':<12} {'std B':>8} {'compact B':>10} {'saved':>7} {'std ns':>8} {'compact ns':>11} {'saved':>7}")
+    for r in rows:
+        print(
+            f"{r['type']:<12} {r['standard_bytes']:>8.1f} {r['compact_bytes']:>10.1f} {r['bytes_saved_pct']:>6.1f}%"
+            f" {r['standard_ns']:>8.1f} {r['compact_ns']:>11.1f} {r['time_saved_pct']:>6.1f}%"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
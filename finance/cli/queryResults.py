@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+
+from finance.reporting.resultsStore import METRIC_COLUMNS, SqliteResultsStore
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="查询 SQLite 结果库：Top-N / 按参数与指标过滤")
+
+    p.add_argument("--db", required=True, help="结果库路径（runBacktest --results-db 写入）")
+    p.add_argument("--top", type=int, default=10, help="返回条数（<=0 表示不限制）")
+    p.add_argument("--order-by", default="sharpe", help="排序字段：指标列或 run_config 参数名")
+    p.add_argument("--asc", action="store_true", help="升序（默认降序）")
+    p.add_argument("--where", action="append", default=[], help="过滤条件，可重复：如 sharpe>1、fast=10、symbol=000001")
+    p.add_argument("--params", default="fast,slow", help="输出中展示的 run_config 参数（逗号分隔）")
+    p.add_argument("--format", choices=["table", "csv", "json"], default="table", help="输出格式")
+
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    with SqliteResultsStore(args.db) as store:
+        rows = store.query(
+            order_by=args.order_by,
+            descending=not args.asc,
+            limit=args.top if args.top > 0 else None,
+            filters=args.where,
+        )
+
+    params = [s for s in args.params.split(",") if s]
+    columns = ["run_id", "symbol"] + params + list(METRIC_COLUMNS) + ["trades", "final_equity"]
+    records = [{c: (r["config"].get(c) if c in params else r.get(c)) for c in columns} for r in rows]
+
+    if args.format == "json":
+        json.dump(records, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif args.format == "csv":
+        w = csv.DictWriter(sys.stdout, fieldnames=columns)
+        w.writeheader()
+        w.writerows(records)
+    else:
+        cells = [[_fmt(rec[c]) for c in columns] for rec in records]
+        widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+        print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+        for row in cells:
+            print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+    return 0
+
+
+def _fmt(v: object) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.4f}"
+    return str(v)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,18 +4,11 @@ import argparse
 import logging
 import os
 from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
 
-from finance.backtest.backtestEngine import BacktestEngine
-from finance.backtest.metrics import Metrics, MetricsConfig
 from finance.config.defaultConfig import DEFAULT_CONFIG
-from finance.data.csvDataSource import CsvDataSource
-from finance.data.dataHandler import DataHandler
-from finance.execution.broker import Broker
-from finance.execution.feeModel import FeeModel
-from finance.execution.slippageModel import SlippageModel
-from finance.portfolio.portfolio import Portfolio
-from finance.reporting.reportWriter import ReportWriter
-from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
+# 重依赖（pandas/numpy 及回测各模块）在 run_backtest 内按需导入：--help 与参数错误无需加载它们
 
 
 def _build_arg_parser() -> argparse.ArgumentParser:
@@ -24,33 +17,170 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--symbol", required=True, help="标的代码（用于输出与记录）")
     p.add_argument("--csv-path", default=None, help="CSV 文件路径（优先级高于 data_dir）")
     p.add_argument("--data-dir", default=DEFAULT_CONFIG["data_dir"], help="数据目录（默认 data/raw）")
+    p.add_argument("--data-server", default=None, help="从常驻行情服务读取（Unix socket 路径），不再解析 CSV")
+    p.add_argument("--date-format", default=DEFAULT_CONFIG["date_format"], help="date 列格式（分钟/秒级数据可用 ISO8601）")
+    p.add_argument("--bar-freq", default=DEFAULT_CONFIG["bar_frequency"], help="CSV 的 bar 周期（如 1d/1m/5m），用于年化")
+    p.add_argument("--resample", default=None, help="回测前聚合到更高周期（如 5m/1h/1d/1w）")
+    p.add_argument("--actions-csv", default=None, help="除权除息事件 CSV（date,split_ratio,dividend）")
+    p.add_argument("--adjust", default="none", choices=["none", "forward", "backward"], help="复权方式：none/forward（前复权）/backward（后复权）")
+    p.add_argument("--session-minutes", type=float, default=DEFAULT_CONFIG["session_minutes"], help="日内周期下每日交易分钟数")
 
     p.add_argument("--output-root", default=DEFAULT_CONFIG["output_root"], help="输出根目录（默认 outputs）")
     p.add_argument("--run-id", default=None, help="本次运行ID（默认使用时间戳）")
+    p.add_argument("--results-db", default=None, help="同时写入 SQLite 结果库（可用 finance.cli.queryResults 查询）")
+    p.add_argument("--store-trades", action="store_true", help="写入结果库时包含逐笔成交")
+    p.add_argument("--no-report-dir", action="store_true", help="只写结果库，不生成 outputs/{run_id} 下的 CSV/JSON（需配合 --results-db）")
+    p.add_argument("--charts", action="store_true", help="输出 equity_chart.png（单次运行在本进程渲染；runBatch 中由后台进程渲染）")
+    p.add_argument("--journal", action="store_true", help="净值与成交边跑边写入输出目录的内存映射文件（长区间分钟线省内存，中途退出可读回）")
 
     p.add_argument("--initial-cash", type=float, default=DEFAULT_CONFIG["initial_cash"], help="初始资金")
     p.add_argument("--fast", type=int, default=DEFAULT_CONFIG["fast_window"], help="SMA fast window")
     p.add_argument("--slow", type=int, default=DEFAULT_CONFIG["slow_window"], help="SMA slow window")
+    p.add_argument("--trend-tf", default=None, help="高周期趋势过滤（如 1w）：只在已结束的高周期 close 高于其 SMA 时做多")
+    p.add_argument("--trend-window", type=int, default=10, help="高周期趋势 SMA 的窗口（高周期 bar 数）")
 
     p.add_argument("--fee-rate", type=float, default=DEFAULT_CONFIG["fee_rate"], help="手续费率（成交额比例）")
     p.add_argument("--fee-min", type=float, default=DEFAULT_CONFIG["fee_min"], help="最低手续费")
     p.add_argument("--slippage-bps", type=float, default=DEFAULT_CONFIG["slippage_bps"], help="滑点（bps）")
+    p.add_argument("--impact-coef", type=float, default=None, help="冲击成本系数：系数 × 波动率 × (数量/ADV)^0.5（默认关闭）")
+    p.add_argument("--max-participation", type=float, default=None, help="单根 bar 成交量参与上限（如 0.1），超出部分顺延")
+    p.add_argument("--adv-window", type=int, default=20, help="ADV/波动率的回看 bar 数")
 
     p.add_argument("--trading-days", type=int, default=DEFAULT_CONFIG["trading_days_per_year"], help="年交易日数")
     p.add_argument("--risk-free", type=float, default=DEFAULT_CONFIG["risk_free_rate"], help="无风险利率（年化）")
 
+    p.add_argument("--rolling-window", type=int, default=None, help="输出 rolling_metrics.csv（窗口为 bar 数）")
+    p.add_argument("--var-level", type=float, default=0.95, help="滚动 VaR/CVaR 置信度")
+    p.add_argument("--benchmark-csv", default=None, help="基准 CSV（用于滚动 beta，按时间向前对齐）")
+
+    p.add_argument("--bootstrap-paths", type=int, default=0, help="块自助/交易重排的 Monte Carlo 路径数（0=关闭）")
+    p.add_argument("--bootstrap-block", type=int, default=None, help="块自助的块长（默认 n^(1/3)）")
+    p.add_argument("--bootstrap-seed", type=int, default=0, help="Monte Carlo 随机种子")
+
     p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
 
     return p
 
 
 def main(argv: list[str] | None = None) -> int:
-    args = _build_arg_parser().parse_args(argv)
+    parser = _build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.no_report_dir and not args.results_db:
+        parser.error("--no-report-dir 需要同时指定 --results-db")
 
     logging.basicConfig(
         level=getattr(logging, str(args.log_level).upper(), logging.INFO),
         format="%(asctime)s %(levelname)s %(message)s",
     )
+    run_backtest(args)
+    return 0
+
+
+def _load_data(args: argparse.Namespace, csv_path: str, cache: Optional[Dict[Any, Any]]):
+    """读取行情，返回 (bars, arrays, bar_freq)；cache 非 None 时复用已加载结果。
+
+    原始数组与复权视图（AdjustedBars）按数据源缓存，同一数据源的不同复权方式/周期只需取视图再转换。
+    """
+
+    from finance.data.corporateActions import AdjustedBars, AdjustMode, load_actions
+    from finance.data.barArrays import equity_arrays
+    from finance.data.csvDataSource import CsvDataSource
+    from finance.data.dataServer import DataClient
+    from finance.data.resampler import resample_ohlcv
+
+    if args.adjust != AdjustMode.NONE.value and not args.actions_csv:
+        raise ValueError("--adjust 需要同时指定 --actions-csv")
+
+    source = (args.symbol, args.data_server or os.path.abspath(csv_path), args.date_format, args.actions_csv)
+    key = source + (args.adjust, args.resample, args.bar_freq)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    adjusted = cache.get(source) if cache is not None else None
+    if adjusted is None:
+        if args.data_server:
+            with DataClient(args.data_server) as client:
+                raw = client.fetch(args.symbol)
+        else:
+            raw = CsvDataSource(date_format=args.date_format).load_arrays(csv_path)
+        actions = load_actions(args.actions_csv, args.date_format) if args.actions_csv else None
+        adjusted = AdjustedBars(raw, actions)
+        if cache is not None:
+            cache[source] = adjusted
+
+    arrays = adjusted.view(args.adjust)
+    bar_freq = args.bar_freq
+    if args.resample:
+        arrays = resample_ohlcv(arrays, args.resample)
+        bar_freq = args.resample
+    loaded = (arrays.to_bars(args.symbol), arrays, bar_freq)
+    if cache is not None:
+        cache[key] = loaded
+    return loaded
+
+
+def _load_benchmark(args: argparse.Namespace, ts):
+    """读取基准收盘价并对齐到回测 bar 的 ts。
+
+    指定 --resample 时基准按同一周期聚合后再对齐：聚合后的 ts 是周期起点，而净值点取的是周期收盘，
+    直接用原始基准按起点对齐会滞后近一个周期。
+    """
+
+    from finance.backtest.rollingMetrics import align_to
+    from finance.data.csvDataSource import CsvDataSource
+    from finance.data.resampler import resample_ohlcv
+
+    bench = CsvDataSource(date_format=args.date_format).load_arrays(args.benchmark_csv)
+    if args.resample:
+        bench = resample_ohlcv(bench, args.resample)
+    return align_to(ts, bench.ts, bench.close)
+
+
+def run_backtest(
+    args: argparse.Namespace,
+    *,
+    data_cache: Optional[Dict[Any, Any]] = None,
+    chart_renderer=None,
+    results_store=None,
+) -> str:
+    """按解析后的参数执行一次回测并写出报告，返回输出目录（--no-report-dir 时为空字符串）。"""
+
+    return execute_backtest(args, data_cache=data_cache, chart_renderer=chart_renderer, results_store=results_store)[0]
+
+
+def execute_backtest(
+    args: argparse.Namespace,
+    *,
+    data_cache: Optional[Dict[Any, Any]] = None,
+    chart_renderer=None,
+    results_store=None,
+) -> Tuple[str, Any, Dict[str, Any]]:
+    """执行一次回测，返回 (输出目录, 带指标的 ResultBundle, run_config)。
+
+    - data_cache：批量运行时在多次回测间共享已加载的行情（bar 列表不会被引擎修改）
+    - chart_renderer：复用外部的渲染进程；为 None 且指定 --charts 时在本进程同步渲染
+    - results_store：批量运行共用的 BufferedResultsStore；其 db_path 与 --results-db 相同时结果写入其缓存，否则单独打开结果库写入
+    """
+
+    from finance.backtest.backtestEngine import BacktestEngine
+    from finance.backtest.bootstrap import bootstrap_equity, reshuffle_trades
+    from finance.backtest.metrics import Metrics, MetricsConfig
+    from finance.backtest.rollingMetrics import compute_rolling_curve
+    from finance.backtest.tradeAnalytics import analyze_trades
+    from finance.data.csvDataSource import CsvDataSource
+    from finance.data.dataHandler import DataHandler
+    from finance.execution.broker import Broker
+    from finance.execution.feeModel import FeeModel
+    from finance.execution.marketImpact import MarketImpactModel
+    from finance.execution.slippageModel import SlippageModel
+    from finance.portfolio.portfolio import Portfolio
+    from finance.portfolio.runJournal import RunJournal
+    from finance.reporting.chartRenderer import ChartRenderer
+    from finance.reporting.reportWriter import ReportWriter
+    from finance.reporting.resultsStore import SqliteResultsStore
+    from finance.strategy.multiTimeframeStrategy import TrendFilteredSmaStrategy
+    from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
     log = logging.getLogger("runBacktest")
 
     run_id = args.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -59,31 +189,68 @@ def main(argv: list[str] | None = None) -> int:
     if not csv_path:
         csv_path = os.path.join(args.data_dir, f"{args.symbol}.csv")
 
-    log.info("symbol=%s csv=%s", args.symbol, csv_path)
+    log.info("symbol=%s csv=%s", args.symbol, args.data_server or csv_path)
 
     # 1) data
-    ds = CsvDataSource()
-    load = ds.load(symbol=args.symbol, csv_path=csv_path)
-    data = DataHandler(_bars_by_symbol={args.symbol: load.bars})
-    log.info("loaded bars=%d range=%s..%s", len(load.bars), load.bars[0].dt.date(), load.bars[-1].dt.date())
+    bars, arrays, bar_freq = _load_data(args, csv_path, data_cache)
+    data = DataHandler(_bars_by_symbol={args.symbol: bars})
+    log.info("loaded bars=%d freq=%s range=%s..%s", len(bars), bar_freq, bars[0].dt, bars[-1].dt)
 
     # 2) components
-    strategy = SmaCrossStrategy(symbol=args.symbol, fast_window=args.fast, slow_window=args.slow)
+    if args.trend_tf:
+        strategy = TrendFilteredSmaStrategy(
+            symbol=args.symbol,
+            fast_window=args.fast,
+            slow_window=args.slow,
+            trend_timeframe=args.trend_tf,
+            trend_window=args.trend_window,
+            base_timeframe=bar_freq,
+        )
+    else:
+        strategy = SmaCrossStrategy(symbol=args.symbol, fast_window=args.fast, slow_window=args.slow)
+    impact_model = None
+    if args.impact_coef is not None or args.max_participation is not None:
+        impact_model = MarketImpactModel(
+            impact_coef=args.impact_coef or 0.0,
+            adv_window=args.adv_window,
+            vol_window=args.adv_window,
+            max_participation=args.max_participation,
+        )
     broker = Broker(
         fee_model=FeeModel(rate=args.fee_rate, min_fee=args.fee_min),
         slippage_model=SlippageModel(bps=args.slippage_bps),
+        impact_model=impact_model,
     )
-    portfolio = Portfolio(symbol=args.symbol, initial_cash=args.initial_cash)
+    journal = RunJournal.create(os.path.join(args.output_root, run_id)) if args.journal else None
+    portfolio = Portfolio(symbol=args.symbol, initial_cash=args.initial_cash, journal=journal)
 
     # 3) engine
     engine = BacktestEngine(symbol=args.symbol, data=data, strategy=strategy, broker=broker, portfolio=portfolio)
     result = engine.run()
 
     # 4) metrics
-    metrics = Metrics.compute(
-        result.equity_curve,
-        config=MetricsConfig(trading_days_per_year=args.trading_days, risk_free_rate=args.risk_free),
+    metrics_config = MetricsConfig(
+        trading_days_per_year=args.trading_days,
+        risk_free_rate=args.risk_free,
+        bar_frequency=bar_freq,
+        session_minutes=args.session_minutes,
     )
+    metrics = Metrics.compute(result.equity_curve, config=metrics_config)
+    analytics = analyze_trades(result.trades, bars={args.symbol: arrays})
+    metrics["trade_stats"] = analytics.stats
+    if args.bootstrap_paths > 0 and len(result.equity_curve) > 1:
+        metrics["bootstrap"] = bootstrap_equity(
+            equity_arrays(result.equity_curve)[1],
+            n_paths=args.bootstrap_paths,
+            block_len=args.bootstrap_block,
+            seed=args.bootstrap_seed,
+            config=metrics_config,
+        )
+        metrics["trade_monte_carlo"] = reshuffle_trades(
+            analytics.round_trips["return"].to_numpy(),
+            n_paths=args.bootstrap_paths,
+            seed=args.bootstrap_seed,
+        )
     result = type(result)(
         symbol=result.symbol,
         equity_curve=result.equity_curve,
@@ -93,28 +260,69 @@ def main(argv: list[str] | None = None) -> int:
         metrics=metrics,
     )
 
+    extra_tables = {"round_trips": analytics.round_trips}
+    if args.rolling_window:
+        benchmark = None
+        if args.benchmark_csv:
+            benchmark = _load_benchmark(args, arrays.ts)
+        extra_tables["rolling_metrics"] = compute_rolling_curve(
+            result.equity_curve,
+            args.rolling_window,
+            benchmark=benchmark,
+            var_level=args.var_level,
+            config=metrics_config,
+        )
+
     # 5) report
-    writer = ReportWriter(output_root=args.output_root)
-    out_dir = writer.write(
-        result,
-        run_id=run_id,
-        run_config={
-            "symbol": args.symbol,
-            "csv_path": csv_path,
-            "initial_cash": args.initial_cash,
-            "fast": args.fast,
-            "slow": args.slow,
-            "fee_rate": args.fee_rate,
-            "fee_min": args.fee_min,
-            "slippage_bps": args.slippage_bps,
-            "trading_days": args.trading_days,
-            "risk_free": args.risk_free,
-        },
-    )
+    run_config = {
+        "symbol": args.symbol,
+        "csv_path": csv_path,
+        "data_server": args.data_server,
+        "actions_csv": args.actions_csv,
+        "adjust": args.adjust,
+        "initial_cash": args.initial_cash,
+        "fast": args.fast,
+        "slow": args.slow,
+        "trend_tf": args.trend_tf,
+        "trend_window": args.trend_window,
+        "fee_rate": args.fee_rate,
+        "fee_min": args.fee_min,
+        "slippage_bps": args.slippage_bps,
+        "impact_coef": args.impact_coef,
+        "max_participation": args.max_participation,
+        "trading_days": args.trading_days,
+        "risk_free": args.risk_free,
+        "bar_freq": bar_freq,
+        "session_minutes": args.session_minutes,
+        "rolling_window": args.rolling_window,
+        "benchmark_csv": args.benchmark_csv,
+        "journal": args.journal,
+    }
+    write_report = not args.no_report_dir
+    own_charts = write_report and bool(args.charts) and chart_renderer is None
+    # 单次运行没有可与绘图重叠的工作，直接在本进程渲染；批量运行由调用方传入进程池渲染器
+    charts = ChartRenderer(max_workers=0) if own_charts else (chart_renderer if args.charts else None)
+    out_dir = ""
+    try:
+        if write_report:
+            writer = ReportWriter(output_root=args.output_root, chart_renderer=charts)
+            out_dir = writer.write(result, run_id=run_id, run_config=run_config, extra_tables=extra_tables)
+        if args.results_db:
+            if results_store is not None and results_store.db_path == args.results_db:
+                results_store.add(result, run_id=run_id, run_config=run_config, include_trades=args.store_trades)
+            else:
+                with SqliteResultsStore(args.results_db) as store:
+                    store.write(result, run_id=run_id, run_config=run_config, include_trades=args.store_trades)
+    finally:
+        if own_charts:
+            charts.close()
+        if journal is not None:
+            journal.close()
 
     log.info(
-        "done out=%s trades=%d final_equity=%.2f cumret=%.4f maxdd=%.4f sharpe=%.4f dropped_last_bar=%d",
-        out_dir,
+        "done run_id=%s out=%s trades=%d final_equity=%.2f cumret=%.4f maxdd=%.4f sharpe=%.4f dropped_last_bar=%d",
+        run_id,
+        out_dir or "-",
         result.run_summary.trades,
         result.run_summary.final_equity,
         metrics.get("cumulative_return", 0.0),
@@ -123,7 +331,7 @@ def main(argv: list[str] | None = None) -> int:
         result.run_summary.dropped_signals_last_bar,
     )
 
-    return 0
+    return out_dir, result, run_config
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from finance.cli.runBacktest import _build_arg_parser as _backtest_arg_parser
+from finance.cli.runBacktest import run_backtest
+from finance.config.defaultConfig import DEFAULT_CONFIG
+
+SUMMARY_COLUMNS = ["job", "run_id", "symbol", "status", "seconds", "out_dir", "error"]
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="批量回测：在同一个进程内依次执行任务文件中的全部 runBacktest 配置")
+
+    p.add_argument("jobs", help="任务文件：.json（列表，或含 defaults/jobs 的对象）、.jsonl 或 .csv（表头为参数名）")
+    p.add_argument("--output-root", default=DEFAULT_CONFIG["output_root"], help="输出根目录（默认 outputs）")
+    p.add_argument("--batch-id", default=None, help="批次ID（默认使用时间戳；任务未指定 run_id 时为 {batch_id}_{序号}）")
+    p.add_argument("--fail-fast", action="store_true", help="遇到失败的任务立即停止（默认记录错误后继续）")
+
+    p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
+    return p
+
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """读取任务文件，返回每个任务的参数字典（键为 runBacktest 的参数名，- 与 _ 均可）。
+
+    - .json：任务列表，或 {"defaults": {...}, "jobs": [...]}（defaults 合并到每个任务）
+    - .jsonl：每行一个任务
+    - .csv：表头为参数名，空单元格表示使用默认值
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext == ".csv":
+            return [{k: v for k, v in row.items() if k and v not in (None, "")} for row in csv.DictReader(f)]
+        if ext == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        doc = json.load(f)
+
+    if isinstance(doc, dict):
+        defaults = doc.get("defaults", {})
+        return [{**defaults, **job} for job in doc.get("jobs", [])]
+    if isinstance(doc, list):
+        return list(doc)
+    raise ValueError(f"任务文件格式不支持: {path}")
+
+
+def job_argv(job: Dict[str, Any]) -> List[str]:
+    """参数字典 -> runBacktest 命令行参数（True 为开关，False/None 省略）。"""
+
+    argv: List[str] = []
+    for key, value in job.items():
+        flag = "--" + str(key).lstrip("-").replace("_", "-")
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            # CSV 中的开关列
+            value = value.lower() == "true"
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(flag)
+        else:
+            argv.extend([flag, str(value)])
+    return argv
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, str(args.log_level).upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    log = logging.getLogger("runBatch")
+
+    batch_id = args.batch_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    jobs = load_jobs(args.jobs)
+    parser = _backtest_arg_parser()
+    log.info("batch=%s jobs=%d file=%s", batch_id, len(jobs), args.jobs)
+
+    # 先整体校验参数，避免跑到一半才发现某个任务写错
+    parsed = []
+    for i, job in enumerate(jobs):
+        try:
+            job_args = parser.parse_args(["--output-root", args.output_root] + job_argv(job))
+        except SystemExit as e:
+            raise ValueError(f"任务 {i} 参数无效: {job}") from e
+        if job_args.no_report_dir and not job_args.results_db:
+            raise ValueError(f"任务 {i} 指定了 no_report_dir 但没有 results_db: {job}")
+        if not job_args.run_id:
+            job_args.run_id = f"{batch_id}_{i:04d}"
+        parsed.append(job_args)
+
+    data_cache: Dict[Any, Any] = {}
+    charts = None
+    if any(a.charts for a in parsed):
+        from finance.reporting.chartRenderer import ChartRenderer
+
+        charts = ChartRenderer(max_workers=1)
+
+    from finance.reporting.resultsStore import BufferedResultsStore
+
+    # 同一结果库的任务共用一个写入端：结果先缓存，批量提交，而不是每个任务各开一次连接和事务
+    stores = {path: BufferedResultsStore(path) for path in dict.fromkeys(a.results_db for a in parsed if a.results_db)}
+
+    rows = []
+    try:
+        for i, job_args in enumerate(parsed):
+            t0 = time.perf_counter()
+            row = {"job": i, "run_id": job_args.run_id, "symbol": job_args.symbol, "status": "ok", "out_dir": "", "error": ""}
+            try:
+                row["out_dir"] = run_backtest(
+                    job_args,
+                    data_cache=data_cache,
+                    chart_renderer=charts,
+                    results_store=stores.get(job_args.results_db),
+                )
+            except Exception as e:
+                log.exception("job %d failed run_id=%s", i, job_args.run_id)
+                row["status"] = "failed"
+                row["error"] = f"{type(e).__name__}: {e}"
+            rows.append({**row, "seconds": round(time.perf_counter() - t0, 4)})
+            if args.fail_fast and row["status"] != "ok":
+                break
+    finally:
+        if charts is not None:
+            charts.close()
+        for store in stores.values():
+            store.close()
+
+    os.makedirs(args.output_root, exist_ok=True)
+    summary_path = os.path.join(args.output_root, f"batch_{batch_id}.csv")
+    with open(summary_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    failed = sum(1 for r in rows if r["status"] != "ok")
+    log.info("batch done ok=%d failed=%d datasets=%d summary=%s", len(rows) - failed, failed, len(data_cache), summary_path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
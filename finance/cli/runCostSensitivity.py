@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+from datetime import datetime
+
+from finance.config.defaultConfig import DEFAULT_CONFIG
+
+
+def _floats(text: str) -> list[float]:
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def _nan_to_none(v: object) -> object:
+    return None if isinstance(v, float) and math.isnan(v) else v
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="固定信号的成本敏感性分析：SMA Cross × (fee_rate, min_fee, slippage_bps) 网格")
+
+    p.add_argument("--symbol", required=True, help="标的代码（用于输出与记录）")
+    p.add_argument("--csv-path", default=None, help="CSV 文件路径（优先级高于 data_dir）")
+    p.add_argument("--data-dir", default=DEFAULT_CONFIG["data_dir"], help="数据目录（默认 data/raw）")
+    p.add_argument("--date-format", default=DEFAULT_CONFIG["date_format"], help="date 列格式")
+    p.add_argument("--bar-freq", default=DEFAULT_CONFIG["bar_frequency"], help="CSV 的 bar 周期（如 1d/1m/5m），用于年化")
+    p.add_argument("--resample", default=None, help="分析前聚合到更高周期（如 5m/1h/1d/1w）")
+
+    p.add_argument("--output-root", default=DEFAULT_CONFIG["output_root"], help="输出根目录（默认 outputs）")
+    p.add_argument("--run-id", default=None, help="本次运行ID（默认使用时间戳）")
+
+    p.add_argument("--initial-cash", type=float, default=DEFAULT_CONFIG["initial_cash"], help="初始资金")
+    p.add_argument("--fast", type=int, default=DEFAULT_CONFIG["fast_window"], help="SMA fast window")
+    p.add_argument("--slow", type=int, default=DEFAULT_CONFIG["slow_window"], help="SMA slow window")
+
+    p.add_argument("--fee-rates", default="0,0.0001,0.0003,0.0005,0.001", help="手续费率网格（逗号分隔）")
+    p.add_argument("--fee-mins", default="0", help="最低手续费网格（逗号分隔）")
+    p.add_argument("--slippage-bps", default="0,2,5,10,20", help="滑点 bps 网格（逗号分隔）")
+
+    p.add_argument("--trading-days", type=int, default=DEFAULT_CONFIG["trading_days_per_year"], help="年交易日数")
+    p.add_argument("--risk-free", type=float, default=DEFAULT_CONFIG["risk_free_rate"], help="无风险利率（年化）")
+    p.add_argument("--session-minutes", type=float, default=DEFAULT_CONFIG["session_minutes"], help="日内周期下每日交易分钟数")
+    p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
+
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    from finance.backtest.costSensitivity import run_cost_sensitivity
+    from finance.backtest.metrics import MetricsConfig
+    from finance.data.csvDataSource import CsvDataSource
+    from finance.data.resampler import resample_ohlcv
+    from finance.strategy.smaCrossStrategy import sma_cross_targets
+
+    logging.basicConfig(
+        level=getattr(logging, str(args.log_level).upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    log = logging.getLogger("runCostSensitivity")
+
+    run_id = args.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_path = args.csv_path or os.path.join(args.data_dir, f"{args.symbol}.csv")
+
+    bars = CsvDataSource(date_format=args.date_format).load_arrays(csv_path)
+    bar_freq = args.bar_freq
+    if args.resample:
+        bars = resample_ohlcv(bars, args.resample)
+        bar_freq = args.resample
+    targets = sma_cross_targets(bars.close, args.fast, args.slow)
+
+    result = run_cost_sensitivity(
+        bars,
+        targets,
+        initial_cash=args.initial_cash,
+        fee_rates=_floats(args.fee_rates),
+        min_fees=_floats(args.fee_mins),
+        slippage_bps=_floats(args.slippage_bps),
+        metrics_config=MetricsConfig(
+            trading_days_per_year=args.trading_days,
+            risk_free_rate=args.risk_free,
+            bar_frequency=bar_freq,
+            session_minutes=args.session_minutes,
+        ),
+    )
+
+    out_dir = os.path.join(args.output_root, run_id)
+    os.makedirs(out_dir, exist_ok=True)
+    result.table.to_csv(os.path.join(out_dir, "cost_sensitivity.csv"), index=False)
+    with open(os.path.join(out_dir, "break_even.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "symbol": args.symbol,
+                "fast": args.fast,
+                "slow": args.slow,
+                "bar_freq": bar_freq,
+                "session_minutes": args.session_minutes,
+                "gross_break_even_bps": _nan_to_none(result.gross_break_even_bps),
+                "by_min_fee": [{k: _nan_to_none(v) for k, v in row.items()} for row in result.break_even.to_dict(orient="records")],
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    log.info(
+        "done out=%s grid=%d bars=%d gross_break_even_bps=%.2f",
+        out_dir,
+        len(result.table),
+        len(bars),
+        result.gross_break_even_bps,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import os
+import signal
+
+from finance.config.defaultConfig import DEFAULT_CONFIG
+from finance.data.dataServer import DataServer
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="常驻行情服务：CSV 解析一次，多个回测进程共享内存读取")
+
+    p.add_argument("--socket", default=DEFAULT_CONFIG["data_server_socket"], help="Unix socket 路径")
+    p.add_argument("--data-dir", default=DEFAULT_CONFIG["data_dir"], help="预加载目录下全部 *.csv（文件名即标的）；客户端 load 也只能读取该目录下的文件")
+    p.add_argument("--csv", action="append", default=[], metavar="SYMBOL=PATH", help="额外加载单个 CSV（可重复）")
+    p.add_argument("--date-format", default=DEFAULT_CONFIG["date_format"], help="date 列格式（分钟/秒级数据可用 ISO8601）")
+    p.add_argument("--store-dir", default=None, help="共享数据文件目录（默认 /dev/shm）")
+
+    p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, str(args.log_level).upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    log = logging.getLogger("runDataServer")
+
+    sources = {}
+    if args.data_dir and os.path.isdir(args.data_dir):
+        for path in sorted(glob.glob(os.path.join(args.data_dir, "*.csv"))):
+            sources[os.path.splitext(os.path.basename(path))[0]] = path
+    for item in args.csv:
+        symbol, sep, path = item.partition("=")
+        if not sep or not symbol or not path:
+            raise ValueError(f"--csv 格式应为 SYMBOL=PATH: {item}")
+        sources[symbol] = path
+
+    server = DataServer(args.socket, store_dir=args.store_dir, data_dir=args.data_dir if args.data_dir and os.path.isdir(args.data_dir) else None)
+    for symbol, path in sources.items():
+        entry = server.load_csv(symbol, path, date_format=args.date_format)
+        log.info("loaded symbol=%s rows=%d csv=%s", symbol, entry.rows, path)
+
+    signal.signal(signal.SIGTERM, lambda *_: server.shutdown())
+    log.info("serving symbols=%d socket=%s store=%s", len(sources), args.socket, server.store_dir)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+    log.info("stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
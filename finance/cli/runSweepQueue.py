@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from finance.backtest.sweepQueue import Heartbeat, Lease, SweepQueue, default_worker_id
+from finance.cli.runBatch import job_argv, load_jobs
+from finance.config.defaultConfig import DEFAULT_CONFIG
+
+RESULT_METRICS = ["bars", "cumulative_return", "annualized_return", "max_drawdown", "sharpe"]
+MERGE_COLUMNS = ["task_id", "run_id", "symbol", "status", "worker", "seconds", *RESULT_METRICS, "trades", "final_equity", "out_dir", "error", "params"]
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="多机参数扫描：共享目录任务队列（submit / work / status / merge）")
+    p.add_argument("--queue", required=True, help="队列目录（各主机可见的共享目录）")
+    p.add_argument("--lease-ttl", type=float, default=120.0, help="租约超时秒数：超过该时间未心跳的任务重新入队")
+    p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("submit", help="把任务文件（格式同 runBatch）写入队列")
+    s.add_argument("jobs", help="任务文件：.json / .jsonl / .csv")
+    s.add_argument("--output-root", default=DEFAULT_CONFIG["output_root"], help="任务未指定 output_root 时的输出根目录（应为共享目录）")
+    s.add_argument("--batch-id", default=None, help="批次ID（默认使用时间戳；task_id 与默认 run_id 为 {batch_id}_{序号}）")
+
+    w = sub.add_parser("work", help="领取并执行任务，直到队列为空")
+    w.add_argument("--worker-id", default=None, help="worker 标识（默认 主机名-pid）")
+    w.add_argument("--heartbeat", type=float, default=None, help="心跳间隔秒数（默认 lease_ttl/4）")
+    w.add_argument("--poll", type=float, default=2.0, help="其他 worker 仍持有租约时的轮询间隔秒数")
+    w.add_argument("--wait", action="store_true", help="队列为空后继续等待新任务（默认所有任务完成后退出）")
+    w.add_argument("--max-tasks", type=int, default=None, help="最多执行的任务数")
+    w.add_argument("--no-report-dir", action="store_true", help="不写每个任务的报告目录，只保留队列中的结果（配合 merge --results-db 入库）")
+
+    sub.add_parser("status", help="输出 pending/leased/ok/failed 计数")
+
+    m = sub.add_parser("merge", help="合并全部结果为一个 CSV")
+    m.add_argument("--out", default=None, help="输出路径（默认 {queue}/merged.csv）")
+    m.add_argument("--results-db", default=None, help="同时把成功任务的 RunSummary/指标/参数批量写入 SQLite 结果库")
+    return p
+
+
+def _compact_result(result) -> Dict[str, Any]:
+    """队列结果：CSV 用的主要指标，外加 merge 入库所需的完整 RunSummary 与指标。"""
+
+    metrics = result.metrics or {}
+    summary = asdict(result.run_summary)
+    return {
+        **{k: metrics.get(k) for k in RESULT_METRICS},
+        "trades": summary["trades"],
+        "final_equity": summary["final_equity"],
+        "run_summary": summary,
+        "metrics": metrics,
+    }
+
+
+def execute_task(
+    lease: Lease,
+    *,
+    heartbeat_interval: float,
+    data_cache: Dict[Any, Any],
+    log: logging.Logger,
+    no_report_dir: bool = False,
+) -> Dict[str, Any]:
+    """在心跳保护下执行一个 runBacktest 任务，写出精简结果并返回。"""
+
+    from finance.cli.runBacktest import _build_arg_parser as _backtest_arg_parser
+    from finance.cli.runBacktest import execute_backtest
+
+    t0 = time.perf_counter()
+    result: Dict[str, Any] = {"status": "ok", "params": lease.task, "error": ""}
+    with Heartbeat(lease, heartbeat_interval) as hb:
+        try:
+            args = _backtest_arg_parser().parse_args(job_argv(lease.task))
+            args.no_report_dir = args.no_report_dir or no_report_dir
+            result.update(run_id=args.run_id, symbol=args.symbol)
+            out_dir, bundle, run_config = execute_backtest(args, data_cache=data_cache)
+            result.update(out_dir=out_dir, run_config=run_config, **_compact_result(bundle))
+        except (Exception, SystemExit) as e:
+            log.exception("task %s failed", lease.task_id)
+            result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    if hb.lost:
+        log.warning("task %s lease lost during run (requeued elsewhere); writing result anyway", lease.task_id)
+    result["seconds"] = round(time.perf_counter() - t0, 4)
+    lease.complete(result)
+    return result
+
+
+def run_worker(
+    queue: SweepQueue,
+    *,
+    worker_id: str,
+    heartbeat_interval: float,
+    poll_interval: float = 2.0,
+    wait: bool = False,
+    max_tasks: Optional[int] = None,
+    no_report_dir: bool = False,
+    log: Optional[logging.Logger] = None,
+) -> List[Dict[str, Any]]:
+    """循环领取任务；同一 worker 内共享行情缓存。返回本 worker 写出的结果。"""
+
+    log = log or logging.getLogger("runSweepQueue")
+    data_cache: Dict[Any, Any] = {}
+    done: List[Dict[str, Any]] = []
+    while max_tasks is None or len(done) < max_tasks:
+        lease = queue.claim(worker_id)
+        if lease is None:
+            counts = queue.status()
+            if not wait and counts["pending"] == 0 and counts["leased"] == 0:
+                break
+            # 其他 worker 持有的租约可能过期重新入队，等待后再试
+            time.sleep(poll_interval)
+            continue
+        log.info("worker=%s claimed %s", worker_id, lease.task_id)
+        done.append(execute_task(lease, heartbeat_interval=heartbeat_interval, data_cache=data_cache, log=log, no_report_dir=no_report_dir))
+    return done
+
+
+def merge_results(queue: SweepQueue, out_path: str, results_db: Optional[str] = None) -> int:
+    """合并全部结果为一个 CSV；指定 results_db 时把成功任务经同一个缓冲写入端批量写入结果库。"""
+
+    rows = queue.results()
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MERGE_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, "params": json.dumps(row.get("params", {}), ensure_ascii=False, sort_keys=True)})
+    if results_db:
+        _store_results(rows, results_db)
+    return len(rows)
+
+
+def _store_results(rows: List[Dict[str, Any]], db_path: str) -> int:
+    from finance.backtest.backtestEngine import ResultBundle
+    from finance.core.coreTypes import RunSummary
+    from finance.reporting.resultsStore import BufferedResultsStore
+
+    with BufferedResultsStore(db_path) as store:
+        for row in rows:
+            if row.get("status") != "ok" or "run_summary" not in row:
+                continue
+            summary = RunSummary(**row["run_summary"])
+            bundle = ResultBundle(
+                symbol=summary.symbol,
+                equity_curve=[],
+                trades=[],
+                dropped_signals=[],
+                run_summary=summary,
+                metrics=row.get("metrics"),
+            )
+            store.add(bundle, run_id=row["run_id"], run_config=row.get("run_config"))
+    return store.written
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, str(args.log_level).upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    log = logging.getLogger("runSweepQueue")
+    queue = SweepQueue(args.queue, lease_ttl=args.lease_ttl)
+
+    if args.command == "submit":
+        batch_id = args.batch_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        tasks = []
+        for i, job in enumerate(load_jobs(args.jobs)):
+            job = {str(k).lstrip("-").replace("-", "_"): v for k, v in job.items()}
+            job.setdefault("output_root", args.output_root)
+            job.setdefault("run_id", f"{batch_id}_{i:04d}")
+            tasks.append(job)
+        ids = queue.submit(tasks, batch_id=batch_id)
+        log.info("submitted batch=%s tasks=%d queue=%s", batch_id, len(ids), args.queue)
+        return 0
+
+    if args.command == "work":
+        worker_id = args.worker_id or default_worker_id()
+        heartbeat = args.heartbeat if args.heartbeat is not None else args.lease_ttl / 4.0
+        if heartbeat >= args.lease_ttl:
+            raise ValueError("--heartbeat 必须小于 --lease-ttl")
+        done = run_worker(
+            queue,
+            worker_id=worker_id,
+            heartbeat_interval=heartbeat,
+            poll_interval=args.poll,
+            wait=args.wait,
+            max_tasks=args.max_tasks,
+            no_report_dir=args.no_report_dir,
+            log=log,
+        )
+        failed = sum(1 for r in done if r["status"] != "ok")
+        log.info("worker=%s done ok=%d failed=%d", worker_id, len(done) - failed, failed)
+        return 1 if failed else 0
+
+    if args.command == "status":
+        print(json.dumps(queue.status(), ensure_ascii=False))
+        return 0
+
+    out_path = args.out or os.path.join(args.queue, "merged.csv")
+    n = merge_results(queue, out_path, args.results_db)
+    log.info("merged results=%d out=%s db=%s status=%s", n, out_path, args.results_db or "-", queue.status())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
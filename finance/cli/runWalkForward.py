@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from datetime import datetime
+
+from finance.cli.optimizeSma import _int_values
+from finance.config.defaultConfig import DEFAULT_CONFIG
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SMA Cross walk-forward：滚动/锚定窗口训练 + 样本外评估")
+
+    p.add_argument("--symbol", required=True, help="标的代码（用于输出与记录）")
+    p.add_argument("--csv-path", default=None, help="CSV 文件路径（优先级高于 data_dir）")
+    p.add_argument("--data-dir", default=DEFAULT_CONFIG["data_dir"], help="数据目录（默认 data/raw）")
+    p.add_argument("--date-format", default=DEFAULT_CONFIG["date_format"], help="date 列格式")
+    p.add_argument("--bar-freq", default=DEFAULT_CONFIG["bar_frequency"], help="bar 周期（用于年化）")
+
+    p.add_argument("--output-root", default=DEFAULT_CONFIG["output_root"], help="输出根目录（默认 outputs）")
+    p.add_argument("--run-id", default=None, help="本次运行ID（默认使用时间戳）")
+
+    p.add_argument("--train-bars", type=int, default=500, help="训练窗口长度（bar 数）")
+    p.add_argument("--test-bars", type=int, default=120, help="测试窗口长度（bar 数）")
+    p.add_argument("--anchored", action="store_true", help="训练窗口从首根 bar 开始逐步加长（默认滚动）")
+    p.add_argument("--fast-range", default="5:30:5", help="fast 取值：逗号分隔或 start:stop:step")
+    p.add_argument("--slow-range", default="20:120:10", help="slow 取值：逗号分隔或 start:stop:step")
+    p.add_argument("--metric", default="sharpe", help="训练窗口的选优指标（越大越好）")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行进程数（0=当前进程串行）")
+
+    p.add_argument("--initial-cash", type=float, default=DEFAULT_CONFIG["initial_cash"], help="初始资金")
+    p.add_argument("--fee-rate", type=float, default=DEFAULT_CONFIG["fee_rate"], help="手续费率（成交额比例）")
+    p.add_argument("--fee-min", type=float, default=DEFAULT_CONFIG["fee_min"], help="最低手续费")
+    p.add_argument("--slippage-bps", type=float, default=DEFAULT_CONFIG["slippage_bps"], help="滑点（bps）")
+    p.add_argument("--trading-days", type=int, default=DEFAULT_CONFIG["trading_days_per_year"], help="年交易日数")
+    p.add_argument("--risk-free", type=float, default=DEFAULT_CONFIG["risk_free_rate"], help="无风险利率（年化）")
+
+    p.add_argument("--log-level", default="INFO", help="日志级别：DEBUG/INFO/WARNING/ERROR")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+
+    from finance.backtest.metrics import MetricsConfig
+    from finance.backtest.optimizer import sma_grid
+    from finance.backtest.walkForward import run_walk_forward
+    from finance.data.csvDataSource import CsvDataSource
+    from finance.execution.feeModel import FeeModel
+    from finance.execution.slippageModel import SlippageModel
+
+    logging.basicConfig(
+        level=getattr(logging, str(args.log_level).upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    log = logging.getLogger("runWalkForward")
+
+    run_id = args.run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_path = args.csv_path or os.path.join(args.data_dir, f"{args.symbol}.csv")
+
+    bars = CsvDataSource(date_format=args.date_format).load_arrays(csv_path)
+    candidates = sma_grid(_int_values(args.fast_range), _int_values(args.slow_range))
+    log.info("symbol=%s bars=%d candidates=%d", args.symbol, len(bars), len(candidates))
+
+    result = run_walk_forward(
+        bars,
+        candidates,
+        train_bars=args.train_bars,
+        test_bars=args.test_bars,
+        anchored=args.anchored,
+        initial_cash=args.initial_cash,
+        fee_model=FeeModel(rate=args.fee_rate, min_fee=args.fee_min),
+        slippage_model=SlippageModel(bps=args.slippage_bps),
+        metrics_config=MetricsConfig(
+            trading_days_per_year=args.trading_days,
+            risk_free_rate=args.risk_free,
+            bar_frequency=args.bar_freq,
+        ),
+        metric=args.metric,
+        max_workers=args.workers,
+    )
+
+    out_dir = os.path.join(args.output_root, run_id)
+    os.makedirs(out_dir, exist_ok=True)
+    result.windows.to_csv(os.path.join(out_dir, "walk_forward_windows.csv"), index=False)
+    result.oos_equity.to_csv(os.path.join(out_dir, "oos_equity_curve.csv"), index=False)
+    with open(os.path.join(out_dir, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump({"symbol": args.symbol, "anchored": args.anchored, "metrics": result.oos_metrics}, f, ensure_ascii=False, indent=2)
+
+    log.info(
+        "done out=%s windows=%d oos_cumret=%.4f oos_maxdd=%.4f oos_sharpe=%.4f",
+        out_dir,
+        result.oos_metrics["windows"],
+        result.oos_metrics["cumulative_return"],
+        result.oos_metrics["max_drawdown"],
+        result.oos_metrics["sharpe"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
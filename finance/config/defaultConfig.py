@@ -11,4 +11,8 @@ DEFAULT_CONFIG = {
     "slippage_bps": 0.0,
     "trading_days_per_year": 252,
     "risk_free_rate": 0.0,
+    "date_format": "%Y-%m-%d",
+    "bar_frequency": "1d",
+    "session_minutes": 240.0,
+    "data_server_socket": "/tmp/finance-data.sock",
 }
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import ClassVar, Optional
+
+from finance.core.coreTypes import (
+    Bar,
+    EquityPoint,
+    Fill,
+    Order,
+    OrderType,
+    Side,
+    Signal,
+    TradeRecord,
+    ns_to_datetime,
+)
+
+# 逐 bar 路径上的紧凑值类型：__slots__（无 __dict__）、非 frozen（构造不走 object.__setattr__），
+# 时间存为 int64 epoch ns。字段与 coreTypes 中的同名类型一一对应（dt -> ts），
+# dt 属性按需换算，因此读取 bar.dt / fill.dt 的既有代码不用改；按约定构造后不要修改字段。
+# 报表侧优先读 ts 做向量化换算，需要标准类型时用 to_standard()。
+
+
+class _TsStamped:
+    __slots__ = ()
+
+    _standard: ClassVar[type]
+
+    @property
+    def dt(self) -> datetime:
+        return ns_to_datetime(self.ts)
+
+    def to_standard(self):
+        """转换为 coreTypes 中对应的 frozen dataclass（dt 为 datetime）。"""
+
+        kw = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "ts"}
+        return self._standard(dt=self.dt, **kw)
+
+
+@dataclass(slots=True)
+class CompactBar(_TsStamped):
+    _standard: ClassVar[type] = Bar
+
+    ts: int
+    symbol: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+@dataclass(slots=True)
+class CompactSignal(_TsStamped):
+    _standard: ClassVar[type] = Signal
+
+    ts: int
+    symbol: str
+    target_position: float
+    reason: str = ""
+
+
+@dataclass(slots=True)
+class CompactOrder(_TsStamped):
+    _standard: ClassVar[type] = Order
+
+    id: str
+    ts: int
+    symbol: str
+    side: Side
+    quantity: int
+    order_type: OrderType = OrderType.MARKET
+    reason: str = ""
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+
+
+@dataclass(slots=True)
+class CompactFill(_TsStamped):
+    _standard: ClassVar[type] = Fill
+
+    order_id: str
+    ts: int
+    symbol: str
+    side: Side
+    quantity: int
+    price: float
+    fee: float
+    slippage: float
+
+    @property
+    def notional(self) -> float:
+        return float(self.quantity) * float(self.price)
+
+    @property
+    def total_cost(self) -> float:
+        return float(self.fee) + float(self.slippage)
+
+
+@dataclass(slots=True)
+class CompactEquityPoint(_TsStamped):
+    _standard: ClassVar[type] = EquityPoint
+
+    ts: int
+    cash: float
+    position_qty: int
+    close: float
+    position_value: float
+    total_equity: float
+
+
+@dataclass(slots=True)
+class CompactTradeRecord(_TsStamped):
+    _standard: ClassVar[type] = TradeRecord
+
+    ts: int
+    symbol: str
+    side: Side
+    quantity: int
+    price: float
+    fee: float
+    slippage: float
+    order_id: str
+    reason: str = ""
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def datetime_to_ns(dt: datetime) -> int:
+    """naive datetime -> int64 epoch ns（按墙上时间处理，不做时区换算）。"""
+
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def ns_to_datetime(ts: int) -> datetime:
+    """int64 epoch ns -> naive datetime（精度截断到微秒）。"""
+
+    return _EPOCH + timedelta(microseconds=int(ts) // 1_000)
+
 
 class Side(str, Enum):
     BUY = "BUY"
@@ -13,10 +28,23 @@ class Side(str, Enum):
 
 class OrderType(str, Enum):
     MARKET = "MARKET"
+    LIMIT = "LIMIT"
+    STOP = "STOP"
+    STOP_LIMIT = "STOP_LIMIT"
+
+
+class _DtStamped:
+    """以 datetime 存时间的类型同时提供 ts（int64 epoch ns），与 compactTypes 中的紧凑类型接口一致。"""
+
+    __slots__ = ()
+
+    @property
+    def ts(self) -> int:
+        return datetime_to_ns(self.dt)
 
 
 @dataclass(frozen=True)
-class Bar:
+class Bar(_DtStamped):
     dt: datetime
     symbol: str
     open: float
@@ -27,7 +55,7 @@ class Bar:
 
 
 @dataclass(frozen=True)
-class Signal:
+class Signal(_DtStamped):
     """策略输出：目标仓位（MVP：0/1）。"""
 
     dt: datetime
@@ -37,7 +65,7 @@ class Signal:
 
 
 @dataclass(frozen=True)
-class Order:
+class Order(_DtStamped):
     id: str
     dt: datetime
     symbol: str
@@ -45,10 +73,12 @@ class Order:
     quantity: int
     order_type: OrderType = OrderType.MARKET
     reason: str = ""
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
 
 
 @dataclass(frozen=True)
-class Fill:
+class Fill(_DtStamped):
     order_id: str
     dt: datetime
     symbol: str
@@ -64,7 +94,7 @@ class Fill:
 
     @property
     def total_cost(self) -> float:
-        """买入：成本（含费用/滑点）为正；卖出：成本为正但现金流方向由 Portfolio 决定。"""
+        """交易成本（手续费 + 滑点）统计值；滑点已体现在 price 中，现金侧只扣 fee。"""
 
         return float(self.fee) + float(self.slippage)
 
@@ -112,7 +142,7 @@ class Position:
 
 
 @dataclass(frozen=True)
-class EquityPoint:
+class EquityPoint(_DtStamped):
     dt: datetime
     cash: float
     position_qty: int
@@ -122,7 +152,18 @@ class EquityPoint:
 
 
 @dataclass(frozen=True)
-class TradeRecord:
+class BookEquityPoint:
+    """多标的组合的盯市点（持仓明细在 MultiAssetPortfolio 的数组里）。"""
+
+    dt: datetime
+    cash: float
+    position_value: float
+    total_equity: float
+    holdings: int
+
+
+@dataclass(frozen=True)
+class TradeRecord(_DtStamped):
     dt: datetime
     symbol: str
     side: Side
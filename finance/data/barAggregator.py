@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from finance.core.compactTypes import CompactBar
+from finance.core.coreTypes import Bar
+from finance.data.resampler import Timeframe, parse_timeframe
+
+
+class BarAggregator:
+    """把基础周期 bar 逐根增量聚合为高周期 bar（每根 O(1)，与 resample_ohlcv(label="left") 口径一致）。
+
+    - 当前周期未结束时只更新 partial（只含已收到的 bar，不含未来数据）
+    - 周期结束即定稿：收到下一个周期的第一根 bar 时，或给出 base_timeframe 且当根 bar 的
+      结束时刻已到周期终点时（如 1m 聚合 5m 时第 5 根分钟线收盘即定稿）
+    - 日线聚合周线无法从时间戳判断周五是否为本周最后一个交易日，周线在下周第一根 bar 到来时定稿
+    """
+
+    def __init__(self, timeframe: str | Timeframe, base_timeframe: Optional[str | Timeframe] = None) -> None:
+        self.timeframe = parse_timeframe(timeframe) if isinstance(timeframe, str) else timeframe
+        base = parse_timeframe(base_timeframe) if isinstance(base_timeframe, str) else base_timeframe
+        if base is not None and base.step_ns > self.timeframe.step_ns:
+            raise ValueError("base_timeframe 不能比聚合周期更长")
+        self._base_step = base.step_ns if base is not None else None
+
+        self._symbol = ""
+        self._bucket: Optional[int] = None
+        self._last_bucket: Optional[int] = None
+        self._open = self._high = self._low = self._close = self._volume = 0.0
+
+    @property
+    def partial(self) -> Optional[CompactBar]:
+        """当前未完成周期的 bar（只含已收到的基础 bar）；没有进行中的周期时为 None。"""
+
+        if self._bucket is None:
+            return None
+        return self._emit()
+
+    def update(self, bar: Bar | CompactBar) -> Optional[CompactBar]:
+        """送入一根基础 bar，返回因此定稿的高周期 bar（没有则 None）。"""
+
+        tf = self.timeframe
+        ts = bar.ts
+        bucket = (ts - tf.origin_ns) // tf.step_ns
+        if self._last_bucket is not None and bar.symbol != self._symbol:
+            raise ValueError(f"BarAggregator symbol {self._symbol} got bar {bar.symbol}")
+
+        done: Optional[CompactBar] = None
+        if bucket != self._bucket:
+            if self._last_bucket is not None and bucket <= self._last_bucket:
+                raise ValueError(f"bar 时间倒序或落入已定稿的周期: {bar.dt}")
+            if self._bucket is not None:
+                done = self._emit()
+            self._symbol = bar.symbol
+            self._bucket = bucket
+            self._last_bucket = bucket
+            self._open = float(bar.open)
+            self._high = float(bar.high)
+            self._low = float(bar.low)
+            self._volume = 0.0
+        else:
+            self._high = max(self._high, float(bar.high))
+            self._low = min(self._low, float(bar.low))
+        self._close = float(bar.close)
+        self._volume += float(bar.volume)
+
+        if self._base_step is not None and ts + self._base_step >= (bucket + 1) * tf.step_ns + tf.origin_ns:
+            done = self._emit()
+            self._bucket = None
+        return done
+
+    def _emit(self) -> CompactBar:
+        tf = self.timeframe
+        return CompactBar(
+            ts=self._bucket * tf.step_ns + tf.origin_ns,
+            symbol=self._symbol,
+            open=self._open,
+            high=self._high,
+            low=self._low,
+            close=self._close,
+            volume=self._volume,
+        )
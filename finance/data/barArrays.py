@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# datetime_to_ns / ns_to_datetime 定义在 coreTypes，这里保留原有的导入路径
+from finance.core.compactTypes import CompactBar
+from finance.core.coreTypes import Bar, EquityPoint, Side, TradeRecord, datetime_to_ns, ns_to_datetime
+
+
+def ns_to_datetimes(ts: np.ndarray) -> List[datetime]:
+    """int64 epoch ns 数组 -> naive datetime 列表（向量化转换，精度截断到微秒）。"""
+
+    return np.asarray(ts, dtype=np.int64).view("datetime64[ns]").astype("datetime64[us]").tolist()
+
+
+
+def equity_arrays(equity_curve: Sequence[EquityPoint]) -> Tuple[np.ndarray, np.ndarray]:
+    """净值曲线的 (ts, total_equity) 数组：落盘的 EquityLog（有 records()）直接取映射列，列表则逐点构造。"""
+
+    if hasattr(equity_curve, "records"):
+        rec = equity_curve.records()
+        return rec["ts"], rec["total_equity"]
+    ts = np.array([p.ts for p in equity_curve], dtype=np.int64)
+    eq = np.array([p.total_equity for p in equity_curve], dtype=np.float64)
+    return ts, eq
+
+
+def trade_arrays(trades: Sequence[TradeRecord]) -> Tuple[np.ndarray, np.ndarray]:
+    """成交的 (ts, side) 数组（side: 买 1 / 卖 -1）：TradeLog 直接取映射列，列表则一次取出属性后整体比较。"""
+
+    if hasattr(trades, "records"):
+        rec = trades.records()
+        return rec["ts"], rec["side"]
+    n = len(trades)
+    ts = np.fromiter(map(attrgetter("ts"), trades), dtype=np.int64, count=n)
+    sides = np.array(list(map(attrgetter("side"), trades)), dtype=object)
+    # Side 为 str 枚举，与其取值比较（直接与枚举成员比较时 numpy 会按 str(Side.BUY) 转换）
+    return ts, np.where(sides == Side.BUY.value, 1, -1).astype(np.int8)
+
+
+@dataclass(frozen=True)
+class BarArrays:
+    """单标的 OHLCV 列式存储：按 ts 升序，ts 为 int64 epoch ns。
+
+    大数据量（分钟/秒级）场景下避免逐行构造 Bar 对象，需要时再用 to_bars 转换。
+    """
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[Bar]) -> "BarArrays":
+        return cls(
+            ts=np.array([b.ts for b in bars], dtype=np.int64),
+            open=np.array([b.open for b in bars], dtype=np.float64),
+            high=np.array([b.high for b in bars], dtype=np.float64),
+            low=np.array([b.low for b in bars], dtype=np.float64),
+            close=np.array([b.close for b in bars], dtype=np.float64),
+            volume=np.array([b.volume for b in bars], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_frame(cls, df) -> "BarArrays":
+        """从 CsvDataSource 清洗后的 DataFrame（dt/open/high/low/close/volume）构造。"""
+
+        return cls(
+            ts=df["dt"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+            open=df["open"].to_numpy(dtype=np.float64),
+            high=df["high"].to_numpy(dtype=np.float64),
+            low=df["low"].to_numpy(dtype=np.float64),
+            close=df["close"].to_numpy(dtype=np.float64),
+            volume=df["volume"].to_numpy(dtype=np.float64),
+        )
+
+    def datetimes(self) -> List[datetime]:
+        return ns_to_datetimes(self.ts)
+
+    def slice(self, start: int, end: int) -> "BarArrays":
+        """按行号切片（返回视图，不拷贝）。"""
+
+        return BarArrays(
+            ts=self.ts[start:end],
+            open=self.open[start:end],
+            high=self.high[start:end],
+            low=self.low[start:end],
+            close=self.close[start:end],
+            volume=self.volume[start:end],
+        )
+
+    def to_bars(self, symbol: str) -> List[CompactBar]:
+        """逐行构造 bar 对象（紧凑类型，ts 直接取 int64，不做 datetime 换算）。"""
+
+        return [
+            CompactBar(ts=ts, symbol=symbol, open=o, high=h, low=lo, close=c, volume=v)
+            for ts, o, h, lo, c, v in zip(
+                self.ts.tolist(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+            )
+        ]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from finance.core.coreTypes import DataValidationError
+from finance.data.barArrays import BarArrays
+
+
+class AdjustMode(str, Enum):
+    """复权方式。
+
+    - NONE：不复权（原始价格）
+    - FORWARD：前复权，最新一根 bar 的价格不变，历史价格按之后的除权除息缩放
+    - BACKWARD：后复权，第一根 bar 的价格不变，之后的价格按之前的除权除息放大
+    """
+
+    NONE = "none"
+    FORWARD = "forward"
+    BACKWARD = "backward"
+
+
+@dataclass(frozen=True)
+class CorporateActions:
+    """除权除息事件（按除权日升序）。
+
+    - split_ratio：每 1 股变为多少股（10 送 5 为 1.5，1 拆 2 为 2.0，无送转为 1.0）
+    - dividend：每股现金分红（按除权前的股本计）
+    """
+
+    ts: np.ndarray
+    split_ratio: np.ndarray
+    dividend: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @classmethod
+    def empty(cls) -> "CorporateActions":
+        return cls(ts=np.zeros(0, dtype=np.int64), split_ratio=np.zeros(0), dividend=np.zeros(0))
+
+
+def load_actions(csv_path: str, date_format: Optional[str] = "%Y-%m-%d") -> CorporateActions:
+    """读取事件 CSV：date 列必需，split_ratio / dividend 列可选（缺省为 1 / 0）。"""
+
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(csv_path)
+    except Exception as e:
+        raise DataValidationError(f"读取除权除息CSV失败: {csv_path}: {e}") from e
+    if "date" not in df.columns:
+        raise DataValidationError("除权除息CSV缺少 date 列")
+    try:
+        dt = pd.to_datetime(df["date"], format=date_format or "ISO8601")
+    except Exception as e:
+        raise DataValidationError(f"除权除息 date 解析失败: {e}") from e
+
+    split = df["split_ratio"].fillna(1.0).to_numpy(dtype=np.float64) if "split_ratio" in df.columns else np.ones(len(df))
+    dividend = df["dividend"].fillna(0.0).to_numpy(dtype=np.float64) if "dividend" in df.columns else np.zeros(len(df))
+    if (split <= 0).any():
+        raise DataValidationError("split_ratio 必须为正")
+    if (dividend < 0).any():
+        raise DataValidationError("dividend 不能为负")
+
+    ts = dt.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    if ts.shape[0] > 1 and bool((np.diff(ts) == 0).any()):
+        raise DataValidationError("除权除息CSV存在重复日期（同日的送转与分红请写在同一行）")
+    return CorporateActions(ts=ts, split_ratio=split[order], dividend=dividend[order])
+
+
+@dataclass(frozen=True)
+class AdjustmentFactors:
+    """逐 bar 的累计复权因子（与 bar 行号对齐）：复权价 = 原始价 × price，复权量 = 原始量 × volume。"""
+
+    price: np.ndarray
+    volume: np.ndarray
+
+
+def compute_factors(raw: BarArrays, actions: CorporateActions) -> Dict[AdjustMode, AdjustmentFactors]:
+    """由事件计算前/后复权因子（向量化累乘，O(n + 事件数)）。
+
+    除权日（或其后第一根 bar）t 的单步因子 f = (P - D) / (P × S)，P 为前一根 bar 的 close；
+    后复权因子为 1/f 自首根 bar 起的累乘，前复权因子为后复权因子除以其最后一个值。
+    成交量只按送转调整。落在首根 bar 及之前、最后一根 bar 之后的事件不影响区间内价格，忽略。
+    """
+
+    n = len(raw)
+    step = np.ones(n)
+    split_step = np.ones(n)
+    if len(actions) and n:
+        rows = np.searchsorted(raw.ts, actions.ts, side="left")
+        keep = (rows > 0) & (rows < n)
+        rows = rows[keep]
+        split = actions.split_ratio[keep]
+        dividend = actions.dividend[keep]
+        prev = np.asarray(raw.close, dtype=np.float64)[rows - 1]
+        if bool((dividend >= prev).any()):
+            raise DataValidationError("分红不小于除权前收盘价，无法计算复权因子")
+        # 同一根 bar 上可能落入多个事件（如停牌期间），按乘法合并
+        np.multiply.at(step, rows, (prev - dividend) / (prev * split))
+        np.multiply.at(split_step, rows, split)
+
+    backward = np.cumprod(1.0 / step)
+    split_cum = np.cumprod(split_step)
+    return {
+        AdjustMode.BACKWARD: AdjustmentFactors(price=backward, volume=1.0 / split_cum),
+        AdjustMode.FORWARD: AdjustmentFactors(
+            price=backward / backward[-1] if n else backward,
+            volume=split_cum[-1] / split_cum if n else split_cum,
+        ),
+    }
+
+
+class AdjustedBars:
+    """原始 bar 与复权视图：因子在构造时算一次，各复权方式的 OHLCV 数组首次取用时物化并缓存，
+    之后在原始/前复权/后复权之间切换只是取出已缓存的数组。"""
+
+    def __init__(self, raw: BarArrays, actions: Optional[CorporateActions] = None) -> None:
+        self.raw = raw
+        self.actions = actions if actions is not None else CorporateActions.empty()
+        self.factors = compute_factors(raw, self.actions)
+        self._views: Dict[AdjustMode, BarArrays] = {AdjustMode.NONE: raw}
+
+    def view(self, mode: Union[AdjustMode, str] = AdjustMode.FORWARD) -> BarArrays:
+        mode = AdjustMode(mode)
+        cached = self._views.get(mode)
+        if cached is not None:
+            return cached
+        f = self.factors[mode]
+        raw = self.raw
+        view = BarArrays(
+            ts=raw.ts,
+            open=raw.open * f.price,
+            high=raw.high * f.price,
+            low=raw.low * f.price,
+            close=raw.close * f.price,
+            volume=raw.volume * f.volume,
+        )
+        for arr in (view.open, view.high, view.low, view.close, view.volume):
+            arr.flags.writeable = False
+        self._views[mode] = view
+        return view
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 from finance.core.coreTypes import Bar, DataValidationError
+from finance.data.barArrays import BarArrays
 
 
 DEFAULT_COLUMN_MAP: Dict[str, str] = {
@@ -27,28 +28,29 @@ class CsvLoadResult:
 
 
 class CsvDataSource:
-    """读取单标的 CSV 并输出 Bar 序列（按日期升序）。"""
+    """读取单标的 CSV 并输出 Bar 序列（按时间升序）。
+
+    - date_format：默认 `YYYY-MM-DD`（日线）；分钟/秒级数据可传 "ISO8601"
+      （如 `2025-01-02 09:31:00`）或自定义 strftime 格式；None 等价于 "ISO8601"
+    - timestamp_unit：date 列为 epoch 数值时间戳时指定单位（s/ms/us/ns），此时忽略 date_format
+    """
 
     def __init__(
         self,
         column_map: Optional[Dict[str, str]] = None,
-        date_format: str = "%Y-%m-%d",
+        date_format: Optional[str] = "%Y-%m-%d",
         allow_volume_missing_as_zero: bool = True,
         enforce_unique_date: bool = True,
+        timestamp_unit: Optional[str] = None,
     ) -> None:
         self._column_map = column_map or dict(DEFAULT_COLUMN_MAP)
-        self._date_format = date_format
+        self._date_format = date_format or "ISO8601"
+        self._timestamp_unit = timestamp_unit
         self._allow_volume_missing_as_zero = allow_volume_missing_as_zero
         self._enforce_unique_date = enforce_unique_date
 
     def load(self, symbol: str, csv_path: str) -> CsvLoadResult:
-        try:
-            df = pd.read_csv(csv_path)
-        except Exception as e:
-            raise DataValidationError(f"读取CSV失败: {csv_path}: {e}") from e
-
-        df = self._normalize_columns(df)
-        df = self._validate_and_clean(df)
+        df = self._read_clean(csv_path)
 
         bars: List[Bar] = []
         for row in df.itertuples(index=False):
@@ -66,6 +68,20 @@ class CsvDataSource:
 
         return CsvLoadResult(symbol=symbol, bars=bars, df=df)
 
+    def load_arrays(self, csv_path: str) -> BarArrays:
+        """与 load 相同的解析/校验，但直接输出列式数组，不逐行构造 Bar（适合分钟级大文件）。"""
+
+        return BarArrays.from_frame(self._read_clean(csv_path))
+
+    def _read_clean(self, csv_path: str) -> pd.DataFrame:
+        try:
+            df = pd.read_csv(csv_path)
+        except Exception as e:
+            raise DataValidationError(f"读取CSV失败: {csv_path}: {e}") from e
+
+        df = self._normalize_columns(df)
+        return self._validate_and_clean(df)
+
     def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         rename_map = {src: dst for src, dst in self._column_map.items() if src in df.columns}
         df = df.rename(columns=rename_map)
@@ -79,9 +95,13 @@ class CsvDataSource:
 
         # date
         try:
-            dt = pd.to_datetime(df["date"], format=self._date_format)
+            if self._timestamp_unit is not None:
+                dt = pd.to_datetime(df["date"], unit=self._timestamp_unit)
+            else:
+                dt = pd.to_datetime(df["date"], format=self._date_format)
         except Exception as e:
-            raise DataValidationError(f"date解析失败（期望格式 {self._date_format}）: {e}") from e
+            expected = f"epoch {self._timestamp_unit}" if self._timestamp_unit is not None else self._date_format
+            raise DataValidationError(f"date解析失败（期望格式 {expected}）: {e}") from e
 
         df = df.copy()
         df["dt"] = dt
@@ -104,7 +124,7 @@ class CsvDataSource:
         if self._enforce_unique_date:
             dup = df["dt"].duplicated(keep=False)
             if bool(dup.any()):
-                dts = df.loc[dup, "dt"].dt.strftime(self._date_format).tolist()
+                dts = df.loc[dup, "dt"].astype(str).tolist()
                 raise DataValidationError(f"存在重复日期（MVP默认不允许）: {dts[:10]}{'...' if len(dts) > 10 else ''}")
 
         # 合法性：价格必须为正
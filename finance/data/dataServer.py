@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from finance.core.coreTypes import Bar, DataValidationError
+from finance.data.barArrays import BarArrays, datetime_to_ns
+
+# 本模块的客户端部分只依赖 numpy：回测进程连接数据服务时无需 import pandas、无需解析 CSV
+
+_COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+TimeBound = Union[None, int, datetime]
+
+
+def default_store_dir() -> str:
+    """共享数据文件目录：优先 /dev/shm（内存文件系统），否则系统临时目录。"""
+
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+def _to_ns(value: TimeBound) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return datetime_to_ns(value)
+    return int(value)
+
+
+def write_block(path: str, arrays: BarArrays) -> None:
+    """把 6 列按 (6, n) 行主序写成一个 float64 文件（ts 按位存为 int64）。"""
+
+    block = np.empty((len(_COLUMNS), len(arrays)), dtype=np.float64)
+    block[0] = np.ascontiguousarray(arrays.ts, dtype=np.int64).view(np.float64)
+    for i, name in enumerate(_COLUMNS[1:], start=1):
+        block[i] = getattr(arrays, name)
+    tmp = path + ".tmp"
+    block.tofile(tmp)
+    os.replace(tmp, path)
+
+
+def map_block(path: str, rows: int) -> BarArrays:
+    """只读映射共享数据文件：返回的各列都是同一块页缓存上的视图，不拷贝。"""
+
+    if rows == 0:
+        empty = np.zeros(0)
+        return BarArrays(ts=empty.view(np.int64), open=empty, high=empty, low=empty, close=empty, volume=empty)
+    block = np.memmap(path, dtype=np.float64, mode="r", shape=(len(_COLUMNS), rows))
+    return BarArrays(
+        ts=block[0].view(np.int64),
+        open=block[1],
+        high=block[2],
+        low=block[3],
+        close=block[4],
+        volume=block[5],
+    )
+
+
+@dataclass(frozen=True)
+class SymbolEntry:
+    symbol: str
+    path: str
+    rows: int
+    first_ts: Optional[int]
+    last_ts: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"symbol": self.symbol, "path": self.path, "rows": self.rows, "first_ts": self.first_ts, "last_ts": self.last_ts}
+
+
+# ---------- 服务端 ----------
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """每个连接一个线程；协议为逐行 JSON（一行请求对应一行响应），连接可复用。"""
+
+    def handle(self) -> None:
+        server: DataServer = self.server.owner  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = server.dispatch(json.loads(line))
+            except KeyError as e:
+                reply = {"ok": False, "kind": "missing", "error": f"unknown symbol: {e.args[0]}"}
+            except Exception as e:
+                reply = {"ok": False, "kind": type(e).__name__, "error": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class DataServer:
+    """常驻本机的行情服务：校验后的 bar 数组写入共享内存文件，客户端只读映射。
+
+    - 每个标的一个 (6, n) float64 文件（默认在 /dev/shm），多个回测进程映射同一份物理页
+    - Unix socket 只传元数据（文件路径、行数、时间范围），不传行情本身
+    - 重新加载某个标的时写入新文件并替换目录项；已映射旧文件的客户端不受影响
+      （拿到旧路径但尚未映射的客户端会重新 get 一次，见 DataClient.fetch）
+    - 经 socket 的 load 请求只允许读取 data_dir 下的文件；未指定 data_dir 时不接受 load
+    """
+
+    def __init__(self, socket_path: str, *, store_dir: Optional[str] = None, data_dir: Optional[str] = None) -> None:
+        self.socket_path = socket_path
+        self.data_dir = os.path.realpath(data_dir) if data_dir else None
+        self.store_dir = tempfile.mkdtemp(prefix="finance-data-", dir=store_dir or default_store_dir())
+        self._entries: Dict[str, SymbolEntry] = {}
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 数据 ----
+
+    def add_arrays(self, symbol: str, arrays: BarArrays) -> SymbolEntry:
+        ts = np.asarray(arrays.ts)
+        if ts.shape[0] > 1 and not bool((np.diff(ts) > 0).all()):
+            raise DataValidationError(f"{symbol}: ts 必须严格递增")
+        with self._lock:
+            self._seq += 1
+            path = os.path.join(self.store_dir, f"{self._seq:06d}.bin")
+        write_block(path, arrays)
+        entry = SymbolEntry(
+            symbol=symbol,
+            path=path,
+            rows=len(arrays),
+            first_ts=int(ts[0]) if ts.shape[0] else None,
+            last_ts=int(ts[-1]) if ts.shape[0] else None,
+        )
+        with self._lock:
+            old = self._entries.get(symbol)
+            self._entries[symbol] = entry
+        if old is not None:
+            # 已有映射保持有效（POSIX 下 unlink 只移除目录项）
+            os.unlink(old.path)
+        return entry
+
+    def load_csv(self, symbol: str, csv_path: str, *, date_format: Optional[str] = "%Y-%m-%d") -> SymbolEntry:
+        from finance.data.csvDataSource import CsvDataSource
+
+        return self.add_arrays(symbol, CsvDataSource(date_format=date_format).load_arrays(csv_path))
+
+    def _allowed_csv(self, csv_path: str) -> str:
+        """把客户端传来的路径限制在 data_dir 内（解析符号链接后判断），返回实际路径。"""
+
+        if self.data_dir is None:
+            raise PermissionError("load 未启用：启动服务时需指定 data_dir")
+        path = os.path.realpath(os.path.join(self.data_dir, csv_path))
+        if os.path.commonpath([path, self.data_dir]) != self.data_dir:
+            raise PermissionError(f"csv_path 不在 data_dir 内: {csv_path}")
+        return path
+
+    def entry(self, symbol: str) -> SymbolEntry:
+        with self._lock:
+            return self._entries[symbol]
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op == "list":
+            return {"ok": True, "symbols": self.symbols()}
+        if op == "get":
+            return {"ok": True, **self.entry(str(request["symbol"])).to_dict()}
+        if op == "load":
+            path = self._allowed_csv(str(request["csv_path"]))
+            entry = self.load_csv(str(request["symbol"]), path, date_format=request.get("date_format", "%Y-%m-%d"))
+            return {"ok": True, **entry.to_dict()}
+        raise ValueError(f"unknown op: {op}")
+
+    # ---- 生命周期 ----
+
+    def start(self) -> "DataServer":
+        """在后台线程中开始监听（serve_forever 的非阻塞版本）。"""
+
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="data-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def _bind(self) -> None:
+        if self._server is not None:
+            return
+        if os.path.exists(self.socket_path):
+            # 残留的 socket 文件：能连上说明已有服务在运行
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(self.socket_path)
+                raise RuntimeError(f"data server already running at {self.socket_path}")
+            except ConnectionRefusedError:
+                os.unlink(self.socket_path)
+        self._server = _UnixServer(self.socket_path, _Handler)
+        self._server.owner = self  # type: ignore[attr-defined]
+
+    def shutdown(self) -> None:
+        """请求 serve_forever 退出（可在其他线程或信号处理中调用）。"""
+
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self) -> None:
+        if self._server is not None:
+            if self._thread is not None:
+                self._server.shutdown()
+                self._thread.join()
+                self._thread = None
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+        for e in entries:
+            if os.path.exists(e.path):
+                os.unlink(e.path)
+        if os.path.isdir(self.store_dir):
+            os.rmdir(self.store_dir)
+
+    def __enter__(self) -> "DataServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------- 客户端 ----------
+
+
+class DataClient:
+    """数据服务客户端：一条复用的 socket 连接；fetch 返回只读映射的 BarArrays（零拷贝）。"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = 30.0) -> None:
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile("rwb")
+        self._lock = threading.Lock()
+
+    def request(self, op: str, **params: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._file.write(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ConnectionError(f"data server closed the connection: {self.socket_path}")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            if reply.get("kind") == "missing":
+                raise KeyError(params.get("symbol"))
+            raise DataValidationError(f"data server error: {reply.get('error')}")
+        return reply
+
+    def ping(self) -> bool:
+        return bool(self.request("ping")["ok"])
+
+    def symbols(self) -> List[str]:
+        return list(self.request("list")["symbols"])
+
+    def load(self, symbol: str, csv_path: str, date_format: Optional[str] = "%Y-%m-%d") -> SymbolEntry:
+        """让服务端加载（或重新加载）一个 CSV（须在服务端 data_dir 内）；解析与校验只在服务端做一次。"""
+
+        reply = self.request("load", symbol=symbol, csv_path=os.path.abspath(csv_path), date_format=date_format)
+        return SymbolEntry(**{k: reply[k] for k in SymbolEntry.__dataclass_fields__})
+
+    def fetch(self, symbol: str, start: TimeBound = None, end: TimeBound = None) -> BarArrays:
+        """取 [start, end] 闭区间内的 bar（None 表示不限）；结果为共享内存上的只读视图。"""
+
+        reply = self.request("get", symbol=symbol)
+        try:
+            arrays = map_block(reply["path"], int(reply["rows"]))
+        except FileNotFoundError:
+            # get 与映射之间服务端重新加载了该标的，旧文件已删除：按新目录项再取一次
+            reply = self.request("get", symbol=symbol)
+            arrays = map_block(reply["path"], int(reply["rows"]))
+        lo_ns, hi_ns = _to_ns(start), _to_ns(end)
+        lo = 0 if lo_ns is None else int(np.searchsorted(arrays.ts, lo_ns, side="left"))
+        hi = len(arrays) if hi_ns is None else int(np.searchsorted(arrays.ts, hi_ns, side="right"))
+        if lo == 0 and hi == len(arrays):
+            return arrays
+        return arrays.slice(lo, hi)
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def __enter__(self) -> "DataClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class RemoteDataHandler:
+    """与 DataHandler 接口一致、数据来自 DataServer 的行情句柄。
+
+    - symbols 为 None 时使用服务端的全部标的；start/end 对所有标的生效
+    - 列式数组按需映射；get_bars 首次调用时才构造 Bar 对象并缓存
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        symbols: Optional[Sequence[str]] = None,
+        *,
+        start: TimeBound = None,
+        end: TimeBound = None,
+    ) -> None:
+        self._client = DataClient(socket_path)
+        self._symbols = list(symbols) if symbols is not None else self._client.symbols()
+        self._start = start
+        self._end = end
+        self._arrays: Dict[str, BarArrays] = {}
+        self._bars: Dict[str, List[Bar]] = {}
+
+    def symbols(self) -> Sequence[str]:
+        return list(self._symbols)
+
+    def get_arrays(self, symbol: str) -> BarArrays:
+        if symbol not in self._symbols:
+            raise KeyError(symbol)
+        arrays = self._arrays.get(symbol)
+        if arrays is None:
+            arrays = self._arrays[symbol] = self._client.fetch(symbol, self._start, self._end)
+        return arrays
+
+    def get_bars(self, symbol: str) -> List[Bar]:
+        bars = self._bars.get(symbol)
+        if bars is None:
+            bars = self._bars[symbol] = self.get_arrays(symbol).to_bars(symbol)
+        return bars
+
+    def iter_bars(self, symbol: str) -> Iterator[Bar]:
+        for b in self.get_bars(symbol):
+            yield b
+
+    def bar_count(self, symbol: str) -> int:
+        return len(self.get_arrays(symbol))
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "RemoteDataHandler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from finance.data.barArrays import BarArrays
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+
+_UNIT_NS = {
+    "s": NS_PER_SECOND,
+    "m": 60 * NS_PER_SECOND,
+    "min": 60 * NS_PER_SECOND,
+    "h": 3_600 * NS_PER_SECOND,
+    "d": NS_PER_DAY,
+    "w": 7 * NS_PER_DAY,
+}
+
+# 1970-01-01 是周四；周线按周一 00:00 对齐
+_WEEK_ORIGIN_NS = 4 * NS_PER_DAY
+
+_TIMEFRAME_RE = re.compile(r"^\s*(\d*)\s*([a-zA-Z]+)\s*$")
+
+
+@dataclass(frozen=True)
+class Timeframe:
+    """固定宽度的时间周期：bucket = (ts - origin) // step。"""
+
+    step_ns: int
+    origin_ns: int = 0
+
+    @property
+    def is_intraday(self) -> bool:
+        return self.step_ns < NS_PER_DAY
+
+    def bucket_of(self, ts: np.ndarray) -> np.ndarray:
+        return (np.asarray(ts, dtype=np.int64) - self.origin_ns) // self.step_ns
+
+    def bucket_start(self, bucket: np.ndarray) -> np.ndarray:
+        return np.asarray(bucket, dtype=np.int64) * self.step_ns + self.origin_ns
+
+
+def parse_timeframe(spec: str) -> Timeframe:
+    """解析周期字符串：30s / 1m / 5min / 1h / 1d / 1w（大小写不敏感）。"""
+
+    m = _TIMEFRAME_RE.match(str(spec))
+    if m is None:
+        raise ValueError(f"无法解析周期: {spec!r}")
+    n = int(m.group(1) or 1)
+    unit = m.group(2).lower()
+    if unit not in _UNIT_NS:
+        raise ValueError(f"不支持的周期单位: {spec!r}（支持 s/m/min/h/d/w）")
+    if n <= 0:
+        raise ValueError(f"周期必须 > 0: {spec!r}")
+
+    step = n * _UNIT_NS[unit]
+    origin = _WEEK_ORIGIN_NS if unit == "w" else 0
+    return Timeframe(step_ns=step, origin_ns=origin)
+
+
+def segment_starts(ts: np.ndarray, timeframe: Timeframe, group_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """返回每个聚合段的起始行号（ts 须升序；给出 group_ids 时须按 (group, ts) 排序）。"""
+
+    ts = np.asarray(ts, dtype=np.int64)
+    n = ts.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    bucket = timeframe.bucket_of(ts)
+    changed = bucket[1:] != bucket[:-1]
+    if group_ids is not None:
+        group_ids = np.asarray(group_ids)
+        if group_ids.shape[0] != n:
+            raise ValueError("group_ids 长度与 ts 不一致")
+        group_changed = group_ids[1:] != group_ids[:-1]
+        changed |= group_changed
+        backwards = (ts[1:] < ts[:-1]) & ~group_changed
+    else:
+        backwards = ts[1:] < ts[:-1]
+    if bool(backwards.any()):
+        raise ValueError("ts 未按升序排列，无法分段聚合")
+
+    return np.concatenate(([0], np.flatnonzero(changed) + 1)).astype(np.int64)
+
+
+def resample_ohlcv(
+    bars: BarArrays,
+    timeframe: str | Timeframe,
+    *,
+    group_ids: Optional[np.ndarray] = None,
+    label: str = "left",
+) -> BarArrays:
+    """把 OHLCV 聚合到更高周期（分段归约，不依赖 pandas groupby）。
+
+    - open/close 取段首/段尾，high/low/volume 用 ufunc.reduceat 归约
+    - 多标的：传入按 (group, ts) 排序的 group_ids，段边界在标的切换处自动断开；
+      输出行对应的标的为 group_ids[segment_starts(...)]
+    - label：left=周期起点，right=周期终点，last=段内最后一根原始 bar 的 ts
+    """
+
+    tf = parse_timeframe(timeframe) if isinstance(timeframe, str) else timeframe
+    if label not in ("left", "right", "last"):
+        raise ValueError(f"label 仅支持 left/right/last: {label!r}")
+
+    starts = segment_starts(bars.ts, tf, group_ids=group_ids)
+    if starts.shape[0] == 0:
+        return bars.slice(0, 0)
+
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    ends[-1] = len(bars)
+    last = ends - 1
+
+    if label == "last":
+        out_ts = bars.ts[last]
+    else:
+        bucket_start = tf.bucket_start(tf.bucket_of(bars.ts[starts]))
+        out_ts = bucket_start if label == "left" else bucket_start + tf.step_ns
+
+    return BarArrays(
+        ts=np.ascontiguousarray(out_ts, dtype=np.int64),
+        open=bars.open[starts],
+        high=np.maximum.reduceat(bars.high, starts),
+        low=np.minimum.reduceat(bars.low, starts),
+        close=bars.close[last],
+        volume=np.add.reduceat(bars.volume, starts),
+    )
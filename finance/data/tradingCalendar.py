@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from finance.data.barArrays import BarArrays, datetime_to_ns, ns_to_datetimes
+from finance.data.dataHandler import DataHandler
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class FillPolicy(str, Enum):
+    """缺失（停牌/未上市/已退市）位置的取值方式。"""
+
+    NAN = "nan"
+    FFILL = "ffill"  # 沿用最近一根已有 bar 的值；首根 bar 之前仍为 NaN
+    ZERO = "zero"  # 适合 volume：停牌日成交量为 0
+
+
+@dataclass(frozen=True)
+class TradingCalendar:
+    """主时间轴：所有标的时间戳的并集（int64 epoch ns，升序且唯一）。"""
+
+    ts: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @classmethod
+    def union(cls, ts_arrays: Iterable[np.ndarray]) -> "TradingCalendar":
+        arrays = [np.asarray(t, dtype=np.int64) for t in ts_arrays]
+        if not arrays:
+            return cls(ts=np.zeros(0, dtype=np.int64))
+        return cls(ts=np.unique(np.concatenate(arrays)))
+
+    def datetimes(self) -> list:
+        return ns_to_datetimes(self.ts)
+
+    def positions(self, ts: np.ndarray) -> np.ndarray:
+        """时间戳 -> 主时间轴下标（int32）；不在日历中的时间戳报错。"""
+
+        ts = np.asarray(ts, dtype=np.int64)
+        pos = np.searchsorted(self.ts, ts)
+        ok = pos < self.ts.shape[0]
+        ok[ok] = self.ts[pos[ok]] == ts[ok]
+        if not ok.all():
+            bad = ns_to_datetimes(ts[~ok][:5])
+            raise ValueError(f"时间戳不在交易日历中: {bad}")
+        return pos.astype(np.int32)
+
+    def index_of(self, dt) -> int:
+        return int(self.positions(np.array([datetime_to_ns(dt)]))[0])
+
+    def bounds(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Tuple[int, int]:
+        """[start_ns, end_ns] 闭区间对应的下标范围 [lo, hi)。"""
+
+        lo = 0 if start_ns is None else int(np.searchsorted(self.ts, start_ns, side="left"))
+        hi = len(self) if end_ns is None else int(np.searchsorted(self.ts, end_ns, side="right"))
+        return lo, hi
+
+
+@dataclass(frozen=True)
+class AlignedPanel:
+    """多标的按主时间轴对齐的面板（时间 × 标的）。
+
+    构建时一次性计算：
+    - position_map[symbol]：该标的每根 bar 在主时间轴上的下标（int32）
+    - row_index：(T, K) int32，主时间轴每个位置对应各标的自身的行号，缺失为 -1
+    面板按 (field, policy) 物化一次后缓存，之后的 window/column 都是缓存数组的视图（零拷贝），
+    标的本身覆盖完整日历时 column 直接返回原始数组。
+    """
+
+    calendar: TradingCalendar
+    symbols: List[str]
+    arrays: Dict[str, BarArrays]
+    position_map: Dict[str, np.ndarray]
+    row_index: np.ndarray
+    _ffill_index: np.ndarray
+    _panels: Dict[Tuple[str, FillPolicy], np.ndarray] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, arrays: Mapping[str, BarArrays], calendar: Optional[TradingCalendar] = None) -> "AlignedPanel":
+        symbols = list(arrays.keys())
+        cal = calendar or TradingCalendar.union(a.ts for a in arrays.values())
+        n, k = len(cal), len(symbols)
+
+        row_index = np.full((n, k), -1, dtype=np.int32)
+        position_map: Dict[str, np.ndarray] = {}
+        for j, sym in enumerate(symbols):
+            pos = cal.positions(arrays[sym].ts)
+            position_map[sym] = pos
+            row_index[pos, j] = np.arange(pos.shape[0], dtype=np.int32)
+
+        # 前向填充只是下标的前缀最大值（行号随时间单调递增）
+        ffill_index = np.maximum.accumulate(row_index, axis=0) if n else row_index.copy()
+        return cls(
+            calendar=cal,
+            symbols=symbols,
+            arrays=dict(arrays),
+            position_map=position_map,
+            row_index=row_index,
+            _ffill_index=ffill_index,
+        )
+
+    @classmethod
+    def from_data_handler(cls, data: DataHandler, calendar: Optional[TradingCalendar] = None) -> "AlignedPanel":
+        return cls.build({s: BarArrays.from_bars(data.get_bars(s)) for s in data.symbols()}, calendar)
+
+    def symbol_index(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    @property
+    def present(self) -> np.ndarray:
+        """(T, K) bool：该时点该标的有 bar（可交易）。"""
+
+        return self.row_index >= 0
+
+    @property
+    def listed(self) -> np.ndarray:
+        """(T, K) bool：位于该标的首根与末根 bar 之间（含停牌）。"""
+
+        started = self._ffill_index >= 0
+        last = np.array([self.arrays[s].ts.shape[0] - 1 for s in self.symbols], dtype=np.int32)
+        return started & (self._ffill_index < last) | self.present
+
+    def panel(self, field_name: str = "close", fill: FillPolicy | str = FillPolicy.NAN) -> np.ndarray:
+        """(T, K) float64 面板；同一 (field, fill) 只物化一次，返回缓存数组（请勿原地修改）。"""
+
+        if field_name not in PANEL_FIELDS:
+            raise ValueError(f"field 仅支持 {PANEL_FIELDS}: {field_name!r}")
+        policy = FillPolicy(fill)
+        key = (field_name, policy)
+        cached = self._panels.get(key)
+        if cached is not None:
+            return cached
+
+        index = self._ffill_index if policy == FillPolicy.FFILL else self.row_index
+        # 所有标的该列拼成一个扁平数组（末尾放缺失值哨兵），一次花式索引完成对齐
+        columns = [getattr(self.arrays[s], field_name) for s in self.symbols]
+        sizes = np.array([c.shape[0] for c in columns], dtype=np.int64)
+        offsets = np.cumsum(sizes) - sizes
+        missing = 0.0 if policy == FillPolicy.ZERO else np.nan
+        flat = np.concatenate(columns + [np.array([missing])]).astype(np.float64, copy=False)
+        gather = np.where(index >= 0, index + offsets[None, :], flat.shape[0] - 1)
+        out = flat[gather]
+        out.setflags(write=False)
+        self._panels[key] = out
+        return out
+
+    def window(
+        self,
+        field_name: str = "close",
+        fill: FillPolicy | str = FillPolicy.NAN,
+        *,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        symbols: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """按时间区间取面板的行切片（视图）；指定 symbols 时为列选择（会拷贝）。"""
+
+        lo, hi = self.calendar.bounds(start_ns, end_ns)
+        out = self.panel(field_name, fill)[lo:hi]
+        if symbols is not None:
+            out = out[:, [self.symbol_index(s) for s in symbols]]
+        return out
+
+    def column(self, symbol: str, field_name: str = "close", fill: FillPolicy | str = FillPolicy.NAN) -> np.ndarray:
+        """单个标的在主时间轴上的序列（视图）。"""
+
+        arrays = self.arrays[symbol]
+        if arrays.ts.shape[0] == len(self.calendar):
+            # 与主时间轴完全一致：直接返回原始数组
+            return getattr(arrays, field_name)
+        return self.panel(field_name, fill)[:, self.symbol_index(symbol)]
+
+    def values_at(self, t: int, field_name: str = "close", fill: FillPolicy | str = FillPolicy.NAN) -> np.ndarray:
+        """主时间轴第 t 个时点的横截面（视图）。"""
+
+        return self.panel(field_name, fill)[t]
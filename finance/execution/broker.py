@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import math
 import uuid
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional
 
+import numpy as np
+
+from finance.core.compactTypes import CompactFill, CompactOrder
 from finance.core.coreTypes import Bar, Fill, Order, Side, Signal
+from finance.data.barArrays import BarArrays, datetime_to_ns
 from finance.execution.feeModel import FeeModel
+from finance.execution.marketImpact import LiquidityProfile, MarketImpactModel
+from finance.execution.orderBook import OrderBook
 from finance.execution.slippageModel import SlippageModel
 
 
@@ -20,16 +28,238 @@ class Broker:
     - 消费 Signal（t 收盘后）并缓存为 pending
     - 在下一根 bar 的 open 时撮合成交
     - 成本（fee/slippage）在这里计算，并写入 Fill
+    - 限价/止损/止损限价单挂在 order_book 中，跨多根 bar 有效，直到成交或撤单
+    - 可选 impact_model：市价成交（开盘单、触发后的止损单）叠加按参与率计的冲击成本；
+      设置 max_participation 时每根 bar 的成交量受限，未成交部分顺延到之后的 bar
+    - 生成的订单与成交为 CompactOrder / CompactFill（时间存为 ts，dt 属性按需换算）
     """
 
-    def __init__(self, fee_model: Optional[FeeModel] = None, slippage_model: Optional[SlippageModel] = None) -> None:
+    def __init__(
+        self,
+        fee_model: Optional[FeeModel] = None,
+        slippage_model: Optional[SlippageModel] = None,
+        impact_model: Optional[MarketImpactModel] = None,
+    ) -> None:
         self._fee_model = fee_model or FeeModel()
         self._slippage_model = slippage_model or SlippageModel()
+        self._impact_model = impact_model
         self._pending: Optional[PendingSignal] = None
+        self.order_book = OrderBook()
+        self._liquidity: Dict[str, LiquidityProfile] = {}
+        self._capacity_bar: Optional[tuple] = None
+        self._capacity_left: Optional[int] = None
 
     def queue_signal(self, signal: Signal) -> None:
         self._pending = PendingSignal(signal=signal)
 
+    @property
+    def fee_model(self) -> FeeModel:
+        return self._fee_model
+
+    @property
+    def slippage_model(self) -> SlippageModel:
+        return self._slippage_model
+
+    @property
+    def impact_model(self) -> Optional[MarketImpactModel]:
+        return self._impact_model
+
+    def needs_liquidity(self, symbol: str) -> bool:
+        return self._impact_model is not None and symbol not in self._liquidity
+
+    def attach_liquidity(self, symbol: str, arrays: BarArrays) -> LiquidityProfile:
+        """为标的预先算好 ADV/波动率数组（每个标的只算一次，之后按 bar 查表）。"""
+
+        if self._impact_model is None:
+            raise ValueError("impact_model 未设置")
+        profile = self._liquidity[symbol] = self._impact_model.profile(arrays)
+        return profile
+
+    def _liquidity_at(self, bar: Bar) -> tuple[float, float]:
+        profile = self._liquidity.get(bar.symbol)
+        if profile is None:
+            return math.nan, math.nan
+        i = profile.row_of(bar.ts)
+        return float(profile.adv[i]), float(profile.volatility[i])
+
+    def _capacity_for(self, bar: Bar) -> Optional[int]:
+        """当根 bar 按参与上限剩余的可成交数量（None 表示不限）。"""
+
+        if self._impact_model is None or self._impact_model.max_participation is None:
+            return None
+        key = (bar.symbol, bar.ts)
+        if self._capacity_bar != key:
+            self._capacity_bar = key
+            self._capacity_left = self._impact_model.capacity(bar.volume)
+        return self._capacity_left
+
+    def _use_capacity(self, quantity: int) -> None:
+        if self._capacity_left is not None:
+            self._capacity_left -= int(quantity)
+
+    def _apply_impact(self, bar: Bar, order: Order, fill: Fill, *, cash: float) -> tuple[int, Optional[Fill]]:
+        """对一笔已按固定滑点定价的市价成交叠加参与上限与冲击成本，返回 (顺延数量, 新 Fill)。"""
+
+        model = self._impact_model
+        requested = int(fill.quantity)
+        cap = self._capacity_for(bar)
+        qty = requested if cap is None else min(requested, cap)
+        carry = requested - qty
+        adv, vol = self._liquidity_at(bar)
+        flat_slip = float(fill.slippage) / requested
+
+        # 冲击随数量增大：买入时缩量直到含冲击与手续费的成本不超过现金
+        while qty > 0:
+            price, impact = model.exec_price(fill.price, fill.side, qty, adv, vol)
+            fee = self._fee_model.calc(price * qty)
+            if fill.side == Side.SELL or price * qty + fee <= cash:
+                break
+            qty = min(qty - 1, int(qty * cash / (price * qty + fee)))
+        if qty <= 0:
+            return carry, None
+        self._use_capacity(qty)
+        return carry, CompactFill(
+            order_id=order.id,
+            ts=fill.ts,
+            symbol=fill.symbol,
+            side=fill.side,
+            quantity=qty,
+            price=price,
+            fee=fee,
+            slippage=(flat_slip + impact) * qty,
+        )
+
+    def size_target_weights(
+        self,
+        *,
+        target_weights: np.ndarray,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+        equity: float,
+        lot_size: int = 1,
+    ) -> np.ndarray:
+        """多标的目标权重 -> 带符号的调仓数量（买为正、卖为负），按 symbol id 对齐。
+
+        - 目标数量 = 权重 × 权益 / 买入成交价（含滑点与费率缓冲），向 0 取整到整手
+        - prices 为 NaN/非正（停牌、未上市）的标的不调仓；目标为 0 时全部卖出（不受整手约束）
+        """
+
+        w = np.asarray(target_weights, dtype=np.float64)
+        p = np.asarray(prices, dtype=np.float64)
+        q = np.asarray(quantities, dtype=np.int64)
+        if not (w.shape == p.shape == q.shape):
+            raise ValueError("target_weights/prices/quantities 形状不一致")
+
+        tradable = p > 0
+        lot = max(int(lot_size), 1)
+        factor = (1.0 + float(self._slippage_model.bps) / 1e4) * (1.0 + float(self._fee_model.rate))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raw = np.where(tradable, np.nan_to_num(w) * float(equity) / (p * factor), 0.0)
+        target = (np.trunc(raw / lot) * lot).astype(np.int64)
+        return np.where(tradable, target - q, 0)
+
+    def affordable_qty(self, market_price: float, cash: float, lot_size: int = 1) -> int:
+        """现金可买入的最大数量（含滑点与手续费，按整手）。"""
+
+        exec_price, _ = self._slippage_model.apply(market_price, side=Side.BUY)
+        lot = max(int(lot_size), 1)
+        qty = int(cash // (exec_price * (1.0 + float(self._fee_model.rate))) // lot) * lot
+        while qty > 0 and exec_price * qty + self._fee_model.calc(exec_price * qty) > cash:
+            qty -= lot
+        return max(qty, 0)
+
+    def fill_market(self, *, dt: datetime, symbol: str, quantity: int, market_price: float, reason: str = "") -> tuple[Order, Fill]:
+        """按市价成交一笔带符号数量的订单（买为正、卖为负），成本口径与 execute_open 相同。"""
+
+        if quantity == 0:
+            raise ValueError("quantity must be non-zero")
+        side = Side.BUY if quantity > 0 else Side.SELL
+        qty = abs(int(quantity))
+        exec_price, per_share_slip = self._slippage_model.apply(market_price, side=side)
+        ts = datetime_to_ns(dt)
+        order = CompactOrder(id=str(uuid.uuid4()), ts=ts, symbol=symbol, side=side, quantity=qty, reason=reason)
+        fill = CompactFill(
+            order_id=order.id,
+            ts=ts,
+            symbol=symbol,
+            side=side,
+            quantity=qty,
+            price=exec_price,
+            fee=self._fee_model.calc(exec_price * qty),
+            slippage=per_share_slip * qty,
+        )
+        return order, fill
+
+    def submit_order(self, order: Order) -> str:
+        return self.order_book.submit(order)
+
+    def cancel_order(self, order_id: str) -> bool:
+        return self.order_book.cancel(order_id)
+
+    def execute_resting(self, bar: Bar, *, cash: float, position_qty: int) -> List[tuple[Order, Fill]]:
+        """用当前 bar 撮合挂单簿，返回按顺序应用的 (Order, Fill) 列表。
+
+        - 止损单按触发价（或跳空后的 open）加滑点成交；限价单按限价或更优价成交，不计滑点
+        - 只做多：卖出超过当前持仓的部分、买入超过可用现金的部分不成交，订单剩余数量随之撤销
+        - 有参与上限时超出当根 bar 容量的部分以同一 order id 顺延（见 OrderBook.carry）；冲击成本只加在止损单上
+        """
+
+        triggers = self.order_book.match(bar.symbol, float(bar.open), float(bar.high), float(bar.low))
+        out: List[tuple[Order, Fill]] = []
+        for t in triggers:
+            order = t.order
+            if t.market:
+                exec_price, per_share_slip = self._slippage_model.apply(t.price, side=order.side)
+            else:
+                exec_price, per_share_slip = t.price, 0.0
+
+            cap = self._capacity_for(bar)
+            wanted = int(order.quantity) if cap is None else min(int(order.quantity), cap)
+            if order.side == Side.SELL:
+                qty = min(wanted, int(position_qty))
+            else:
+                qty = min(wanted, self._affordable_at(exec_price, cash))
+            if qty <= 0:
+                continue
+
+            fee = self._fee_model.calc(exec_price * qty)
+            fill = CompactFill(
+                order_id=order.id,
+                ts=bar.ts,
+                symbol=bar.symbol,
+                side=order.side,
+                quantity=qty,
+                price=exec_price,
+                fee=fee,
+                slippage=per_share_slip * qty,
+            )
+            if t.market and self._impact_model is not None:
+                _, fill = self._apply_impact(bar, order, fill, cash=cash)
+                if fill is None:
+                    continue
+                qty = fill.quantity
+                fee = fill.fee
+                exec_price = fill.price
+            else:
+                self._use_capacity(qty)
+            if qty == wanted < order.quantity:
+                # 只有容量不足时顺延剩余部分；受持仓/现金限制时剩余数量撤销
+                self.order_book.carry(replace(order, quantity=int(order.quantity) - qty))
+            if order.side == Side.SELL:
+                cash += exec_price * qty - fee
+                position_qty -= qty
+            else:
+                cash -= exec_price * qty + fee
+                position_qty += qty
+            out.append((order, fill))
+        return out
+
+    def _affordable_at(self, exec_price: float, cash: float) -> int:
+        qty = int(cash // (exec_price * (1.0 + float(self._fee_model.rate))))
+        while qty > 0 and exec_price * qty + self._fee_model.calc(exec_price * qty) > cash:
+            qty -= 1
+        return max(qty, 0)
+
     def has_pending(self) -> bool:
         return self._pending is not None
 
@@ -58,6 +288,21 @@ class Broker:
         if signal.symbol != bar.symbol:
             raise ValueError(f"Pending signal symbol {signal.symbol} != bar symbol {bar.symbol}")
 
+        order, fill = self._fill_signal(bar, signal, cash=cash, position_qty=position_qty)
+        if fill is None or self._impact_model is None:
+            return order, fill
+
+        carry, fill = self._apply_impact(bar, order, fill, cash=cash)
+        if carry:
+            # 受参与上限限制未成交的部分：保留 signal，下一根 bar 开盘按同一目标继续调仓（新 signal 会覆盖它）
+            self._pending = PendingSignal(signal=signal)
+        if fill is None:
+            return None, None
+        return replace(order, quantity=fill.quantity), fill
+
+    def _fill_signal(self, bar: Bar, signal: Signal, *, cash: float, position_qty: int) -> tuple[Optional[Order], Optional[Fill]]:
+        """按目标仓位（0/1）和固定滑点生成开盘成交。"""
+
         target = float(signal.target_position)
         if target <= 0.0:
             # 目标空仓：卖出全部
@@ -69,17 +314,17 @@ class Broker:
             exec_price, per_share_slip = self._slippage_model.apply(market_price, side=side)
             slippage = per_share_slip * qty
             fee = self._fee_model.calc(exec_price * qty)
-            order = Order(
+            order = CompactOrder(
                 id=str(uuid.uuid4()),
-                dt=bar.dt,
+                ts=bar.ts,
                 symbol=bar.symbol,
                 side=side,
                 quantity=qty,
                 reason=signal.reason,
             )
-            fill = Fill(
+            fill = CompactFill(
                 order_id=order.id,
-                dt=bar.dt,
+                ts=bar.ts,
                 symbol=bar.symbol,
                 side=side,
                 quantity=qty,
@@ -110,17 +355,17 @@ class Broker:
                     sell_exec_price, sell_per_share_slip = self._slippage_model.apply(market_price, side=Side.SELL)
                     sell_slippage = sell_per_share_slip * sell_qty
                     sell_fee = self._fee_model.calc(sell_exec_price * sell_qty)
-                    order = Order(
+                    order = CompactOrder(
                         id=str(uuid.uuid4()),
-                        dt=bar.dt,
+                        ts=bar.ts,
                         symbol=bar.symbol,
                         side=Side.SELL,
                         quantity=sell_qty,
                         reason=signal.reason,
                     )
-                    fill = Fill(
+                    fill = CompactFill(
                         order_id=order.id,
-                        dt=bar.dt,
+                        ts=bar.ts,
                         symbol=bar.symbol,
                         side=Side.SELL,
                         quantity=sell_qty,
@@ -146,17 +391,17 @@ class Broker:
                 # 检查：买入成本不能超过可用现金
                 if total_cost <= cash:
                     # 能买得起，生成订单
-                    order = Order(
+                    order = CompactOrder(
                         id=str(uuid.uuid4()),
-                        dt=bar.dt,
+                        ts=bar.ts,
                         symbol=bar.symbol,
                         side=side,
                         quantity=buy_qty,
                         reason=signal.reason,
                     )
-                    fill = Fill(
+                    fill = CompactFill(
                         order_id=order.id,
-                        dt=bar.dt,
+                        ts=bar.ts,
                         symbol=bar.symbol,
                         side=side,
                         quantity=buy_qty,
@@ -191,17 +436,17 @@ class Broker:
                 return None, None
 
             slippage = per_share_slip * buy_qty
-            order = Order(
+            order = CompactOrder(
                 id=str(uuid.uuid4()),
-                dt=bar.dt,
+                ts=bar.ts,
                 symbol=bar.symbol,
                 side=side,
                 quantity=buy_qty,
                 reason=signal.reason,
             )
-            fill = Fill(
+            fill = CompactFill(
                 order_id=order.id,
-                dt=bar.dt,
+                ts=bar.ts,
                 symbol=bar.symbol,
                 side=side,
                 quantity=buy_qty,
@@ -211,30 +456,4 @@ class Broker:
             )
             return order, fill
 
-            # desired_qty < position_qty: 卖出差额
-            side = Side.SELL
-            sell_qty = position_qty - desired_qty
-            exec_price, per_share_slip = self._slippage_model.apply(market_price, side=side)
-            slippage = per_share_slip * sell_qty
-            fee = self._fee_model.calc(exec_price * sell_qty)
-            order = Order(
-                id=str(uuid.uuid4()),
-                dt=bar.dt,
-                symbol=bar.symbol,
-                side=side,
-                quantity=sell_qty,
-                reason=signal.reason,
-            )
-            fill = Fill(
-                order_id=order.id,
-                dt=bar.dt,
-                symbol=bar.symbol,
-                side=side,
-                quantity=sell_qty,
-                price=exec_price,
-                fee=fee,
-                slippage=slippage,
-            )
-            return order, fill
-
         raise ValueError("MVP 仅支持 target_position 为 0 或 1")
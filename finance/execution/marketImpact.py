@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from finance.core.coreTypes import Side
+from finance.data.barArrays import BarArrays
+
+
+def _trailing_stats(x: np.ndarray, end: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """对每个 t 取 x[max(end[t]-window, 0) : end[t]] 的 (个数, 均值, 平方均值)，前缀和 O(n)。"""
+
+    cs1 = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    cs2 = np.concatenate(([0.0], np.cumsum(x * x, dtype=np.float64)))
+    lo = np.maximum(end - window, 0)
+    count = end - lo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cs1[end] - cs1[lo]) / count
+        sq = (cs2[end] - cs2[lo]) / count
+    return count, mean, sq
+
+
+@dataclass(frozen=True)
+class LiquidityProfile:
+    """单标的的流动性数组（按 bar 行号对齐，整段预先算好一次，下单时只做查表）。
+
+    - adv：之前 adv_window 根 bar 的平均成交量（不含当根 bar，t=0 为 NaN）
+    - volatility：之前 vol_window 个 close-to-close 收益的标准差（不足 2 个收益时为 NaN）
+    """
+
+    ts: np.ndarray
+    adv: np.ndarray
+    volatility: np.ndarray
+
+    @classmethod
+    def build(cls, arrays: BarArrays, adv_window: int = 20, vol_window: int = 20) -> "LiquidityProfile":
+        if adv_window < 1 or vol_window < 2:
+            raise ValueError("adv_window must be >= 1 and vol_window >= 2")
+        volume = np.asarray(arrays.volume, dtype=np.float64)
+        close = np.asarray(arrays.close, dtype=np.float64)
+        n = close.shape[0]
+        t = np.arange(n)
+
+        # bar t 开盘时可用：成交量 volume[:t]；收益 rets[j] = close[j+1]/close[j]-1 中 j+1 <= t-1 的部分
+        count, adv, _ = _trailing_stats(volume, t, adv_window)
+        adv = np.where(count > 0, adv, np.nan)
+
+        rets = close[1:] / close[:-1] - 1.0 if n > 1 else np.zeros(0)
+        count, mean, sq = _trailing_stats(rets, np.maximum(t - 1, 0), vol_window)
+        vol = np.where(count >= 2, np.sqrt(np.maximum(sq - mean * mean, 0.0)), np.nan)
+
+        return cls(ts=np.asarray(arrays.ts, dtype=np.int64), adv=adv, volatility=vol)
+
+    def row_of(self, ts: int) -> int:
+        i = int(np.searchsorted(self.ts, ts))
+        if i >= self.ts.shape[0] or int(self.ts[i]) != int(ts):
+            raise KeyError(ts)
+        return i
+
+
+@dataclass(frozen=True)
+class MarketImpactModel:
+    """按参与率计的冲击成本（叠加在 SlippageModel 的固定 bps 之上）：
+
+        冲击（比例）= impact_coef × volatility × (quantity / adv) ^ exponent
+
+    exponent=0.5 即常见的平方根冲击模型。adv/volatility 缺失（样本开头）时冲击为 0。
+    max_participation 为单根 bar 成交量的参与上限（如 0.1 = 最多成交当根 bar 成交量的 10%），
+    超出部分不在当根 bar 成交，由 Broker 顺延到之后的 bar。
+    """
+
+    impact_coef: float = 1.0
+    exponent: float = 0.5
+    adv_window: int = 20
+    vol_window: int = 20
+    max_participation: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.impact_coef < 0 or self.exponent <= 0:
+            raise ValueError("impact_coef must be >= 0 and exponent > 0")
+        if self.max_participation is not None and not 0 < self.max_participation <= 1:
+            raise ValueError(f"max_participation must be in (0, 1]: {self.max_participation}")
+
+    def profile(self, arrays: BarArrays) -> LiquidityProfile:
+        return LiquidityProfile.build(arrays, self.adv_window, self.vol_window)
+
+    def impact(self, quantity: int, adv: float, volatility: float) -> float:
+        if quantity <= 0 or not adv > 0 or not math.isfinite(volatility):
+            return 0.0
+        return float(self.impact_coef) * float(volatility) * (float(quantity) / float(adv)) ** float(self.exponent)
+
+    def capacity(self, bar_volume: float) -> Optional[int]:
+        """当根 bar 最多可成交的数量（None 表示不限）。"""
+
+        if self.max_participation is None:
+            return None
+        return max(int(math.floor(float(bar_volume) * float(self.max_participation))), 0)
+
+    def exec_price(self, price: float, side: Side, quantity: int, adv: float, volatility: float) -> tuple[float, float]:
+        """在参考价（已含固定滑点）上叠加冲击，返回 (成交价, 每股冲击成本)。"""
+
+        cost = float(price) * self.impact(quantity, adv, volatility)
+        if side == Side.BUY:
+            return float(price) + cost, cost
+        return float(price) - cost, cost
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import heapq
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from finance.core.coreTypes import Order, OrderType, Side
+
+
+def _new_order(
+    *,
+    dt: datetime,
+    symbol: str,
+    side: Side,
+    quantity: int,
+    order_type: OrderType,
+    limit_price: Optional[float] = None,
+    stop_price: Optional[float] = None,
+    reason: str = "",
+) -> Order:
+    if int(quantity) <= 0:
+        raise ValueError("quantity must be > 0")
+    for name, price in (("limit_price", limit_price), ("stop_price", stop_price)):
+        if price is not None and not float(price) > 0:
+            raise ValueError(f"{name} must be > 0: {price}")
+    return Order(
+        id=str(uuid.uuid4()),
+        dt=dt,
+        symbol=symbol,
+        side=side,
+        quantity=int(quantity),
+        order_type=order_type,
+        reason=reason,
+        limit_price=None if limit_price is None else float(limit_price),
+        stop_price=None if stop_price is None else float(stop_price),
+    )
+
+
+def limit_order(dt: datetime, symbol: str, side: Side, quantity: int, limit_price: float, reason: str = "") -> Order:
+    return _new_order(dt=dt, symbol=symbol, side=side, quantity=quantity, order_type=OrderType.LIMIT, limit_price=limit_price, reason=reason)
+
+
+def stop_order(dt: datetime, symbol: str, side: Side, quantity: int, stop_price: float, reason: str = "") -> Order:
+    return _new_order(dt=dt, symbol=symbol, side=side, quantity=quantity, order_type=OrderType.STOP, stop_price=stop_price, reason=reason)
+
+
+def stop_limit_order(
+    dt: datetime, symbol: str, side: Side, quantity: int, stop_price: float, limit_price: float, reason: str = ""
+) -> Order:
+    return _new_order(
+        dt=dt,
+        symbol=symbol,
+        side=side,
+        quantity=quantity,
+        order_type=OrderType.STOP_LIMIT,
+        stop_price=stop_price,
+        limit_price=limit_price,
+        reason=reason,
+    )
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """某根 bar 上被触发的挂单。
+
+    - price：参考成交价（未含滑点）
+    - market：True 表示止损单触发后按市价成交（计滑点）；False 表示按限价或更优价成交（不计滑点）
+    """
+
+    order: Order
+    price: float
+    market: bool
+
+
+# 堆元素：(排序键, 提交序号, order id)；同价位按提交顺序（时间优先）
+_Entry = Tuple[float, int, str]
+
+
+@dataclass
+class _SymbolBook:
+    """单标的的四个堆；堆顶就是最先会被触发的挂单。
+
+    - buy_limit：限价越高越先成交（键为 -limit）
+    - sell_limit：限价越低越先成交（键为 limit）
+    - buy_stop：止损价越低越先触发（键为 stop）
+    - sell_stop：止损价越高越先触发（键为 -stop）
+    - market：已触发止损单顺延的未成交部分，下一根 bar 开盘按市价成交（键为 0，按提交顺序）
+    """
+
+    buy_limit: List[_Entry] = field(default_factory=list)
+    sell_limit: List[_Entry] = field(default_factory=list)
+    buy_stop: List[_Entry] = field(default_factory=list)
+    sell_stop: List[_Entry] = field(default_factory=list)
+    market: List[_Entry] = field(default_factory=list)
+    stale: int = 0
+
+    def heaps(self) -> Tuple[List[_Entry], ...]:
+        return (self.buy_limit, self.sell_limit, self.buy_stop, self.sell_stop, self.market)
+
+
+class OrderBook:
+    """按标的、按触发价组织的挂单簿（限价/止损/止损限价，挂单直到成交或撤单）。
+
+    撤单只从 live 表中删除（惰性删除），堆顶遇到已撤订单时跳过；
+    堆中失效条目多于存活订单时整体重建。每根 bar 只查看堆顶，复杂度与被触发的订单数相关，
+    与挂单总数无关（再加 O(log n) 的出堆）。
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[str, _SymbolBook] = {}
+        self._live: Dict[str, Order] = {}
+        self._seq: Dict[str, int] = {}
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._live
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        orders = sorted(self._live.values(), key=lambda o: self._seq[o.id])
+        return [o for o in orders if symbol is None or o.symbol == symbol]
+
+    def submit(self, order: Order) -> str:
+        if order.order_type == OrderType.MARKET:
+            raise ValueError("市价单不进入挂单簿")
+        if order.id in self._live:
+            raise ValueError(f"duplicate order id: {order.id}")
+        if order.order_type in (OrderType.LIMIT, OrderType.STOP_LIMIT) and order.limit_price is None:
+            raise ValueError(f"{order.order_type.value} 需要 limit_price")
+        if order.order_type in (OrderType.STOP, OrderType.STOP_LIMIT) and order.stop_price is None:
+            raise ValueError(f"{order.order_type.value} 需要 stop_price")
+
+        self._counter += 1
+        self._seq[order.id] = self._counter
+        self._live[order.id] = order
+        book = self._books.setdefault(order.symbol, _SymbolBook())
+        if order.order_type == OrderType.LIMIT:
+            self._push_limit(book, order)
+        elif order.side == Side.BUY:
+            heapq.heappush(book.buy_stop, (float(order.stop_price), self._counter, order.id))
+        else:
+            heapq.heappush(book.sell_stop, (-float(order.stop_price), self._counter, order.id))
+        return order.id
+
+    def carry(self, order: Order) -> str:
+        """已触发订单的未成交部分（如受成交量参与上限限制）重新入簿：
+
+        止损单已触发，之后的 bar 开盘按市价成交；限价/止损限价单按限价继续挂单。
+        """
+
+        if order.id in self._live:
+            raise ValueError(f"duplicate order id: {order.id}")
+        self._counter += 1
+        self._seq[order.id] = self._counter
+        self._live[order.id] = order
+        book = self._books.setdefault(order.symbol, _SymbolBook())
+        if order.order_type == OrderType.STOP:
+            heapq.heappush(book.market, (0.0, self._counter, order.id))
+        else:
+            self._push_limit(book, order)
+        return order.id
+
+    def cancel(self, order_id: str) -> bool:
+        order = self._live.pop(order_id, None)
+        if order is None:
+            return False
+        del self._seq[order_id]
+        book = self._books[order.symbol]
+        book.stale += 1
+        if book.stale > 64 and book.stale > sum(len(h) for h in book.heaps()) // 2:
+            self._compact(book)
+        return True
+
+    def match(self, symbol: str, open_: float, high: float, low: float) -> List[Trigger]:
+        """用一根 bar 的 open/high/low 撮合该标的的挂单，被触发的订单移出挂单簿。
+
+        跳空处理：开盘价已越过触发价/限价时按 open 成交（限价单得到更优价，止损单承受跳空损失）；
+        否则按触发价/限价成交。止损限价单触发后转为限价单：当根 bar 内限价可达则成交，
+        否则留在挂单簿中等待后续 bar。返回顺序为先卖后买，同方向按提交顺序。
+        """
+
+        book = self._books.get(symbol)
+        if book is None or not self._live:
+            return []
+        out: List[Tuple[int, Trigger]] = []
+
+        # 0) 顺延的已触发止损单：开盘市价
+        while book.market:
+            order = self._pop(book, book.market)
+            if order is not None:
+                out.append(self._fill(order, open_, True))
+
+        # 1) 止损 / 止损限价触发
+        while book.buy_stop and book.buy_stop[0][0] <= high:
+            order = self._pop(book, book.buy_stop)
+            if order is None:
+                continue
+            p = max(open_, float(order.stop_price))
+            if order.order_type == OrderType.STOP:
+                out.append(self._fill(order, p, True))
+            elif p <= order.limit_price:
+                out.append(self._fill(order, p, False))
+            elif low <= order.limit_price:
+                out.append(self._fill(order, float(order.limit_price), False))
+            else:
+                self._push_limit(book, order)
+
+        while book.sell_stop and -book.sell_stop[0][0] >= low:
+            order = self._pop(book, book.sell_stop)
+            if order is None:
+                continue
+            p = min(open_, float(order.stop_price))
+            if order.order_type == OrderType.STOP:
+                out.append(self._fill(order, p, True))
+            elif p >= order.limit_price:
+                out.append(self._fill(order, p, False))
+            elif high >= order.limit_price:
+                out.append(self._fill(order, float(order.limit_price), False))
+            else:
+                self._push_limit(book, order)
+
+        # 2) 限价（含之前 bar 已触发的止损限价单）
+        while book.buy_limit and -book.buy_limit[0][0] >= low:
+            order = self._pop(book, book.buy_limit)
+            if order is not None:
+                out.append(self._fill(order, min(open_, float(order.limit_price)), False))
+
+        while book.sell_limit and book.sell_limit[0][0] <= high:
+            order = self._pop(book, book.sell_limit)
+            if order is not None:
+                out.append(self._fill(order, max(open_, float(order.limit_price)), False))
+
+        out.sort(key=lambda x: (x[1].order.side != Side.SELL, x[0]))
+        return [t for _, t in out]
+
+    # ---- 内部 ----
+
+    def _push_limit(self, book: _SymbolBook, order: Order) -> None:
+        seq = self._seq[order.id]
+        if order.side == Side.BUY:
+            heapq.heappush(book.buy_limit, (-float(order.limit_price), seq, order.id))
+        else:
+            heapq.heappush(book.sell_limit, (float(order.limit_price), seq, order.id))
+
+    def _pop(self, book: _SymbolBook, heap: List[_Entry]) -> Optional[Order]:
+        _, seq, oid = heapq.heappop(heap)
+        if self._seq.get(oid) != seq:
+            # 已撤单（惰性删除）
+            book.stale = max(book.stale - 1, 0)
+            return None
+        return self._live[oid]
+
+    def _fill(self, order: Order, price: float, market: bool) -> Tuple[int, Trigger]:
+        seq = self._seq.pop(order.id)
+        del self._live[order.id]
+        return seq, Trigger(order=order, price=float(price), market=market)
+
+    def _compact(self, book: _SymbolBook) -> None:
+        for heap in book.heaps():
+            heap[:] = [e for e in heap if self._seq.get(e[2]) == e[1]]
+            heapq.heapify(heap)
+        book.stale = 0
@@ -3,6 +3,8 @@ from __future__ import annotations
 from collections import deque
 from typing import Deque, Iterable, List, Optional
 
+import numpy as np
+
 
 class RollingSma:
     """按顺序更新的 SMA（用于逐 bar 回测）。"""
@@ -34,3 +36,24 @@ def compute_sma_series(values: Iterable[float], window: int) -> List[Optional[fl
     for v in values:
         out.append(r.update(float(v)))
     return out
+
+
+def rolling_sma_array(values: np.ndarray, window: int) -> np.ndarray:
+    """与 RollingSma 逐位一致的 SMA 数组（前 window-1 为 NaN）。
+
+    按同样的顺序维护累加和（先减最旧、再加最新），而不是用前缀和相减：
+    两者舍入不同，价格相等或接近时 fast > slow 的比较结果可能不一样。
+    """
+
+    if window <= 0:
+        raise ValueError("window must be > 0")
+    x = np.asarray(values, dtype=np.float64).tolist()
+    out = np.full(len(x), np.nan)
+    total = 0.0
+    for i, price in enumerate(x):
+        if i >= window:
+            total -= x[i - window]
+        total += price
+        if i >= window - 1:
+            out[i] = total / window
+    return out
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from finance.core.coreTypes import Bar, BookEquityPoint, Fill, Order, Side, TradeRecord
+from finance.portfolio.portfolio import fill_cash_delta
+from finance.portfolio.riskManager import RiskManager
+
+
+class MultiAssetPortfolio:
+    """多标的组合：持仓用按 symbol id 对齐的 NumPy 数组存储。
+
+    - quantities / avg_prices / last_prices 三个数组下标一致（symbol_ids[symbol]）
+    - apply_fill 原地更新对应槽位，现金与 RiskManager 校验规则与 Portfolio 相同
+    - mark_to_market 对整本持仓做一次点积（quantities · last_prices）
+    - MVP：只支持多头（卖出超过持仓会报错）
+    """
+
+    def __init__(self, symbols: Sequence[str], initial_cash: float, risk_manager: Optional[RiskManager] = None) -> None:
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("symbols 存在重复")
+
+        self.symbols: List[str] = list(symbols)
+        self.symbol_ids: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.initial_cash = float(initial_cash)
+        self.risk_manager = risk_manager or RiskManager()
+
+        n = len(self.symbols)
+        self.cash = float(initial_cash)
+        self.quantities = np.zeros(n, dtype=np.int64)
+        self.avg_prices = np.zeros(n, dtype=np.float64)
+        # 尚未见过价格的标的按 0 估值（此时必然没有持仓）
+        self.last_prices = np.zeros(n, dtype=np.float64)
+
+        self.equity_curve: List[BookEquityPoint] = []
+        self.trades: List[TradeRecord] = []
+
+    def symbol_id(self, symbol: str) -> int:
+        try:
+            return self.symbol_ids[symbol]
+        except KeyError:
+            raise ValueError(f"Unknown symbol: {symbol}") from None
+
+    def position_qty(self, symbol: str) -> int:
+        return int(self.quantities[self.symbol_id(symbol)])
+
+    def position_values(self) -> np.ndarray:
+        return self.quantities * self.last_prices
+
+    def total_equity(self) -> float:
+        return float(self.cash) + float(np.dot(self.quantities, self.last_prices))
+
+    def weights(self) -> np.ndarray:
+        equity = self.total_equity()
+        if equity <= 0:
+            return np.zeros(len(self.symbols), dtype=np.float64)
+        return self.position_values() / equity
+
+    def apply_fill(self, order: Order, fill: Fill) -> None:
+        if order.id != fill.order_id:
+            raise ValueError("Order/Fill id mismatch")
+        if order.symbol != fill.symbol:
+            raise ValueError("Symbol mismatch")
+        i = self.symbol_id(fill.symbol)
+
+        self.risk_manager.validate_fill(cash_before=self.cash, fill=fill)
+
+        cash_delta = fill_cash_delta(fill)
+        qty = int(self.quantities[i])
+        if fill.side == Side.BUY:
+            new_qty = qty + int(fill.quantity)
+            if new_qty < 0:
+                raise ValueError(f"BUY fill would make quantity negative: {qty} + {fill.quantity} = {new_qty}")
+            # 加权平均成本（不把 fee/slippage 计入均价；成本在现金侧体现）
+            self.avg_prices[i] = 0.0 if new_qty == 0 else (self.avg_prices[i] * qty + fill.price * fill.quantity) / new_qty
+        else:
+            new_qty = qty - int(fill.quantity)
+            if new_qty < 0:
+                raise ValueError("Sell quantity exceeds position")
+            if new_qty == 0:
+                self.avg_prices[i] = 0.0
+        self.quantities[i] = new_qty
+        self.cash += cash_delta
+
+        self.trades.append(
+            TradeRecord(
+                dt=fill.dt,
+                symbol=fill.symbol,
+                side=fill.side,
+                quantity=fill.quantity,
+                price=fill.price,
+                fee=fill.fee,
+                slippage=fill.slippage,
+                order_id=order.id,
+                reason=order.reason,
+            )
+        )
+
+    def mark_to_market(self, dt: datetime, prices: np.ndarray) -> BookEquityPoint:
+        """按 symbol id 对齐的收盘价数组盯市；NaN（停牌/缺失）沿用上一次价格。"""
+
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape != self.last_prices.shape:
+            raise ValueError(f"prices shape {prices.shape} != ({len(self.symbols)},)")
+        np.copyto(self.last_prices, prices, where=~np.isnan(prices))
+
+        position_value = float(np.dot(self.quantities, self.last_prices))
+        pt = BookEquityPoint(
+            dt=dt,
+            cash=float(self.cash),
+            position_value=position_value,
+            total_equity=float(self.cash) + position_value,
+            holdings=int(np.count_nonzero(self.quantities)),
+        )
+        self.equity_curve.append(pt)
+        return pt
+
+    def mark_to_market_bars(self, dt: datetime, bars: Iterable[Bar]) -> BookEquityPoint:
+        """便捷入口：用同一时点的若干 Bar 盯市（未给出的标的沿用上一次价格）。"""
+
+        prices = np.full(len(self.symbols), np.nan)
+        for bar in bars:
+            prices[self.symbol_id(bar.symbol)] = bar.close
+        return self.mark_to_market(dt, prices)
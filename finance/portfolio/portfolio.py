@@ -3,8 +3,25 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Optional
 
-from finance.core.coreTypes import Bar, EquityPoint, Fill, Order, Position, Side, TradeRecord
+from finance.core.compactTypes import CompactEquityPoint, CompactTradeRecord
+from finance.core.coreTypes import Bar, Fill, Order, Position, Side
 from finance.portfolio.riskManager import RiskManager
+from finance.portfolio.runJournal import RunJournal
+
+
+def fill_cash_delta(fill: Fill) -> float:
+    """Fill 对现金的影响（买入为负、卖出为正）。
+
+    fill.price 已是含滑点的成交价，fill.slippage 只是记录用的滑点成本，不能再从现金里扣一次；
+    现金侧只额外扣手续费。
+    """
+
+    notional = float(fill.price) * int(fill.quantity)
+    if fill.side == Side.BUY:
+        return -(notional + float(fill.fee))
+    if fill.side == Side.SELL:
+        return notional - float(fill.fee)
+    raise ValueError(f"Unsupported side: {fill.side}")
 
 
 @dataclass
@@ -15,18 +32,26 @@ class Portfolio:
 
     cash: float
     position: Position
-    equity_curve: List[EquityPoint]
-    trades: List[TradeRecord]
+    equity_curve: List[CompactEquityPoint]
+    trades: List[CompactTradeRecord]
+
+    def __init__(
+        self,
+        symbol: str,
+        initial_cash: float,
+        risk_manager: Optional[RiskManager] = None,
+        journal: Optional[RunJournal] = None,
+    ) -> None:
+        """journal：给出时净值点与成交追加写入其内存映射文件，而不是保存在内存列表里。"""
 
-    def __init__(self, symbol: str, initial_cash: float, risk_manager: Optional[RiskManager] = None) -> None:
         self.symbol = symbol
         self.initial_cash = float(initial_cash)
         self.risk_manager = risk_manager or RiskManager()
 
         self.cash = float(initial_cash)
         self.position = Position(symbol=symbol)
-        self.equity_curve = []
-        self.trades = []
+        self.equity_curve = journal.equity if journal is not None else []
+        self.trades = journal.trades if journal is not None else []
 
     @property
     def position_qty(self) -> int:
@@ -40,21 +65,13 @@ class Portfolio:
 
         self.risk_manager.validate_fill(cash_before=self.cash, fill=fill)
 
-        notional = float(fill.price) * int(fill.quantity)
-        cost = float(fill.fee) + float(fill.slippage)
-
-        if fill.side == Side.BUY:
-            self.cash -= notional + cost
-        elif fill.side == Side.SELL:
-            self.cash += notional - cost
-        else:
-            raise ValueError(f"Unsupported side: {fill.side}")
-
+        cash_delta = fill_cash_delta(fill)
         self.position.apply_fill(fill)
+        self.cash += cash_delta
 
         self.trades.append(
-            TradeRecord(
-                dt=fill.dt,
+            CompactTradeRecord(
+                ts=fill.ts,
                 symbol=fill.symbol,
                 side=fill.side,
                 quantity=fill.quantity,
@@ -66,7 +83,7 @@ class Portfolio:
             )
         )
 
-    def mark_to_market(self, bar: Bar) -> EquityPoint:
+    def mark_to_market(self, bar: Bar) -> CompactEquityPoint:
         if bar.symbol != self.symbol:
             raise ValueError("Symbol mismatch")
 
@@ -81,8 +98,8 @@ class Portfolio:
                 f"total={total_equity}, expected={expected_equity}, diff={abs(total_equity - expected_equity)}"
             )
 
-        pt = EquityPoint(
-            dt=bar.dt,
+        pt = CompactEquityPoint(
+            ts=bar.ts,
             cash=float(self.cash),
             position_qty=int(self.position.quantity),
             close=float(bar.close),
@@ -1,17 +1,199 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from enum import IntEnum, IntFlag
+from typing import Optional
+
+import numpy as np
 
 from finance.core.coreTypes import Fill, RiskRejectedError, Side
 
 
+class LimitFlag(IntFlag):
+    """批量预检中触发的限制（按位组合，写入 PreTradeResult.flags）。"""
+
+    NONE = 0
+    INVALID_PRICE = 1
+    SHORT = 2
+    ORDER_NOTIONAL = 4
+    DAILY_TURNOVER = 8
+    SYMBOL_WEIGHT = 16
+    NET_EXPOSURE = 32
+    GROSS_EXPOSURE = 64
+    CASH = 128
+
+
+class OrderStatus(IntEnum):
+    ACCEPTED = 0
+    SCALED = 1
+    REJECTED = 2
+
+
+@dataclass(frozen=True)
+class RiskLimits:
+    """组合层面的事前风控限制；None 表示不限制。
+
+    - 权重/敞口/换手均以当前总权益为分母（比例），max_order_notional 为金额
+    - lot_size：被缩量的订单向 0 取整到整手（A 股 100 股）；清仓卖出不受整手约束
+    """
+
+    max_weight_per_symbol: Optional[float] = None
+    max_gross_exposure: Optional[float] = None
+    max_net_exposure: Optional[float] = None
+    max_order_notional: Optional[float] = None
+    max_daily_turnover: Optional[float] = None
+    allow_short: bool = False
+    lot_size: int = 1
+
+
+@dataclass(frozen=True)
+class PreTradeResult:
+    """批量预检结果（与输入订单数组一一对应，数量带符号：买为正、卖为负）。"""
+
+    requested: np.ndarray
+    accepted: np.ndarray
+    status: np.ndarray
+    flags: np.ndarray
+    turnover: float
+
+    @property
+    def rejected_mask(self) -> np.ndarray:
+        return self.status == OrderStatus.REJECTED
+
+    @property
+    def scaled_mask(self) -> np.ndarray:
+        return self.status == OrderStatus.SCALED
+
+
+# 敞口类限制之间会相互影响（例如缩减空头回补会增大总敞口），多轮收敛；每轮只会缩小 |q|
+_EXPOSURE_PASSES = 3
+
+
 @dataclass(frozen=True)
 class RiskManager:
-    """MVP 风控：仅做最小现金校验。"""
+    """风控：
+
+    - validate_fill：成交后逐笔的最小现金校验（原 MVP 行为）
+    - check_orders：同一时点整批订单的事前校验，全部为数组运算，不逐单抛异常
+    """
+
+    limits: RiskLimits = field(default_factory=RiskLimits)
 
     def validate_fill(self, *, cash_before: float, fill: Fill) -> None:
         if fill.side == Side.BUY:
-            required = fill.price * fill.quantity + fill.fee + fill.slippage
+            # fill.price 已含滑点，所需现金 = 成交额 + 手续费
+            required = fill.price * fill.quantity + fill.fee
             if cash_before + 1e-12 < required:
                 raise RiskRejectedError(f"现金不足：cash={cash_before}, required={required}")
         # SELL 不做校验（持仓校验在 Position.apply_fill 做）
+
+    def check_orders(
+        self,
+        *,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        positions: np.ndarray,
+        equity: float,
+        cash: Optional[float] = None,
+        turnover_used: float = 0.0,
+    ) -> PreTradeResult:
+        """校验一批订单，返回接受/缩量/拒绝后的数量。
+
+        quantities/prices/positions 为按 symbol id 对齐的数组；turnover_used 为当日已成交金额，
+        cash 给出时按“卖出回款可用于买入”校验买单现金。
+        """
+
+        lim = self.limits
+        requested = np.asarray(quantities, dtype=np.int64)
+        p = np.asarray(prices, dtype=np.float64)
+        pos = np.asarray(positions, dtype=np.float64)
+        if not (requested.shape == p.shape == pos.shape):
+            raise ValueError("quantities/prices/positions 形状不一致")
+        if not equity > 0:
+            raise ValueError(f"equity must be > 0: {equity}")
+
+        q = requested.astype(np.float64)
+        flags = np.zeros(q.shape, dtype=np.int32)
+
+        def shrink(new_q: np.ndarray, flag: LimitFlag) -> np.ndarray:
+            flags[np.abs(new_q) < np.abs(q) - 1e-9] |= int(flag)
+            return new_q
+
+        bad_price = ~(p > 0)
+        q = shrink(np.where(bad_price, 0.0, q), LimitFlag.INVALID_PRICE)
+        p = np.where(bad_price, 1.0, p)
+
+        if not lim.allow_short:
+            q = shrink(np.maximum(q, -np.maximum(pos, 0.0)), LimitFlag.SHORT)
+
+        if lim.max_order_notional is not None:
+            cap = float(lim.max_order_notional) / p
+            q = shrink(np.clip(q, -cap, cap), LimitFlag.ORDER_NOTIONAL)
+
+        if lim.max_daily_turnover is not None:
+            remaining = max(float(lim.max_daily_turnover) * equity - float(turnover_used), 0.0)
+            traded = float(np.abs(q) @ p)
+            if traded > remaining:
+                q = shrink(q * (remaining / traded), LimitFlag.DAILY_TURNOVER)
+
+        for _ in range(_EXPOSURE_PASSES):
+            before = q.copy()
+
+            if lim.max_weight_per_symbol is not None:
+                cap_qty = float(lim.max_weight_per_symbol) * equity / p
+                new = pos + q
+                grows = (np.abs(new) > np.abs(pos)) | (np.sign(new) != np.sign(pos))
+                over = grows & (np.abs(new) > cap_qty)
+                clipped = np.where(over, np.clip(new, -cap_qty, cap_qty) - pos, q)
+                # 原持仓已超限时不允许继续加仓（截断后方向反转 => 置 0）
+                clipped = np.where(np.sign(clipped) != np.sign(q), 0.0, clipped)
+                q = shrink(clipped, LimitFlag.SYMBOL_WEIGHT)
+
+            if lim.max_net_exposure is not None:
+                net = float((pos + q) @ p)
+                limit = float(lim.max_net_exposure) * equity
+                if abs(net) > limit:
+                    same_dir = np.sign(q) == np.sign(net)
+                    contrib = float(np.abs(q[same_dir]) @ p[same_dir])
+                    f = max(0.0, 1.0 - (abs(net) - limit) / contrib) if contrib > 0 else 1.0
+                    q = shrink(np.where(same_dir, q * f, q), LimitFlag.NET_EXPOSURE)
+
+            if lim.max_gross_exposure is not None:
+                gross = float(np.abs(pos + q) @ p)
+                limit = float(lim.max_gross_exposure) * equity
+                if gross > limit:
+                    inc = np.maximum(np.abs(pos + q) - np.abs(pos), 0.0) * p
+                    total_inc = float(inc.sum())
+                    # |pos + f·q| 关于 f 是凸的，按增量线性缩放是保守的
+                    f = max(0.0, 1.0 - (gross - limit) / total_inc) if total_inc > 0 else 1.0
+                    q = shrink(np.where(inc > 0, q * f, q), LimitFlag.GROSS_EXPOSURE)
+
+            if cash is not None:
+                buys = q > 0
+                buy_notional = float(q[buys] @ p[buys])
+                available = float(cash) + float(-q[~buys] @ p[~buys])
+                if buy_notional > available:
+                    f = max(available, 0.0) / buy_notional
+                    q = shrink(np.where(buys, q * f, q), LimitFlag.CASH)
+
+            if np.array_equal(q, before):
+                break
+
+        # 被缩量的订单向 0 取整到整手；清仓卖出保留零股
+        lot = max(int(lim.lot_size), 1)
+        scaled = np.abs(q) < np.abs(requested) - 1e-9
+        rounded = np.trunc(q / lot) * lot
+        full_close = (q < 0) & np.isclose(-q, pos)
+        accepted = np.where(scaled & ~full_close, rounded, np.trunc(q)).astype(np.int64)
+
+        status = np.full(accepted.shape, int(OrderStatus.ACCEPTED), dtype=np.int8)
+        status[accepted != requested] = int(OrderStatus.SCALED)
+        status[(accepted == 0) & (requested != 0)] = int(OrderStatus.REJECTED)
+
+        return PreTradeResult(
+            requested=requested,
+            accepted=accepted,
+            status=status,
+            flags=flags,
+            turnover=float(np.abs(accepted) @ p),
+        )
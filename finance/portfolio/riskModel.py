@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+# 增量协方差估计与风险预算权重。
+#
+# 估计器逐 bar 喂入 (K,) 收益（NaN 表示该标的本 bar 无收益：停牌/未上市），每次 update 为 O(K²)，
+# 不回看完整历史。缺失值按标的对（pairwise）处理：只有两个标的同时有收益的 bar 才计入二者的协方差。
+# 收益、波动均为单 bar 口径，年化由调用方传 periods_per_year。
+
+
+class _CovarianceEstimator(ABC):
+    def __init__(self, k: int, min_periods: int) -> None:
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        if min_periods < 2:
+            raise ValueError("min_periods must be >= 2")
+        self.k = int(k)
+        self.min_periods = int(min_periods)
+
+    def _prepare(self, returns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        r = np.asarray(returns, dtype=np.float64)
+        if r.shape != (self.k,):
+            raise ValueError(f"returns shape {r.shape} != ({self.k},)")
+        valid = ~np.isnan(r)
+        return np.where(valid, r, 0.0), valid.astype(np.float64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """(K,) 各标的计入估计的有效收益个数。"""
+
+        return np.diagonal(self._pair_counts()).astype(np.int64)
+
+    def ready(self) -> np.ndarray:
+        """(K,) 有效收益个数达到 min_periods 的标的。"""
+
+        return self.counts >= self.min_periods
+
+    def volatility(self) -> np.ndarray:
+        return np.sqrt(np.maximum(np.diagonal(self.covariance()), 0.0))
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        vol = np.sqrt(np.maximum(np.diagonal(cov), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(vol, vol)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(vol > 0, 1.0, np.nan))
+        return corr
+
+    @abstractmethod
+    def update(self, returns: np.ndarray) -> None:
+        """喂入一根 bar 的 (K,) 收益。"""
+
+    @abstractmethod
+    def covariance(self) -> np.ndarray:
+        """(K, K) 单 bar 协方差；样本不足的标的对为 NaN。"""
+
+    @abstractmethod
+    def _pair_counts(self) -> np.ndarray:
+        """(K, K) 各标的对计入估计的样本数。"""
+
+
+class EwmaCovariance(_CovarianceEstimator):
+    """指数加权协方差（零均值，RiskMetrics 口径）：S ← λS + (1-λ) r rᵀ。
+
+    权重和 W 同样按标的对递推，covariance() 返回 S / W，前期样本少时不会被初始值 0 拉低。
+    lam 与 halflife 二选一（halflife 以 bar 计，λ = 0.5^(1/halflife)）。
+    """
+
+    def __init__(self, k: int, *, halflife: Optional[float] = None, lam: Optional[float] = None, min_periods: int = 20) -> None:
+        super().__init__(k, min_periods)
+        if (halflife is None) == (lam is None):
+            raise ValueError("halflife 与 lam 需且仅需指定一个")
+        if halflife is not None:
+            if halflife <= 0:
+                raise ValueError("halflife must be > 0")
+            lam = 0.5 ** (1.0 / float(halflife))
+        if not 0.0 < float(lam) < 1.0:
+            raise ValueError("lam must be in (0, 1)")
+        self.lam = float(lam)
+        self._s = np.zeros((self.k, self.k))
+        self._w = np.zeros((self.k, self.k))
+        self._n = np.zeros((self.k, self.k))
+
+    def update(self, returns: np.ndarray) -> None:
+        r, m = self._prepare(returns)
+        pair = np.outer(m, m)
+        # 缺失的标的对保持不变：衰减系数取 1
+        decay = np.where(pair > 0, self.lam, 1.0)
+        self._s *= decay
+        self._s += (1.0 - self.lam) * np.outer(r, r)
+        self._w *= decay
+        self._w += (1.0 - self.lam) * pair
+        self._n += pair
+
+    def covariance(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self._w > 0, self._s / self._w, np.nan)
+
+    def _pair_counts(self) -> np.ndarray:
+        return self._n
+
+
+class RollingCovariance(_CovarianceEstimator):
+    """最近 window 根 bar 的样本协方差（ddof=1）。
+
+    维护成对的 Σ1、Σr、Σrrᵀ，新 bar 加入、最旧 bar 移出各一次外积；
+    每满 window 次更新从环形缓冲区重算一次累加量，避免长时间加减带来的浮点漂移（均摊仍为 O(K²)）。
+    """
+
+    def __init__(self, k: int, *, window: int, min_periods: Optional[int] = None) -> None:
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        super().__init__(k, window if min_periods is None else min_periods)
+        if self.min_periods > window:
+            raise ValueError("min_periods must be <= window")
+        self.window = int(window)
+        self._buf = np.full((self.window, self.k), np.nan)
+        self._pos = 0
+        self._updates = 0
+        self._n = np.zeros((self.k, self.k))
+        self._sx = np.zeros((self.k, self.k))
+        self._sxy = np.zeros((self.k, self.k))
+
+    def _add(self, r: np.ndarray, m: np.ndarray, sign: float) -> None:
+        self._n += sign * np.outer(m, m)
+        self._sx += sign * np.outer(r, m)
+        self._sxy += sign * np.outer(r, r)
+
+    def update(self, returns: np.ndarray) -> None:
+        r, m = self._prepare(returns)
+        old = self._buf[self._pos]
+        if self._updates >= self.window:
+            valid = ~np.isnan(old)
+            self._add(np.where(valid, old, 0.0), valid.astype(np.float64), -1.0)
+        self._buf[self._pos] = np.where(m > 0, r, np.nan)
+        self._add(r, m, 1.0)
+        self._pos = (self._pos + 1) % self.window
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        valid = ~np.isnan(self._buf)
+        m = valid.astype(np.float64)
+        r = np.where(valid, self._buf, 0.0)
+        self._n = m.T @ m
+        self._sx = r.T @ m
+        self._sxy = r.T @ r
+
+    def covariance(self) -> np.ndarray:
+        n = self._n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self._sxy - self._sx * self._sx.T / n) / (n - 1.0)
+        return np.where(n >= 2, cov, np.nan)
+
+    def _pair_counts(self) -> np.ndarray:
+        return self._n
+
+
+# ---------- 由协方差得到目标权重（和为 1 的多头权重；active 之外的标的权重为 0） ----------
+
+
+def _active_block(cov: np.ndarray, active: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    cov = np.asarray(cov, dtype=np.float64)
+    if cov.ndim != 2 or cov.shape[0] != cov.shape[1]:
+        raise ValueError(f"cov must be square: {cov.shape}")
+    diag = np.diagonal(cov)
+    mask = np.isfinite(diag) & (diag > 0)
+    if active is not None:
+        mask &= np.asarray(active, dtype=bool)
+    idx = np.flatnonzero(mask)
+    block = np.nan_to_num(cov[np.ix_(idx, idx)])
+    return idx, block
+
+
+def inverse_volatility_weights(cov: np.ndarray, active: Optional[np.ndarray] = None) -> np.ndarray:
+    """w_i ∝ 1/σ_i：忽略相关性时各标的风险贡献相等。"""
+
+    idx, block = _active_block(cov, active)
+    w = np.zeros(np.asarray(cov).shape[0])
+    if idx.size:
+        inv = 1.0 / np.sqrt(np.diagonal(block))
+        w[idx] = inv / inv.sum()
+    return w
+
+
+def risk_parity_weights(
+    cov: np.ndarray,
+    active: Optional[np.ndarray] = None,
+    budgets: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 1000,
+) -> np.ndarray:
+    """等风险贡献（或按 budgets 分配风险）权重：w_i (Σw)_i ∝ b_i。
+
+    循环坐标下降：逐个标的解一元二次方程 σ_ii x_i² + c_i x_i - b_i = 0（c_i 为其余标的的协方差贡献），
+    每轮 O(K²)，协方差半正定时收敛到唯一正解。
+    """
+
+    idx, block = _active_block(cov, active)
+    w = np.zeros(np.asarray(cov).shape[0])
+    if not idx.size:
+        return w
+    b = np.ones(idx.size) if budgets is None else np.asarray(budgets, dtype=np.float64)[idx]
+    if np.any(b <= 0):
+        raise ValueError("budgets must be > 0 for active symbols")
+    b = b / b.sum()
+
+    diag = np.diagonal(block)
+    x = 1.0 / np.sqrt(diag)
+    x /= np.sqrt(x @ block @ x)
+    sx = block @ x
+    for _ in range(max_iter):
+        prev = x.copy()
+        for i in range(idx.size):
+            c = sx[i] - diag[i] * x[i]
+            xi = (-c + np.sqrt(c * c + 4.0 * diag[i] * b[i])) / (2.0 * diag[i])
+            sx += block[:, i] * (xi - x[i])
+            x[i] = xi
+        if np.max(np.abs(x - prev)) <= tol * np.max(np.abs(x)):
+            break
+    w[idx] = x / x.sum()
+    return w
+
+
+def risk_contributions(weights: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """各标的对组合方差的贡献占比 w_i (Σw)_i / wᵀΣw。"""
+
+    w = np.asarray(weights, dtype=np.float64)
+    c = np.nan_to_num(np.asarray(cov, dtype=np.float64))
+    rc = w * (c @ w)
+    total = rc.sum()
+    return rc / total if total > 0 else np.zeros_like(w)
+
+
+def scale_to_target_vol(
+    weights: np.ndarray,
+    cov: np.ndarray,
+    target_vol: float,
+    periods_per_year: float = 252.0,
+    max_gross: float = 1.0,
+) -> np.ndarray:
+    """整体缩放权重，使组合年化波动 sqrt(wᵀΣw · periods_per_year) 等于 target_vol；总仓位不超过 max_gross。"""
+
+    if target_vol <= 0:
+        raise ValueError("target_vol must be > 0")
+    w = np.asarray(weights, dtype=np.float64)
+    c = np.nan_to_num(np.asarray(cov, dtype=np.float64))
+    vol = float(np.sqrt(max(w @ c @ w, 0.0) * periods_per_year))
+    gross = float(np.abs(w).sum())
+    if vol <= 0 or gross <= 0:
+        return w
+    scale = min(target_vol / vol, max_gross / gross)
+    return w * scale
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from abc import abstractmethod
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from finance.core.compactTypes import CompactEquityPoint, CompactTradeRecord
+from finance.core.coreTypes import EquityPoint, Side, TradeRecord
+
+# 文件格式：32 字节头（magic, 记录字节数, 记录数, 保留）+ 定长记录（numpy 结构化 dtype，小端）。
+# 记录数在每条记录写完之后才更新，进程中途退出时头里的记录数之前的数据都是完整的。
+
+_MAGIC = b"FJRNL001"
+_HEADER = struct.Struct("<8sqqq")
+_COUNT_OFFSET = 16
+_INITIAL_CAPACITY = 1024
+_ITER_CHUNK = 4096
+
+EQUITY_FILENAME = "equity.bin"
+TRADES_FILENAME = "trades.bin"
+
+EQUITY_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("cash", "<f8"),
+        ("position_qty", "<i8"),
+        ("close", "<f8"),
+        ("position_value", "<f8"),
+        ("total_equity", "<f8"),
+    ]
+)
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("side", "i1"),
+        ("quantity", "<i8"),
+        ("price", "<f8"),
+        ("fee", "<f8"),
+        ("slippage", "<f8"),
+        ("symbol", "S16"),
+        ("order_id", "S40"),
+        ("reason", "S64"),
+    ]
+)
+
+
+class RecordFile:
+    """定长记录的内存映射文件：写满后按 2 倍扩容并重新映射，记录读出为零拷贝的结构化数组视图。
+
+    扩容时旧映射不主动关闭：之前取出的数组视图仍引用它，随视图释放自动回收。
+    """
+
+    def __init__(self, path: str, dtype: np.dtype, fd: int, count: int, capacity: int, writable: bool) -> None:
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self._fd = fd
+        self._count = count
+        self._capacity = capacity
+        self._writable = writable
+        self._mm: Optional[mmap.mmap] = None
+        self._rows: Optional[np.ndarray] = None
+        self._map()
+
+    @classmethod
+    def create(cls, path: str, dtype: np.dtype, initial_capacity: int = _INITIAL_CAPACITY) -> "RecordFile":
+        if initial_capacity < 1:
+            raise ValueError("initial_capacity must be >= 1")
+        dtype = np.dtype(dtype)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, _HEADER.size + initial_capacity * dtype.itemsize)
+        os.pwrite(fd, _HEADER.pack(_MAGIC, dtype.itemsize, 0, 0), 0)
+        return cls(path, dtype, fd, 0, initial_capacity, writable=True)
+
+    @classmethod
+    def open(cls, path: str, dtype: np.dtype, *, writable: bool = False) -> "RecordFile":
+        """打开已有文件（如中途退出的运行）；只认头里的记录数，其后的残留字节忽略。"""
+
+        dtype = np.dtype(dtype)
+        fd = os.open(path, os.O_RDWR if writable else os.O_RDONLY)
+        try:
+            magic, itemsize, count, _ = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+            if magic != _MAGIC or itemsize != dtype.itemsize:
+                raise ValueError(f"不是匹配的记录文件: {path}")
+            capacity = (os.fstat(fd).st_size - _HEADER.size) // dtype.itemsize
+            if not 0 <= count <= capacity:
+                raise ValueError(f"记录文件头损坏: {path} count={count} capacity={capacity}")
+        except Exception:
+            os.close(fd)
+            raise
+        return cls(path, dtype, fd, int(count), int(capacity), writable=writable)
+
+    def _map(self) -> None:
+        size = _HEADER.size + self._capacity * self.dtype.itemsize
+        access = mmap.ACCESS_WRITE if self._writable else mmap.ACCESS_READ
+        self._mm = mmap.mmap(self._fd, size, access=access)
+        self._rows = np.frombuffer(self._mm, dtype=self.dtype, count=self._capacity, offset=_HEADER.size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def append(self, row: Tuple[Any, ...]) -> None:
+        if not self._writable:
+            raise TypeError(f"记录文件为只读: {self.path}")
+        if self._count == self._capacity:
+            self._capacity *= 2
+            os.ftruncate(self._fd, _HEADER.size + self._capacity * self.dtype.itemsize)
+            self._map()
+        self._rows[self._count] = row
+        self._count += 1
+        struct.pack_into("<q", self._mm, _COUNT_OFFSET, self._count)
+
+    def array(self, limit: Optional[int] = None) -> np.ndarray:
+        """前 limit（默认全部）条记录的只读视图（不复制）。"""
+
+        n = self._count if limit is None else min(int(limit), self._count)
+        view = self._rows[:n]
+        view.flags.writeable = False
+        return view
+
+    def truncate(self, count: int) -> None:
+        """回退到前 count 条记录（从检查点恢复时丢弃之后追加的记录）。"""
+
+        if not 0 <= count <= self._count:
+            raise ValueError(f"count out of range: {count}")
+        self._count = int(count)
+        if self._writable:
+            struct.pack_into("<q", self._mm, _COUNT_OFFSET, self._count)
+
+    def flush(self) -> None:
+        if self._writable and self._mm is not None:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """落盘、把文件截到实际记录长度并转为只读映射（关闭后仍可读取记录）。"""
+
+        if self._fd < 0:
+            return
+        if self._writable:
+            self.flush()
+            self._capacity = self._count
+            os.ftruncate(self._fd, _HEADER.size + self._capacity * self.dtype.itemsize)
+            self._writable = False
+            self._map()
+        os.close(self._fd)
+        self._fd = -1
+
+    def __getstate__(self) -> dict:
+        # 检查点只记录路径与记录数；数据本身已在文件里
+        return {"path": self.path, "dtype": self.dtype, "count": self._count, "writable": self._writable}
+
+    def __setstate__(self, state: dict) -> None:
+        other = RecordFile.open(state["path"], state["dtype"], writable=state["writable"])
+        self.__dict__.update(other.__dict__)
+        self.truncate(state["count"])
+
+
+def _encode(value: str, width: int, field: str, *, truncate: bool = False) -> bytes:
+    raw = value.encode("utf-8")
+    if len(raw) > width:
+        if not truncate:
+            raise ValueError(f"{field} 超过 {width} 字节，无法写入定长记录: {value!r}")
+        raw = raw[:width]
+    return raw
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="ignore")
+
+
+class RecordLog(Sequence):
+    """记录文件上的列表式接口：支持 append / len / 下标 / 迭代，元素按需转换为对象。
+
+    limit 不为 None 时为快照：只看前 limit 条、不可追加（ResultBundle 持有的就是快照）。
+    """
+
+    def __init__(self, file: RecordFile, limit: Optional[int] = None) -> None:
+        self.file = file
+        self._limit = limit
+
+    def __len__(self) -> int:
+        return len(self.file) if self._limit is None else min(self._limit, len(self.file))
+
+    def records(self) -> np.ndarray:
+        return self.file.array(len(self))
+
+    def snapshot(self) -> "RecordLog":
+        return type(self)(self.file, len(self))
+
+    def append(self, item: Any) -> None:
+        if self._limit is not None:
+            raise TypeError("快照不可追加")
+        self.file.append(self._to_row(item))
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        rec = self.records()
+        if isinstance(index, slice):
+            return self._to_items(rec[index])
+        return self._to_items(rec[[index]])[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        rec = self.records()
+        for start in range(0, rec.shape[0], _ITER_CHUNK):
+            yield from self._to_items(rec[start : start + _ITER_CHUNK])
+
+    @abstractmethod
+    def _to_row(self, item: Any) -> Tuple[Any, ...]:
+        """对象 -> 一条记录（字段顺序同 dtype）。"""
+
+    @abstractmethod
+    def _to_items(self, rec: np.ndarray) -> List[Any]:
+        """一段记录 -> 对象列表。"""
+
+
+class EquityLog(RecordLog):
+    def _to_row(self, p: EquityPoint | CompactEquityPoint) -> Tuple[Any, ...]:
+        return (p.ts, p.cash, p.position_qty, p.close, p.position_value, p.total_equity)
+
+    def _to_items(self, rec: np.ndarray) -> List[CompactEquityPoint]:
+        return [
+            CompactEquityPoint(ts=ts, cash=c, position_qty=q, close=px, position_value=v, total_equity=e)
+            for ts, c, q, px, v, e in zip(
+                rec["ts"].tolist(),
+                rec["cash"].tolist(),
+                rec["position_qty"].tolist(),
+                rec["close"].tolist(),
+                rec["position_value"].tolist(),
+                rec["total_equity"].tolist(),
+            )
+        ]
+
+
+class TradeLog(RecordLog):
+    def _to_row(self, t: TradeRecord | CompactTradeRecord) -> Tuple[Any, ...]:
+        return (
+            t.ts,
+            1 if t.side == Side.BUY else -1,
+            t.quantity,
+            t.price,
+            t.fee,
+            t.slippage,
+            _encode(t.symbol, TRADE_DTYPE["symbol"].itemsize, "symbol"),
+            _encode(t.order_id, TRADE_DTYPE["order_id"].itemsize, "order_id"),
+            _encode(t.reason, TRADE_DTYPE["reason"].itemsize, "reason", truncate=True),
+        )
+
+    def _to_items(self, rec: np.ndarray) -> List[CompactTradeRecord]:
+        return [
+            CompactTradeRecord(
+                ts=ts,
+                symbol=_decode(sym),
+                side=Side.BUY if side > 0 else Side.SELL,
+                quantity=q,
+                price=px,
+                fee=fee,
+                slippage=slip,
+                order_id=_decode(oid),
+                reason=_decode(reason),
+            )
+            for ts, side, q, px, fee, slip, sym, oid, reason in zip(
+                rec["ts"].tolist(),
+                rec["side"].tolist(),
+                rec["quantity"].tolist(),
+                rec["price"].tolist(),
+                rec["fee"].tolist(),
+                rec["slippage"].tolist(),
+                rec["symbol"].tolist(),
+                rec["order_id"].tolist(),
+                rec["reason"].tolist(),
+            )
+        ]
+
+
+class RunJournal:
+    """单次运行的落盘记录：净值点写入 equity.bin，成交写入 trades.bin（均在输出目录下）。
+
+    交给 Portfolio(journal=...) 后，equity_curve / trades 不再驻留内存；
+    进程中途退出时，已写入的部分可用 RunJournal.open(directory) 读回。
+    """
+
+    def __init__(self, directory: str, equity: EquityLog, trades: TradeLog) -> None:
+        self.directory = directory
+        self.equity = equity
+        self.trades = trades
+
+    @classmethod
+    def create(cls, directory: str, initial_capacity: int = _INITIAL_CAPACITY) -> "RunJournal":
+        os.makedirs(directory, exist_ok=True)
+        return cls(
+            directory,
+            EquityLog(RecordFile.create(os.path.join(directory, EQUITY_FILENAME), EQUITY_DTYPE, initial_capacity)),
+            TradeLog(RecordFile.create(os.path.join(directory, TRADES_FILENAME), TRADE_DTYPE, initial_capacity)),
+        )
+
+    @classmethod
+    def open(cls, directory: str) -> "RunJournal":
+        """只读打开已有记录。"""
+
+        return cls(
+            directory,
+            EquityLog(RecordFile.open(os.path.join(directory, EQUITY_FILENAME), EQUITY_DTYPE)),
+            TradeLog(RecordFile.open(os.path.join(directory, TRADES_FILENAME), TRADE_DTYPE)),
+        )
+
+    def flush(self) -> None:
+        self.equity.file.flush()
+        self.trades.file.flush()
+
+    def close(self) -> None:
+        self.equity.file.close()
+        self.trades.file.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from finance.core.coreTypes import BookEquityPoint, Fill, Order, Side
+from finance.portfolio.multiAssetPortfolio import MultiAssetPortfolio
+from finance.portfolio.riskManager import RiskManager
+
+
+def split_quantity(total: int, requests: np.ndarray) -> np.ndarray:
+    """把 total 股按 requests（非负）比例拆成整数（最大余数法），和恰为 total。"""
+
+    req = np.asarray(requests, dtype=np.float64)
+    out = np.zeros(req.shape[0], dtype=np.int64)
+    s = req.sum()
+    if total <= 0 or s <= 0:
+        return out
+    raw = req * (total / s)
+    out = np.floor(raw).astype(np.int64)
+    rest = int(total - out.sum())
+    if rest:
+        out[np.argsort(-(raw - out), kind="stable")[:rest]] += 1
+    return out
+
+
+class SleevePortfolio:
+    """多策略资金分仓：每个 sleeve 交易一个标的、持有一份虚拟现金与持仓，合在一本 MultiAssetPortfolio 里。
+
+    - 真实成交只发生在 book 上（同一标的各 sleeve 的订单先轧差，只把净额发给 Broker）
+    - apply_netted_fill 把净额成交拆回各 sleeve：各自按市价记账，净额的手续费与滑点由与净额同向的 sleeve 按数量分摊，
+      反向部分视为 sleeve 之间按市价内部对冲，不产生成本
+    - weights 为各 sleeve 的资金占比，和可以小于 1（剩余现金不属于任何 sleeve）；reallocate 按当前总权益重新划拨现金
+    - 不变式：各 sleeve 持仓之和等于 book 持仓，sleeve 权益之和 + 未分配现金 = book 权益
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        symbols: Sequence[str],
+        weights: Sequence[float],
+        initial_cash: float,
+        risk_manager: Optional[RiskManager] = None,
+    ) -> None:
+        if not (len(names) == len(symbols) == len(weights)) or not names:
+            raise ValueError("names/symbols/weights 长度须一致且非空")
+        if len(set(names)) != len(names):
+            raise ValueError("sleeve 名称存在重复")
+        w = np.asarray(weights, dtype=np.float64)
+        if np.any(w <= 0) or w.sum() > 1.0 + 1e-9:
+            raise ValueError("weights 须为正且和不超过 1")
+
+        self.names: List[str] = list(names)
+        self.weights = w
+        self.book = MultiAssetPortfolio(list(dict.fromkeys(symbols)), initial_cash, risk_manager)
+        self.symbol_index = np.array([self.book.symbol_id(s) for s in symbols], dtype=np.int64)
+        self.cash = w * float(initial_cash)
+        self.quantities = np.zeros(len(self.names), dtype=np.int64)
+        self.equity_curves: Dict[str, List[BookEquityPoint]] = {name: [] for name in self.names}
+
+    @property
+    def initial_cash(self) -> float:
+        return self.book.initial_cash
+
+    def sleeve_ids(self, symbol: str) -> np.ndarray:
+        return np.flatnonzero(self.symbol_index == self.book.symbol_id(symbol))
+
+    def equity(self, prices: Optional[np.ndarray] = None) -> np.ndarray:
+        """(S,) 各 sleeve 权益；prices 为按 book.symbols 对齐的价格（默认最近一次盯市价）。"""
+
+        prices = self.book.last_prices if prices is None else np.where(np.isnan(prices), self.book.last_prices, prices)
+        return self.cash + self.quantities * prices[self.symbol_index]
+
+    def apply_netted_fill(
+        self,
+        symbol: str,
+        deltas: np.ndarray,
+        market_price: float,
+        order: Optional[Order] = None,
+        fill: Optional[Fill] = None,
+    ) -> np.ndarray:
+        """按该标的各 sleeve 的请求数量（带符号，长度为 S，其他标的的 sleeve 须为 0）与净额成交记账，返回各 sleeve 实际成交数量。
+
+        fill 为 None 表示净额为 0（完全内部对冲）；fill 数量小于净额时（现金/容量不足），
+        与净额同向的 sleeve 按请求比例少成交。
+        """
+
+        deltas = np.asarray(deltas, dtype=np.int64)
+        net = int(deltas.sum())
+        executed = 0 if fill is None else (int(fill.quantity) if fill.side == Side.BUY else -int(fill.quantity))
+        if (net > 0 and not 0 <= executed <= net) or (net < 0 and not net <= executed <= 0) or (net == 0 and executed):
+            raise ValueError(f"fill 数量 {executed} 与净额 {net} 不一致")
+
+        final = deltas.copy()
+        if executed != net:
+            same = np.sign(deltas) == np.sign(net)
+            other = int(np.abs(deltas[~same]).sum())
+            final[same] = np.sign(net) * split_quantity(other + abs(executed), np.abs(deltas[same]))
+
+        self.cash -= final * float(market_price)
+        if fill is not None:
+            self.book.apply_fill(order, fill)
+            same = np.sign(final) == np.sign(executed)
+            self.cash[same] -= float(fill.fee + fill.slippage) * np.abs(final[same]) / np.abs(final[same]).sum()
+        self.quantities += final
+        return final
+
+    def reallocate(self) -> np.ndarray:
+        """按最近一次盯市的总权益与 weights 重新划拨各 sleeve 的现金（持仓不动），返回划拨金额。"""
+
+        transfer = self.weights * self.book.total_equity() - self.equity()
+        self.cash += transfer
+        return transfer
+
+    def mark_to_market(self, dt: datetime, prices: np.ndarray) -> BookEquityPoint:
+        pt = self.book.mark_to_market(dt, prices)
+        values = self.quantities * self.book.last_prices[self.symbol_index]
+        for s, name in enumerate(self.names):
+            self.equity_curves[name].append(
+                BookEquityPoint(
+                    dt=dt,
+                    cash=float(self.cash[s]),
+                    position_value=float(values[s]),
+                    total_equity=float(self.cash[s] + values[s]),
+                    holdings=int(self.quantities[s] != 0),
+                )
+            )
+        return pt
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from finance.backtest.backtestEngine import ResultBundle
+from finance.data.barArrays import equity_arrays, trade_arrays
+
+CHART_FILENAME = "equity_chart.png"
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（含首尾点）。
+
+    循环次数只与 n_out 有关，每个桶内用向量运算，整体 O(n)；
+    能保留尖峰/回撤等形状特征，比等间隔抽样更适合画净值曲线。
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # 下一个桶的均值点（最后一个桶用末点）
+        if i + 2 < n_out - 1:
+            nxt_end = max(edges[i + 2], end + 1)
+            cx = x[end:nxt_end].mean()
+            cy = y[end:nxt_end].mean()
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        xs = x[start:end]
+        ys = y[start:end]
+        area = np.abs((x[a] - cx) * (ys - y[a]) - (x[a] - xs) * (cy - y[a]))
+        a = int(start + np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+@dataclass(frozen=True)
+class ChartJob:
+    """发往渲染进程的数据（只含数组，序列化开销小）。"""
+
+    out_path: str
+    title: str
+    ts: np.ndarray
+    equity: np.ndarray
+    trade_ts: np.ndarray
+    trade_side: np.ndarray
+
+    @classmethod
+    def from_result(cls, result: ResultBundle, out_dir: str) -> "ChartJob":
+        ts, equity = equity_arrays(result.equity_curve)
+        trade_ts, trade_side = trade_arrays(result.trades)
+        return cls(
+            out_path=os.path.join(out_dir, CHART_FILENAME),
+            title=f"{result.symbol} equity",
+            ts=np.array(ts, dtype=np.int64),
+            equity=np.array(equity, dtype=np.float64),
+            trade_ts=np.array(trade_ts, dtype=np.int64),
+            trade_side=np.array(trade_side, dtype=np.int8),
+        )
+
+
+def render_chart(job: ChartJob, max_points: int = 2000, max_markers: int = 500) -> str:
+    """渲染净值 + 回撤 + 成交标记（非交互 Agg 后端，不经过 pyplot 全局状态）。"""
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 7))
+    FigureCanvasAgg(fig)
+    ax_eq, ax_dd = fig.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+
+    if job.ts.shape[0] > 0:
+        x = job.ts.astype(np.float64)
+        drawdown = job.equity / np.maximum.accumulate(job.equity) - 1.0
+        eq_idx = lttb_indices(x, job.equity, max_points)
+        dd_idx = lttb_indices(x, drawdown, max_points)
+        dts = job.ts.view("datetime64[ns]")
+
+        ax_eq.plot(dts[eq_idx], job.equity[eq_idx], lw=1.0, color="tab:blue")
+        ax_dd.fill_between(dts[dd_idx], drawdown[dd_idx], 0.0, color="tab:red", alpha=0.4, lw=0)
+
+        if job.trade_ts.shape[0] > 0:
+            # 成交过多时等间隔抽稀，标记数量有上限
+            keep = np.arange(job.trade_ts.shape[0])
+            if keep.shape[0] > max_markers:
+                keep = np.linspace(0, keep.shape[0] - 1, max_markers).astype(np.int64)
+            pos = np.clip(np.searchsorted(job.ts, job.trade_ts[keep]), 0, job.ts.shape[0] - 1)
+            side = job.trade_side[keep]
+            for s, marker, color in ((1, "^", "tab:green"), (-1, "v", "tab:orange")):
+                m = side == s
+                ax_eq.scatter(dts[pos[m]], job.equity[pos[m]], marker=marker, color=color, s=18, zorder=3)
+
+    ax_eq.set_title(job.title)
+    ax_eq.set_ylabel("equity")
+    ax_dd.set_ylabel("drawdown")
+    ax_eq.grid(alpha=0.3)
+    ax_dd.grid(alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(job.out_path, dpi=100)
+    return job.out_path
+
+
+class ChartRenderer:
+    """在进程池里异步渲染图表，报告写出不必等待绘图。
+
+    只有后面还有别的工作可以重叠时（runBatch 多个任务共用一个渲染器）进程池才有收益；
+    单次运行写完报告就要等图表落盘，此时用 max_workers=0 在当前进程渲染，省去起进程与传数据。
+
+    - max_workers=0：在当前进程同步渲染（单次运行/调试/测试）
+    - 用作上下文管理器时，退出前会等待所有图表写完
+    """
+
+    def __init__(self, max_workers: int = 1, max_points: int = 2000, max_markers: int = 500) -> None:
+        if max_workers < 0:
+            raise ValueError("max_workers must be >= 0")
+        self.max_workers = max_workers
+        self.max_points = max_points
+        self.max_markers = max_markers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: List[Future] = []
+
+    def submit(self, result: ResultBundle, out_dir: str) -> Future:
+        job = ChartJob.from_result(result, out_dir)
+        if self.max_workers == 0:
+            fut: Future = Future()
+            fut.set_result(render_chart(job, self.max_points, self.max_markers))
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            fut = self._pool.submit(render_chart, job, self.max_points, self.max_markers)
+        self._futures.append(fut)
+        return fut
+
+    def wait(self) -> List[str]:
+        """等待已提交的图表，返回输出路径（渲染失败会在这里抛出）。"""
+
+        paths = [f.result() for f in self._futures]
+        self._futures = []
+        return paths
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self) -> "ChartRenderer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
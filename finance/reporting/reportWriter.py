@@ -5,46 +5,40 @@ import os
 from dataclasses import asdict
 from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
 
 from finance.backtest.backtestEngine import ResultBundle
+from finance.core.coreTypes import Side
+from finance.portfolio.runJournal import EquityLog, TradeLog
+from finance.reporting.chartRenderer import ChartRenderer
 
 
 class ReportWriter:
-    def __init__(self, output_root: str = "outputs") -> None:
+    """写出单次回测的 CSV/JSON；给出 chart_renderer 时异步渲染 equity_chart.png。
+
+    extra_tables：附加输出的表（如滚动指标），按 {name}.csv 写入同一目录。
+    """
+
+    def __init__(self, output_root: str = "outputs", chart_renderer: Optional[ChartRenderer] = None) -> None:
         self.output_root = output_root
+        self.chart_renderer = chart_renderer
 
-    def write(self, result: ResultBundle, *, run_id: str, run_config: Optional[Dict[str, Any]] = None) -> str:
+    def write(
+        self,
+        result: ResultBundle,
+        *,
+        run_id: str,
+        run_config: Optional[Dict[str, Any]] = None,
+        extra_tables: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> str:
         out_dir = os.path.join(self.output_root, run_id)
         os.makedirs(out_dir, exist_ok=True)
 
-        equity_df = pd.DataFrame([
-            {
-                "dt": p.dt,
-                "cash": p.cash,
-                "position_qty": p.position_qty,
-                "close": p.close,
-                "position_value": p.position_value,
-                "total_equity": p.total_equity,
-            }
-            for p in result.equity_curve
-        ])
+        equity_df = _equity_frame(result.equity_curve)
         equity_df.to_csv(os.path.join(out_dir, "equity_curve.csv"), index=False)
 
-        trades_df = pd.DataFrame([
-            {
-                "dt": t.dt,
-                "symbol": t.symbol,
-                "side": t.side,
-                "quantity": t.quantity,
-                "price": t.price,
-                "fee": t.fee,
-                "slippage": t.slippage,
-                "order_id": t.order_id,
-                "reason": t.reason,
-            }
-            for t in result.trades
-        ])
+        trades_df = _trades_frame(result.trades)
         trades_df.to_csv(os.path.join(out_dir, "trades.csv"), index=False)
 
         metrics = result.metrics or {}
@@ -72,4 +66,80 @@ class ReportWriter:
             with open(os.path.join(out_dir, "run_config.json"), "w", encoding="utf-8") as f:
                 json.dump(run_config, f, ensure_ascii=False, indent=2)
 
+        for name, table in (extra_tables or {}).items():
+            table.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
+
+        if self.chart_renderer is not None:
+            self.chart_renderer.submit(result, out_dir)
+
         return out_dir
+
+
+def _ts_to_datetime(df: pd.DataFrame) -> pd.DataFrame:
+    """报表边界：逐点记录里的 int64 ts 整列换算为时间（不逐个构造 datetime）。"""
+
+    if len(df):
+        df["dt"] = df["dt"].to_numpy(dtype=np.int64).view("datetime64[ns]")
+    return df
+
+
+def _equity_frame(equity_curve) -> pd.DataFrame:
+    if isinstance(equity_curve, EquityLog):
+        # 落盘记录：按列从映射数组构造，不逐点生成 EquityPoint
+        rec = equity_curve.records()
+        return pd.DataFrame({
+            "dt": rec["ts"].view("datetime64[ns]"),
+            "cash": rec["cash"],
+            "position_qty": rec["position_qty"],
+            "close": rec["close"],
+            "position_value": rec["position_value"],
+            "total_equity": rec["total_equity"],
+        })
+    df = pd.DataFrame([
+        {
+            "dt": p.ts,
+            "cash": p.cash,
+            "position_qty": p.position_qty,
+            "close": p.close,
+            "position_value": p.position_value,
+            "total_equity": p.total_equity,
+        }
+        for p in equity_curve
+    ])
+    return _ts_to_datetime(df)
+
+
+def _trades_frame(trades) -> pd.DataFrame:
+    if not isinstance(trades, TradeLog):
+        df = pd.DataFrame([
+            {
+                "dt": t.ts,
+                "symbol": t.symbol,
+                "side": t.side,
+                "quantity": t.quantity,
+                "price": t.price,
+                "fee": t.fee,
+                "slippage": t.slippage,
+                "order_id": t.order_id,
+                "reason": t.reason,
+            }
+            for t in trades
+        ])
+        return _ts_to_datetime(df)
+
+    rec = trades.records()
+
+    def text(name: str) -> pd.Series:
+        return pd.Series(rec[name]).str.decode("utf-8", errors="ignore")
+
+    return pd.DataFrame({
+        "dt": rec["ts"].view("datetime64[ns]"),
+        "symbol": text("symbol"),
+        "side": np.where(rec["side"] > 0, Side.BUY.value, Side.SELL.value),
+        "quantity": rec["quantity"],
+        "price": rec["price"],
+        "fee": rec["fee"],
+        "slippage": rec["slippage"],
+        "order_id": text("order_id"),
+        "reason": text("reason"),
+    })
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+from dataclasses import asdict, replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from finance.backtest.backtestEngine import ResultBundle
+
+# 直接落在 runs 表上的关键指标列（其余指标保存在 metrics_json）
+METRIC_COLUMNS = ("cumulative_return", "annualized_return", "max_drawdown", "sharpe")
+SUMMARY_COLUMNS = ("bars", "trades", "dropped_signals_last_bar", "initial_cash", "final_equity")
+TEXT_COLUMNS = ("run_id", "symbol", "created_at")
+RUN_COLUMNS = TEXT_COLUMNS + SUMMARY_COLUMNS + METRIC_COLUMNS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    bars INTEGER,
+    trades INTEGER,
+    dropped_signals_last_bar INTEGER,
+    initial_cash REAL,
+    final_equity REAL,
+    {", ".join(f"{c} REAL" for c in METRIC_COLUMNS)},
+    config_json TEXT,
+    metrics_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_symbol ON runs(symbol);
+{"".join(f"CREATE INDEX IF NOT EXISTS idx_runs_{c} ON runs({c});" for c in METRIC_COLUMNS)}
+
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    num_value REAL,
+    text_value TEXT,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_params_num ON run_params(name, num_value);
+CREATE INDEX IF NOT EXISTS idx_params_text ON run_params(name, text_value);
+
+CREATE TABLE IF NOT EXISTS trades (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    dt TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    fee REAL NOT NULL,
+    slippage REAL NOT NULL,
+    order_id TEXT,
+    reason TEXT,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+"""
+
+_FILTER_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+
+StoredRun = Tuple[str, ResultBundle, Optional[Dict[str, Any]]]
+
+
+def parse_filter(expr: str) -> Tuple[str, str, str]:
+    """解析 `name op value`（op：= != < <= > >=），value 保留原始字符串。"""
+
+    m = _FILTER_RE.match(expr)
+    if m is None:
+        raise ValueError(f"无法解析过滤条件: {expr!r}（示例：sharpe>1、fast=10）")
+    name, op, raw = m.groups()
+    return name, op, raw.strip("'\"")
+
+
+def _to_number(raw: str) -> Optional[float]:
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _param_rows(run_id: str, config: Dict[str, Any]) -> List[Tuple[str, str, Optional[float], Optional[str]]]:
+    rows = []
+    for name, value in config.items():
+        if isinstance(value, (bool, int, float)):
+            rows.append((run_id, name, float(value), None))
+        elif isinstance(value, str):
+            rows.append((run_id, name, None, value))
+        # 其他类型（list/dict/None）只保存在 config_json 中
+    return rows
+
+
+class SqliteResultsStore:
+    """本地 SQLite 结果库：适合大规模参数扫描（10 万级 run）。
+
+    - runs：每个 run 一行，关键指标与 RunSummary 为独立列并建索引
+    - run_params：run_config 中的标量参数（EAV），按 (name, value) 建索引，可按参数过滤
+    - trades：可选，逐笔成交
+    写入按批次在单个事务里 executemany，避免逐行提交。
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteResultsStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def write(self, result: ResultBundle, *, run_id: str, run_config: Optional[Dict[str, Any]] = None, include_trades: bool = False) -> None:
+        self.write_many([(run_id, result, run_config)], include_trades=include_trades)
+
+    def write_many(self, runs: Iterable[StoredRun], *, include_trades: bool = False, batch_size: int = 1000) -> int:
+        """批量写入（同 run_id 覆盖），返回写入条数。"""
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+
+        total = 0
+        batch: List[StoredRun] = []
+        for item in runs:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                total += self._write_batch(batch, include_trades)
+                batch = []
+        if batch:
+            total += self._write_batch(batch, include_trades)
+        return total
+
+    def _write_batch(self, batch: Sequence[StoredRun], include_trades: bool) -> int:
+        created_at = datetime.now().isoformat(timespec="seconds")
+        run_rows = []
+        param_rows = []
+        trade_rows = []
+        for run_id, result, config in batch:
+            summary = asdict(result.run_summary)
+            metrics = result.metrics or {}
+            config = config or {}
+            run_rows.append(
+                (run_id, result.symbol, created_at)
+                + tuple(summary[c] for c in SUMMARY_COLUMNS)
+                + tuple(metrics.get(c) for c in METRIC_COLUMNS)
+                + (json.dumps(config, ensure_ascii=False, default=str), json.dumps(metrics, ensure_ascii=False, default=str))
+            )
+            param_rows.extend(_param_rows(run_id, config))
+            if include_trades:
+                trade_rows.extend(
+                    (run_id, seq, t.dt.isoformat(), t.symbol, str(getattr(t.side, "value", t.side)), t.quantity, t.price, t.fee, t.slippage, t.order_id, t.reason)
+                    for seq, t in enumerate(result.trades)
+                )
+
+        run_ids = [(r[0],) for r in run_rows]
+        placeholders = ", ".join("?" for _ in range(len(RUN_COLUMNS) + 2))
+        with self._conn:
+            self._conn.executemany("DELETE FROM run_params WHERE run_id = ?", run_ids)
+            self._conn.executemany("DELETE FROM trades WHERE run_id = ?", run_ids)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO runs ({', '.join(RUN_COLUMNS)}, config_json, metrics_json) VALUES ({placeholders})",
+                run_rows,
+            )
+            self._conn.executemany("INSERT INTO run_params (run_id, name, num_value, text_value) VALUES (?, ?, ?, ?)", param_rows)
+            if trade_rows:
+                self._conn.executemany(
+                    "INSERT INTO trades (run_id, seq, dt, symbol, side, quantity, price, fee, slippage, order_id, reason) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    trade_rows,
+                )
+        return len(run_rows)
+
+    def count(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0])
+
+    def query(
+        self,
+        *,
+        order_by: str = "sharpe",
+        descending: bool = True,
+        limit: Optional[int] = 10,
+        filters: Sequence[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """Top-N / 过滤查询。order_by 与 filters 可用 runs 列名（指标/汇总）或 run_config 参数名。"""
+
+        where: List[str] = []
+        args: List[Any] = []
+        for expr in filters:
+            name, op, raw = parse_filter(expr)
+            number = _to_number(raw)
+            if name in TEXT_COLUMNS:
+                where.append(f"r.{name} {op} ?")
+                args.append(raw)
+            elif name in RUN_COLUMNS:
+                if number is None:
+                    raise ValueError(f"{name} 需要数值比较: {expr!r}")
+                where.append(f"r.{name} {op} ?")
+                args.append(number)
+            else:
+                # 参数既可能是数值也可能是字符串（如 symbol=000001），两种取值都匹配
+                cond = f"p.text_value {op} ?" if number is None else f"(p.num_value {op} ? OR p.text_value {op} ?)"
+                where.append(f"EXISTS (SELECT 1 FROM run_params p WHERE p.run_id = r.run_id AND p.name = ? AND {cond})")
+                args.extend([name, raw] if number is None else [name, number, raw])
+
+        join = ""
+        if order_by in RUN_COLUMNS:
+            order_expr = f"r.{order_by}"
+        elif re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", order_by):
+            join = "LEFT JOIN run_params o ON o.run_id = r.run_id AND o.name = ?"
+            args.insert(0, order_by)
+            order_expr = "COALESCE(o.num_value, o.text_value)"
+        else:
+            raise ValueError(f"非法排序字段: {order_by!r}")
+
+        sql = f"SELECT r.{', r.'.join(RUN_COLUMNS)}, r.config_json FROM runs r {join}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # NULL 指标（如空跑）总排在最后
+        sql += f" ORDER BY {order_expr} IS NULL, {order_expr} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+
+        rows = []
+        for rec in self._conn.execute(sql, args):
+            row = dict(zip(RUN_COLUMNS, rec[:-1]))
+            row["config"] = json.loads(rec[-1]) if rec[-1] else {}
+            rows.append(row)
+        return rows
+
+    def trades(self, run_id: str) -> List[Dict[str, Any]]:
+        cur = self._conn.execute(
+            "SELECT seq, dt, symbol, side, quantity, price, fee, slippage, order_id, reason FROM trades WHERE run_id = ? ORDER BY seq",
+            (run_id,),
+        )
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, rec)) for rec in cur]
+
+
+class BufferedResultsStore:
+    """多次回测共用的结果库写入端：run 先缓存在内存，满 flush_every 条或 close 时经 write_many 批量写入。
+
+    缓存时只保留入库用到的字段（不含净值曲线；不写成交时也不含成交），批量运行不会因此累积整条曲线。
+    """
+
+    def __init__(self, db_path: str, *, flush_every: int = 200) -> None:
+        if flush_every <= 0:
+            raise ValueError("flush_every must be > 0")
+        self.store = SqliteResultsStore(db_path)
+        self.flush_every = int(flush_every)
+        self._pending: Dict[bool, List[StoredRun]] = {False: [], True: []}
+        self.written = 0
+
+    @property
+    def db_path(self) -> str:
+        return self.store.db_path
+
+    def __len__(self) -> int:
+        return sum(len(runs) for runs in self._pending.values())
+
+    def add(self, result: ResultBundle, *, run_id: str, run_config: Optional[Dict[str, Any]] = None, include_trades: bool = False) -> None:
+        slim = replace(result, equity_curve=[], dropped_signals=[], trades=list(result.trades) if include_trades else [])
+        self._pending[include_trades].append((run_id, slim, run_config))
+        if len(self) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> int:
+        n = 0
+        for include_trades, runs in self._pending.items():
+            if runs:
+                n += self.store.write_many(runs, include_trades=include_trades, batch_size=self.flush_every)
+                runs.clear()
+        self.written += n
+        return n
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.store.close()
+
+    def __enter__(self) -> "BufferedResultsStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
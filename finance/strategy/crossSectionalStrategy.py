@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from finance.data.resampler import parse_timeframe
+from finance.data.tradingCalendar import AlignedPanel, TradingCalendar
+from finance.portfolio.riskModel import (
+    EwmaCovariance,
+    RollingCovariance,
+    inverse_volatility_weights,
+    risk_parity_weights,
+    scale_to_target_vol,
+)
+
+
+# ---------- 截面运算（沿最后一维，支持 (K,) 或 (T, K)，NaN 视为不可选） ----------
+
+
+def cross_rank(values: np.ndarray, pct: bool = True) -> np.ndarray:
+    """截面排名（升序，从 1 开始；并列按出现顺序）；pct=True 时归一化到 (0, 1]。NaN 保持 NaN。"""
+
+    x = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(x)
+    # NaN 排在最后，先排序再把名次写回原位置
+    order = np.argsort(np.where(valid, x, np.inf), axis=-1, kind="stable")
+    ranks = np.empty_like(x)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, x.shape[-1] + 1, dtype=np.float64), x.shape), axis=-1)
+    if pct:
+        count = valid.sum(axis=-1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ranks = ranks / count
+    return np.where(valid, ranks, np.nan)
+
+
+def cross_zscore(values: np.ndarray, clip: Optional[float] = None) -> np.ndarray:
+    """截面标准化 (x - mean) / std（ddof=0）；std 为 0 时为 0，可选截断到 ±clip。"""
+
+    x = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(x)
+    count = valid.sum(axis=-1, keepdims=True)
+    filled = np.where(valid, x, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=-1, keepdims=True) / count
+        std = np.sqrt((np.where(valid, x - mean, 0.0) ** 2).sum(axis=-1, keepdims=True) / count)
+        z = np.where(std > 0, (x - mean) / std, 0.0)
+    z = np.where(valid, z, np.nan)
+    if clip is not None:
+        z = np.clip(z, -clip, clip)
+    return z
+
+
+def top_k_mask(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """每个截面取最大（或最小）的 k 个非 NaN 值，O(K) 的 argpartition，不做全排序。"""
+
+    x = np.asarray(values, dtype=np.float64)
+    n = x.shape[-1]
+    mask = np.zeros(x.shape, dtype=bool)
+    if k <= 0 or n == 0:
+        return mask
+    key = np.where(np.isnan(x), np.inf, -x if largest else x)
+    k_eff = min(k, n)
+    idx = np.argpartition(key, k_eff - 1, axis=-1)[..., :k_eff]
+    np.put_along_axis(mask, idx, True, axis=-1)
+    return mask & ~np.isnan(x)
+
+
+def normalize_weights(scores: np.ndarray, gross: float = 1.0) -> np.ndarray:
+    """非负得分按截面归一化为权重（和为 gross）；全为 0/NaN 的截面返回全 0。"""
+
+    s = np.nan_to_num(np.maximum(np.asarray(scores, dtype=np.float64), 0.0))
+    total = s.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, s * (gross / total), 0.0)
+
+
+# ---------- 调仓日程 ----------
+
+
+@dataclass(frozen=True)
+class RebalanceSchedule:
+    """调仓日程：在哪些 bar 收盘后计算目标权重（下一根 bar 开盘成交）。
+
+    - every="bars"：每 n 根 bar 一次（从 offset 开始）
+    - every="1d"/"1w"/"1M" 等：每个周期的最后一根 bar（日内数据按日/周/月调仓）
+    """
+
+    every: str = "bars"
+    n: int = 1
+    offset: int = 0
+
+    def mask(self, calendar: TradingCalendar) -> np.ndarray:
+        ts = calendar.ts
+        out = np.zeros(ts.shape[0], dtype=bool)
+        if ts.shape[0] == 0:
+            return out
+        if self.every == "bars":
+            if self.n < 1:
+                raise ValueError(f"n must be >= 1: {self.n}")
+            out[self.offset :: self.n] = True
+            return out
+
+        dt64 = ts.view("datetime64[ns]")
+        if self.every.endswith("M"):
+            period = dt64.astype("datetime64[M]").astype(np.int64) // max(int(self.every[:-1] or 1), 1)
+        else:
+            period = parse_timeframe(self.every).bucket_of(ts)
+        out[:-1] = period[1:] != period[:-1]
+        out[-1] = True
+        return out
+
+
+# ---------- 策略接口 ----------
+
+
+@dataclass(frozen=True)
+class CrossSection:
+    """某个调仓时点的截面输入：features 中每项为长度 K 的行视图（按 symbols 对齐）。"""
+
+    t: int
+    dt: datetime
+    symbols: List[str]
+    features: Dict[str, np.ndarray]
+    tradable: np.ndarray
+    weights: np.ndarray
+
+    def matrix(self, names: Optional[List[str]] = None) -> np.ndarray:
+        """(K, F) 特征矩阵（按需拼接，会拷贝）。"""
+
+        names = names or list(self.features.keys())
+        return np.column_stack([self.features[n] for n in names])
+
+
+class CrossSectionalStrategy(ABC):
+    """截面策略：
+
+    - compute_features：回测开始前对整个面板一次性计算特征（每项 (T, K)，只能使用 t 及之前的数据）
+    - observe：每根 bar 收盘后调用（调仓日先于 target_weights），用于维护增量状态（如协方差估计），默认不做事
+    - target_weights：仅在调仓日调用，输入该时点的截面，返回长度 K 的目标权重
+    """
+
+    def compute_features(self, panel: AlignedPanel) -> Dict[str, np.ndarray]:
+        return {"close": panel.panel("close", "ffill")}
+
+    def observe(self, t: int, close: np.ndarray) -> None:
+        """close 为 (K,) 收盘价，停牌/未上市为 NaN。"""
+
+    @abstractmethod
+    def target_weights(self, snapshot: CrossSection) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TopKMomentumStrategy(CrossSectionalStrategy):
+    """Top-K 动量：按过去 lookback 根 bar 的收益排名，持有最强的 k 只（等权或按排名加权）。"""
+
+    def __init__(self, lookback: int = 20, k: int = 10, weighting: str = "equal", gross: float = 1.0) -> None:
+        if lookback < 1:
+            raise ValueError("lookback must be >= 1")
+        if weighting not in ("equal", "rank"):
+            raise ValueError("weighting 仅支持 equal/rank")
+        self.lookback = lookback
+        self.k = k
+        self.weighting = weighting
+        self.gross = gross
+
+    def compute_features(self, panel: AlignedPanel) -> Dict[str, np.ndarray]:
+        close = panel.panel("close", "ffill")
+        momentum = np.full(close.shape, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            momentum[self.lookback :] = close[self.lookback :] / close[: -self.lookback] - 1.0
+        return {"momentum": momentum}
+
+    def target_weights(self, snapshot: CrossSection) -> np.ndarray:
+        score = np.where(snapshot.tradable, snapshot.features["momentum"], np.nan)
+        chosen = top_k_mask(score, self.k)
+        if self.weighting == "equal":
+            return normalize_weights(chosen.astype(np.float64), self.gross)
+        return normalize_weights(np.where(chosen, cross_rank(score), 0.0), self.gross)
+
+
+class RiskParityStrategy(CrossSectionalStrategy):
+    """按风险分配权重的多标的配置：逐 bar 增量更新协方差，调仓日给出目标权重。
+
+    - estimator="ewma"（halflife 根 bar）或 "rolling"（最近 window 根 bar）
+    - method="risk_parity"（等风险贡献）或 "inverse_vol"（波动倒数）
+    - target_vol 不为 None 时整体缩放到该年化波动（总仓位不超过 max_gross，多出部分留作现金）
+    收益为相邻两次有效收盘价的对数收益；有效收益不足 min_periods 或当日不可交易的标的不分配权重。
+    """
+
+    def __init__(
+        self,
+        *,
+        estimator: str = "ewma",
+        halflife: float = 20.0,
+        window: int = 60,
+        min_periods: int = 20,
+        method: str = "risk_parity",
+        target_vol: Optional[float] = None,
+        periods_per_year: float = 252.0,
+        max_gross: float = 1.0,
+    ) -> None:
+        if estimator not in ("ewma", "rolling"):
+            raise ValueError("estimator 仅支持 ewma/rolling")
+        if method not in ("risk_parity", "inverse_vol"):
+            raise ValueError("method 仅支持 risk_parity/inverse_vol")
+        if max_gross <= 0:
+            raise ValueError("max_gross must be > 0")
+        self.estimator = estimator
+        self.halflife = halflife
+        self.window = window
+        self.min_periods = min_periods
+        self.method = method
+        self.target_vol = target_vol
+        self.periods_per_year = periods_per_year
+        self.max_gross = max_gross
+        self.cov: Optional[EwmaCovariance | RollingCovariance] = None
+        self._last_close: Optional[np.ndarray] = None
+
+    def _make_estimator(self, k: int) -> EwmaCovariance | RollingCovariance:
+        if self.estimator == "ewma":
+            return EwmaCovariance(k, halflife=self.halflife, min_periods=self.min_periods)
+        return RollingCovariance(k, window=self.window, min_periods=self.min_periods)
+
+    def compute_features(self, panel: AlignedPanel) -> Dict[str, np.ndarray]:
+        self.cov = self._make_estimator(len(panel.symbols))
+        self._last_close = np.full(len(panel.symbols), np.nan)
+        return {}
+
+    def observe(self, t: int, close: np.ndarray) -> None:
+        close = np.asarray(close, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ret = np.log(close / self._last_close)
+        self.cov.update(np.where(np.isfinite(ret), ret, np.nan))
+        self._last_close = np.where(close > 0, close, self._last_close)
+
+    def target_weights(self, snapshot: CrossSection) -> np.ndarray:
+        cov = self.cov.covariance()
+        active = self.cov.ready() & snapshot.tradable
+        if self.method == "risk_parity":
+            w = risk_parity_weights(cov, active)
+        else:
+            w = inverse_volatility_weights(cov, active)
+        if self.target_vol is not None:
+            return scale_to_target_vol(w, cov, self.target_vol, self.periods_per_year, self.max_gross)
+        return w * self.max_gross
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from abc import abstractmethod
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence
+
+from finance.core.coreTypes import Bar, Signal
+from finance.data.barAggregator import BarAggregator
+from finance.indicators.smaIndicator import RollingSma
+from finance.strategy.strategyBase import StrategyBase
+
+
+class MultiTimeframeStrategy(StrategyBase):
+    """多周期策略基类：引擎照常逐根送入基础周期 bar，高周期 bar 在这里增量聚合。
+
+    每根基础 bar 先更新各高周期的聚合器，定稿的高周期 bar 通过 on_higher_bar 通知并存入
+    higher(tf)（最多保留 history 根），再调用 on_base_bar。higher(tf) 里只有已结束的周期，
+    进行中的周期只能通过 partial(tf) 显式取得（只含截至当前 bar 的数据），因此不会有前视。
+    """
+
+    def __init__(self, timeframes: Sequence[str], base_timeframe: Optional[str] = None, history: int = 500) -> None:
+        if not timeframes:
+            raise ValueError("timeframes 不能为空")
+        if history <= 0:
+            raise ValueError("history must be > 0")
+        self._aggregators: Dict[str, BarAggregator] = {tf: BarAggregator(tf, base_timeframe) for tf in timeframes}
+        self._higher: Dict[str, Deque[Bar]] = {tf: deque(maxlen=history) for tf in timeframes}
+
+    def on_bar(self, bar: Bar) -> Optional[Signal]:
+        for tf, agg in self._aggregators.items():
+            done = agg.update(bar)
+            if done is not None:
+                self._higher[tf].append(done)
+                self.on_higher_bar(tf, done)
+        return self.on_base_bar(bar)
+
+    def higher(self, timeframe: str) -> Deque[Bar]:
+        """已定稿的高周期 bar（按时间升序）。"""
+
+        return self._higher[timeframe]
+
+    def partial(self, timeframe: str) -> Optional[Bar]:
+        return self._aggregators[timeframe].partial
+
+    def on_higher_bar(self, timeframe: str, bar: Bar) -> None:
+        """高周期 bar 定稿（默认忽略）。"""
+
+    @abstractmethod
+    def on_base_bar(self, bar: Bar) -> Optional[Signal]:
+        raise NotImplementedError
+
+
+class TrendFilteredSmaStrategy(MultiTimeframeStrategy):
+    """高周期趋势过滤的双均线：基础周期 fast > slow 且最近一根已结束的高周期 close 在其 SMA 之上时持仓。
+
+    高周期 SMA 未就绪（warm-up）时视为趋势不成立；只在目标仓位变化时输出信号。
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        fast_window: int,
+        slow_window: int,
+        trend_timeframe: str = "1w",
+        trend_window: int = 10,
+        base_timeframe: Optional[str] = None,
+    ) -> None:
+        if fast_window <= 0 or slow_window <= 0 or trend_window <= 0:
+            raise ValueError("fast_window/slow_window/trend_window must be > 0")
+        if fast_window >= slow_window:
+            raise ValueError("fast_window must be < slow_window")
+        super().__init__([trend_timeframe], base_timeframe=base_timeframe, history=trend_window)
+
+        self.symbol = symbol
+        self.fast_window = fast_window
+        self.slow_window = slow_window
+        self.trend_timeframe = trend_timeframe
+        self.trend_window = trend_window
+
+        self._fast = RollingSma(window=fast_window)
+        self._slow = RollingSma(window=slow_window)
+        self._trend = RollingSma(window=trend_window)
+        self._trend_up = False
+        self._current_target: float = 0.0
+
+    def on_higher_bar(self, timeframe: str, bar: Bar) -> None:
+        sma = self._trend.update(bar.close)
+        self._trend_up = sma is not None and bar.close > sma
+
+    def on_base_bar(self, bar: Bar) -> Optional[Signal]:
+        if bar.symbol != self.symbol:
+            raise ValueError(f"Strategy symbol {self.symbol} got bar {bar.symbol}")
+
+        fast = self._fast.update(bar.close)
+        slow = self._slow.update(bar.close)
+        if slow is None or fast is None:
+            return None
+
+        target = 1.0 if fast > slow and self._trend_up else 0.0
+        if target == self._current_target:
+            return None
+
+        self._current_target = target
+        return Signal(
+            dt=bar.dt,
+            symbol=bar.symbol,
+            target_position=target,
+            reason=f"sma_cross fast={self.fast_window} slow={self.slow_window} trend={self.trend_timeframe}/{self.trend_window}",
+        )
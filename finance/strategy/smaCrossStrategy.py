@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import Optional
 
+import numpy as np
+
 from finance.core.coreTypes import Bar, Signal
-from finance.indicators.smaIndicator import RollingSma
+from finance.indicators.smaIndicator import RollingSma, rolling_sma_array
 from finance.strategy.strategyBase import StrategyBase
 
 
@@ -52,3 +54,34 @@ class SmaCrossStrategy(StrategyBase):
             target_position=target,
             reason=f"sma_cross fast={self.fast_window} slow={self.slow_window}",
         )
+
+
+def sma_cross_targets(close: np.ndarray, fast_window: int, slow_window: int) -> np.ndarray:
+    """按数组一次生成与 SmaCrossStrategy 逐位相同的目标仓位序列。
+
+    返回与 close 等长的 float 数组：第 i 个元素是 bar i 收盘后发出的 target（0/1），
+    没有信号（warm-up 或目标未变化）为 NaN。信号与成交无关，可一次生成、多次复用。
+    """
+
+    if fast_window <= 0 or slow_window <= 0:
+        raise ValueError("fast_window/slow_window must be > 0")
+    if fast_window >= slow_window:
+        raise ValueError("fast_window must be < slow_window")
+
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n < slow_window:
+        return out
+
+    # 累加顺序与 RollingSma 相同，保证均线相等/接近时的比较结果与逐 bar 策略一致
+    idx = np.arange(slow_window - 1, n)
+    fast = rolling_sma_array(close, fast_window)[idx]
+    slow = rolling_sma_array(close, slow_window)[idx]
+    target = np.where(fast > slow, 1.0, 0.0)
+
+    # 只有目标变化时才出信号（初始目标为 0）
+    prev = np.concatenate(([0.0], target[:-1]))
+    changed = target != prev
+    out[idx[changed]] = target[changed]
+    return out
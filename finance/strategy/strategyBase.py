@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from finance.core.coreTypes import Bar, Signal
+from finance.core.coreTypes import Bar, Fill, Order, Signal
 
 
 class StrategyBase(ABC):
@@ -12,3 +12,31 @@ class StrategyBase(ABC):
         """消费一根 bar（收盘后），返回 Signal（目标仓位）或 None。"""
 
         raise NotImplementedError
+
+    # ---- 挂单（限价/止损/止损限价）：在 on_bar 中提交或撤销，引擎在收盘后统一取走，下一根 bar 起生效 ----
+
+    # 收件箱在首次提交时才创建，子类的 __init__ 无需调用 super().__init__()
+    _order_outbox: Optional[List[Order]] = None
+    _cancel_outbox: Optional[List[str]] = None
+
+    def submit_order(self, order: Order) -> str:
+        if self._order_outbox is None:
+            self._order_outbox = []
+        self._order_outbox.append(order)
+        return order.id
+
+    def cancel_order(self, order_id: str) -> None:
+        if self._cancel_outbox is None:
+            self._cancel_outbox = []
+        self._cancel_outbox.append(order_id)
+
+    def drain_orders(self) -> Tuple[List[Order], List[str]]:
+        """取走并清空本根 bar 新提交的挂单与撤单请求。"""
+
+        orders, cancels = self._order_outbox or [], self._cancel_outbox or []
+        if orders or cancels:
+            self._order_outbox = self._cancel_outbox = None
+        return orders, cancels
+
+    def on_fill(self, fill: Fill) -> None:
+        """挂单成交回报（默认忽略）。"""
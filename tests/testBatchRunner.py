@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from finance.cli.runBatch import job_argv, load_jobs, main
+from finance.reporting.resultsStore import SqliteResultsStore
+
+
+def _write_csv(path, n=60):
+    with open(path, "w") as f:
+        f.write("date,open,high,low,close,volume\n")
+        for i in range(n):
+            price = 10.0 + (i % 7) - (i % 3) * 0.5 + i * 0.05
+            f.write(f"2024-{1 + i // 28:02d}-{1 + i % 28:02d},{price},{price + 0.5},{price - 0.5},{price + 0.1},1000\n")
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.tmp.name, "AAA.csv")
+        _write_csv(self.csv)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_job_argv(self):
+        self.assertEqual(
+            job_argv({"symbol": "AAA", "csv_path": "a.csv", "fast": 5, "charts": True, "store-trades": "false", "resample": None}),
+            ["--symbol", "AAA", "--csv-path", "a.csv", "--fast", "5", "--charts"],
+        )
+
+    def test_load_jobs_formats(self):
+        jpath = os.path.join(self.tmp.name, "jobs.json")
+        with open(jpath, "w") as f:
+            json.dump({"defaults": {"symbol": "AAA", "fast": 3}, "jobs": [{"slow": 8}, {"fast": 4, "slow": 9}]}, f)
+        self.assertEqual(load_jobs(jpath), [{"symbol": "AAA", "fast": 3, "slow": 8}, {"symbol": "AAA", "fast": 4, "slow": 9}])
+
+        cpath = os.path.join(self.tmp.name, "jobs.csv")
+        with open(cpath, "w") as f:
+            f.write("symbol,fast,slow,resample\nAAA,3,8,\nAAA,4,9,1w\n")
+        self.assertEqual(load_jobs(cpath)[0], {"symbol": "AAA", "fast": "3", "slow": "8"})
+        self.assertEqual(load_jobs(cpath)[1]["resample"], "1w")
+
+    def test_batch_runs_jobs_and_writes_summary(self):
+        out = os.path.join(self.tmp.name, "out")
+        jpath = os.path.join(self.tmp.name, "jobs.jsonl")
+        with open(jpath, "w") as f:
+            for fast, slow in [(3, 8), (4, 10)]:
+                f.write(json.dumps({"symbol": "AAA", "csv_path": self.csv, "fast": fast, "slow": slow}) + "\n")
+            f.write(json.dumps({"symbol": "BBB", "csv_path": os.path.join(self.tmp.name, "missing.csv")}) + "\n")
+
+        code = main([jpath, "--output-root", out, "--batch-id", "t", "--log-level", "ERROR"])
+        self.assertEqual(code, 1)
+        with open(os.path.join(out, "batch_t.csv")) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["status"] for r in rows], ["ok", "ok", "failed"])
+        self.assertEqual([r["run_id"] for r in rows], ["t_0000", "t_0001", "t_0002"])
+        for r in rows[:2]:
+            self.assertTrue(os.path.exists(os.path.join(r["out_dir"], "metrics.json")))
+
+    def test_batch_shares_results_db_and_can_skip_report_dirs(self):
+        out = os.path.join(self.tmp.name, "out")
+        db = os.path.join(self.tmp.name, "r.db")
+        jpath = os.path.join(self.tmp.name, "jobs.json")
+        with open(jpath, "w") as f:
+            json.dump({"defaults": {"symbol": "AAA", "csv_path": self.csv, "results_db": db, "no_report_dir": True}, "jobs": [{"fast": 3, "slow": 8}, {"fast": 4, "slow": 10}]}, f)
+
+        self.assertEqual(main([jpath, "--output-root", out, "--batch-id", "t", "--log-level", "ERROR"]), 0)
+        self.assertEqual(sorted(os.listdir(out)), ["batch_t.csv"])
+        with SqliteResultsStore(db) as store:
+            rows = store.query(order_by="fast", descending=False, limit=None)
+        self.assertEqual([(r["run_id"], r["config"]["fast"]) for r in rows], [("t_0000", 3), ("t_0001", 4)])
+
+        with open(jpath, "w") as f:
+            json.dump([{"symbol": "AAA", "csv_path": self.csv, "no_report_dir": True}], f)
+        with self.assertRaises(ValueError):
+            main([jpath, "--output-root", out, "--log-level", "CRITICAL"])
+
+    def test_invalid_job_rejected_before_running(self):
+        jpath = os.path.join(self.tmp.name, "jobs.json")
+        with open(jpath, "w") as f:
+            json.dump([{"symbol": "AAA", "fast": "x"}], f)
+        with self.assertRaises(ValueError):
+            main([jpath, "--output-root", os.path.join(self.tmp.name, "out"), "--log-level", "CRITICAL"])
+
+    def test_help_does_not_import_pandas(self):
+        code = "import sys\nfrom finance.cli import runBatch, runBacktest\nprint('pandas' in sys.modules)\n"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
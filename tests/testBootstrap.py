@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from finance.backtest.bootstrap import block_bootstrap_indices, bootstrap_equity, reshuffle_trades, summarize
+
+
+def _equity(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1e6 * np.exp(np.cumsum(rng.normal(0.0004, 0.01, n)))
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_block_indices_are_circular_runs(self):
+        idx = block_bootstrap_indices(10, 4, 3, np.random.default_rng(1))
+        self.assertEqual(idx.shape, (4, 10))
+        for row in idx:
+            for start in range(0, 9, 3):
+                block = row[start : start + 3]
+                self.assertTrue(np.all(np.diff(block) % 10 == 1))
+
+    def test_reproducible_and_chunk_independent(self):
+        eq = _equity()
+        a = bootstrap_equity(eq, n_paths=300, seed=42, chunk_size=64)
+        b = bootstrap_equity(eq, n_paths=300, seed=42, chunk_size=300)
+        self.assertEqual(a, b)
+        c = bootstrap_equity(eq, n_paths=300, seed=43)
+        self.assertNotEqual(a["metrics"]["sharpe"], c["metrics"]["sharpe"])
+
+        s = a["metrics"]["sharpe"]
+        self.assertLess(s["ci_low"], s["median"])
+        self.assertLess(s["median"], s["ci_high"])
+
+    def test_full_length_block_keeps_total_return(self):
+        # 块长 >= 样本长度时每条路径只是原序列的循环平移，累计收益不变
+        eq = _equity(200)
+        out = bootstrap_equity(eq, n_paths=50, block_len=1000)
+        cr = out["metrics"]["cumulative_return"]
+        self.assertAlmostEqual(cr["ci_low"], eq[-1] / eq[0] - 1.0, places=10)
+        self.assertAlmostEqual(cr["ci_high"], eq[-1] / eq[0] - 1.0, places=10)
+
+    def test_trade_reshuffle(self):
+        r = np.array([0.1, -0.05, 0.02, -0.08, 0.04])
+        out = reshuffle_trades(r, n_paths=400, seed=3)
+        cr = out["metrics"]["cumulative_return"]
+        self.assertAlmostEqual(cr["std"], 0.0, places=12)
+        self.assertAlmostEqual(cr["mean"], float(np.prod(1 + r) - 1))
+        dd = out["metrics"]["max_drawdown"]
+        self.assertLessEqual(dd["ci_low"], dd["ci_high"])
+        self.assertGreaterEqual(dd["ci_low"], float(np.prod(1 + r[r < 0]) - 1) - 1e-12)
+
+        self.assertEqual(reshuffle_trades(r, n_paths=100, replace=True, seed=1, chunk_size=7), reshuffle_trades(r, n_paths=100, replace=True, seed=1))
+        self.assertEqual(reshuffle_trades([], n_paths=10)["paths"], 0)
+
+    def test_summarize_ignores_non_finite(self):
+        s = summarize({"x": np.array([1.0, np.nan, 3.0, np.inf])}, ci=0.5)
+        self.assertEqual(s["x"]["mean"], 2.0)
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import ResultBundle
+from finance.core.coreTypes import EquityPoint, RunSummary, Side, TradeRecord
+from finance.reporting.chartRenderer import CHART_FILENAME, ChartJob, ChartRenderer, lttb_indices
+from finance.reporting.reportWriter import ReportWriter
+
+
+def _result(n=5000):
+    base = datetime(2025, 1, 2, 9, 30)
+    equity = 1000.0 + np.cumsum(np.sin(np.arange(n) / 50.0))
+    curve = [
+        EquityPoint(dt=base + timedelta(minutes=i), cash=e, position_qty=0, close=1.0, position_value=0.0, total_equity=e)
+        for i, e in enumerate(equity.tolist())
+    ]
+    trades = [
+        TradeRecord(dt=base + timedelta(minutes=i), symbol="TEST", side=Side.BUY if k % 2 == 0 else Side.SELL, quantity=1, price=1.0, fee=0.0, slippage=0.0, order_id=str(i))
+        for k, i in enumerate(range(0, n, 97))
+    ]
+    summary = RunSummary(symbol="TEST", bars=n, trades=len(trades), dropped_signals_last_bar=0, initial_cash=1000.0, final_equity=float(equity[-1]))
+    return ResultBundle(symbol="TEST", equity_curve=curve, trades=trades, dropped_signals=[], run_summary=summary, metrics={})
+
+
+class TestChartRenderer(unittest.TestCase):
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        x = np.arange(10_000, dtype=float)
+        y = np.zeros_like(x)
+        y[4321] = 50.0
+        y[7000] = -30.0
+
+        idx = lttb_indices(x, y, 200)
+        self.assertEqual(len(idx), 200)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], 9999)
+        self.assertTrue((np.diff(idx) > 0).all())
+        self.assertIn(4321, idx)
+        self.assertIn(7000, idx)
+
+        np.testing.assert_array_equal(lttb_indices(x[:10], y[:10], 200), np.arange(10))
+
+    def test_chart_job_trade_columns(self):
+        result = _result(n=500)
+        job = ChartJob.from_result(result, "/tmp")
+        np.testing.assert_array_equal(job.trade_ts, [t.ts for t in result.trades])
+        self.assertEqual(job.trade_side.tolist(), [1 if t.side == Side.BUY else -1 for t in result.trades])
+        self.assertEqual(job.trade_side.dtype, np.int8)
+
+    def test_report_writer_renders_chart_inline(self):
+        with tempfile.TemporaryDirectory() as d:
+            with ChartRenderer(max_workers=0, max_points=500) as charts:
+                out_dir = ReportWriter(output_root=d, chart_renderer=charts).write(_result(), run_id="r1")
+            self.assertGreater(os.path.getsize(os.path.join(out_dir, CHART_FILENAME)), 0)
+
+    def test_process_pool_rendering(self):
+        with tempfile.TemporaryDirectory() as d:
+            out_dirs = []
+            with ChartRenderer(max_workers=2) as charts:
+                for i in range(2):
+                    out_dir = os.path.join(d, f"r{i}")
+                    os.makedirs(out_dir)
+                    charts.submit(_result(n=2000 + i), out_dir)
+                    out_dirs.append(out_dir)
+            for out_dir in out_dirs:
+                self.assertTrue(os.path.exists(os.path.join(out_dir, CHART_FILENAME)))
@@ -0,0 +1,52 @@
+import pickle
+import unittest
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+
+from finance.cli.benchCoreTypes import run_benchmark
+from finance.core.compactTypes import CompactBar, CompactFill, CompactOrder, CompactTradeRecord
+from finance.core.coreTypes import Bar, Side, TradeRecord, datetime_to_ns
+from finance.data.barArrays import BarArrays
+
+DT = datetime(2024, 3, 4, 9, 31, 0, 500)
+
+
+class TestCompactTypes(unittest.TestCase):
+    def test_slots_and_dt_roundtrip(self):
+        bar = CompactBar(datetime_to_ns(DT), "AAA", 1.0, 2.0, 0.5, 1.5, 10.0)
+        self.assertFalse(hasattr(bar, "__dict__"))
+        self.assertEqual(bar.dt, DT)
+        self.assertEqual(bar.to_standard(), Bar(DT, "AAA", 1.0, 2.0, 0.5, 1.5, 10.0))
+        # 标准类型也提供 ts，两类可以混用
+        self.assertEqual(Bar(DT, "AAA", 1.0, 2.0, 0.5, 1.5, 10.0).ts, bar.ts)
+
+    def test_replace_pickle_and_properties(self):
+        order = CompactOrder("o1", datetime_to_ns(DT), "AAA", Side.BUY, 100)
+        self.assertEqual(replace(order, quantity=40).quantity, 40)
+        fill = CompactFill("o1", order.ts, "AAA", Side.BUY, 100, 10.0, 1.0, 0.5)
+        self.assertEqual(pickle.loads(pickle.dumps(fill)), fill)
+        self.assertEqual((fill.notional, fill.total_cost), (1000.0, 1.5))
+        rec = CompactTradeRecord(order.ts, "AAA", Side.SELL, 1, 2.0, 0.0, 0.0, "o1", reason="x")
+        self.assertEqual(rec.to_standard(), TradeRecord(DT, "AAA", Side.SELL, 1, 2.0, 0.0, 0.0, "o1", "x"))
+
+    def test_to_bars_roundtrip(self):
+        ts = datetime_to_ns(DT) + np.arange(3, dtype=np.int64) * 60_000_000_000
+        arrays = BarArrays(ts=ts, open=np.ones(3), high=np.ones(3), low=np.ones(3), close=np.arange(3.0), volume=np.ones(3))
+        bars = arrays.to_bars("AAA")
+        self.assertIsInstance(bars[0], CompactBar)
+        np.testing.assert_array_equal(BarArrays.from_bars(bars).ts, ts)
+
+    def test_benchmark_reports_every_type(self):
+        rows = run_benchmark(n=200, repeat=1)
+        self.assertEqual(
+            [r["type"] for r in rows],
+            ["Bar", "Signal", "Order", "Fill", "EquityPoint", "TradeRecord"],
+        )
+        for r in rows:
+            self.assertLess(r["compact_bytes"], r["standard_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from finance.core.coreTypes import DataValidationError
+from finance.data.barArrays import BarArrays, datetime_to_ns
+from finance.data.corporateActions import AdjustedBars, AdjustMode, CorporateActions, compute_factors, load_actions
+
+DAY = 86_400_000_000_000
+
+
+def _raw(close, volume=None):
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    ts = datetime_to_ns(datetime(2024, 1, 1)) + np.arange(n, dtype=np.int64) * DAY
+    volume = np.full(n, 1000.0) if volume is None else np.asarray(volume, dtype=np.float64)
+    return BarArrays(ts=ts, open=close, high=close * 1.01, low=close * 0.99, close=close, volume=volume)
+
+
+def _actions(raw, rows, split, dividend):
+    return CorporateActions(
+        ts=raw.ts[np.asarray(rows)],
+        split_ratio=np.asarray(split, dtype=np.float64),
+        dividend=np.asarray(dividend, dtype=np.float64),
+    )
+
+
+class TestCorporateActions(unittest.TestCase):
+    def test_split_forward_and_backward(self):
+        raw = _raw([10.0, 10.2, 5.1, 5.2])
+        adj = AdjustedBars(raw, _actions(raw, [2], [2.0], [0.0]))
+        fwd = adj.view(AdjustMode.FORWARD)
+        np.testing.assert_allclose(fwd.close, [5.0, 5.1, 5.1, 5.2])
+        np.testing.assert_allclose(fwd.volume, [2000, 2000, 1000, 1000])
+        bwd = adj.view("backward")
+        np.testing.assert_allclose(bwd.close, [10.0, 10.2, 10.2, 10.4])
+        np.testing.assert_allclose(bwd.volume, [1000, 1000, 500, 500])
+        self.assertIs(adj.view("none"), raw)
+
+    def test_adjusted_returns_are_total_returns(self):
+        rng = np.random.default_rng(5)
+        close = 20 * np.cumprod(1 + rng.normal(0, 0.01, 40))
+        raw = _raw(close)
+        rows, split, dividend = [10, 25, 30], [1.0, 1.5, 1.0], [0.5, 0.2, 0.3]
+        adj = AdjustedBars(raw, _actions(raw, rows, split, dividend))
+
+        # 逐笔构造：除权日的真实持有收益 = close_t × S / (close_{t-1} - D)
+        expected = close[1:] / close[:-1]
+        for r, s, d in zip(rows, split, dividend):
+            expected[r - 1] = close[r] * s / (close[r - 1] - d)
+        for mode in (AdjustMode.FORWARD, AdjustMode.BACKWARD):
+            c = adj.view(mode).close
+            np.testing.assert_allclose(c[1:] / c[:-1], expected)
+        self.assertAlmostEqual(adj.view(AdjustMode.FORWARD).close[-1], close[-1])
+        self.assertAlmostEqual(adj.view(AdjustMode.BACKWARD).close[0], close[0])
+
+    def test_views_cached_and_readonly(self):
+        raw = _raw([10.0, 9.0, 9.5])
+        adj = AdjustedBars(raw, _actions(raw, [1], [1.0], [1.0]))
+        v = adj.view("forward")
+        self.assertIs(adj.view(AdjustMode.FORWARD), v)
+        self.assertIs(v.ts, raw.ts)
+        self.assertFalse(v.close.flags.writeable)
+
+    def test_events_outside_range_and_non_trading_day(self):
+        raw = _raw([10.0, 10.0, 5.0, 5.0])
+        # 首根 bar 当天与区间之后的事件忽略；落在非交易时点的事件作用于其后第一根 bar
+        actions = CorporateActions(
+            ts=np.array([raw.ts[0], raw.ts[1] + DAY // 2, raw.ts[-1] + 5 * DAY], dtype=np.int64),
+            split_ratio=np.array([3.0, 2.0, 4.0]),
+            dividend=np.zeros(3),
+        )
+        f = compute_factors(raw, actions)[AdjustMode.FORWARD]
+        np.testing.assert_allclose(f.price, [0.5, 0.5, 1.0, 1.0])
+
+    def test_load_actions_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.csv")
+            with open(path, "w") as f:
+                f.write("date,split_ratio,dividend\n2024-06-01,,0.3\n2024-03-01,1.5,\n")
+            actions = load_actions(path)
+            self.assertEqual(actions.split_ratio.tolist(), [1.5, 1.0])
+            self.assertEqual(actions.dividend.tolist(), [0.0, 0.3])
+            self.assertLess(actions.ts[0], actions.ts[1])
+
+            with open(path, "w") as f:
+                f.write("date,split_ratio\n2024-06-01,-1\n")
+            with self.assertRaises(DataValidationError):
+                load_actions(path)
+
+    def test_dividend_above_price_rejected(self):
+        raw = _raw([1.0, 1.0])
+        with self.assertRaises(DataValidationError):
+            AdjustedBars(raw, _actions(raw, [1], [1.0], [1.0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
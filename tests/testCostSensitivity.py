@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from finance.backtest.costSensitivity import estimate_break_even, run_cost_sensitivity
+from finance.backtest.fastKernel import run_target_positions
+from finance.backtest.metrics import Metrics
+from finance.cli.runCostSensitivity import main
+from finance.core.coreTypes import Bar
+from finance.data.barArrays import BarArrays
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.strategy.smaCrossStrategy import sma_cross_targets
+
+
+def _arrays(n=500, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 20.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.004, n))
+    base = datetime(2020, 1, 1)
+    bars = [
+        Bar(dt=base + timedelta(days=i), symbol="TEST", open=o, high=max(o, c), low=min(o, c), close=c, volume=1e5)
+        for i, (o, c) in enumerate(zip(open_.tolist(), close.tolist()))
+    ]
+    return BarArrays.from_bars(bars)
+
+
+class TestCostSensitivity(unittest.TestCase):
+    def test_grid_matches_individual_runs(self):
+        bars = _arrays()
+        targets = sma_cross_targets(bars.close, 5, 20)
+        result = run_cost_sensitivity(
+            bars,
+            targets,
+            initial_cash=100_000.0,
+            fee_rates=[0.0, 0.0003, 0.002],
+            min_fees=[0.0, 5.0],
+            slippage_bps=[0.0, 10.0],
+            max_cells=700,  # 强制分块
+        )
+        self.assertEqual(len(result.table), 12)
+
+        for row in result.table.itertuples(index=False):
+            ref = run_target_positions(
+                bars,
+                targets,
+                initial_cash=100_000.0,
+                fee_model=FeeModel(rate=row.fee_rate, min_fee=row.min_fee),
+                slippage_model=SlippageModel(bps=row.slippage_bps),
+                backend="python",
+            )
+            m = Metrics.compute(ref.equity_points())
+            self.assertAlmostEqual(row.final_equity, float(ref.total_equity[-1]), places=6)
+            self.assertEqual(row.trades, int(np.count_nonzero(ref.fill_side)))
+            self.assertAlmostEqual(row.total_fees, float(ref.fill_fee.sum()), places=6)
+            self.assertAlmostEqual(row.sharpe, m["sharpe"], places=9)
+            self.assertAlmostEqual(row.max_drawdown, m["max_drawdown"], places=12)
+
+        costly = result.table.sort_values(["min_fee", "fee_rate", "slippage_bps"])
+        self.assertTrue((np.diff(costly[costly.min_fee == 0.0].groupby("fee_rate").final_equity.first().to_numpy()) < 0).all())
+
+    def test_break_even_interpolation(self):
+        table = pd.DataFrame(
+            {
+                "fee_rate": [0.0, 0.0, 0.0],
+                "min_fee": [0.0, 0.0, 0.0],
+                "slippage_bps": [0.0, 10.0, 20.0],
+                "cumulative_return": [0.2, 0.1, -0.1],
+            }
+        )
+        be = estimate_break_even(table)
+        self.assertAlmostEqual(float(be.break_even_cost_bps.iloc[0]), 15.0)
+
+        table["cumulative_return"] = [0.3, 0.2, 0.1]
+        self.assertTrue(np.isnan(estimate_break_even(table).break_even_cost_bps.iloc[0]))
+
+    def test_cli_uses_resample_and_session_minutes(self):
+        rng = np.random.default_rng(5)
+        close = 10.0 * np.exp(np.cumsum(rng.normal(0, 0.002, 2400)))
+        base = datetime(2024, 1, 2, 9, 30)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "M.csv")
+            with open(path, "w") as f:
+                f.write("date,open,high,low,close,volume\n")
+                for i, c in enumerate(close.tolist()):
+                    f.write(f"{(base + timedelta(minutes=i)).isoformat()},{c},{c},{c},{c},100\n")
+
+            def run(run_id, minutes):
+                argv = ["--symbol", "M", "--csv-path", path, "--date-format", "ISO8601", "--bar-freq", "1m", "--resample", "5m",
+                        "--session-minutes", str(minutes), "--fast", "3", "--slow", "10", "--fee-rates", "0", "--slippage-bps", "0",
+                        "--output-root", d, "--run-id", run_id, "--log-level", "ERROR"]
+                self.assertEqual(main(argv), 0)
+                with open(os.path.join(d, run_id, "break_even.json")) as f:
+                    meta = json.load(f)
+                return meta, pd.read_csv(os.path.join(d, run_id, "cost_sensitivity.csv"))
+
+            meta, a = run("a", 240)
+            _, b = run("b", 390)
+        self.assertEqual((meta["bar_freq"], meta["session_minutes"]), ("5m", 240.0))
+        # 年化口径随每日交易分钟数变化（同一份 5m bar：每年 bar 数不同）
+        self.assertAlmostEqual(b["sharpe"][0] / a["sharpe"][0], np.sqrt(390 / 240))
+
@@ -0,0 +1,130 @@
+import unittest
+
+import numpy as np
+
+from finance.backtest.crossSectionalEngine import CrossSectionalEngine
+from finance.data.barArrays import BarArrays
+from finance.data.tradingCalendar import AlignedPanel, TradingCalendar
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.multiAssetPortfolio import MultiAssetPortfolio
+from finance.strategy.crossSectionalStrategy import (
+    CrossSectionalStrategy,
+    RebalanceSchedule,
+    TopKMomentumStrategy,
+    cross_rank,
+    cross_zscore,
+    normalize_weights,
+    top_k_mask,
+)
+
+NS_DAY = 86_400 * 10**9
+T0 = np.datetime64("2024-01-01", "ns").astype(np.int64)  # 周一
+
+
+def _arrays(ts, close):
+    close = np.asarray(close, dtype=np.float64)
+    return BarArrays(ts=np.asarray(ts, dtype=np.int64), open=close, high=close, low=close, close=close, volume=np.ones_like(close))
+
+
+class _FixedWeights(CrossSectionalStrategy):
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.calls = []
+
+    def target_weights(self, snapshot):
+        self.calls.append(snapshot.t)
+        return self.weights
+
+
+class TestCrossSectionalOps(unittest.TestCase):
+    def test_rank_zscore_topk(self):
+        x = np.array([[3.0, np.nan, 1.0, 2.0], [1.0, 2.0, 3.0, 4.0]])
+        r = cross_rank(x)
+        np.testing.assert_allclose(r[0], [1.0, np.nan, 1 / 3, 2 / 3])
+        np.testing.assert_allclose(cross_rank(x, pct=False)[1], [1, 2, 3, 4])
+
+        z = cross_zscore(x)
+        self.assertTrue(np.isnan(z[0, 1]))
+        self.assertAlmostEqual(float(np.nansum(z[0])), 0.0)
+        np.testing.assert_allclose(np.nanstd(z, axis=1), [1.0, 1.0])
+
+        self.assertEqual(top_k_mask(x, 2).tolist(), [[True, False, False, True], [False, False, True, True]])
+        self.assertEqual(top_k_mask(x[0], 2, largest=False).tolist(), [False, False, True, True])
+        # 有效值不足 k 个时不选 NaN
+        self.assertEqual(int(top_k_mask(x[0], 4).sum()), 3)
+
+        np.testing.assert_allclose(normalize_weights(np.array([1.0, 3.0, np.nan, -1.0])), [0.25, 0.75, 0.0, 0.0])
+
+    def test_schedule(self):
+        cal = TradingCalendar(ts=T0 + np.arange(40, dtype=np.int64) * NS_DAY)
+        self.assertEqual(np.flatnonzero(RebalanceSchedule(n=10, offset=5).mask(cal)).tolist(), [5, 15, 25, 35])
+        weekly = np.flatnonzero(RebalanceSchedule("1w").mask(cal))
+        self.assertEqual(weekly[:2].tolist(), [6, 13])  # 周日为每周最后一根 bar
+        monthly = np.flatnonzero(RebalanceSchedule("1M").mask(cal))
+        self.assertEqual(monthly.tolist(), [30, 39])
+
+    def test_broker_sizing(self):
+        broker = Broker(fee_model=FeeModel(rate=0.0), slippage_model=SlippageModel(bps=0.0))
+        deltas = broker.size_target_weights(
+            target_weights=np.array([0.5, 0.5, 0.0, 0.2]),
+            prices=np.array([10.0, np.nan, 20.0, 7.0]),
+            quantities=np.array([0, 100, 30, 0]),
+            equity=10_000.0,
+            lot_size=100,
+        )
+        self.assertEqual(deltas.tolist(), [500, 0, -30, 200])
+        self.assertEqual(Broker(fee_model=FeeModel(rate=0.001, min_fee=5.0)).affordable_qty(10.0, 1000.0), 99)
+
+
+class TestCrossSectionalEngine(unittest.TestCase):
+    def test_weights_applied_next_open_only_on_rebalance(self):
+        n = 10
+        ts = T0 + np.arange(n, dtype=np.int64) * NS_DAY
+        panel = AlignedPanel.build(
+            {
+                "A": _arrays(ts, np.linspace(10, 12, n)),
+                "B": _arrays(ts, np.linspace(20, 18, n)),
+                "C": _arrays(ts[::2], np.linspace(5, 6, n // 2)),  # 隔日停牌
+            }
+        )
+        strategy = _FixedWeights([0.5, 0.25, 0.0])
+        pf = MultiAssetPortfolio(panel.symbols, initial_cash=100_000.0)
+        engine = CrossSectionalEngine(
+            panel=panel,
+            strategy=strategy,
+            broker=Broker(fee_model=FeeModel(rate=0.001), slippage_model=SlippageModel(bps=10)),
+            portfolio=pf,
+            schedule=RebalanceSchedule(n=4),
+        )
+        result = engine.run()
+
+        self.assertEqual(strategy.calls, [0, 4, 8])
+        self.assertEqual(result.rebalances, 3)
+        self.assertEqual(result.dropped_last_bar, 0)
+        self.assertTrue(all(t.dt.day in (2, 6, 10) for t in result.trades))
+        self.assertEqual(pf.position_qty("C"), 0)
+
+        w = pf.weights()
+        self.assertAlmostEqual(float(w[0]), 0.5, delta=0.01)
+        self.assertAlmostEqual(float(w[1]), 0.25, delta=0.01)
+        last = result.equity_curve[-1]
+        self.assertAlmostEqual(last.total_equity, pf.cash + float(pf.quantities @ panel.values_at(n - 1, "close", "ffill")))
+        self.assertGreater(pf.cash, 0.0)
+
+    def test_top_k_momentum(self):
+        n = 30
+        ts = T0 + np.arange(n, dtype=np.int64) * NS_DAY
+        growth = {"A": 0.01, "B": -0.01, "C": 0.02, "D": 0.0}
+        panel = AlignedPanel.build({s: _arrays(ts, 10 * (1 + g) ** np.arange(n)) for s, g in growth.items()})
+        pf = MultiAssetPortfolio(panel.symbols, initial_cash=1_000_000.0)
+        CrossSectionalEngine(
+            panel=panel,
+            strategy=TopKMomentumStrategy(lookback=5, k=2),
+            broker=Broker(),
+            portfolio=pf,
+            schedule=RebalanceSchedule(n=5),
+        ).run()
+        held = [s for s in panel.symbols if pf.position_qty(s) > 0]
+        self.assertEqual(held, ["A", "C"])
@@ -37,3 +37,21 @@ class TestCsvDataSource(unittest.TestCase):
             ds = CsvDataSource()
             with self.assertRaises(DataValidationError):
                 ds.load(symbol="TEST", csv_path=p)
+
+    def test_intraday_timestamps(self):
+        csv = """date,open,high,low,close,volume
+2025-01-02 09:32:00,10,11,9,10,100
+2025-01-02 09:31:00,8,9,7,8,100
+"""
+        with tempfile.TemporaryDirectory() as d:
+            p = os.path.join(d, "x.csv")
+            with open(p, "w", encoding="utf-8") as f:
+                f.write(csv)
+
+            ds = CsvDataSource(date_format="ISO8601")
+            r = ds.load(symbol="TEST", csv_path=p)
+            self.assertEqual([b.dt for b in r.bars], [datetime(2025, 1, 2, 9, 31), datetime(2025, 1, 2, 9, 32)])
+
+            arrays = ds.load_arrays(p)
+            self.assertEqual(arrays.datetimes(), [b.dt for b in r.bars])
+            self.assertEqual(list(arrays.close), [8.0, 10.0])
@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.core.coreTypes import DataValidationError
+from finance.data.barArrays import BarArrays, datetime_to_ns
+from finance.data.dataHandler import DataHandler
+from finance.data.dataServer import DataClient, DataServer, RemoteDataHandler
+from finance.execution.broker import Broker
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
+
+def _arrays(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = np.array([datetime_to_ns(datetime(2024, 1, 1)) + i * 86_400_000_000_000 for i in range(n)], dtype=np.int64)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0, 0.01, n))
+    return BarArrays(ts=ts, open=close * 0.999, high=close * 1.01, low=close * 0.99, close=close, volume=np.full(n, 1000.0))
+
+
+class TestDataServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sock = os.path.join(self.tmp.name, "data.sock")
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data_dir)
+        self.server = DataServer(self.sock, store_dir=self.tmp.name, data_dir=self.data_dir).start()
+        self.arrays = _arrays(120)
+        self.server.add_arrays("AAA", self.arrays)
+
+    def tearDown(self):
+        self.server.close()
+        self.tmp.cleanup()
+
+    def test_fetch_is_readonly_shared_view(self):
+        with DataClient(self.sock) as client:
+            self.assertTrue(client.ping())
+            self.assertEqual(client.symbols(), ["AAA"])
+            got = client.fetch("AAA")
+            for name in ("ts", "open", "high", "low", "close", "volume"):
+                np.testing.assert_array_equal(getattr(got, name), getattr(self.arrays, name))
+            self.assertEqual(got.ts.dtype, np.int64)
+            self.assertFalse(got.close.flags.writeable)
+            with self.assertRaises(KeyError):
+                client.fetch("BBB")
+
+    def test_fetch_date_range_inclusive(self):
+        with DataClient(self.sock) as client:
+            got = client.fetch("AAA", start=datetime(2024, 1, 11), end=datetime(2024, 1, 20))
+        self.assertEqual(len(got), 10)
+        self.assertEqual(int(got.ts[0]), int(self.arrays.ts[10]))
+        self.assertEqual(int(got.ts[-1]), int(self.arrays.ts[19]))
+
+    def test_reload_keeps_existing_mappings(self):
+        with DataClient(self.sock) as client:
+            old = client.fetch("AAA")
+            self.server.add_arrays("AAA", _arrays(50, seed=1))
+            new = client.fetch("AAA")
+        self.assertEqual(len(new), 50)
+        np.testing.assert_array_equal(old.close, self.arrays.close)
+
+    def test_fetch_retries_when_old_file_was_replaced(self):
+        with DataClient(self.sock) as client:
+            stale = client.request("get", symbol="AAA")
+            self.server.add_arrays("AAA", _arrays(50, seed=1))
+            request = client.request
+            replies = [stale]
+            client.request = lambda op, **kw: replies.pop() if replies and op == "get" else request(op, **kw)
+            self.assertEqual(len(client.fetch("AAA")), 50)
+
+    def test_load_csv_through_client(self):
+        body = "date,open,high,low,close,volume\n2024-01-02,1,2,1,1.5,10\n2024-01-03,1.5,2,1,1.8,12\n"
+        path = os.path.join(self.data_dir, "b.csv")
+        outside = os.path.join(self.tmp.name, "c.csv")
+        for p in (path, outside):
+            with open(p, "w") as f:
+                f.write(body)
+        with DataClient(self.sock) as client:
+            entry = client.load("BBB", path)
+            self.assertEqual(entry.rows, 2)
+            self.assertEqual(client.fetch("BBB").close.tolist(), [1.5, 1.8])
+            # data_dir 之外的路径（含 .. 跳出）一律拒绝
+            for p in (outside, os.path.join(self.data_dir, "..", "c.csv")):
+                with self.assertRaises(DataValidationError):
+                    client.load("CCC", p)
+            self.assertEqual(client.symbols(), ["AAA", "BBB"])
+
+    def test_remote_handler_matches_local_backtest(self):
+        def run(data):
+            engine = BacktestEngine(
+                symbol="AAA",
+                data=data,
+                strategy=SmaCrossStrategy(symbol="AAA", fast_window=3, slow_window=8),
+                broker=Broker(),
+                portfolio=Portfolio(symbol="AAA", initial_cash=10_000.0),
+            )
+            return engine.run()
+
+        local = run(DataHandler(_bars_by_symbol={"AAA": self.arrays.to_bars("AAA")}))
+        with RemoteDataHandler(self.sock) as remote:
+            self.assertEqual(remote.bar_count("AAA"), 120)
+            result = run(remote)
+        self.assertEqual(result.run_summary.final_equity, local.run_summary.final_equity)
+        self.assertEqual(len(result.trades), len(local.trades))
+
+    def test_client_does_not_import_pandas(self):
+        code = (
+            "import sys\n"
+            "from finance.data.dataServer import DataClient\n"
+            f"c = DataClient({self.sock!r})\n"
+            "assert len(c.fetch('AAA')) == 120\n"
+            "print('pandas' in sys.modules)\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
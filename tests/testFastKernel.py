@@ -0,0 +1,111 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.backtest.fastKernel import jit_available, run_target_positions
+from finance.core.coreTypes import Bar
+from finance.data.barArrays import BarArrays
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy, sma_cross_targets
+
+COSTS = [(0.0, 0.0, 0.0), (0.0003, 5.0, 5.0), (0.001, 0.0, 20.0)]
+
+
+def _random_bars(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 10.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    base = datetime(2020, 1, 1)
+    return [
+        Bar(dt=base + timedelta(days=i), symbol="TEST", open=o, high=max(o, c) * 1.01, low=min(o, c) * 0.99, close=c, volume=1e5)
+        for i, (o, c) in enumerate(zip(open_.tolist(), close.tolist()))
+    ]
+
+
+class TestFastKernel(unittest.TestCase):
+    def setUp(self):
+        self.bars = _random_bars()
+        self.arrays = BarArrays.from_bars(self.bars)
+        self.targets = sma_cross_targets(self.arrays.close, 5, 20)
+
+    def test_vectorized_targets_match_strategy(self):
+        s = SmaCrossStrategy(symbol="TEST", fast_window=5, slow_window=20)
+        expected = np.full(len(self.bars), np.nan)
+        for i, bar in enumerate(self.bars):
+            sig = s.on_bar(bar)
+            if sig is not None:
+                expected[i] = sig.target_position
+        np.testing.assert_array_equal(self.targets, expected)
+
+    def test_targets_match_strategy_on_rounded_and_flat_prices(self):
+        rng = np.random.default_rng(3)
+        rounded = np.round(10.0 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000))), 2)
+        flat = np.repeat(np.round(10.0 + rng.normal(0, 0.3, 400), 2), 50)
+        for close in (rounded, flat):
+            s = SmaCrossStrategy(symbol="TEST", fast_window=5, slow_window=20)
+            expected = np.full(close.shape[0], np.nan)
+            for i, c in enumerate(close.tolist()):
+                sig = s.on_bar(Bar(dt=datetime(2020, 1, 1) + timedelta(minutes=i), symbol="TEST", open=c, high=c, low=c, close=c, volume=1.0))
+                if sig is not None:
+                    expected[i] = sig.target_position
+            np.testing.assert_array_equal(sma_cross_targets(close, 5, 20), expected)
+
+    def test_reference_path_matches_engine(self):
+        for rate, min_fee, bps in COSTS:
+            engine = BacktestEngine(
+                symbol="TEST",
+                data=DataHandler(_bars_by_symbol={"TEST": self.bars}),
+                strategy=SmaCrossStrategy(symbol="TEST", fast_window=5, slow_window=20),
+                broker=Broker(fee_model=FeeModel(rate=rate, min_fee=min_fee), slippage_model=SlippageModel(bps=bps)),
+                portfolio=Portfolio(symbol="TEST", initial_cash=100_000.0),
+            )
+            expected = engine.run()
+            got = run_target_positions(
+                self.arrays,
+                self.targets,
+                initial_cash=100_000.0,
+                fee_model=FeeModel(rate=rate, min_fee=min_fee),
+                slippage_model=SlippageModel(bps=bps),
+                backend="python",
+            )
+            np.testing.assert_allclose(got.total_equity, [p.total_equity for p in expected.equity_curve])
+            self.assertEqual(int(np.count_nonzero(got.fill_side)), len(expected.trades))
+
+    def _assert_backend_matches_reference(self, backend):
+        for rate, min_fee, bps in COSTS:
+            kwargs = dict(initial_cash=100_000.0, fee_model=FeeModel(rate=rate, min_fee=min_fee), slippage_model=SlippageModel(bps=bps))
+            ref = run_target_positions(self.arrays, self.targets, backend="python", **kwargs)
+            got = run_target_positions(self.arrays, self.targets, backend=backend, **kwargs)
+            np.testing.assert_allclose(got.cash, ref.cash, rtol=1e-12)
+            np.testing.assert_array_equal(got.position_qty, ref.position_qty)
+            np.testing.assert_allclose(got.total_equity, ref.total_equity, rtol=1e-12)
+            np.testing.assert_array_equal(got.fill_side, ref.fill_side)
+            np.testing.assert_allclose(got.fill_fee, ref.fill_fee, rtol=1e-12)
+            np.testing.assert_allclose(got.fill_slippage, ref.fill_slippage, rtol=1e-12)
+
+    def test_interpreted_kernel_matches_reference(self):
+        self._assert_backend_matches_reference("kernel")
+
+    @unittest.skipUnless(jit_available(), "numba not installed")
+    def test_compiled_kernel_matches_reference(self):
+        self._assert_backend_matches_reference("numba")
+
+    def test_auto_backend_falls_back(self):
+        r = run_target_positions(self.arrays, self.targets, initial_cash=100_000.0)
+        self.assertEqual(r.backend, "numba" if jit_available() else "python")
+        if not jit_available():
+            with self.assertRaises(RuntimeError):
+                run_target_positions(self.arrays, self.targets, initial_cash=100_000.0, backend="numba")
+
+    def test_invalid_target_raises(self):
+        targets = np.full(len(self.bars), np.nan)
+        targets[3] = 0.5
+        for backend in ("kernel", "python"):
+            with self.assertRaises(ValueError):
+                run_target_positions(self.arrays, targets, initial_cash=1000.0, backend=backend)
@@ -0,0 +1,155 @@
+import math
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.core.coreTypes import Bar, Side, Signal
+from finance.data.barArrays import BarArrays
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.marketImpact import LiquidityProfile, MarketImpactModel
+from finance.execution.orderBook import stop_order
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.strategyBase import StrategyBase
+
+DT = datetime(2025, 1, 2)
+
+
+def _bars(closes, volumes, symbol="AAA"):
+    return [
+        Bar(dt=DT + timedelta(days=i), symbol=symbol, open=c, high=c * 1.01, low=c * 0.99, close=c, volume=float(v))
+        for i, (c, v) in enumerate(zip(closes, volumes))
+    ]
+
+
+class TestLiquidityProfile(unittest.TestCase):
+    def test_matches_brute_force_without_lookahead(self):
+        rng = np.random.default_rng(3)
+        n = 60
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+        volume = rng.uniform(1e4, 5e4, n)
+        arrays = BarArrays(ts=np.arange(n, dtype=np.int64), open=close, high=close, low=close, close=close, volume=volume)
+        p = LiquidityProfile.build(arrays, adv_window=5, vol_window=10)
+        rets = close[1:] / close[:-1] - 1
+        for t in range(n):
+            adv = volume[max(0, t - 5) : t].mean() if t else math.nan
+            r = rets[max(0, t - 11) : max(t - 1, 0)]
+            vol = r.std() if len(r) >= 2 else math.nan
+            self.assertTrue(np.isclose(p.adv[t], adv, equal_nan=True), t)
+            self.assertTrue(np.isclose(p.volatility[t], vol, equal_nan=True), t)
+
+    def test_impact_and_capacity(self):
+        m = MarketImpactModel(impact_coef=2.0, exponent=0.5, max_participation=0.1)
+        self.assertAlmostEqual(m.impact(2500, 10_000.0, 0.02), 2.0 * 0.02 * 0.5)
+        self.assertEqual(m.impact(100, math.nan, 0.02), 0.0)
+        self.assertEqual(m.capacity(12_345), 1234)
+        buy, cost = m.exec_price(10.0, Side.BUY, 2500, 10_000.0, 0.02)
+        sell, _ = m.exec_price(10.0, Side.SELL, 2500, 10_000.0, 0.02)
+        self.assertAlmostEqual(buy, 10.2)
+        self.assertAlmostEqual(sell, 9.8)
+        self.assertAlmostEqual(cost, 0.2)
+        with self.assertRaises(ValueError):
+            MarketImpactModel(max_participation=1.5)
+
+
+class TestParticipationCap(unittest.TestCase):
+    def _broker(self, bars, **kw):
+        broker = Broker(impact_model=MarketImpactModel(**kw))
+        broker.attach_liquidity("AAA", BarArrays.from_bars(bars))
+        return broker
+
+    def test_open_fill_capped_and_carried(self):
+        bars = _bars([10.0] * 4, [1000, 1000, 1000, 1000])
+        broker = self._broker(bars, impact_coef=0.0, max_participation=0.1)
+        broker.queue_signal(Signal(dt=bars[0].dt, symbol="AAA", target_position=1.0))
+
+        order, fill = broker.execute_open(bars[1], cash=10_000.0, position_qty=0)
+        self.assertEqual((order.quantity, fill.quantity), (100, 100))
+        self.assertTrue(broker.has_pending())
+        _, fill = broker.execute_open(bars[2], cash=9_000.0, position_qty=100)
+        self.assertEqual(fill.quantity, 100)
+        # 新 signal 覆盖顺延中的目标
+        broker.queue_signal(Signal(dt=bars[2].dt, symbol="AAA", target_position=0.0))
+        _, fill = broker.execute_open(bars[3], cash=8_000.0, position_qty=200)
+        self.assertEqual((fill.side, fill.quantity), (Side.SELL, 100))
+
+    def test_zero_volume_bar_fills_nothing(self):
+        bars = _bars([10.0] * 3, [1000, 0, 1000])
+        broker = self._broker(bars, impact_coef=0.0, max_participation=0.5)
+        broker.queue_signal(Signal(dt=bars[0].dt, symbol="AAA", target_position=1.0))
+        self.assertEqual(broker.execute_open(bars[1], cash=1_000.0, position_qty=0), (None, None))
+        _, fill = broker.execute_open(bars[2], cash=1_000.0, position_qty=0)
+        self.assertEqual(fill.quantity, 100)
+
+    def test_resting_stop_remainder_fills_next_open(self):
+        bars = _bars([10.0, 10.0, 8.0, 7.0], [1000, 1000, 1000, 1000])
+        broker = self._broker(bars, impact_coef=0.0, max_participation=0.2)
+        oid = broker.submit_order(stop_order(DT, "AAA", Side.SELL, 300, 9.0))
+        first = broker.execute_resting(bars[2], cash=0.0, position_qty=300)
+        self.assertEqual([f.quantity for _, f in first], [200])
+        self.assertIn(oid, broker.order_book)
+        second = broker.execute_resting(bars[3], cash=1_600.0, position_qty=100)
+        self.assertEqual([(f.quantity, f.price, f.order_id) for _, f in second], [(100, 7.0, oid)])
+
+    def test_remainder_not_carried_when_position_or_cash_binds(self):
+        bars = _bars([10.0, 10.0, 8.0, 7.0], [1000, 1000, 1000, 1000])
+        broker = self._broker(bars, impact_coef=0.0, max_participation=0.2)
+        flat = broker.submit_order(stop_order(DT, "AAA", Side.SELL, 300, 9.0))
+        self.assertEqual(broker.execute_resting(bars[2], cash=0.0, position_qty=0), [])
+        self.assertNotIn(flat, broker.order_book)
+        self.assertEqual(broker.execute_resting(bars[3], cash=0.0, position_qty=300), [])
+
+        # 持仓少于容量：成交持仓部分，剩余撤销
+        broker = self._broker(bars, impact_coef=0.0, max_participation=0.2)
+        partial = broker.submit_order(stop_order(DT, "AAA", Side.SELL, 300, 9.0))
+        self.assertEqual([f.quantity for _, f in broker.execute_resting(bars[2], cash=0.0, position_qty=50)], [50])
+        self.assertNotIn(partial, broker.order_book)
+
+    def test_impact_raises_buy_cost_and_respects_cash(self):
+        closes = list(100 * np.cumprod(1 + np.tile([0.02, -0.02], 15)))
+        bars = _bars(closes, [1000] * 30)
+        broker = self._broker(bars, impact_coef=1.0)
+        broker.queue_signal(Signal(dt=bars[25].dt, symbol="AAA", target_position=1.0))
+        cash = 100_000.0
+        _, fill = broker.execute_open(bars[26], cash=cash, position_qty=0)
+        self.assertGreater(fill.price, bars[26].open)
+        self.assertLessEqual(fill.price * fill.quantity + fill.fee, cash)
+        self.assertGreater(fill.slippage, 0.0)
+
+
+class _Hold(StrategyBase):
+    def on_bar(self, bar):
+        if bar.dt == DT:
+            return Signal(dt=bar.dt, symbol=bar.symbol, target_position=1.0)
+        return None
+
+
+class TestEngineWithImpact(unittest.TestCase):
+    def test_position_builds_over_several_bars(self):
+        bars = _bars([10.0] * 8, [500] * 8)
+        engine = BacktestEngine(
+            symbol="AAA",
+            data=DataHandler(_bars_by_symbol={"AAA": bars}),
+            strategy=_Hold(),
+            broker=Broker(impact_model=MarketImpactModel(impact_coef=0.0, max_participation=0.2)),
+            portfolio=Portfolio(symbol="AAA", initial_cash=1_000.0),
+        )
+        result = engine.run()
+        self.assertEqual([t.quantity for t in result.trades], [100])
+        self.assertEqual(result.equity_curve[-1].position_qty, 100)
+
+        engine = BacktestEngine(
+            symbol="AAA",
+            data=DataHandler(_bars_by_symbol={"AAA": bars}),
+            strategy=_Hold(),
+            broker=Broker(impact_model=MarketImpactModel(impact_coef=0.0, max_participation=0.05)),
+            portfolio=Portfolio(symbol="AAA", initial_cash=1_000.0),
+        )
+        result = engine.run()
+        self.assertEqual([t.quantity for t in result.trades], [25, 25, 25, 25])
+
+
+if __name__ == "__main__":
+    unittest.main()
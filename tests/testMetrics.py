@@ -0,0 +1,29 @@
+import unittest
+from datetime import datetime, timedelta
+
+from finance.backtest.metrics import Metrics, MetricsConfig
+from finance.core.coreTypes import EquityPoint
+
+
+def _curve(values, step):
+    base = datetime(2025, 1, 2, 9, 30)
+    return [
+        EquityPoint(dt=base + step * i, cash=v, position_qty=0, close=1.0, position_value=0.0, total_equity=v)
+        for i, v in enumerate(values)
+    ]
+
+
+class TestMetrics(unittest.TestCase):
+    def test_periods_per_year_follows_bar_frequency(self):
+        self.assertAlmostEqual(MetricsConfig().periods_per_year(), 252.0)
+        self.assertAlmostEqual(MetricsConfig(bar_frequency="1m").periods_per_year(), 252.0 * 240)
+        self.assertAlmostEqual(MetricsConfig(bar_frequency="5m", session_minutes=390).periods_per_year(), 252.0 * 78)
+        self.assertAlmostEqual(MetricsConfig(bar_frequency="1w").periods_per_year(), 50.4)
+
+    def test_intraday_sharpe_scales_with_sqrt_periods(self):
+        values = [100.0, 101.0, 100.5, 102.0, 101.0, 103.0]
+        daily = Metrics.compute(_curve(values, timedelta(days=1)))
+        minute = Metrics.compute(_curve(values, timedelta(minutes=1)), MetricsConfig(bar_frequency="1m"))
+
+        self.assertAlmostEqual(minute["sharpe"], daily["sharpe"] * (240**0.5))
+        self.assertEqual(minute["cumulative_return"], daily["cumulative_return"])
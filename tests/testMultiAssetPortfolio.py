@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from finance.core.coreTypes import Bar, Fill, Order, RiskRejectedError, Side
+from finance.portfolio.multiAssetPortfolio import MultiAssetPortfolio
+
+
+def _order_fill(oid, symbol, side, qty, price, fee=0.0):
+    dt = datetime(2025, 1, 2)
+    order = Order(id=oid, dt=dt, symbol=symbol, side=side, quantity=qty, reason="")
+    fill = Fill(order_id=oid, dt=dt, symbol=symbol, side=side, quantity=qty, price=price, fee=fee, slippage=0.0)
+    return order, fill
+
+
+class TestMultiAssetPortfolio(unittest.TestCase):
+    def test_fills_update_slots_and_mark_to_market(self):
+        p = MultiAssetPortfolio(symbols=["A", "B", "C"], initial_cash=10_000.0)
+        p.apply_fill(*_order_fill("o1", "A", Side.BUY, 100, 10.0, fee=5.0))
+        p.apply_fill(*_order_fill("o2", "C", Side.BUY, 50, 20.0))
+        p.apply_fill(*_order_fill("o3", "C", Side.BUY, 50, 30.0))
+        p.apply_fill(*_order_fill("o4", "A", Side.SELL, 40, 12.0, fee=1.0))
+
+        np.testing.assert_array_equal(p.quantities, [60, 0, 100])
+        np.testing.assert_allclose(p.avg_prices, [10.0, 0.0, 25.0])
+        self.assertAlmostEqual(p.cash, 10_000.0 - 1005.0 - 1000.0 - 1500.0 + 480.0 - 1.0)
+
+        pt = p.mark_to_market(datetime(2025, 1, 2), np.array([11.0, 5.0, 26.0]))
+        self.assertAlmostEqual(pt.position_value, 60 * 11.0 + 100 * 26.0)
+        self.assertAlmostEqual(pt.total_equity, pt.cash + pt.position_value)
+        self.assertEqual(pt.holdings, 2)
+
+        # NaN（停牌）沿用上一次价格
+        pt2 = p.mark_to_market_bars(datetime(2025, 1, 3), [Bar(dt=datetime(2025, 1, 3), symbol="A", open=12, high=12, low=12, close=12, volume=1)])
+        self.assertAlmostEqual(pt2.position_value, 60 * 12.0 + 100 * 26.0)
+        self.assertEqual(len(p.equity_curve), 2)
+        self.assertEqual(len(p.trades), 4)
+
+    def test_risk_and_position_checks_still_apply(self):
+        p = MultiAssetPortfolio(symbols=["A"], initial_cash=100.0)
+        with self.assertRaises(RiskRejectedError):
+            p.apply_fill(*_order_fill("o1", "A", Side.BUY, 11, 10.0))
+        with self.assertRaises(ValueError):
+            p.apply_fill(*_order_fill("o2", "A", Side.SELL, 1, 10.0))
+        with self.assertRaises(ValueError):
+            p.apply_fill(*_order_fill("o3", "Z", Side.BUY, 1, 10.0))
+        self.assertEqual(p.cash, 100.0)
@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.core.coreTypes import Bar
+from finance.data.barAggregator import BarAggregator
+from finance.data.barArrays import BarArrays, datetime_to_ns
+from finance.data.dataHandler import DataHandler
+from finance.data.resampler import resample_ohlcv
+from finance.execution.broker import Broker
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.multiTimeframeStrategy import MultiTimeframeStrategy, TrendFilteredSmaStrategy
+
+
+def _minute_bars(n, start=datetime(2024, 3, 4, 9, 30), gaps=()):
+    rng = np.random.default_rng(2)
+    close = 10 * np.cumprod(1 + rng.normal(0, 0.001, n))
+    out = []
+    for i, c in enumerate(close):
+        if i in gaps:
+            continue
+        o = close[i - 1] if i else c
+        out.append(Bar(start + timedelta(minutes=i), "AAA", o, max(o, c) * 1.001, min(o, c) * 0.999, c, float(100 + i)))
+    return out
+
+
+def _daily_bars(n, start=datetime(2024, 1, 1)):
+    rng = np.random.default_rng(4)
+    close = 20 * np.cumprod(1 + rng.normal(0.001, 0.02, n))
+    days = [d for d in (start + timedelta(days=i) for i in range(n * 2)) if d.weekday() < 5][:n]
+    return [Bar(d, "AAA", c, c * 1.01, c * 0.99, c, 1e4) for d, c in zip(days, close)]
+
+
+class TestBarAggregator(unittest.TestCase):
+    def test_matches_vectorized_resample(self):
+        bars = _minute_bars(120, gaps={7, 8, 9, 33})
+        agg = BarAggregator("5m")
+        done = [b for b in (agg.update(bar) for bar in bars) if b is not None]
+        done.append(agg.partial)
+
+        expected = resample_ohlcv(BarArrays.from_bars(bars), "5m", label="left")
+        self.assertEqual([datetime_to_ns(b.dt) for b in done], expected.ts.tolist())
+        for field in ("open", "high", "low", "close", "volume"):
+            np.testing.assert_allclose([getattr(b, field) for b in done], getattr(expected, field))
+
+    def test_finalized_on_period_close_with_base_timeframe(self):
+        bars = _minute_bars(10)
+        agg = BarAggregator("5m", base_timeframe="1m")
+        emitted = [agg.update(bar) is not None for bar in bars]
+        # 9:30 起每 5 根分钟线的最后一根收盘即定稿
+        self.assertEqual(emitted, [False, False, False, False, True] * 2)
+        self.assertIsNone(agg.partial)
+
+    def test_partial_has_no_future_data(self):
+        bars = _minute_bars(5)
+        agg = BarAggregator("5m")
+        for i, bar in enumerate(bars):
+            agg.update(bar)
+            p = agg.partial
+            self.assertEqual(p.close, bar.close)
+            self.assertEqual(p.high, max(b.high for b in bars[: i + 1]))
+            self.assertEqual(p.volume, sum(b.volume for b in bars[: i + 1]))
+
+    def test_rejects_out_of_order(self):
+        bars = _minute_bars(12)
+        agg = BarAggregator("5m")
+        agg.update(bars[10])
+        with self.assertRaises(ValueError):
+            agg.update(bars[2])
+
+
+class _Recorder(MultiTimeframeStrategy):
+    def __init__(self):
+        super().__init__(["1w"], base_timeframe="1d")
+        self.seen = []
+
+    def on_base_bar(self, bar):
+        self.seen.append((bar.dt, [b.dt for b in self.higher("1w")]))
+        return None
+
+
+class TestMultiTimeframeStrategy(unittest.TestCase):
+    def test_weekly_bars_only_after_week_ends(self):
+        strategy = _Recorder()
+        for bar in _daily_bars(30):
+            strategy.on_bar(bar)
+        for dt, weeks in strategy.seen:
+            for week_start in weeks:
+                self.assertLessEqual(week_start + timedelta(days=7), dt + timedelta(days=1))
+        # 周一收盘时可见上一周（周五之后才算结束）
+        monday, weeks = strategy.seen[5]
+        self.assertEqual(monday.weekday(), 0)
+        self.assertEqual(weeks, [datetime(2024, 1, 1)])
+
+    def test_trend_filter_blocks_entries_in_downtrend(self):
+        bars = _daily_bars(300)
+        strategy = TrendFilteredSmaStrategy(symbol="AAA", fast_window=5, slow_window=20, trend_timeframe="1w", trend_window=4)
+        engine = BacktestEngine(
+            symbol="AAA",
+            data=DataHandler(_bars_by_symbol={"AAA": bars}),
+            strategy=strategy,
+            broker=Broker(),
+            portfolio=Portfolio(symbol="AAA", initial_cash=100_000.0),
+        )
+        result = engine.run()
+        self.assertGreater(len(result.trades), 0)
+
+        weekly = resample_ohlcv(BarArrays.from_bars(bars), "1w")
+        sma = np.convolve(weekly.close, np.ones(4) / 4, mode="full")[: len(weekly)]
+        for t in result.trades:
+            if t.side.value != "BUY":
+                continue
+            # 买入由前一根 bar 的信号触发；信号发出时最近一根已结束的周线须在其 SMA 之上
+            signal_ts = max(datetime_to_ns(b.dt) for b in bars if b.dt < t.dt)
+            finished = np.flatnonzero(weekly.ts + 7 * 86_400_000_000_000 <= signal_ts)
+            k = finished[-1]
+            self.assertGreaterEqual(k, 3)
+            self.assertGreater(weekly.close[k], sma[k])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.backtest.metrics import Metrics
+from finance.backtest.optimizer import rung_budgets, sma_grid, successive_halving
+from finance.core.coreTypes import Bar
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
+
+def _bars(n=400, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 10.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    base = datetime(2020, 1, 1)
+    return [
+        Bar(dt=base + timedelta(days=i), symbol="T", open=c, high=c, low=c, close=c, volume=1.0)
+        for i, c in enumerate(close.tolist())
+    ]
+
+
+def _engine(data, fast, slow):
+    return BacktestEngine(
+        symbol="T",
+        data=data,
+        strategy=SmaCrossStrategy(symbol="T", fast_window=fast, slow_window=slow),
+        broker=Broker(fee_model=FeeModel(rate=0.0005)),
+        portfolio=Portfolio(symbol="T", initial_cash=100_000.0),
+    )
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_resume_from_checkpoint_matches_full_run(self):
+        data = DataHandler(_bars_by_symbol={"T": _bars()})
+        full = _engine(data, 5, 20).run()
+
+        engine = _engine(data, 5, 20)
+        engine.advance(37)
+        engine = BacktestEngine.restore(engine.checkpoint(), data)
+        engine.advance(150)
+        resumed = engine.run()
+
+        self.assertEqual([p.total_equity for p in resumed.equity_curve], [p.total_equity for p in full.equity_curve])
+        self.assertEqual(len(resumed.trades), len(full.trades))
+        self.assertEqual(resumed.run_summary, full.run_summary)
+
+    def test_budgets(self):
+        self.assertEqual(rung_budgets(1000, 100, 3), [100, 300, 900, 1000])
+        self.assertEqual(rung_budgets(50, 100, 3), [50])
+
+    def test_successive_halving(self):
+        bars = _bars()
+        candidates = sma_grid([3, 5, 8, 13], [20, 30, 50])
+        kwargs = dict(symbol="T", initial_cash=100_000.0, fee_model=FeeModel(rate=0.0005), min_bars=50, eta=3)
+        result = successive_halving(bars, candidates, **kwargs)
+
+        self.assertLess(result.bars_evaluated, result.full_grid_bars)
+        self.assertEqual(result.budgets, [50, 150, 400])
+        # 最后一轮得分等于完整回测的指标
+        data = DataHandler(_bars_by_symbol={"T": bars})
+        best = result.best_params
+        full = _engine(data, best["fast"], best["slow"]).run()
+        self.assertAlmostEqual(result.best_score, Metrics.compute(full.equity_curve)["sharpe"], places=12)
+        final = result.leaderboard[result.leaderboard["rung"] == 2]
+        self.assertEqual(len(final), 1)
+
+        parallel = successive_halving(bars, candidates, max_workers=2, **kwargs)
+        self.assertEqual(parallel.best_params, result.best_params)
+        self.assertEqual(parallel.bars_evaluated, result.bars_evaluated)
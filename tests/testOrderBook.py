@@ -0,0 +1,139 @@
+import unittest
+from datetime import datetime, timedelta
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.core.coreTypes import Bar, Side
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.orderBook import OrderBook, limit_order, stop_limit_order, stop_order
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.strategyBase import StrategyBase
+
+DT = datetime(2025, 1, 2)
+
+
+def _bar(i, o, h, l, c, symbol="AAA"):
+    return Bar(dt=DT + timedelta(days=i), symbol=symbol, open=o, high=h, low=l, close=c, volume=1000.0)
+
+
+class TestOrderBook(unittest.TestCase):
+    def test_limit_fills_at_limit_or_gap_open(self):
+        book = OrderBook()
+        a = book.submit(limit_order(DT, "AAA", Side.BUY, 10, 95.0))
+        b = book.submit(limit_order(DT, "AAA", Side.BUY, 10, 90.0))
+        c = book.submit(limit_order(DT, "AAA", Side.SELL, 10, 110.0))
+
+        self.assertEqual(book.match("AAA", 100.0, 105.0, 96.0), [])
+        hits = book.match("AAA", 100.0, 104.0, 94.0)
+        self.assertEqual([(t.order.id, t.price, t.market) for t in hits], [(a, 95.0, False)])
+        # 跳空低开：按更优的 open 成交
+        hits = book.match("AAA", 85.0, 88.0, 84.0)
+        self.assertEqual([(t.order.id, t.price) for t in hits], [(b, 85.0)])
+        hits = book.match("AAA", 112.0, 113.0, 111.0)
+        self.assertEqual([(t.order.id, t.price) for t in hits], [(c, 112.0)])
+        self.assertEqual(len(book), 0)
+
+    def test_stop_gap_fills_at_open(self):
+        book = OrderBook()
+        s = book.submit(stop_order(DT, "AAA", Side.SELL, 10, 95.0))
+        bs = book.submit(stop_order(DT, "AAA", Side.BUY, 10, 105.0))
+        self.assertEqual(book.match("AAA", 100.0, 104.0, 96.0), [])
+        hits = book.match("AAA", 90.0, 92.0, 89.0)
+        self.assertEqual([(t.order.id, t.price, t.market) for t in hits], [(s, 90.0, True)])
+        hits = book.match("AAA", 100.0, 106.0, 99.0)
+        self.assertEqual([(t.order.id, t.price) for t in hits], [(bs, 105.0)])
+
+    def test_stop_limit_rests_after_trigger(self):
+        book = OrderBook()
+        oid = book.submit(stop_limit_order(DT, "AAA", Side.BUY, 10, stop_price=105.0, limit_price=103.0))
+        # 跳空高开触发，但当根 bar 未回到限价 -> 转为限价单挂着
+        self.assertEqual(book.match("AAA", 108.0, 110.0, 104.0), [])
+        self.assertIn(oid, book)
+        hits = book.match("AAA", 104.0, 105.0, 102.0)
+        self.assertEqual([(t.order.id, t.price, t.market) for t in hits], [(oid, 103.0, False)])
+
+    def test_cancel_and_sells_first(self):
+        book = OrderBook()
+        keep = book.submit(limit_order(DT, "AAA", Side.BUY, 1, 99.0))
+        gone = book.submit(limit_order(DT, "AAA", Side.BUY, 1, 99.5))
+        sell = book.submit(stop_order(DT, "AAA", Side.SELL, 1, 99.0))
+        self.assertTrue(book.cancel(gone))
+        self.assertFalse(book.cancel(gone))
+        hits = book.match("AAA", 100.0, 100.0, 98.0)
+        self.assertEqual([t.order.id for t in hits], [sell, keep])
+
+    def test_only_top_of_book_is_touched(self):
+        book = OrderBook()
+        ids = [book.submit(limit_order(DT, "AAA", Side.BUY, 1, 50.0 + i * 0.001)) for i in range(5000)]
+        for oid in ids[:4000]:
+            book.cancel(oid)
+        self.assertLess(sum(len(h) for h in book._books["AAA"].heaps()), 5000)
+        self.assertEqual(book.match("AAA", 100.0, 101.0, 60.0), [])
+        hits = book.match("AAA", 100.0, 101.0, 54.5)
+        self.assertEqual(len(hits), 500)
+        self.assertEqual(len(book), 500)
+
+
+class _BracketStrategy(StrategyBase):
+    """第 0 根 bar 收盘挂买入限价；成交后挂止损卖出。"""
+
+    def __init__(self):
+        self.fills = []
+
+    def on_bar(self, bar):
+        if bar.dt == DT:
+            self.submit_order(limit_order(bar.dt, bar.symbol, Side.BUY, 100, 95.0, reason="entry"))
+        return None
+
+    def on_fill(self, fill):
+        self.fills.append(fill)
+        if fill.side == Side.BUY:
+            self.submit_order(stop_order(fill.dt, fill.symbol, Side.SELL, 100, 90.0, reason="stop"))
+
+
+class TestRestingOrdersInEngine(unittest.TestCase):
+    def _run(self, bars, cash=100_000.0, slippage_bps=0.0):
+        strategy = _BracketStrategy()
+        engine = BacktestEngine(
+            symbol="AAA",
+            data=DataHandler(_bars_by_symbol={"AAA": bars}),
+            strategy=strategy,
+            broker=Broker(slippage_model=SlippageModel(bps=slippage_bps)),
+            portfolio=Portfolio(symbol="AAA", initial_cash=cash),
+        )
+        return engine.run(), strategy
+
+    def test_outboxes_are_per_instance_and_drained(self):
+        a, b = _BracketStrategy(), _BracketStrategy()
+        self.assertEqual(a.drain_orders(), ([], []))
+        order = limit_order(DT, "AAA", Side.BUY, 100, 95.0)
+        a.submit_order(order)
+        a.cancel_order("x")
+        self.assertEqual(b.drain_orders(), ([], []))
+        self.assertEqual(a.drain_orders(), ([order], ["x"]))
+        self.assertEqual(a.drain_orders(), ([], []))
+
+    def test_bracket_entry_and_gap_stop(self):
+        bars = [
+            _bar(0, 100, 101, 94, 100),  # 挂单当根 bar 不参与撮合
+            _bar(1, 99, 100, 96, 97),
+            _bar(2, 97, 98, 94, 96),  # 限价 95 成交
+            _bar(3, 96, 97, 91, 92),
+            _bar(4, 85, 86, 84, 85),  # 跳空跌破止损：按 open 85 加滑点成交
+        ]
+        result, strategy = self._run(bars, slippage_bps=10.0)
+        self.assertEqual([(t.side, t.price, t.reason) for t in result.trades[:1]], [(Side.BUY, 95.0, "entry")])
+        self.assertEqual(result.trades[1].side, Side.SELL)
+        self.assertAlmostEqual(result.trades[1].price, 85.0 * (1 - 0.001))
+        self.assertEqual(len(strategy.fills), 2)
+        self.assertEqual(result.equity_curve[-1].position_qty, 0)
+
+    def test_buy_capped_by_cash(self):
+        bars = [_bar(0, 100, 101, 99, 100), _bar(1, 96, 97, 94, 95)]
+        result, _ = self._run(bars, cash=950.0)
+        self.assertEqual(result.trades[0].quantity, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,3 +18,13 @@ class TestPortfolioAccounting(unittest.TestCase):
 
         self.assertAlmostEqual(eq.cash + eq.position_value, eq.total_equity)
         self.assertAlmostEqual(eq.total_equity, 1000.0)
+
+    def test_slippage_is_not_double_counted(self):
+        p = Portfolio(symbol="TEST", initial_cash=1000.0)
+
+        # 成交价 10.05 已含 0.05 滑点；现金只扣成交额 + 手续费
+        order = Order(id="o1", dt=datetime(2025, 1, 2), symbol="TEST", side=Side.BUY, quantity=99, reason="")
+        fill = Fill(order_id="o1", dt=datetime(2025, 1, 2), symbol="TEST", side=Side.BUY, quantity=99, price=10.05, fee=0.5, slippage=99 * 0.05)
+        p.apply_fill(order, fill)
+
+        self.assertAlmostEqual(p.cash, 1000.0 - 99 * 10.05 - 0.5)
@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.core.coreTypes import Bar
+from finance.data.barArrays import BarArrays, datetime_to_ns
+from finance.data.resampler import parse_timeframe, resample_ohlcv
+
+
+def _minute_arrays(start: datetime, closes):
+    bars = []
+    for i, c in enumerate(closes):
+        dt = start + timedelta(minutes=i)
+        bars.append(Bar(dt=dt, symbol="TEST", open=c, high=c + 0.5, low=c - 0.5, close=c, volume=10))
+    return BarArrays.from_bars(bars)
+
+
+class TestResampler(unittest.TestCase):
+    def test_parse_timeframe(self):
+        self.assertEqual(parse_timeframe("5m").step_ns, 5 * 60 * 10**9)
+        self.assertEqual(parse_timeframe("5min").step_ns, 5 * 60 * 10**9)
+        self.assertEqual(parse_timeframe("1H").step_ns, 3600 * 10**9)
+        self.assertTrue(parse_timeframe("30s").is_intraday)
+        self.assertFalse(parse_timeframe("1d").is_intraday)
+        with self.assertRaises(ValueError):
+            parse_timeframe("3q")
+
+    def test_resample_minutes_to_5m(self):
+        arr = _minute_arrays(datetime(2025, 1, 2, 9, 30), [float(i + 1) for i in range(12)])
+        out = resample_ohlcv(arr, "5m")
+
+        self.assertEqual(len(out), 3)
+        self.assertEqual(out.datetimes()[0], datetime(2025, 1, 2, 9, 30))
+        np.testing.assert_allclose(out.open, [1.0, 6.0, 11.0])
+        np.testing.assert_allclose(out.close, [5.0, 10.0, 12.0])
+        np.testing.assert_allclose(out.high, [5.5, 10.5, 12.5])
+        np.testing.assert_allclose(out.low, [0.5, 5.5, 10.5])
+        np.testing.assert_allclose(out.volume, [50.0, 50.0, 20.0])
+
+    def test_weekly_aligns_to_monday(self):
+        # 2025-01-06 是周一
+        days = [datetime(2025, 1, 2) + timedelta(days=i) for i in range(10)]
+        bars = [Bar(dt=d, symbol="TEST", open=1, high=1, low=1, close=1, volume=1) for d in days]
+        out = resample_ohlcv(BarArrays.from_bars(bars), "1w")
+        self.assertEqual(out.datetimes(), [datetime(2024, 12, 30), datetime(2025, 1, 6)])
+        np.testing.assert_allclose(out.volume, [4.0, 6.0])
+
+        last = resample_ohlcv(BarArrays.from_bars(bars), "1w", label="last")
+        self.assertEqual(last.datetimes(), [datetime(2025, 1, 5), datetime(2025, 1, 11)])
+
+    def test_group_ids_split_segments(self):
+        a = _minute_arrays(datetime(2025, 1, 2, 9, 30), [1.0, 2.0, 3.0])
+        b = _minute_arrays(datetime(2025, 1, 2, 9, 30), [7.0, 8.0, 9.0])
+        stacked = BarArrays(*(np.concatenate([getattr(a, f), getattr(b, f)]) for f in ("ts", "open", "high", "low", "close", "volume")))
+        groups = np.array([0, 0, 0, 1, 1, 1])
+
+        out = resample_ohlcv(stacked, "1h", group_ids=groups)
+        np.testing.assert_allclose(out.open, [1.0, 7.0])
+        np.testing.assert_allclose(out.close, [3.0, 9.0])
+
+    def test_unsorted_raises(self):
+        arr = _minute_arrays(datetime(2025, 1, 2, 9, 30), [1.0, 2.0])
+        rev = BarArrays(ts=arr.ts[::-1].copy(), open=arr.open, high=arr.high, low=arr.low, close=arr.close, volume=arr.volume)
+        with self.assertRaises(ValueError):
+            resample_ohlcv(rev, "5m")
+
+    def test_datetime_ns_roundtrip(self):
+        dt = datetime(2025, 1, 2, 9, 31, 15, 500)
+        arr = BarArrays.from_bars([Bar(dt=dt, symbol="X", open=1, high=1, low=1, close=1, volume=0)])
+        self.assertEqual(int(arr.ts[0]), datetime_to_ns(dt))
+        self.assertEqual(arr.to_bars("X")[0].dt, dt)
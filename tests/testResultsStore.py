@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from finance.backtest.backtestEngine import ResultBundle
+from finance.core.coreTypes import RunSummary, Side, TradeRecord
+from finance.reporting.resultsStore import BufferedResultsStore, SqliteResultsStore, parse_filter
+
+
+def _result(sharpe, trades=0):
+    records = [
+        TradeRecord(dt=datetime(2025, 1, 2 + i), symbol="TEST", side=Side.BUY, quantity=10, price=1.0, fee=0.0, slippage=0.0, order_id=f"o{i}")
+        for i in range(trades)
+    ]
+    return ResultBundle(
+        symbol="TEST",
+        equity_curve=[],
+        trades=records,
+        dropped_signals=[],
+        run_summary=RunSummary(symbol="TEST", bars=10, trades=trades, dropped_signals_last_bar=0, initial_cash=1000.0, final_equity=1100.0),
+        metrics={"cumulative_return": 0.1, "annualized_return": 0.2, "max_drawdown": -0.05, "sharpe": sharpe},
+    )
+
+
+class TestResultsStore(unittest.TestCase):
+    def test_bulk_insert_and_top_n(self):
+        with tempfile.TemporaryDirectory() as d:
+            with SqliteResultsStore(os.path.join(d, "r.db")) as store:
+                runs = [(f"run{i}", _result(sharpe=i / 10.0), {"fast": i % 5, "slow": 20, "tag": "a" if i % 2 else "b"}) for i in range(50)]
+                self.assertEqual(store.write_many(runs, batch_size=7), 50)
+                self.assertEqual(store.count(), 50)
+
+                top = store.query(order_by="sharpe", limit=3)
+                self.assertEqual([r["run_id"] for r in top], ["run49", "run48", "run47"])
+
+                filtered = store.query(filters=["fast=2", "sharpe<2", "tag=b"], limit=None)
+                self.assertEqual([r["run_id"] for r in filtered], ["run12", "run2"])
+                self.assertEqual(filtered[0]["config"]["fast"], 2)
+
+                self.assertEqual(store.query(filters=["symbol=TEST"], limit=None)[0]["symbol"], "TEST")
+
+                by_param = store.query(order_by="fast", descending=False, limit=1)
+                self.assertEqual(by_param[0]["config"]["fast"], 0)
+
+    def test_rewrite_replaces_run_and_trades(self):
+        with tempfile.TemporaryDirectory() as d:
+            with SqliteResultsStore(os.path.join(d, "r.db")) as store:
+                store.write(_result(1.0, trades=3), run_id="x", run_config={"fast": 1}, include_trades=True)
+                store.write(_result(2.0, trades=2), run_id="x", run_config={"fast": 2}, include_trades=True)
+
+                self.assertEqual(store.count(), 1)
+                self.assertEqual(len(store.trades("x")), 2)
+                self.assertEqual(store.query(filters=["fast=1"]), [])
+                self.assertEqual(store.query()[0]["sharpe"], 2.0)
+
+    def test_buffered_store_flushes_in_batches_and_on_close(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "r.db")
+            with BufferedResultsStore(path, flush_every=3) as buffered:
+                for i in range(4):
+                    buffered.add(_result(i / 10.0, trades=2), run_id=f"run{i}", run_config={"fast": i}, include_trades=i % 2 == 0)
+                # 第 3 条触发一次批量写入，第 4 条留在缓存里
+                self.assertEqual((buffered.written, len(buffered)), (3, 1))
+                with SqliteResultsStore(path) as reader:
+                    self.assertEqual(reader.count(), 3)
+            self.assertEqual(buffered.written, 4)
+
+            with SqliteResultsStore(path) as store:
+                self.assertEqual(store.count(), 4)
+                self.assertEqual([len(store.trades(f"run{i}")) for i in range(4)], [2, 0, 2, 0])
+                self.assertEqual(store.query(filters=["fast=3"])[0]["run_id"], "run3")
+
+    def test_parse_filter(self):
+        self.assertEqual(parse_filter("sharpe>=1.5"), ("sharpe", ">=", "1.5"))
+        self.assertEqual(parse_filter("symbol = 000001"), ("symbol", "=", "000001"))
+        with self.assertRaises(ValueError):
+            parse_filter("sharpe ~ 1")
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from finance.portfolio.riskManager import LimitFlag, OrderStatus, RiskLimits, RiskManager
+
+
+class TestRiskManagerPreTrade(unittest.TestCase):
+    def test_no_limits_accepts_everything(self):
+        rm = RiskManager()
+        r = rm.check_orders(
+            quantities=np.array([100, -50, 0]),
+            prices=np.array([10.0, 20.0, 5.0]),
+            positions=np.array([0, 50, 0]),
+            equity=10_000.0,
+        )
+        np.testing.assert_array_equal(r.accepted, [100, -50, 0])
+        self.assertTrue((r.status == OrderStatus.ACCEPTED).all())
+        self.assertAlmostEqual(r.turnover, 2000.0)
+
+    def test_weight_and_order_notional_limits(self):
+        rm = RiskManager(limits=RiskLimits(max_weight_per_symbol=0.2, max_order_notional=2500.0, lot_size=100))
+        r = rm.check_orders(
+            quantities=np.array([500, 100, 300, -200]),
+            prices=np.array([10.0, 10.0, 10.0, 10.0]),
+            positions=np.array([0, 250, 0, 200]),
+            equity=10_000.0,
+        )
+        # A：权重上限 2000 => 200 股；B：已超限不能再加；C：单笔上限 2500 => 250 => 200 股（整手）；D：清仓照常
+        np.testing.assert_array_equal(r.accepted, [200, 0, 200, -200])
+        np.testing.assert_array_equal(r.status, [OrderStatus.SCALED, OrderStatus.REJECTED, OrderStatus.SCALED, OrderStatus.ACCEPTED])
+        self.assertTrue(r.flags[0] & LimitFlag.SYMBOL_WEIGHT)
+        self.assertTrue(r.flags[2] & LimitFlag.ORDER_NOTIONAL)
+
+    def test_gross_net_turnover_and_cash(self):
+        prices = np.full(4, 10.0)
+        positions = np.zeros(4)
+        orders = np.array([300, 300, 300, 300])
+
+        gross = RiskManager(limits=RiskLimits(max_gross_exposure=0.6)).check_orders(
+            quantities=orders, prices=prices, positions=positions, equity=10_000.0
+        )
+        self.assertLessEqual(float(np.abs(gross.accepted) @ prices), 6000.0 + 1e-9)
+        self.assertTrue((gross.status == OrderStatus.SCALED).all())
+
+        turnover = RiskManager(limits=RiskLimits(max_daily_turnover=1.0)).check_orders(
+            quantities=orders, prices=prices, positions=positions, equity=10_000.0, turnover_used=8_000.0
+        )
+        self.assertLessEqual(turnover.turnover, 2000.0 + 1e-9)
+
+        cash = RiskManager().check_orders(
+            quantities=np.array([300, 300, -100, 0]), prices=prices, positions=np.array([0, 0, 100, 0]), equity=10_000.0, cash=3_000.0
+        )
+        self.assertLessEqual(float(cash.accepted[:2] @ prices[:2]), 4000.0 + 1e-9)
+        self.assertEqual(cash.accepted[2], -100)
+
+    def test_short_and_invalid_price(self):
+        rm = RiskManager(limits=RiskLimits(max_net_exposure=1.0))
+        r = rm.check_orders(
+            quantities=np.array([-200, 100]),
+            prices=np.array([10.0, np.nan]),
+            positions=np.array([50, 0]),
+            equity=10_000.0,
+        )
+        np.testing.assert_array_equal(r.accepted, [-50, 0])
+        self.assertTrue(r.flags[0] & LimitFlag.SHORT)
+        self.assertTrue(r.flags[1] & LimitFlag.INVALID_PRICE)
+        self.assertTrue(r.rejected_mask[1])
@@ -0,0 +1,126 @@
+import unittest
+
+import numpy as np
+
+from finance.backtest.crossSectionalEngine import CrossSectionalEngine
+from finance.data.barArrays import BarArrays
+from finance.data.tradingCalendar import AlignedPanel
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.multiAssetPortfolio import MultiAssetPortfolio
+from finance.portfolio.riskModel import (
+    EwmaCovariance,
+    RollingCovariance,
+    _CovarianceEstimator,
+    inverse_volatility_weights,
+    risk_contributions,
+    risk_parity_weights,
+    scale_to_target_vol,
+)
+from finance.strategy.crossSectionalStrategy import RebalanceSchedule, RiskParityStrategy
+
+NS_DAY = 86_400 * 10**9
+T0 = np.datetime64("2024-01-01", "ns").astype(np.int64)
+
+
+def _returns(n, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    mix = np.array([[1.0, 0.0, 0.0], [0.5, 1.0, 0.0], [0.2, -0.3, 2.0]])[:k, :k]
+    return rng.normal(size=(n, k)) @ mix.T * 0.01
+
+
+class TestCovarianceEstimators(unittest.TestCase):
+    def test_ewma_matches_weighted_history(self):
+        r = _returns(50)
+        est = EwmaCovariance(3, halflife=10, min_periods=5)
+        for row in r:
+            est.update(row)
+        w = est.lam ** np.arange(len(r))[::-1]
+        expected = (r * w[:, None]).T @ r / w.sum()
+        np.testing.assert_allclose(est.covariance(), expected, rtol=1e-10)
+        self.assertTrue(est.ready().all())
+
+    def test_rolling_matches_np_cov_with_missing_values(self):
+        r = _returns(95)
+        r[10:20, 1] = np.nan
+        r[88, 0] = np.nan
+        est = RollingCovariance(3, window=20, min_periods=5)
+        for t, row in enumerate(r):
+            est.update(row)
+            if t in (15, 40, 94):
+                tail = r[max(0, t - 19) : t + 1]
+                for i in range(3):
+                    for j in range(3):
+                        both = ~np.isnan(tail[:, i]) & ~np.isnan(tail[:, j])
+                        if both.sum() >= 2:
+                            self.assertAlmostEqual(est.covariance()[i, j], np.cov(tail[both, i], tail[both, j])[0, 1], places=12)
+        self.assertEqual(est.counts.tolist(), [19, 20, 20])
+        corr = est.correlation()
+        np.testing.assert_allclose(np.diagonal(corr), 1.0)
+
+    def test_argument_validation(self):
+        with self.assertRaises(ValueError):
+            EwmaCovariance(2, halflife=5, lam=0.9)
+        with self.assertRaises(ValueError):
+            RollingCovariance(2, window=10, min_periods=20)
+        with self.assertRaises(ValueError):
+            EwmaCovariance(2, lam=0.9).update(np.zeros(3))
+        # 基类只定义公共接口，需由子类实现 update/covariance/_pair_counts
+        with self.assertRaises(TypeError):
+            _CovarianceEstimator(2, 2)
+
+
+class TestRiskWeights(unittest.TestCase):
+    def test_risk_parity_equalizes_contributions(self):
+        r = _returns(500)
+        cov = np.cov(r.T)
+        w = risk_parity_weights(cov)
+        self.assertAlmostEqual(w.sum(), 1.0)
+        np.testing.assert_allclose(risk_contributions(w, cov), [1 / 3] * 3, atol=1e-8)
+
+        budgets = np.array([0.5, 0.25, 0.25])
+        np.testing.assert_allclose(risk_contributions(risk_parity_weights(cov, budgets=budgets), cov), budgets, atol=1e-8)
+
+        # 无相关性时与波动倒数权重一致；非 active 标的为 0
+        diag = np.diag([0.01, 0.04, 0.09])
+        np.testing.assert_allclose(risk_parity_weights(diag), inverse_volatility_weights(diag), atol=1e-10)
+        w = risk_parity_weights(diag, active=np.array([True, False, True]))
+        np.testing.assert_allclose(w, [0.75, 0.0, 0.25], atol=1e-10)
+
+    def test_scale_to_target_vol(self):
+        cov = np.diag([0.0001, 0.0004])
+        w = np.array([0.5, 0.5])
+        scaled = scale_to_target_vol(w, cov, target_vol=0.1, periods_per_year=252)
+        self.assertAlmostEqual(float(np.sqrt(scaled @ cov @ scaled * 252)), 0.1)
+        # 达不到目标波动时受 max_gross 约束
+        np.testing.assert_allclose(scale_to_target_vol(w, cov, target_vol=1.0, max_gross=1.5), [0.75, 0.75])
+
+
+class TestRiskParityStrategy(unittest.TestCase):
+    def test_engine_allocates_less_to_volatile_symbol(self):
+        n = 120
+        rng = np.random.default_rng(1)
+        ts = T0 + np.arange(n, dtype=np.int64) * NS_DAY
+        arrays = {}
+        for sym, vol in (("LOW", 0.005), ("HIGH", 0.02)):
+            close = 100.0 * np.exp(np.cumsum(rng.normal(scale=vol, size=n)))
+            arrays[sym] = BarArrays(ts=ts, open=close, high=close, low=close, close=close, volume=np.ones(n))
+        panel = AlignedPanel.build(arrays)
+
+        strategy = RiskParityStrategy(estimator="rolling", window=60, min_periods=30, method="inverse_vol")
+        seen = []
+        observe = strategy.observe
+        strategy.observe = lambda t, close: (seen.append(t), observe(t, close))
+        broker = Broker(fee_model=FeeModel(rate=0.0), slippage_model=SlippageModel(bps=0.0))
+        pf = MultiAssetPortfolio(panel.symbols, initial_cash=1_000_000.0)
+        CrossSectionalEngine(panel=panel, strategy=strategy, broker=broker, portfolio=pf, schedule=RebalanceSchedule(n=20)).run()
+
+        self.assertEqual(seen, list(range(n)))
+        weights = dict(zip(pf.symbols, pf.weights()))
+        self.assertGreater(weights["LOW"], 2.0 * weights["HIGH"])
+        self.assertGreater(weights["HIGH"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from finance.backtest.metrics import MetricsConfig
+from finance.cli.runBacktest import _build_arg_parser, _load_benchmark, _load_data
+from finance.backtest.rollingMetrics import (
+    align_to,
+    compute_rolling,
+    rolling_max,
+    rolling_max_drawdown,
+    rolling_min,
+    rolling_sum,
+    rolling_var_cvar,
+)
+
+NS_DAY = 86_400 * 10**9
+
+
+def _equity(n, seed=0, vol=0.02):
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, vol, n)))
+
+
+class TestRollingMetrics(unittest.TestCase):
+    def test_extremes_and_drawdown_match_naive(self):
+        for n, w in [(50, 7), (53, 1), (64, 8), (10, 10), (37, 36)]:
+            eq = _equity(n, seed=n + w)
+            mx, mn, dd = rolling_max(eq, w), rolling_min(eq, w), rolling_max_drawdown(eq, w)
+            self.assertTrue(np.isnan(dd[: w - 1]).all())
+            for e in range(w - 1, n):
+                x = eq[e - w + 1 : e + 1]
+                self.assertEqual(mx[e], x.max())
+                self.assertEqual(mn[e], x.min())
+                self.assertAlmostEqual(dd[e], float((x / np.maximum.accumulate(x) - 1.0).min()), places=12)
+
+    def test_var_cvar(self):
+        r = np.array([0.01, -0.03, 0.02, -0.01, -0.05, 0.04])
+        var, cvar = rolling_var_cvar(r, 4, level=0.5)
+        self.assertTrue(np.isnan(var[:3]).all())
+        # 窗口 [0.01, -0.03, 0.02, -0.01] 最差 2 个：-0.03, -0.01
+        self.assertAlmostEqual(var[3], 0.01)
+        self.assertAlmostEqual(cvar[3], 0.02)
+        self.assertAlmostEqual(var[5], 0.01)
+        self.assertAlmostEqual(cvar[5], 0.03)
+
+    def test_rolling_table_matches_per_window(self):
+        n, w = 200, 20
+        eq = _equity(n, seed=1, vol=0.01)
+        bench = _equity(n, seed=2, vol=0.01)
+        cfg = MetricsConfig(risk_free_rate=0.02)
+        df = compute_rolling(np.arange(n, dtype=np.int64) * NS_DAY, eq, w, benchmark=bench, config=cfg)
+
+        r = eq[1:] / eq[:-1] - 1.0
+        b = bench[1:] / bench[:-1] - 1.0
+        ppy = cfg.periods_per_year()
+        self.assertTrue(df["rolling_sharpe"].iloc[:w].isna().all())
+        for t in range(w, n):
+            x, y = r[t - w : t], b[t - w : t]
+            ex = x - 0.02 / ppy
+            self.assertAlmostEqual(df["rolling_vol"].iloc[t], ex.std() * np.sqrt(ppy), places=10)
+            self.assertAlmostEqual(df["rolling_sharpe"].iloc[t], np.sqrt(ppy) * ex.mean() / ex.std(), places=8)
+            self.assertAlmostEqual(df["rolling_beta"].iloc[t], np.cov(x, y, bias=True)[0, 1] / y.var(), places=8)
+            seg = eq[t - w : t + 1]
+            self.assertAlmostEqual(df["rolling_max_drawdown"].iloc[t], (seg / np.maximum.accumulate(seg) - 1.0).min(), places=12)
+
+    def test_nan_only_spoils_windows_containing_it(self):
+        x = np.arange(10, dtype=np.float64)
+        x[2] = np.nan
+        out = rolling_sum(x, 3)
+        self.assertTrue(np.isnan(out[:5]).all())
+        self.assertEqual(out[5:].tolist(), [12.0, 15.0, 18.0, 21.0, 24.0])
+
+    def test_beta_with_late_starting_benchmark(self):
+        n, w = 120, 20
+        ts = np.arange(n, dtype=np.int64) * NS_DAY
+        eq = _equity(n, seed=3, vol=0.01)
+        bench = _equity(n, seed=4, vol=0.01)
+        aligned = align_to(ts, ts[1:], bench[1:])
+        df = compute_rolling(ts, eq, w, benchmark=aligned)
+        beta = df["rolling_beta"].to_numpy()
+        # 基准晚一根 bar 开始：首个完整窗口之后的 beta 都有值
+        self.assertTrue(np.isnan(beta[: w + 1]).all())
+        self.assertFalse(np.isnan(beta[w + 1 :]).any())
+        r = eq[1:] / eq[:-1] - 1.0
+        b = bench[1:] / bench[:-1] - 1.0
+        x, y = r[n - 1 - w : n - 1], b[n - 1 - w : n - 1]
+        self.assertAlmostEqual(beta[-1], np.cov(x, y, bias=True)[0, 1] / y.var(), places=8)
+
+    def test_resampled_series_against_itself_has_unit_beta(self):
+        close = _equity(400, seed=5, vol=0.01)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "AAA.csv")
+            with open(path, "w") as f:
+                f.write("date,open,high,low,close,volume\n")
+                for day, c in zip(np.arange("2020-01-01", 400, dtype="datetime64[D]"), close.tolist()):
+                    f.write(f"{day},{c},{c},{c},{c},1\n")
+            args = _build_arg_parser().parse_args(["--symbol", "AAA", "--csv-path", path, "--resample", "1w", "--benchmark-csv", path])
+            _, arrays, _ = _load_data(args, path, None)
+            benchmark = _load_benchmark(args, arrays.ts)
+        df = compute_rolling(arrays.ts, arrays.close, 10, benchmark=benchmark)
+        beta = df["rolling_beta"].dropna().to_numpy()
+        self.assertGreater(beta.shape[0], 40)
+        np.testing.assert_allclose(beta, 1.0, rtol=1e-9)
+
+    def test_align_to(self):
+        out = align_to(np.array([1, 3, 5, 7]), np.array([2, 5]), np.array([10.0, 20.0]))
+        self.assertTrue(np.isnan(out[0]))
+        self.assertEqual(out[1:].tolist(), [10.0, 20.0, 20.0])
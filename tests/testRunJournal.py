@@ -0,0 +1,143 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.backtest.metrics import Metrics
+from finance.core.coreTypes import Bar, EquityPoint, Side, TradeRecord
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.portfolio.portfolio import Portfolio
+from finance.data.barArrays import equity_arrays, trade_arrays
+from finance.portfolio.runJournal import EQUITY_DTYPE, RecordFile, RecordLog, RunJournal
+from finance.reporting.reportWriter import ReportWriter
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
+DT = datetime(2024, 1, 2)
+
+
+def _bars(n=300):
+    rng = np.random.default_rng(11)
+    close = 50 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    return [
+        Bar(dt=DT + timedelta(days=i), symbol="AAA", open=c, high=c * 1.01, low=c * 0.99, close=c, volume=1e5)
+        for i, c in enumerate(close)
+    ]
+
+
+def _engine(bars, journal=None):
+    return BacktestEngine(
+        symbol="AAA",
+        data=DataHandler(_bars_by_symbol={"AAA": bars}),
+        strategy=SmaCrossStrategy(symbol="AAA", fast_window=5, slow_window=20),
+        broker=Broker(),
+        portfolio=Portfolio(symbol="AAA", initial_cash=100_000.0, journal=journal),
+    )
+
+
+class TestRecordFile(unittest.TestCase):
+    def test_grows_geometrically_and_survives_without_close(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "equity.bin")
+            f = RecordFile.create(path, EQUITY_DTYPE, initial_capacity=4)
+            early = f.array()
+            for i in range(37):
+                f.append((i, 1.0, i, 2.0, 3.0, float(i)))
+            self.assertEqual((len(f), f.capacity), (37, 64))
+            self.assertEqual(len(early), 0)
+
+            # 不 close 直接从另一个句柄读：头里的记录数之前的数据完整
+            reader = RecordFile.open(path, EQUITY_DTYPE)
+            self.assertEqual(reader.array()["total_equity"].tolist(), [float(i) for i in range(37)])
+            f.close()
+            self.assertEqual(os.path.getsize(path), 32 + 37 * EQUITY_DTYPE.itemsize)
+            self.assertEqual(len(f.array()), 37)
+            with self.assertRaises(TypeError):
+                f.append((0, 0.0, 0, 0.0, 0.0, 0.0))
+
+
+class TestRunJournal(unittest.TestCase):
+    def test_engine_results_match_in_memory_run(self):
+        bars = _bars()
+        expected = _engine(bars).run()
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal.create(os.path.join(tmp, "run"), initial_capacity=16) as journal:
+                result = _engine(bars, journal).run()
+                self.assertEqual(list(result.equity_curve), expected.equity_curve)
+                self.assertEqual(
+                    [(t.dt, t.side, t.quantity, t.price, t.reason) for t in result.trades],
+                    [(t.dt, t.side, t.quantity, t.price, t.reason) for t in expected.trades],
+                )
+                got = Metrics.compute(result.equity_curve)
+                for k, v in Metrics.compute(expected.equity_curve).items():
+                    self.assertAlmostEqual(got[k], v, places=10)
+                ReportWriter(output_root=tmp).write(result, run_id="run")
+
+            reopened = RunJournal.open(os.path.join(tmp, "run"))
+            self.assertEqual(reopened.equity[-1], expected.equity_curve[-1])
+            self.assertEqual(len(reopened.trades), len(expected.trades))
+            with open(os.path.join(tmp, "run", "equity_curve.csv")) as f:
+                self.assertEqual(sum(1 for _ in f), len(bars) + 1)
+
+    def test_array_views_match_in_memory_lists(self):
+        bars = _bars()
+        expected = _engine(bars).run()
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal.create(tmp) as journal:
+                result = _engine(bars, journal).run()
+                for got, want in zip(equity_arrays(result.equity_curve), equity_arrays(expected.equity_curve)):
+                    np.testing.assert_array_equal(got, want)
+                for got, want in zip(trade_arrays(result.trades), trade_arrays(expected.trades)):
+                    np.testing.assert_array_equal(got, want)
+                with self.assertRaises(TypeError):
+                    RecordLog(journal.equity.file)
+
+    def test_metrics_do_not_import_run_journal(self):
+        code = "import sys\nimport finance.backtest.metrics, finance.backtest.rollingMetrics\nprint('finance.portfolio.runJournal' in sys.modules)\n"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_result_is_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = RunJournal.create(tmp)
+            journal.equity.append(EquityPoint(DT, 1.0, 0, 1.0, 0.0, 1.0))
+            snap = journal.equity.snapshot()
+            journal.equity.append(EquityPoint(DT, 2.0, 0, 1.0, 0.0, 2.0))
+            self.assertEqual(len(snap), 1)
+            with self.assertRaises(TypeError):
+                snap.append(EquityPoint(DT, 3.0, 0, 1.0, 0.0, 3.0))
+            journal.close()
+
+    def test_checkpoint_restore_rolls_back_records(self):
+        bars = _bars(120)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = _engine(bars, RunJournal.create(tmp))
+            engine.advance(60)
+            blob = engine.checkpoint()
+            engine.run()
+            self.assertEqual(len(engine.portfolio.equity_curve), 120)
+
+            restored = BacktestEngine.restore(blob, DataHandler(_bars_by_symbol={"AAA": bars}))
+            self.assertEqual(len(restored.portfolio.equity_curve), 60)
+            result = restored.run()
+            self.assertEqual(len(result.equity_curve), 120)
+            self.assertEqual(result.equity_curve[59].dt, bars[59].dt)
+
+    def test_field_widths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = RunJournal.create(tmp)
+            journal.trades.append(TradeRecord(DT, "AAA", Side.SELL, 10, 1.0, 0.0, 0.0, "id", reason="x" * 100))
+            self.assertEqual(journal.trades[0].reason, "x" * 64)
+            self.assertEqual(journal.trades[0].side, Side.SELL)
+            with self.assertRaises(ValueError):
+                journal.trades.append(TradeRecord(DT, "S" * 17, Side.BUY, 1, 1.0, 0.0, 0.0, "id"))
+            journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from finance.backtest.sleeveEngine import Sleeve, SleeveEngine
+from finance.core.coreTypes import Signal
+from finance.data.barArrays import BarArrays
+from finance.data.tradingCalendar import AlignedPanel
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.execution.slippageModel import SlippageModel
+from finance.portfolio.sleevePortfolio import split_quantity
+from finance.strategy.crossSectionalStrategy import RebalanceSchedule
+from finance.strategy.strategyBase import StrategyBase
+
+NS_DAY = 86_400 * 10**9
+T0 = np.datetime64("2024-01-01", "ns").astype(np.int64)
+
+
+class _Toggle(StrategyBase):
+    """每 period 根 bar 在满仓/空仓之间切换一次。"""
+
+    def __init__(self, period, phase=0):
+        self.period = period
+        self.phase = phase
+        self.i = 0
+
+    def on_bar(self, bar):
+        self.i += 1
+        if (self.i + self.phase) % self.period:
+            return None
+        return Signal(bar.dt, bar.symbol, float((self.i + self.phase) // self.period % 2))
+
+
+def _panel(n=60):
+    ts = T0 + np.arange(n, dtype=np.int64) * NS_DAY
+    arrays = {}
+    for sym, drift in (("AAA", 0.002), ("BBB", -0.001)):
+        close = 50.0 * np.exp(np.cumsum(np.full(n, drift) + 0.01 * np.sin(np.arange(n))))
+        arrays[sym] = BarArrays(ts=ts, open=close, high=close * 1.01, low=close * 0.99, close=close, volume=np.full(n, 1e6))
+    return AlignedPanel.build(arrays)
+
+
+def _broker():
+    return Broker(fee_model=FeeModel(rate=0.001, min_fee=0.0), slippage_model=SlippageModel(bps=5.0))
+
+
+class TestSleeveEngine(unittest.TestCase):
+    def test_split_quantity(self):
+        self.assertEqual(split_quantity(10, np.array([1.0, 1.0, 1.0])).tolist(), [4, 3, 3])
+        self.assertEqual(split_quantity(0, np.array([1.0, 2.0])).tolist(), [0, 0])
+        self.assertEqual(int(split_quantity(7, np.array([0.0, 5.0, 3.0])).sum()), 7)
+
+    def test_sleeves_net_orders_and_keep_books_consistent(self):
+        sleeves = [
+            Sleeve("fast", "AAA", _Toggle(3), 0.4),
+            Sleeve("slow", "AAA", _Toggle(3, phase=3), 0.4),
+            Sleeve("other", "BBB", _Toggle(5), 0.2),
+        ]
+        engine = SleeveEngine(panel=_panel(), sleeves=sleeves, broker=_broker(), initial_cash=1_000_000.0)
+        result = engine.run()
+        sp = engine.portfolio
+
+        # 两个 AAA sleeve 反向切换：净额只下一笔单，同时内部对冲了部分数量
+        self.assertGreater(result.crossed_quantity, 0)
+        self.assertGreater(result.costs_saved, 0.0)
+        self.assertEqual({t.reason for t in result.trades}, {"sleeve_net"})
+
+        self.assertEqual(len(result.equity_curve), 60)
+        for name in ("fast", "slow", "other"):
+            self.assertEqual(len(result.sleeve_curves[name]), 60)
+        for i in range(60):
+            total = sum(result.sleeve_curves[name][i].total_equity for name in ("fast", "slow", "other"))
+            self.assertAlmostEqual(total, result.equity_curve[i].total_equity, places=6)
+        for k, symbol in enumerate(sp.book.symbols):
+            self.assertEqual(int(sp.quantities[sp.symbol_index == k].sum()), int(sp.book.quantities[k]))
+        self.assertTrue((sp.cash >= -1e-6).all())
+
+    def test_reallocation_restores_weights(self):
+        sleeves = [Sleeve("a", "AAA", _Toggle(50, phase=49), 0.5), Sleeve("b", "BBB", _Toggle(50, phase=49), 0.3)]
+        engine = SleeveEngine(
+            panel=_panel(),
+            sleeves=sleeves,
+            broker=_broker(),
+            initial_cash=100_000.0,
+            reallocate=RebalanceSchedule(n=20, offset=19),
+        )
+        result = engine.run()
+        self.assertEqual(result.reallocations, 2)
+        # 划拨后下一根 bar 开盘按原目标仓位重新调整
+        self.assertGreater(len(result.trades), 2)
+        sp = engine.portfolio
+        sp.reallocate()
+        np.testing.assert_allclose(sp.equity() / sp.book.total_equity(), [0.5, 0.3])
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            SleeveEngine(panel=_panel(), sleeves=[Sleeve("a", "ZZZ", _Toggle(3), 0.5)], broker=_broker(), initial_cash=1.0)
+        with self.assertRaises(ValueError):
+            SleeveEngine(
+                panel=_panel(),
+                sleeves=[Sleeve("a", "AAA", _Toggle(3), 0.7), Sleeve("b", "BBB", _Toggle(3), 0.7)],
+                broker=_broker(),
+                initial_cash=1.0,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
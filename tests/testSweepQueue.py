@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from finance.backtest.sweepQueue import Heartbeat, SweepQueue
+from finance.cli.runSweepQueue import main
+from finance.reporting.resultsStore import SqliteResultsStore
+
+
+def _write_prices(path, n=60, seed=7):
+    """队列端到端测试的行情：固定种子的随机游走，工作日日期。"""
+
+    rng = np.random.default_rng(seed)
+    close = 10.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, n))
+    pd.DataFrame(
+        {
+            "date": pd.bdate_range("2024-01-01", periods=n).strftime("%Y-%m-%d"),
+            "open": close,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "volume": 1000,
+        }
+    ).to_csv(path, index=False)
+
+
+class TestSweepQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "queue")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_claim_is_exclusive_and_complete_removes_task(self):
+        q = SweepQueue(self.root)
+        self.assertEqual(q.submit([{"fast": 3}, {"fast": 4}], batch_id="b"), ["b_0000", "b_0001"])
+        a, b = q.claim("w1"), q.claim("w2")
+        self.assertEqual((a.task_id, b.task_id), ("b_0000", "b_0001"))
+        self.assertIsNone(q.claim("w3"))
+        self.assertEqual(q.status(), {"pending": 0, "leased": 2, "ok": 0, "failed": 0})
+
+        a.complete({"status": "ok"})
+        b.release()
+        self.assertEqual(q.status(), {"pending": 1, "leased": 0, "ok": 1, "failed": 0})
+        # 重复提交同一批次：已有结果的任务不再入队
+        q.submit([{"fast": 3}, {"fast": 4}], batch_id="b")
+        self.assertEqual(q.claim("w4").task_id, "b_0001")
+
+    def test_expired_lease_is_requeued_and_old_owner_loses_it(self):
+        q = SweepQueue(self.root, lease_ttl=10)
+        q.submit([{"fast": 3}], batch_id="b")
+        old = q.claim("w1")
+        self.assertEqual(q.requeue_expired(now=time.time() + 5), [])
+        self.assertEqual(q.requeue_expired(now=time.time() + 60), ["b_0000"])
+
+        new = q.claim("w2")
+        self.assertEqual(new.task_id, "b_0000")
+        self.assertFalse(old.heartbeat())
+        old.release()  # 不应删除 w2 的租约
+        self.assertTrue(new.heartbeat())
+
+    def test_heartbeat_thread_detects_lost_lease(self):
+        q = SweepQueue(self.root)
+        q.submit([{"fast": 3}], batch_id="b")
+        lease = q.claim("w1")
+        with Heartbeat(lease, interval=0.01) as hb:
+            time.sleep(0.05)
+            self.assertFalse(hb.lost)
+            os.unlink(lease.path)
+            time.sleep(0.05)
+        self.assertTrue(hb.lost)
+
+    def test_submit_work_merge_end_to_end(self):
+        data = os.path.join(self.tmp.name, "AAA.csv")
+        _write_prices(data)
+        jobs = os.path.join(self.tmp.name, "jobs.jsonl")
+        with open(jobs, "w") as f:
+            for fast, slow in [(3, 8), (4, 10)]:
+                f.write(json.dumps({"symbol": "AAA", "csv_path": data, "fast": fast, "slow": slow}) + "\n")
+            f.write(json.dumps({"symbol": "BBB", "csv_path": os.path.join(self.tmp.name, "missing.csv")}) + "\n")
+
+        base = ["--queue", self.root, "--log-level", "ERROR"]
+        out = os.path.join(self.tmp.name, "out")
+        self.assertEqual(main(base + ["submit", jobs, "--batch-id", "t", "--output-root", out]), 0)
+        self.assertEqual(main(base + ["work", "--worker-id", "w1", "--max-tasks", "1"]), 0)
+        self.assertEqual(main(base + ["work", "--worker-id", "w2"]), 1)
+
+        merged = os.path.join(self.tmp.name, "merged.csv")
+        self.assertEqual(main(base + ["merge", "--out", merged]), 0)
+        with open(merged) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["task_id"] for r in rows], ["t_0000", "t_0001", "t_0002"])
+        self.assertEqual([r["status"] for r in rows], ["ok", "ok", "failed"])
+        self.assertEqual([r["worker"] for r in rows], ["w1", "w2", "w2"])
+        self.assertTrue(os.path.exists(os.path.join(out, "t_0000", "metrics.json")))
+        self.assertNotEqual(rows[0]["sharpe"], "")
+        self.assertEqual(json.loads(rows[1]["params"])["fast"], 4)
+        self.assertEqual(SweepQueue(self.root).status(), {"pending": 0, "leased": 0, "ok": 2, "failed": 1})
+
+    def test_merge_writes_results_db_without_report_dirs(self):
+        data = os.path.join(self.tmp.name, "AAA.csv")
+        _write_prices(data)
+        jobs = os.path.join(self.tmp.name, "jobs.jsonl")
+        with open(jobs, "w") as f:
+            for fast, slow in [(3, 8), (4, 10)]:
+                f.write(json.dumps({"symbol": "AAA", "csv_path": data, "fast": fast, "slow": slow}) + "\n")
+
+        base = ["--queue", self.root, "--log-level", "ERROR"]
+        out = os.path.join(self.tmp.name, "out")
+        db = os.path.join(self.tmp.name, "r.db")
+        self.assertEqual(main(base + ["submit", jobs, "--batch-id", "t", "--output-root", out]), 0)
+        self.assertEqual(main(base + ["work", "--worker-id", "w1", "--no-report-dir"]), 0)
+        self.assertFalse(os.path.exists(out))
+
+        merged = os.path.join(self.tmp.name, "merged.csv")
+        self.assertEqual(main(base + ["merge", "--out", merged, "--results-db", db]), 0)
+        with open(merged) as f:
+            sharpe = {r["run_id"]: float(r["sharpe"]) for r in csv.DictReader(f)}
+        with SqliteResultsStore(db) as store:
+            rows = store.query(order_by="fast", descending=False, limit=None)
+        self.assertEqual([(r["run_id"], r["config"]["slow"]) for r in rows], [("t_0000", 8), ("t_0001", 10)])
+        self.assertEqual({r["run_id"]: r["sharpe"] for r in rows}, sharpe)
+        self.assertEqual(rows[0]["bars"], 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.tradeAnalytics import analyze_trades, match_fifo, TradeColumns
+from finance.core.coreTypes import Bar, Side, TradeRecord
+from finance.data.barArrays import BarArrays
+from finance.portfolio.runJournal import RunJournal
+
+D0 = datetime(2024, 1, 1)
+
+
+def _trade(day, symbol, side, qty, price, fee=0.0):
+    return TradeRecord(dt=D0 + timedelta(days=day), symbol=symbol, side=side, quantity=qty, price=price, fee=fee, slippage=0.0, order_id=f"o{day}")
+
+
+class TestTradeAnalytics(unittest.TestCase):
+    def test_fifo_partial_lots_across_symbols(self):
+        trades = [
+            _trade(0, "A", Side.BUY, 100, 10.0, fee=1.0),
+            _trade(1, "B", Side.BUY, 50, 20.0),
+            _trade(2, "A", Side.BUY, 100, 12.0, fee=1.0),
+            _trade(3, "A", Side.SELL, 150, 13.0, fee=3.0),
+            _trade(4, "B", Side.SELL, 50, 18.0),
+            _trade(5, "A", Side.SELL, 30, 11.0),
+        ]
+        m = match_fifo(TradeColumns.from_records(trades))
+        got = sorted(zip(m.buy_index.tolist(), m.sell_index.tolist(), m.quantity.tolist()))
+        self.assertEqual(got, [(0, 3, 100), (1, 4, 50), (2, 3, 50), (2, 5, 30)])
+
+        result = analyze_trades(trades)
+        rt = result.round_trips.sort_values(["entry_dt", "exit_dt"]).reset_index(drop=True)
+        # 第一段：100 股 10 -> 13，买入费 1 + 卖出费 3×100/150
+        self.assertAlmostEqual(rt.loc[0, "fees"], 1.0 + 2.0)
+        self.assertAlmostEqual(rt.loc[0, "pnl"], 300.0 - 3.0)
+        self.assertAlmostEqual(rt.loc[0, "holding_days"], 3.0)
+
+        stats = result.stats
+        self.assertEqual(stats["round_trips"], 4)
+        self.assertAlmostEqual(stats["win_rate"], 0.5)
+        gross_loss = 100.0 + 30.0 + 0.3  # B: -100；A 第二批 30 股：-30 - 买入费分摊 0.3
+        self.assertAlmostEqual(stats["gross_loss"], gross_loss)
+        self.assertAlmostEqual(stats["expectancy"], float(rt["pnl"].mean()))
+        self.assertAlmostEqual(stats["profit_factor"], stats["gross_profit"] / gross_loss)
+
+    def test_columns_from_trade_log_match_records(self):
+        trades = [
+            _trade(0, "B", Side.BUY, 50, 20.0, fee=0.5),
+            _trade(1, "A", Side.BUY, 100, 10.0, fee=1.0),
+            _trade(2, "A", Side.SELL, 60, 12.0, fee=0.7),
+            _trade(3, "B", Side.SELL, 50, 18.0),
+        ]
+        expected = TradeColumns.from_records(trades)
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal.create(os.path.join(tmp, "run")) as journal:
+                for t in trades:
+                    journal.trades.append(t)
+                cols = TradeColumns.from_records(journal.trades)
+                rt = analyze_trades(journal.trades).round_trips
+
+        self.assertEqual(cols.symbols, ["A", "B"])
+        for name in ("symbol_id", "ts", "side", "quantity", "price", "fee"):
+            np.testing.assert_array_equal(getattr(cols, name), getattr(expected, name))
+            self.assertEqual(getattr(cols, name).dtype, getattr(expected, name).dtype)
+        self.assertTrue(rt.equals(analyze_trades(trades).round_trips))
+
+    def test_mae_mfe_from_bar_range(self):
+        closes = [10.0, 10.0, 10.0, 10.0]
+        lows = [9.5, 8.0, 9.0, 7.0]
+        highs = [10.5, 12.0, 11.0, 15.0]
+        bars = [
+            Bar(dt=D0 + timedelta(days=i), symbol="A", open=c, high=h, low=lo, close=c, volume=1.0)
+            for i, (c, h, lo) in enumerate(zip(closes, highs, lows))
+        ]
+        trades = [_trade(1, "A", Side.BUY, 10, 10.0), _trade(3, "A", Side.SELL, 10, 10.0)]
+        rt = analyze_trades(trades, bars={"A": BarArrays.from_bars(bars)}).round_trips
+        # 出场 bar（第 3 根）开盘成交，其高低点不计入
+        self.assertAlmostEqual(rt.loc[0, "mae"], -0.2)
+        self.assertAlmostEqual(rt.loc[0, "mfe"], 0.2)
+        self.assertEqual(rt.loc[0, "holding_bars"], 2)
+
+    def test_open_lots_and_short_sells(self):
+        result = analyze_trades([_trade(0, "A", Side.BUY, 10, 10.0)])
+        self.assertEqual(result.stats["round_trips"], 0)
+        self.assertIsNone(result.stats["profit_factor"])
+
+        with self.assertRaises(ValueError):
+            analyze_trades([_trade(0, "A", Side.SELL, 10, 10.0), _trade(1, "A", Side.BUY, 10, 10.0)])
+
+    def test_empty(self):
+        empty = analyze_trades([])
+        self.assertEqual(len(empty.round_trips), 0)
+        # 无成交时统计项与有成交时同一组键
+        full = analyze_trades([_trade(0, "A", Side.BUY, 10, 10.0), _trade(1, "A", Side.SELL, 10, 11.0)])
+        self.assertEqual(list(empty.stats), list(full.stats))
+        self.assertEqual((empty.stats["gross_profit"], empty.stats["avg_mae"]), (0.0, None))
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from finance.data.barArrays import BarArrays
+from finance.data.tradingCalendar import AlignedPanel, FillPolicy, TradingCalendar
+
+
+def _arrays(ts, close):
+    ts = np.asarray(ts, dtype=np.int64)
+    close = np.asarray(close, dtype=np.float64)
+    return BarArrays(ts=ts, open=close, high=close, low=close, close=close, volume=close * 100)
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        # A 全程交易；B 晚上市且停牌一天；C 提前退市
+        self.panel = AlignedPanel.build(
+            {
+                "A": _arrays([1, 2, 3, 4, 5], [10, 11, 12, 13, 14]),
+                "B": _arrays([3, 5], [20, 22]),
+                "C": _arrays([1, 2], [30, 31]),
+            }
+        )
+
+    def test_position_map_and_row_index(self):
+        p = self.panel
+        self.assertEqual(p.calendar.ts.tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(p.position_map["B"].dtype, np.int32)
+        self.assertEqual(p.position_map["B"].tolist(), [2, 4])
+        self.assertEqual(p.row_index[:, 1].tolist(), [-1, -1, 0, -1, 1])
+        with self.assertRaises(ValueError):
+            p.calendar.positions(np.array([6]))
+
+    def test_fill_policies(self):
+        p = self.panel
+        nan = p.panel("close")
+        self.assertTrue(np.isnan(nan[3, 1]))
+        self.assertEqual(nan[4].tolist()[:2], [14.0, 22.0])
+
+        ffill = p.panel("close", "ffill")
+        self.assertEqual(ffill[3, 1], 20.0)
+        self.assertTrue(np.isnan(ffill[:2, 1]).all())
+        self.assertEqual(ffill[4, 2], 31.0)
+
+        zero = p.panel("volume", FillPolicy.ZERO)
+        self.assertEqual(zero[:, 1].tolist(), [0.0, 0.0, 2000.0, 0.0, 2200.0])
+
+        self.assertEqual(p.listed[:, 1].tolist(), [False, False, True, True, True])
+        self.assertEqual(p.listed[:, 2].tolist(), [True, True, False, False, False])
+
+    def test_views_are_zero_copy(self):
+        p = self.panel
+        full = p.panel("close", "ffill")
+        self.assertIs(p.panel("close", "ffill"), full)
+        self.assertTrue(np.shares_memory(p.window("close", "ffill", start_ns=2, end_ns=4), full))
+        self.assertTrue(np.shares_memory(p.column("B", "close", "ffill"), full))
+        # 完整覆盖日历的标的直接返回原始数组
+        self.assertIs(p.column("A"), p.arrays["A"].close)
+        self.assertEqual(p.window(start_ns=2, end_ns=4).shape, (3, 3))
+        self.assertFalse(full.flags.writeable)
+
+    def test_union_calendar(self):
+        cal = TradingCalendar.union([np.array([3, 1]), np.array([2, 3])])
+        self.assertEqual(cal.ts.tolist(), [1, 2, 3])
+        self.assertEqual(cal.bounds(2, None), (1, 3))
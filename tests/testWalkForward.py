@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from finance.backtest.backtestEngine import BacktestEngine
+from finance.backtest.metrics import Metrics, MetricsConfig
+from finance.backtest.optimizer import sma_grid
+from finance.backtest.walkForward import run_walk_forward, walk_forward_windows
+from finance.core.coreTypes import Bar
+from finance.data.barArrays import BarArrays
+from finance.data.dataHandler import DataHandler
+from finance.execution.broker import Broker
+from finance.execution.feeModel import FeeModel
+from finance.portfolio.portfolio import Portfolio
+from finance.strategy.smaCrossStrategy import SmaCrossStrategy
+
+
+def _bars(n=360, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 10.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    base = datetime(2020, 1, 1)
+    return [
+        Bar(dt=base + timedelta(days=i), symbol="T", open=c * 1.001, high=c * 1.01, low=c * 0.99, close=c, volume=1.0)
+        for i, c in enumerate(close.tolist())
+    ]
+
+
+class TestWalkForward(unittest.TestCase):
+    def test_windows(self):
+        rolling = walk_forward_windows(100, 40, 25)
+        self.assertEqual([(w.train_start, w.train_end, w.test_start, w.test_end) for w in rolling], [(0, 40, 40, 65), (25, 65, 65, 90), (50, 90, 90, 100)])
+        anchored = walk_forward_windows(100, 40, 25, anchored=True)
+        self.assertTrue(all(w.train_start == 0 for w in anchored))
+        self.assertEqual(walk_forward_windows(30, 40, 25), [])
+
+    def test_oos_segments_match_engine(self):
+        bars = _bars()
+        arrays = BarArrays.from_bars(bars)
+        fee = FeeModel(rate=0.0005)
+        kwargs = dict(train_bars=150, test_bars=70, initial_cash=100_000.0, fee_model=fee, backend="python")
+        result = run_walk_forward(arrays, sma_grid([3, 5, 10], [20, 40]), **kwargs)
+
+        self.assertEqual(len(result.oos_equity), len(bars) - 150)
+        self.assertEqual(result.windows["test_bars"].sum(), len(bars) - 150)
+
+        # 每个测试段 = 用该段参数、在 [test_start - (slow-1), test_end) 上独立跑 BacktestEngine 的样本外部分
+        level = 1.0
+        for row in result.windows.itertuples(index=False):
+            lead = row.slow - 1
+            seg = bars[row.test_start - lead : row.test_end]
+            engine = BacktestEngine(
+                symbol="T",
+                data=DataHandler(_bars_by_symbol={"T": seg}),
+                strategy=SmaCrossStrategy(symbol="T", fast_window=row.fast, slow_window=row.slow),
+                broker=Broker(fee_model=fee),
+                portfolio=Portfolio(symbol="T", initial_cash=100_000.0),
+            )
+            eq = np.array([p.total_equity for p in engine.run().equity_curve[lead:]])
+            got = result.oos_equity.loc[result.oos_equity["window"] == row.window, "total_equity"].to_numpy()
+            np.testing.assert_allclose(got, eq / 100_000.0 * level * 100_000.0, rtol=1e-12)
+            self.assertAlmostEqual(row.test_return, eq[-1] / eq[0] - 1.0)
+            level *= eq[-1] / 100_000.0
+
+        parallel = run_walk_forward(arrays, sma_grid([3, 5, 10], [20, 40]), max_workers=2, **kwargs)
+        np.testing.assert_allclose(parallel.oos_equity["total_equity"], result.oos_equity["total_equity"])
+        self.assertEqual(parallel.windows["fast"].tolist(), result.windows["fast"].tolist())
+
+    def test_train_score_ignores_warmup_bars(self):
+        bars = _bars()
+        arrays = BarArrays.from_bars(bars)
+        result = run_walk_forward(arrays, [{"fast": 5, "slow": 40}], train_bars=150, test_bars=70, initial_cash=100_000.0, backend="python")
+        row = result.windows.iloc[1]
+        lead = 39
+        engine = BacktestEngine(
+            symbol="T",
+            data=DataHandler(_bars_by_symbol={"T": bars[int(row.train_start) - lead : int(row.train_end)]}),
+            strategy=SmaCrossStrategy(symbol="T", fast_window=5, slow_window=40),
+            broker=Broker(),
+            portfolio=Portfolio(symbol="T", initial_cash=100_000.0),
+        )
+        eq = np.array([p.total_equity for p in engine.run().equity_curve])
+        self.assertAlmostEqual(row.train_score, float(Metrics.compute_matrix(eq[lead:], MetricsConfig())["sharpe"][0]), places=10)
+        self.assertNotAlmostEqual(row.train_score, float(Metrics.compute_matrix(eq, MetricsConfig())["sharpe"][0]), places=6)